@@ -0,0 +1,123 @@
+"""
+静的アセット配信
+=============
+
+`scripts/build_asset_manifest.py` が出力したマニフェストを使ってテンプレートの論理名を
+ハッシュ付きURLへ解決する `asset_url` と、ハッシュ付きファイルを長期キャッシュ付きで、
+`.br` / `.gz` の圧縮版があればそれを優先して配信する `PrecompressedStaticFiles` を提供します。
+
+マニフェストが無い場合 (開発時) は論理名をそのまま返すため、従来どおり /static・/assets の
+元ファイルが配信されます。
+"""
+
+import json
+import re
+import stat
+from mimetypes import guess_type
+from pathlib import Path
+from typing import Dict, Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.core.config import ASSET_MANIFEST_PATH, STATIC_CACHE_MAX_AGE_SECONDS, logger
+from app.middleware.compression import choose_encoding
+
+# ハッシュ付きファイル名 (例: main.3f2a9c1b7d4e.css) の判定
+HASHED_FILENAME_PATTERN = re.compile(r"\.[0-9a-f]{12}\.[^./]+$")
+
+# 圧縮版の拡張子 (優先順)
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+_manifest: Optional[Dict[str, str]] = None
+
+
+def load_asset_manifest(path: str = ASSET_MANIFEST_PATH) -> Dict[str, str]:
+    """
+    マニフェストを読み込み、論理名→URL の辞書としてキャッシュします。
+
+    ファイルが無い、または壊れている場合は空の辞書を使います。
+    """
+    global _manifest
+    manifest_file = Path(path)
+    try:
+        with manifest_file.open(encoding="utf-8") as f:
+            _manifest = dict(json.load(f))
+        logger.info(f"アセットマニフェストを読み込みました: {manifest_file} ({len(_manifest)}件)")
+    except FileNotFoundError:
+        _manifest = {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"アセットマニフェストを読み込めないため元のファイルを配信します: {e}")
+        _manifest = {}
+    return _manifest
+
+
+def get_asset_manifest() -> Dict[str, str]:
+    """読み込み済みのマニフェストを返します (未読み込みの場合は読み込みます)。"""
+    return _manifest if _manifest is not None else load_asset_manifest()
+
+
+def asset_url(name: str) -> str:
+    """
+    アセットの論理名 (例: `/static/js/main.js`) を配信用URLに解決します。
+
+    マニフェストに無い場合は論理名をそのまま返します。
+    """
+    return get_asset_manifest().get(name, name)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    圧縮版の優先配信とキャッシュヘッダーを付与する StaticFiles
+
+    - クライアントが受け付ける場合、`<file>.br` / `<file>.gz` があればそれを返します。
+    - ハッシュ付きファイル名は内容が変わらないため immutable で長期キャッシュさせ、
+      それ以外は毎回 ETag で再検証させます。
+    """
+
+    def __init__(self, *args, max_age: int = STATIC_CACHE_MAX_AGE_SECONDS, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.max_age = max_age
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await self._precompressed_response(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            if HASHED_FILENAME_PATTERN.search(path):
+                response.headers["Cache-Control"] = f"public, max-age={self.max_age}, immutable"
+            else:
+                response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    async def _precompressed_response(self, path: str, scope: Scope) -> Optional[Response]:
+        """受け付け可能な圧縮版があればそのレスポンスを返します。"""
+        if scope["method"] not in ("GET", "HEAD"):
+            return None
+        request_headers = Headers(scope=scope)
+        accept_encoding = request_headers.get("accept-encoding", "")
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+            # 圧縮版の配信には圧縮ライブラリが不要なため、ファイルがあれば br も返せる
+            if choose_encoding(accept_encoding, (encoding,)) is None:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+                break
+        else:
+            return None
+
+        # Content-Type は圧縮前のファイル名から決める
+        response = FileResponse(
+            full_path,
+            stat_result=stat_result,
+            method=scope["method"],
+            media_type=guess_type(path)[0] or "text/plain",
+        )
+        response.headers["Content-Encoding"] = encoding
+        response.headers["Vary"] = "Accept-Encoding"
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
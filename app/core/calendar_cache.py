@@ -0,0 +1,183 @@
+"""
+カレンダーデータキャッシュ管理
+==========================
+
+月次カレンダー (サマリー表示) と日別詳細のデータをプロセス内で保持する共有キャッシュです。
+件数上限付きの LRU として動作し、勤怠・勤怠種別・グループ・ユーザー・社員種別・カスタム祝日の
+書き込み時に CRUD 層から明示的に無効化されます。
+
+複数ワーカーで動作する場合に備え、各エントリには登録時点のキャッシュ世代 (DB 上の世代カウンタ)
+を付与します。参照時に呼び出し元が渡す現在の世代と一致しないエントリは、他のワーカーで
+書き込みが行われたものとして破棄されます。
+"""
+
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import (
+    CALENDAR_CACHE_MAX_ENTRIES,
+    CALENDAR_CACHE_TTL_SECONDS,
+    logger,
+)
+
+# キャッシュキーの種別
+MONTH_KEY = "month"
+DAY_KEY = "day"
+
+CacheKey = Tuple[str, str]
+# 世代トークン (比較のみに使用するため形式は呼び出し元に委ねる)
+Generation = Any
+
+
+def _month_key(year: int, month: int) -> CacheKey:
+    return (MONTH_KEY, f"{year:04d}-{month:02d}")
+
+
+def _day_key(date_obj: datetime.date) -> CacheKey:
+    return (DAY_KEY, date_obj.isoformat())
+
+
+class CalendarCache:
+    """月/日単位のカレンダーデータを保持するスレッドセーフな LRU キャッシュ"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self._max_entries = max(1, max_entries)
+        self._ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Generation, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _get(self, key: CacheKey, generation: Generation) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            stored_at, stored_generation, value = entry
+            expired = self._ttl_seconds > 0 and time.monotonic() - stored_at >= self._ttl_seconds
+            if expired or stored_generation != generation:
+                del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def _set(self, key: CacheKey, value: Any, generation: Generation) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def get_month(self, year: int, month: int, generation: Generation = None) -> Optional[Any]:
+        """月次カレンダーデータを取得する (未登録・期限切れ・世代不一致の場合は None)"""
+        return self._get(_month_key(year, month), generation)
+
+    def set_month(self, year: int, month: int, value: Any, generation: Generation = None) -> None:
+        """月次カレンダーデータを登録する"""
+        self._set(_month_key(year, month), value, generation)
+
+    def get_day(self, date_obj: datetime.date, generation: Generation = None) -> Optional[Any]:
+        """日別詳細データを取得する (未登録・期限切れ・世代不一致の場合は None)"""
+        return self._get(_day_key(date_obj), generation)
+
+    def set_day(self, date_obj: datetime.date, value: Any, generation: Generation = None) -> None:
+        """日別詳細データを登録する"""
+        self._set(_day_key(date_obj), value, generation)
+
+    def invalidate_date(self, date_obj: datetime.date) -> None:
+        """指定日の日別データと、その日を含む月のデータを破棄する"""
+        with self._lock:
+            self._entries.pop(_day_key(date_obj), None)
+            self._entries.pop(_month_key(date_obj.year, date_obj.month), None)
+        logger.debug(f"カレンダーキャッシュ無効化: {date_obj.isoformat()}")
+
+    def clear(self) -> None:
+        """全エントリを破棄する"""
+        with self._lock:
+            self._entries.clear()
+        logger.debug("カレンダーキャッシュを全件無効化しました")
+
+    def get_cache_info(self) -> Dict[str, Any]:
+        """キャッシュの情報を取得する（デバッグ用）"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "ttl_seconds": self._ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+# グローバルインスタンス
+_calendar_cache = CalendarCache(
+    max_entries=CALENDAR_CACHE_MAX_ENTRIES, ttl_seconds=CALENDAR_CACHE_TTL_SECONDS
+)
+
+
+def get_month_data(year: int, month: int, generation: Generation = None) -> Optional[Any]:
+    """キャッシュ済みの月次カレンダーデータを取得する
+
+    Args:
+        year: 年
+        month: 月
+        generation: 現在のキャッシュ世代 (登録時の世代と異なる場合はヒットしない)
+
+    Returns:
+        Optional[Any]: キャッシュされたデータ（存在しない場合は None）
+    """
+    return _calendar_cache.get_month(year, month, generation)
+
+
+def set_month_data(year: int, month: int, value: Any, generation: Generation = None) -> None:
+    """月次カレンダーデータをキャッシュに登録する
+
+    generation にはデータを読み込む前に取得した世代を渡します。
+    """
+    _calendar_cache.set_month(year, month, value, generation)
+
+
+def get_day_data(date_obj: datetime.date, generation: Generation = None) -> Optional[Any]:
+    """キャッシュ済みの日別詳細データを取得する
+
+    Args:
+        date_obj: 対象日
+        generation: 現在のキャッシュ世代 (登録時の世代と異なる場合はヒットしない)
+
+    Returns:
+        Optional[Any]: キャッシュされたデータ（存在しない場合は None）
+    """
+    return _calendar_cache.get_day(date_obj, generation)
+
+
+def set_day_data(date_obj: datetime.date, value: Any, generation: Generation = None) -> None:
+    """日別詳細データをキャッシュに登録する
+
+    generation にはデータを読み込む前に取得した世代を渡します。
+    """
+    _calendar_cache.set_day(date_obj, value, generation)
+
+
+def invalidate_date(date_obj: datetime.date) -> None:
+    """勤怠の書き込みで影響を受ける日・月のキャッシュを無効化する"""
+    _calendar_cache.invalidate_date(date_obj)
+
+
+def invalidate_all() -> None:
+    """マスタ (勤怠種別・グループ・ユーザー等) 変更時にキャッシュ全体を無効化する"""
+    _calendar_cache.clear()
+
+
+def get_cache_info() -> Dict[str, Any]:
+    """キャッシュの情報を取得する（デバッグ用）
+
+    Returns:
+        Dict[str, Any]: キャッシュ情報
+    """
+    return _calendar_cache.get_cache_info()
@@ -0,0 +1,190 @@
+"""
+勤怠変更通知バス
+==============
+
+勤怠の書き込みがコミットされたことを、勤怠確認ページのライブ更新 (Server-Sent Events) の
+接続へ配信するプロセス内の通知バスです。
+
+- 書き込み側 (CRUD 層) はコミット後に変更された日付、または全体の変更 (`ALL_CHANGED`) を
+  `publish` します。スレッドプール上の同期処理からも呼び出せます。
+- 購読側は接続ごとに上限付きのキューを持ちます。キューが溢れた接続には個々の通知を捨てて
+  `ALL_CHANGED` を1回だけ渡すため、遅いクライアントがあってもメモリ使用量は増えず、
+  書き込み側が待たされることもありません。
+
+他のワーカーでの書き込みは、`app/services/change_stream_service.py` が DB の世代カウンタを
+定期的に確認して同じバスへ流します。
+"""
+
+import asyncio
+import datetime
+import threading
+from typing import FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+
+from app.core.config import CHANGE_STREAM_QUEUE_SIZE, logger
+
+
+class _Marker:
+    """通知の種別を表す番兵"""
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def __repr__(self) -> str:
+        return self._name
+
+
+# 全てのカレンダーデータに影響する変更 (マスタ変更・通知の取りこぼしなど)
+ALL_CHANGED = _Marker("ALL_CHANGED")
+# バスの停止 (購読側はストリームを終了する)
+CLOSED = _Marker("CLOSED")
+
+ChangeNotice = Union[FrozenSet[datetime.date], _Marker]
+
+
+class Subscription:
+    """1接続分の購読。通知は接続を受け付けたイベントループ上のキューに届けられます。"""
+
+    def __init__(self, bus: "ChangeBus", maxsize: int, month: Optional[Tuple[int, int]] = None) -> None:
+        self._bus = bus
+        # 購読側が表示している (年, 月)。他ワーカーの変更を確認する範囲の絞り込みに使う
+        self.month = month
+        self._loop = asyncio.get_running_loop()
+        self._queue: "asyncio.Queue[ChangeNotice]" = asyncio.Queue(maxsize=max(1, maxsize))
+        self._overflowed = False
+        self._closed = False
+        self.dropped = 0
+
+    def _deliver(self, notice: ChangeNotice) -> None:
+        """イベントループ上で通知をキューに入れる (溢れた場合は以降の通知を捨てる)"""
+        if self._closed:
+            return
+        if notice is CLOSED:
+            self._closed = True
+            # 停止の通知は溢れていても必ず届ける
+            while self._queue.full():
+                self._queue.get_nowait()
+            self._queue.put_nowait(CLOSED)
+            return
+        if self._overflowed:
+            self.dropped += 1
+            return
+        try:
+            self._queue.put_nowait(notice)
+        except asyncio.QueueFull:
+            self._overflowed = True
+            self.dropped += 1
+
+    def notify(self, notice: ChangeNotice) -> None:
+        """任意のスレッドから通知を渡します。"""
+        if self._loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._deliver(notice)
+        else:
+            self._loop.call_soon_threadsafe(self._deliver, notice)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[ChangeNotice]:
+        """
+        次の通知を待ちます。
+
+        キューが溢れていた場合は、溜まった通知を破棄して `ALL_CHANGED` を返します
+        (受信側はデータを再取得すれば取りこぼしを気にする必要がありません)。
+        日付の通知が複数溜まっている場合は1つにまとめて返します。
+
+        Returns:
+            Optional[ChangeNotice]: 通知 (timeout までに通知が無い場合は None)
+        """
+        if self._overflowed:
+            while not self._queue.empty():
+                if self._queue.get_nowait() is CLOSED:
+                    return CLOSED
+            self._overflowed = False
+            return ALL_CHANGED
+        try:
+            notice = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+        # 既に溜まっている日付の通知は1つにまとめて返す (一括登録などで連続した場合)
+        while isinstance(notice, frozenset) and not self._queue.empty():
+            following = self._queue.get_nowait()
+            notice = notice | following if isinstance(following, frozenset) else following
+        return notice
+
+    def close(self) -> None:
+        """購読を解除します。"""
+        self._bus.unsubscribe(self)
+
+
+class ChangeBus:
+    """勤怠変更の通知を購読中の全接続へ配信するバス (スレッドセーフ)"""
+
+    def __init__(self, queue_size: int = CHANGE_STREAM_QUEUE_SIZE) -> None:
+        self._queue_size = queue_size
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        """購読中の接続数"""
+        return len(self._subscriptions)
+
+    @property
+    def sequence(self) -> int:
+        """これまでに配信した通知の数 (通知を受け取った時点の値は、その通知の配信後の値になる)"""
+        return self._sequence
+
+    @property
+    def watched_months(self) -> Set[Tuple[int, int]]:
+        """購読中の接続が表示している (年, 月) の集合"""
+        return {s.month for s in self._subscriptions if s.month is not None}
+
+    def subscribe(self, month: Optional[Tuple[int, int]] = None) -> Subscription:
+        """
+        購読を開始します (イベントループ上で呼び出してください)。
+
+        Args:
+            month: 購読側が表示している (年, 月)。通知自体は月に関係なく全て届きます
+        """
+        subscription = Subscription(self, self._queue_size, month)
+        with self._lock:
+            self._subscriptions = [*self._subscriptions, subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """購読を解除します。"""
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+
+    def publish(self, notice: Union[Iterable[datetime.date], _Marker]) -> None:
+        """
+        変更を全ての購読へ通知します。
+
+        Args:
+            notice: 変更された日付、または `ALL_CHANGED`
+        """
+        if not isinstance(notice, _Marker):
+            notice = frozenset(notice)
+            if not notice:
+                return
+        with self._lock:
+            self._sequence += 1
+        for subscription in self._subscriptions:
+            try:
+                subscription.notify(notice)
+            except RuntimeError:
+                # 接続を受け付けたイベントループが既に停止している
+                logger.debug("停止済みのイベントループへの変更通知を破棄しました")
+
+    def close(self) -> None:
+        """全ての購読に停止を通知します (アプリケーション終了時)。"""
+        self.publish(CLOSED)
+
+
+# アプリケーション全体で共有する通知バス
+change_bus = ChangeBus()
@@ -23,3 +23,131 @@ logging.basicConfig(
 
 # アプリケーション全体で使用するルートロガーを取得します。
 logger = logging.getLogger("sokora")
+
+
+def _get_int_env(name: str, default: int) -> int:
+    """整数の環境変数を読み込みます (不正値はデフォルトにフォールバック)。"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"環境変数 {name} の値が不正なため既定値を使用します: {value}")
+        return default
+
+
+def _get_float_env(name: str, default: float) -> float:
+    """浮動小数点の環境変数を読み込みます (不正値はデフォルトにフォールバック)。"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"環境変数 {name} の値が不正なため既定値を使用します: {value}")
+        return default
+
+
+# カレンダーキャッシュ設定
+# 書き込み時に明示的に無効化されるため、TTL は取りこぼし時の安全網としてのみ機能します。
+CALENDAR_CACHE_MAX_ENTRIES = _get_int_env("SOKORA_CALENDAR_CACHE_MAX_ENTRIES", 256)
+CALENDAR_CACHE_TTL_SECONDS = _get_float_env("SOKORA_CALENDAR_CACHE_TTL_SECONDS", 300.0)
+
+
+def _get_choice_env(name: str, default: str, choices: tuple) -> str:
+    """選択肢のいずれかを取る環境変数を大文字で読み込みます (不正値はデフォルトにフォールバック)。"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    normalized = value.strip().upper()
+    if normalized not in choices:
+        logger.warning(f"環境変数 {name} の値が不正なため既定値を使用します: {value}")
+        return default
+    return normalized
+
+
+# SQLite 接続設定
+# 接続ごとに PRAGMA として適用されます。WAL により読み取りが書き込みにブロックされなくなり、
+# busy_timeout によりロック競合時は即座に `database is locked` とせず待機します。
+SQLITE_JOURNAL_MODE = _get_choice_env(
+    "SOKORA_SQLITE_JOURNAL_MODE", "WAL", ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+)
+SQLITE_SYNCHRONOUS = _get_choice_env(
+    "SOKORA_SQLITE_SYNCHRONOUS", "NORMAL", ("OFF", "NORMAL", "FULL", "EXTRA")
+)
+SQLITE_CACHE_SIZE_KIB = _get_int_env("SOKORA_SQLITE_CACHE_SIZE_KIB", 20000)
+SQLITE_MMAP_SIZE_BYTES = _get_int_env("SOKORA_SQLITE_MMAP_SIZE_BYTES", 134217728)
+SQLITE_TEMP_STORE = _get_choice_env(
+    "SOKORA_SQLITE_TEMP_STORE", "MEMORY", ("DEFAULT", "FILE", "MEMORY")
+)
+SQLITE_BUSY_TIMEOUT_MS = _get_int_env("SOKORA_SQLITE_BUSY_TIMEOUT_MS", 5000)
+
+# コネクションプール設定 (recycle に負の値を指定すると再接続しない)
+DB_POOL_SIZE = _get_int_env("SOKORA_DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _get_int_env("SOKORA_DB_MAX_OVERFLOW", 10)
+DB_POOL_RECYCLE_SECONDS = _get_int_env("SOKORA_DB_POOL_RECYCLE_SECONDS", -1)
+
+# 勤怠一覧API設定
+# 1ページの既定件数と上限件数。NDJSON ストリーミング時は既定件数ずつ keyset で読み進めます。
+ATTENDANCE_API_PAGE_SIZE = _get_int_env("SOKORA_ATTENDANCE_API_PAGE_SIZE", 1000)
+ATTENDANCE_API_MAX_PAGE_SIZE = _get_int_env("SOKORA_ATTENDANCE_API_MAX_PAGE_SIZE", 10000)
+# 一括登録API (POST /api/v1/attendances/bulk) の1リクエストあたりの上限操作数
+ATTENDANCE_BULK_MAX_OPERATIONS = _get_int_env("SOKORA_ATTENDANCE_BULK_MAX_OPERATIONS", 5000)
+
+# CSV取り込み (POST /api/v1/csv/import) で1トランザクションにまとめるセル数の目安
+# 行の途中では区切らないため、実際のチャンクはこの値を1行分超えることがあります。
+CSV_IMPORT_CHUNK_SIZE = _get_int_env("SOKORA_CSV_IMPORT_CHUNK_SIZE", 5000)
+# CSVダウンロードで1回に書き出す文字数の目安 (行単位でまとめてエンコードして送信します)
+CSV_EXPORT_CHUNK_SIZE = _get_int_env("SOKORA_CSV_EXPORT_CHUNK_SIZE", 65536)
+# CSVダウンロードで start/end に指定できる最大日数 (日付列の数の上限)
+CSV_EXPORT_MAX_DAYS = _get_int_env("SOKORA_CSV_EXPORT_MAX_DAYS", 3660)
+# 縦持ち形式のエクスポート (GET /api/v1/export/attendances) で1回に読み込む件数
+# Parquet では行グループ、Arrow ではレコードバッチ1つ分の行数になります。
+EXPORT_ROW_GROUP_SIZE = _get_int_env("SOKORA_EXPORT_ROW_GROUP_SIZE", 65536)
+
+
+def _get_list_env(name: str, default: str, choices: tuple) -> tuple:
+    """カンマ区切りの環境変数を小文字のタプルで読み込みます (選択肢にない値は警告して無視)。"""
+    value = os.environ.get(name, default)
+    items = []
+    for item in value.split(","):
+        normalized = item.strip().lower()
+        if not normalized:
+            continue
+        if normalized not in choices:
+            logger.warning(f"環境変数 {name} に不正な値が含まれているため無視します: {item}")
+            continue
+        if normalized not in items:
+            items.append(normalized)
+    return tuple(items)
+
+
+# レスポンス圧縮設定
+# 優先順に並べたエンコーディング (空文字で圧縮を無効化)。br は brotli パッケージがある場合のみ使用します。
+COMPRESSION_ENCODINGS = _get_list_env("SOKORA_COMPRESSION_ENCODINGS", "br,gzip", ("br", "gzip"))
+# これより小さいレスポンスは圧縮しない (バイト、ストリーミングレスポンスには適用しない)
+COMPRESSION_MINIMUM_SIZE = _get_int_env("SOKORA_COMPRESSION_MINIMUM_SIZE", 1024)
+COMPRESSION_GZIP_LEVEL = _get_int_env("SOKORA_COMPRESSION_GZIP_LEVEL", 6)
+COMPRESSION_BROTLI_QUALITY = _get_int_env("SOKORA_COMPRESSION_BROTLI_QUALITY", 4)
+
+# 静的アセット設定
+# scripts/build_asset_manifest.py が出力する論理名→ハッシュ付きURLの対応表
+ASSET_MANIFEST_PATH = os.environ.get("SOKORA_ASSET_MANIFEST_PATH", "assets/manifest.json")
+# ハッシュ付きファイル名のアセットに付与する Cache-Control の max-age (秒)
+STATIC_CACHE_MAX_AGE_SECONDS = _get_int_env("SOKORA_STATIC_CACHE_MAX_AGE_SECONDS", 31536000)
+
+# 勤怠確認ページのライブ更新 (Server-Sent Events) 設定
+# 接続ごとの通知キューの上限 (溢れた接続には再取得の通知を1回だけ送る)
+CHANGE_STREAM_QUEUE_SIZE = _get_int_env("SOKORA_CHANGE_STREAM_QUEUE_SIZE", 64)
+# ワーカーあたりの同時接続数の上限 (超えた場合は 503 を返し、ブラウザは再接続を試みる)
+CHANGE_STREAM_MAX_CLIENTS = _get_int_env("SOKORA_CHANGE_STREAM_MAX_CLIENTS", 200)
+# 変更が無い間にコメント行を送る間隔 (秒、プロキシのアイドル切断対策)
+CHANGE_STREAM_HEARTBEAT_SECONDS = _get_float_env("SOKORA_CHANGE_STREAM_HEARTBEAT_SECONDS", 15.0)
+# 1本のストリームを保つ最長時間 (秒)。経過後はブラウザが再接続する (終了時に接続の終了を待ち続けないため)
+CHANGE_STREAM_MAX_AGE_SECONDS = _get_float_env("SOKORA_CHANGE_STREAM_MAX_AGE_SECONDS", 300.0)
+# 他ワーカーでの書き込みを世代カウンタから検出する間隔 (秒、0 で無効)
+CHANGE_STREAM_POLL_SECONDS = _get_float_env("SOKORA_CHANGE_STREAM_POLL_SECONDS", 5.0)
+
+# 祝日データの更新 (祝日キャッシュファイルの差し替え・他ワーカーでのカスタム祝日の変更) を確認する間隔 (秒、0 で無効)
+HOLIDAY_CACHE_CHECK_SECONDS = _get_float_env("SOKORA_HOLIDAY_CACHE_CHECK_SECONDS", 60.0)
@@ -12,6 +12,8 @@ from .calendar import calendar
 from .group import group
 from .user_type import user_type
 from .custom_holiday import custom_holiday
+from .cache_generation import cache_generation
+from .attendance_summary import attendance_summary
 
 __all__ = [
     "user",
@@ -21,4 +23,6 @@ __all__ = [
     "group",
     "user_type",
     "custom_holiday",
+    "cache_generation",
+    "attendance_summary",
 ]
@@ -5,28 +5,49 @@
 勤怠記録モデルの作成、読取、更新、削除操作を提供します。
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from datetime import datetime, date
 from types import SimpleNamespace
+from sqlalchemy import Select, bindparam, inspect, select, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-import time
 
 from .base import CRUDBase
+from app.core import calendar_cache
+from .cache_generation import cache_generation
+from .attendance_summary import attendance_summary
 from app.models.attendance import Attendance
 from app.models.user import User
+from app.models.group import Group
 from app.models.location import Location
 from app.models.user_type import UserType
-from app.schemas.attendance import AttendanceCreate, AttendanceUpdate
+from app.schemas.attendance import AttendanceBulkOperation, AttendanceCreate, AttendanceUpdate
 from app.core.config import logger
 
 
 class CRUDAttendance(CRUDBase[Attendance, AttendanceCreate, AttendanceUpdate]):
     """勤怠記録モデルのCRUD操作クラス"""
 
-    # キャッシュの追加（パフォーマンス最適化）
-    _day_data_cache: Dict[str, Dict[str, List[Dict[str, str]]]] = {}
-    _cache_ttl = 60  # キャッシュの有効期間（秒）
-    _cache_timestamp: Dict[str, float] = {}
+    def _on_write(self, db: Session, db_obj: Attendance) -> None:
+        """
+        勤怠の作成・更新・削除時に、全ワーカーの該当日と該当月のカレンダーキャッシュを失効させ、
+        該当ユーザー・該当月の月次集計を再計算します。
+
+        更新でユーザーや日付が変わった場合は、変更前のユーザー・月も対象にします。
+        """
+        affected = {(str(db_obj.user_id), db_obj.date)}
+        state = inspect(db_obj)
+        old_user_ids = state.attrs.user_id.history.deleted
+        old_dates = state.attrs.date.history.deleted
+        if old_user_ids or old_dates:
+            affected.add((
+                str(old_user_ids[0]) if old_user_ids else str(db_obj.user_id),
+                old_dates[0] if old_dates else db_obj.date,
+            ))
+        for user_id, date_obj in affected:
+            cache_generation.mark_date_changed(db, date_obj)
+            attendance_summary.refresh_user_month(db, user_id=user_id, date_obj=date_obj)
 
     def get_by_user_and_date(
         self, db: Session, *, user_id: str, date: date
@@ -66,16 +87,187 @@ class CRUDAttendance(CRUDBase[Attendance, AttendanceCreate, AttendanceUpdate]):
             bool: 削除が成功した場合はTrue、対象が見つからない場合やエラー時はFalse
         """
         try:
-            attendance = self.get_by_user_and_date(db, user_id=user_id, date=date_obj)
-            if attendance:
-                db.delete(attendance)
-                # コミットは呼び出し元の `update_user_entry` で実施されます。
-                return True
-            return False
+            # (user_id, date) の一意インデックスを使い、検索せずに1回の DELETE で削除します。
+            # コミットは呼び出し元の `update_user_entry` で実施されます。
+            num_deleted = (
+                db.query(Attendance)
+                .filter(Attendance.user_id == user_id, Attendance.date == date_obj)
+                .delete()
+            )
+            if num_deleted:
+                attendance_summary.refresh_user_month(db, user_id=user_id, date_obj=date_obj)
+            return num_deleted > 0
         except Exception as e:
             logger.error(f"勤怠削除処理中にエラーが発生しました: {str(e)}", exc_info=True)
             return False
 
+    def upsert_attendance(
+        self, db: Session, *, user_id: str, date_obj: date, location_id: int, note: Optional[str] = None
+    ) -> None:
+        """
+        指定されたユーザーIDと日付の勤怠記録を1回の `INSERT ... ON CONFLICT DO UPDATE` で作成または更新します。
+
+        既存レコードの検索を行わないため往復が1回で済み、同じセルを同時に編集した場合でも
+        重複レコードが作られることはありません (後から確定した書き込みが残ります)。
+
+        注意: この関数は直接コミットを行いません。呼び出し元でコミットが必要です。
+
+        Args:
+            db: データベースセッション
+            user_id: 対象のユーザーID
+            date_obj: 対象の日付オブジェクト
+            location_id: 設定する勤怠種別ID
+            note: 備考
+        """
+        stmt = sqlite_insert(Attendance).values(
+            user_id=user_id, date=date_obj, location_id=location_id, note=note
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Attendance.user_id, Attendance.date],
+            set_={"location_id": stmt.excluded.location_id, "note": stmt.excluded.note},
+        )
+        db.execute(stmt)
+        # 関連する日・月のキャッシュを無効化し、月次集計を再計算 (書き込みと同じトランザクションで実施)
+        cache_generation.mark_date_changed(db, date_obj)
+        attendance_summary.refresh_user_month(db, user_id=user_id, date_obj=date_obj)
+
+    def bulk_apply(
+        self,
+        db: Session,
+        *,
+        operations: Sequence[AttendanceBulkOperation],
+        atomic: bool = False,
+        commit: bool = True,
+        update_note: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        複数ユーザー・複数日の勤怠の登録・更新・削除を1つのトランザクションでまとめて適用します。
+
+        ユーザー・勤怠種別の存在確認は操作ごとに問い合わせず、対象IDをまとめて先読みした集合で行います。
+        書き込みは upsert と削除をそれぞれ executemany で実行し、月次集計は対象ユーザー・対象期間を
+        まとめて1回で再計算し、カレンダーキャッシュの世代更新は月ごとに1回だけ行います。
+        同じユーザー・日付に対する操作が複数ある場合は、後の操作が優先されます。
+        `results` は操作ごとの結果を、`created` / `updated` / `deleted` は実際に書き込む最終状態を
+        適用前の既存レコードと比べた件数を返します。
+
+        Args:
+            db: データベースセッション
+            operations: 適用する操作のリスト (location_id が None または -1 の場合は削除)
+            atomic: True の場合、1件でも不正な操作があれば何も適用しません
+            commit: False の場合はコミットを呼び出し元に委ねます
+            update_note: False の場合、既存レコードの更新時に備考を書き換えません
+
+        Returns:
+            Dict[str, Any]: `AttendanceBulkResult` と同じ形式の処理結果
+        """
+        user_ids = {op.user_id for op in operations}
+        location_ids = {op.location_id for op in operations if op.location_id not in (None, -1)}
+        known_users = set(db.scalars(select(User.id).where(User.id.in_(user_ids)))) if user_ids else set()
+        known_locations = (
+            set(db.scalars(select(Location.id).where(Location.id.in_(location_ids)))) if location_ids else set()
+        )
+
+        # 作成・更新の判定用に、対象ユーザー・対象期間の既存レコードのキーを先読みする
+        present: set = set()
+        if operations and known_users:
+            dates = [op.date for op in operations]
+            present = {
+                (str(row.user_id), row.date)
+                for row in db.execute(
+                    select(Attendance.user_id, Attendance.date).where(
+                        Attendance.user_id.in_(known_users),
+                        Attendance.date >= min(dates),
+                        Attendance.date <= max(dates),
+                    )
+                )
+            }
+
+        results: List[Dict[str, Any]] = []
+        upserts: Dict[Tuple[str, date], Dict[str, Any]] = {}
+        deletes: set = set()
+        # 操作ごとの結果は、それまでの操作を反映した状態に対して判定する
+        current = set(present)
+        failed = 0
+        for index, op in enumerate(operations):
+            key = (op.user_id, op.date)
+            result: Dict[str, Any] = {"index": index, "user_id": op.user_id, "date": op.date, "detail": None}
+            if op.user_id not in known_users:
+                result.update(status="error", detail=f"ユーザー '{op.user_id}' が見つかりません")
+                failed += 1
+            elif op.location_id in (None, -1):
+                result["status"] = "deleted" if key in current else "unchanged"
+                current.discard(key)
+                upserts.pop(key, None)
+                if key in present:
+                    # 既存のレコードだけを削除する (同じバッチで作成した行は登録しないだけでよい)
+                    deletes.add(key)
+            elif op.location_id not in known_locations:
+                result.update(status="error", detail=f"勤怠種別ID '{op.location_id}' が見つかりません")
+                failed += 1
+            else:
+                result["status"] = "updated" if key in current else "created"
+                current.add(key)
+                deletes.discard(key)
+                upserts[key] = {
+                    "user_id": op.user_id,
+                    "date": op.date,
+                    "location_id": op.location_id,
+                    "note": op.note,
+                }
+            results.append(result)
+
+        # 件数は、実際に書き込む最終状態を適用前の既存レコードと比べて数える
+        summary: Dict[str, Any] = {
+            "created": sum(1 for key in upserts if key not in present),
+            "updated": sum(1 for key in upserts if key in present),
+            "deleted": len(deletes),
+            "failed": failed,
+            "results": results,
+        }
+
+        if atomic and failed:
+            return {**summary, "applied": False}
+
+        try:
+            table = Attendance.__table__
+            if deletes:
+                db.execute(
+                    table.delete().where(
+                        table.c.user_id == bindparam("b_user_id"), table.c.date == bindparam("b_date")
+                    ),
+                    [{"b_user_id": user_id, "b_date": date_obj} for user_id, date_obj in deletes],
+                )
+            if upserts:
+                stmt = sqlite_insert(table)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.user_id, table.c.date],
+                    set_=(
+                        {"location_id": stmt.excluded.location_id, "note": stmt.excluded.note}
+                        if update_note
+                        else {"location_id": stmt.excluded.location_id}
+                    ),
+                )
+                db.execute(stmt, list(upserts.values()))
+
+            affected = set(upserts) | deletes
+            if affected:
+                affected_dates = [d for _, d in affected]
+                attendance_summary.refresh_users_range(
+                    db,
+                    user_ids=(user_id for user_id, _ in affected),
+                    start_date=min(affected_dates),
+                    end_date=max(affected_dates),
+                )
+                cache_generation.mark_dates_changed(db, affected_dates)
+
+            if commit:
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        return {**summary, "applied": True}
+
     def delete_by_user_and_date(self, db: Session, *, user_id: str, date_obj: date) -> bool:
         """
         指定されたユーザーIDと日付の勤怠記録を削除します。
@@ -97,11 +289,10 @@ class CRUDAttendance(CRUDBase[Attendance, AttendanceCreate, AttendanceUpdate]):
             # CRUDBase の remove は内部で commit する可能性があるため、
             # ここでは直接 delete を呼び出し、コミットは呼び出し元に委ねます。
             db.delete(obj)
-            # 関連する日のキャッシュを無効化します。
-            day_key = date_obj.strftime("%Y-%m-%d")
-            if day_key in self._day_data_cache:
-                del self._day_data_cache[day_key]
-                logger.debug(f"日別キャッシュクリア: {day_key}")
+            # 関連する日・月のキャッシュを無効化し、月次集計を再計算します
+            # (世代と集計の更新は呼び出し元のコミットで確定します)。
+            cache_generation.mark_date_changed(db, date_obj)
+            attendance_summary.refresh_user_month(db, user_id=user_id, date_obj=date_obj)
             return True
         logger.debug(f"削除対象の勤怠レコードが見つかりません: user_id={user_id}, date={date_obj}")
         return False
@@ -120,7 +311,9 @@ class CRUDAttendance(CRUDBase[Attendance, AttendanceCreate, AttendanceUpdate]):
         try:
             num_deleted = db.query(Attendance).filter(Attendance.user_id == user_id).delete()
             # CRUDBaseと異なり、ここではコミットを行わない (呼び出し元に委ねる)
-            # キャッシュクリアは不要 (ユーザー自体が削除されるため)
+            # 削除対象の日付は全期間に及ぶため、カレンダーキャッシュは全て破棄する
+            cache_generation.mark_all_changed(db)
+            attendance_summary.remove_user(db, user_id=user_id)
             logger.info(f"ユーザーID '{user_id}' に紐づく勤怠レコードを {num_deleted} 件削除しました。")
             return num_deleted
         except Exception as e:
@@ -208,35 +401,24 @@ class CRUDAttendance(CRUDBase[Attendance, AttendanceCreate, AttendanceUpdate]):
                 logger.debug(f"勤怠レコード削除処理開始: user_id={user.id}, date={date_obj}")
                 result = self.delete_attendance(db, user_id=str(user.id), date_obj=date_obj)
                 if result:
+                    # 関連する日・月のキャッシュを無効化 (削除と同じトランザクションで世代を更新)
+                    cache_generation.mark_date_changed(db, date_obj)
                     db.commit() # 変更を確定
                     logger.debug("勤怠レコード削除成功")
-                    # 関連する日のキャッシュを無効化
-                    day_key = date_obj.strftime("%Y-%m-%d")
-                    if day_key in self._day_data_cache:
-                        del self._day_data_cache[day_key]
                     return True
                 else:
                     # 削除対象が存在しなかった場合も正常とみなす
                     logger.debug("削除対象のレコードが存在しませんでした。")
                     return True
             else:
-                # location_id が有効な場合は更新または新規作成処理を実行
+                # location_id が有効な場合は upsert で更新または新規作成を実行
                 logger.debug(f"勤怠レコード更新/作成処理開始: user_id={user.id}, date={date_obj}, location_id={location_id}")
-                attendance_result = self.update_attendance(
+                self.upsert_attendance(
                     db, user_id=str(user.id), date_obj=date_obj, location_id=location_id, note=note
                 )
-                if attendance_result is not None:
-                    db.commit() # 変更を確定
-                    logger.debug("勤怠レコード更新/作成成功")
-                    # 関連する日のキャッシュを無効化
-                    day_key = date_obj.strftime("%Y-%m-%d")
-                    if day_key in self._day_data_cache:
-                        del self._day_data_cache[day_key]
-                    return True
-                else:
-                    db.rollback() # エラー発生時はロールバック
-                    logger.error("勤怠レコード更新/作成失敗")
-                    return False
+                db.commit() # 変更を確定
+                logger.debug("勤怠レコード更新/作成成功")
+                return True
         except Exception as e:
             db.rollback() # 予期せぬエラー発生時もロールバック
             logger.error(f"勤怠情報更新/削除処理中に予期せぬエラーが発生しました: {str(e)}", exc_info=True)
@@ -287,6 +469,253 @@ class CRUDAttendance(CRUDBase[Attendance, AttendanceCreate, AttendanceUpdate]):
             logger.error(f"ユーザー勤怠データ取得中にエラーが発生しました: {str(e)}", exc_info=True)
             return []
 
+    def get_period_entries(
+        self,
+        db: Session,
+        *,
+        start_date: date,
+        end_date: date,
+        user_ids: Optional[Iterable[str]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        指定期間の勤怠データを、全ユーザー分まとめて1回のクエリで取得します。
+
+        Args:
+            db: データベースセッション
+            start_date: 期間の開始日
+            end_date: 期間の終了日
+            user_ids: 対象のユーザーID (指定がない場合は全ユーザー)
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: ユーザーIDをキーとする勤怠データのリスト。
+                各要素は `get_user_data` と同じ形式の辞書。
+        """
+        stmt = (
+            select(
+                Attendance.id,
+                Attendance.user_id,
+                Attendance.date,
+                Attendance.location_id,
+                Attendance.note,
+                Location.name.label("location_name"),
+            )
+            .join(Location, Attendance.location_id == Location.id)
+            .where(Attendance.date >= start_date, Attendance.date <= end_date)
+            .order_by(Attendance.date)
+        )
+        if user_ids is not None:
+            stmt = stmt.where(Attendance.user_id.in_(list(user_ids)))
+
+        entries_by_user: Dict[str, List[Dict[str, Any]]] = {}
+        for row in db.execute(stmt):
+            entries_by_user.setdefault(str(row.user_id), []).append(
+                {
+                    "id": row.id,
+                    "date": row.date.strftime("%Y-%m-%d"),
+                    "location_id": row.location_id,
+                    "location_name": row.location_name,
+                    "note": row.note,
+                }
+            )
+        return entries_by_user
+
+    def get_users_with_attendance(
+        self, db: Session, *, start_date: date, end_date: date
+    ) -> List[Tuple[User, List[Dict[str, Any]]]]:
+        """
+        全ユーザー (グループ・社員種別を読み込み済み) と、表示期間内の勤怠データをまとめて取得します。
+
+        ユーザーごとに `user.get` や `get_user_data` (全期間の勤怠を取得) を呼び出す代わりに使用し、
+        ユーザー数によらず2回のクエリで一覧画面に必要なデータを揃えます。
+
+        Args:
+            db: データベースセッション
+            start_date: 表示期間の開始日
+            end_date: 表示期間の終了日
+
+        Returns:
+            List[Tuple[User, List[Dict[str, Any]]]]: (ユーザー, 期間内の勤怠データのリスト) のリスト
+        """
+        from app.crud.user import user as user_crud
+
+        users = user_crud.get_all_with_relations(db)
+        entries_by_user = self.get_period_entries(db, start_date=start_date, end_date=end_date)
+        return [(user_obj, entries_by_user.get(str(user_obj.id), [])) for user_obj in users]
+
+    @staticmethod
+    def _filtered_stmt(
+        *,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        user_id: Optional[str] = None,
+        group_id: Optional[int] = None,
+        location_id: Optional[int] = None,
+        user_type_id: Optional[int] = None,
+        after: Optional[Tuple[date, int]] = None,
+    ) -> Select:
+        """
+        条件に合う勤怠を (date, id) 順に取得するクエリを生成する。
+
+        `after` を指定すると、その (date, id) より後の行から取得します (keyset ページング)。
+        ORM オブジェクトではなく列の行として取得するため、大量に読み進めても identity map に蓄積されません。
+        """
+        stmt = select(
+            Attendance.id, Attendance.user_id, Attendance.date, Attendance.location_id, Attendance.note
+        )
+        if group_id is not None or user_type_id is not None:
+            stmt = stmt.join(User, Attendance.user_id == User.id)
+        if group_id is not None:
+            stmt = stmt.where(User.group_id == group_id)
+        if user_type_id is not None:
+            stmt = stmt.where(User.user_type_id == user_type_id)
+        if start_date is not None:
+            stmt = stmt.where(Attendance.date >= start_date)
+        if end_date is not None:
+            stmt = stmt.where(Attendance.date <= end_date)
+        if user_id is not None:
+            stmt = stmt.where(Attendance.user_id == user_id)
+        if location_id is not None:
+            stmt = stmt.where(Attendance.location_id == location_id)
+        if after is not None:
+            # 行値比較により date インデックス (末尾に rowid を含む) をそのまま範囲走査に使える
+            stmt = stmt.where(tuple_(Attendance.date, Attendance.id) > tuple_(*after))
+        return stmt.order_by(Attendance.date, Attendance.id)
+
+    def get_page(
+        self,
+        db: Session,
+        *,
+        limit: int,
+        after: Optional[Tuple[date, int]] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        user_id: Optional[str] = None,
+        group_id: Optional[int] = None,
+        location_id: Optional[int] = None,
+        user_type_id: Optional[int] = None,
+    ) -> List[Any]:
+        """
+        条件に合う勤怠を (date, id) 順に最大 `limit` 件取得します。
+
+        OFFSET を使わず直前のページの最後の (date, id) から読み進めるため、
+        何ページ目であっても取得コストは一定です。
+
+        Args:
+            db: データベースセッション
+            limit: 取得する最大件数
+            after: 直前のページの最後の行の (date, id)
+            start_date: 期間の開始日
+            end_date: 期間の終了日
+            user_id: 対象のユーザーID
+            group_id: 対象ユーザーの所属グループID
+            location_id: 対象の勤怠種別ID
+            user_type_id: 対象ユーザーの社員種別ID
+
+        Returns:
+            List[Any]: id, user_id, date, location_id, note を属性に持つ行のリスト
+        """
+        stmt = self._filtered_stmt(
+            start_date=start_date,
+            end_date=end_date,
+            user_id=user_id,
+            group_id=group_id,
+            location_id=location_id,
+            user_type_id=user_type_id,
+            after=after,
+        ).limit(limit)
+        return list(db.execute(stmt).all())
+
+    def iter_filtered(
+        self,
+        db: Session,
+        *,
+        batch_size: int,
+        after: Optional[Tuple[date, int]] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        user_id: Optional[str] = None,
+        group_id: Optional[int] = None,
+        location_id: Optional[int] = None,
+        user_type_id: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """
+        条件に合う勤怠を (date, id) 順に `batch_size` 件ずつ読み進めながら返します。
+
+        全件をメモリに載せず、またバッチ間で読み取りトランザクションを保持し続けないため、
+        長期間の履歴を出力する場合でもメモリ使用量と書き込みへの影響が一定に保たれます。
+
+        Args:
+            db: データベースセッション
+            batch_size: 1回のクエリで取得する件数
+            その他: `get_page` と同じ
+
+        Yields:
+            Any: id, user_id, date, location_id, note を属性に持つ行
+        """
+        while True:
+            batch = self.get_page(
+                db,
+                limit=batch_size,
+                after=after,
+                start_date=start_date,
+                end_date=end_date,
+                user_id=user_id,
+                group_id=group_id,
+                location_id=location_id,
+                user_type_id=user_type_id,
+            )
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            after = (batch[-1].date, batch[-1].id)
+
+    @staticmethod
+    def _day_data_stmt(date_obj: date) -> Select:
+        """指定日の勤怠をユーザー・勤怠種別・グループ・社員種別と結合して取得するクエリを生成する"""
+        return (
+            select(
+                Attendance.user_id,
+                Attendance.location_id,
+                Attendance.note,  # 備考フィールドを追加
+                User.username,
+                User.group_id,
+                User.user_type_id,
+                Location.name.label('location_name'),
+                Group.name.label('group_name'),
+                UserType.name.label('user_type_name'),
+                UserType.order.label('user_type_order')
+            )
+            .join(User, Attendance.user_id == User.id)
+            .join(Location, Attendance.location_id == Location.id)
+            .outerjoin(Group, User.group_id == Group.id)
+            .outerjoin(UserType, User.user_type_id == UserType.id)
+            .where(Attendance.date == date_obj)
+        )
+
+    @staticmethod
+    def _group_day_rows(rows: Iterable[Any]) -> Dict[str, List[Dict[str, str]]]:
+        """日別の勤怠行を勤怠種別ごとにグループ化する"""
+        location_groups: Dict[str, List[Dict[str, str]]] = {}
+        for row in rows:
+            location_name = row.location_name
+            if location_name not in location_groups:
+                location_groups[location_name] = []
+
+            location_groups[location_name].append(
+                {
+                    "user_name": row.username,
+                    "user_id": row.user_id,
+                    "location_id": row.location_id,
+                    "group_id": row.group_id,
+                    "group_name": row.group_name or "",
+                    "user_type_id": row.user_type_id,
+                    "user_type_name": row.user_type_name or "",
+                    "user_type_order": row.user_type_order,
+                    "note": row.note  # 備考フィールドを追加
+                }
+            )
+        return location_groups
+
     def get_day_data(self, db: Session, *, day: str) -> Dict[str, List[Dict[str, str]]]:
         """
         指定した日の全ユーザーの勤怠データを取得
@@ -298,11 +727,6 @@ class CRUDAttendance(CRUDBase[Attendance, AttendanceCreate, AttendanceUpdate]):
         Returns:
             Dict[str, List[Dict[str, str]]]: 勤怠種別ごとにグループ化された勤怠データ
         """
-        # キャッシュチェック（パフォーマンス最適化）
-        current_time = time.time()
-        if day in self._day_data_cache and current_time - self._cache_timestamp.get(day, 0) < self._cache_ttl:
-            return self._day_data_cache[day]
-            
         try:
             # 日付を変換
             try:
@@ -311,102 +735,349 @@ class CRUDAttendance(CRUDBase[Attendance, AttendanceCreate, AttendanceUpdate]):
                 logger.error(f"Invalid date format: {day}")
                 return {}
 
-            # N+1問題を回避するため、JOINを使用する最適化クエリ
-            query = (
-                db.query(
-                    Attendance.user_id,
-                    Attendance.note,  # 備考フィールドを追加
-                    User.username,
-                    User.user_type_id,
-                    Location.name.label('location_name'),
-                    UserType.name.label('user_type_name')
-                )
-                .join(User, Attendance.user_id == User.id)
-                .join(Location, Attendance.location_id == Location.id)
-                .outerjoin(UserType, User.user_type_id == UserType.id)
-                .filter(Attendance.date == date_obj)
-            )
-            
-            # 1回のクエリで効率的に結果を取得
-            results = query.all()
+            # キャッシュチェック（他ワーカーでの書き込みも世代の比較で検出される）
+            generation = cache_generation.get_month_token(db, date_obj.year, date_obj.month)
+            cached = calendar_cache.get_day_data(date_obj, generation)
+            if cached is not None:
+                return cached
 
-            # 勤怠種別ごとにユーザーをグループ化
-            location_groups: Dict[str, List[Dict[str, str]]] = {}
-            for row in results:
-                location_name = row.location_name
-                if location_name not in location_groups:
-                    location_groups[location_name] = []
-
-                location_groups[location_name].append(
-                    {
-                        "user_name": row.username,
-                        "user_id": row.user_id,
-                        "user_type_id": row.user_type_id,
-                        "user_type_name": row.user_type_name or "",
-                        "note": row.note  # 備考フィールドを追加
-                    }
-                )
+            # N+1問題を回避するため、JOINを使用した1回のクエリで取得し、勤怠種別ごとにグループ化
+            location_groups = self._group_day_rows(db.execute(self._day_data_stmt(date_obj)).all())
 
             # キャッシュに結果を保存
-            self._day_data_cache[day] = location_groups
-            self._cache_timestamp[day] = current_time
-            
+            calendar_cache.set_day_data(date_obj, location_groups, generation)
+
             return location_groups
         except Exception as e:
             logger.error(f"Error getting day data: {str(e)}")
             return {}
 
-    def get_attendance_data_for_csv(
-        self, 
-        db: Session, 
-        *, 
-        start_date: Optional[date] = None, 
-        end_date: Optional[date] = None
-    ) -> Dict[str, str]:
+    async def get_day_data_async(
+        self, db: AsyncSession, *, day: str
+    ) -> Dict[str, List[Dict[str, str]]]:
         """
-        CSV出力用の勤怠データを取得
-        
+        指定した日の全ユーザーの勤怠データを取得 (非同期版)
+
         Args:
-            db: データベースセッション
-            start_date: 開始日（指定された場合）
-            end_date: 終了日（指定された場合）
-            
+            db: 非同期データベースセッション
+            day: 日付文字列 (YYYY-MM-DD)
+
         Returns:
-            Dict[str, str]: ユーザーID+日付をキー、勤怠種別名を値とするマッピング
+            Dict[str, List[Dict[str, str]]]: 勤怠種別ごとにグループ化された勤怠データ
         """
         try:
-            query = db.query(
-                Attendance.user_id,
-                Attendance.date,
-                Location.name.label("location_name")
-            ).join(
-                Location, 
-                Attendance.location_id == Location.id
-            )
-            
-            # 日付範囲が指定されている場合はフィルタを適用
-            if start_date and end_date:
-                query = query.filter(
-                    Attendance.date >= start_date,
-                    Attendance.date <= end_date
-                )
-                
-            results = query.all()
-            
-            # ユーザー×日付ごとの勤怠種別をマッピング
-            user_locations = {}
-            for entry in results:
-                date_key = entry.date.strftime("%Y-%m-%d")
-                user_key = f"{entry.user_id}_{date_key}"
-                user_locations[user_key] = entry.location_name
-                
-            return user_locations
+            try:
+                date_obj = datetime.strptime(day, "%Y-%m-%d").date()
+            except ValueError:
+                logger.error(f"Invalid date format: {day}")
+                return {}
+
+            generation = await cache_generation.get_month_token_async(db, date_obj.year, date_obj.month)
+            cached = calendar_cache.get_day_data(date_obj, generation)
+            if cached is not None:
+                return cached
+
+            result = await db.execute(self._day_data_stmt(date_obj))
+            location_groups = self._group_day_rows(result.all())
+
+            calendar_cache.set_day_data(date_obj, location_groups, generation)
+
+            return location_groups
         except Exception as e:
-            logger.error(f"Error getting attendance data for CSV: {str(e)}")
+            logger.error(f"Error getting day data: {str(e)}")
             return {}
 
+    def iter_csv_entries(
+        self,
+        db: Session,
+        *,
+        user_ids: Sequence[str],
+        start_date: date,
+        end_date: date,
+        yield_per: int = 1000,
+    ) -> Iterator[Tuple[str, date, str]]:
+        """
+        指定ユーザー・期間の勤怠を (user_id, date, 勤怠種別名) としてユーザー・日付順に返します。
+
+        (user_id, date) の一意インデックスの順に読むためソートは発生せず、結果はカーソルから
+        `yield_per` 件ずつ取り出されます。全件をメモリに展開しないため、長期間のCSV出力でも
+        メモリ使用量は対象ユーザー数・期間に比例しません。
+
+        Args:
+            db: データベースセッション
+            user_ids: 対象のユーザーID
+            start_date: 開始日
+            end_date: 終了日
+            yield_per: カーソルから一度に取り出す件数
+
+        Yields:
+            Tuple[str, date, str]: (ユーザーID, 日付, 勤怠種別名)
+        """
+        if not user_ids:
+            return
+        stmt = (
+            select(Attendance.user_id, Attendance.date, Location.name)
+            .join(Location, Attendance.location_id == Location.id)
+            .where(
+                Attendance.user_id.in_(user_ids),
+                Attendance.date >= start_date,
+                Attendance.date <= end_date,
+            )
+            .order_by(Attendance.user_id, Attendance.date)
+            .execution_options(yield_per=yield_per)
+        )
+        for user_id, date_obj, location_name in db.execute(stmt):
+            yield str(user_id), date_obj, location_name
+
+    @staticmethod
+    def _resolve_analysis_period(month: Optional[str], fiscal_year: Optional[int]) -> Dict[str, Any]:
+        """
+        集計期間 (月次または4月開始の年度) を決定します。
+
+        Raises:
+            ValueError: 月の形式が不正な場合
+        """
+        import calendar
+
+        if fiscal_year is not None:
+            # 4月開始の年度
+            return {
+                "mode": "fiscal_year",
+                "label": f"{fiscal_year}年度",
+                "start": date(fiscal_year, 4, 1),
+                "end": date(fiscal_year + 1, 3, 31),
+                "fiscal_year": fiscal_year,
+                "month": None,
+            }
+
+        if month is None:
+            current_date = datetime.now()
+            month = f"{current_date.year}-{current_date.month:02d}"
+        year, month_num = map(int, month.split("-"))
+        return {
+            "mode": "month",
+            "label": f"{year}年{month_num}月",
+            "start": date(year, month_num, 1),
+            "end": date(year, month_num, calendar.monthrange(year, month_num)[1]),
+            "fiscal_year": None,
+            "month": month,
+        }
+
+    @staticmethod
+    def _analysis_attendances_stmt(start_date: date, end_date: date) -> Select:
+        """集計期間内の勤怠データを日付順に取得するクエリを生成する"""
+        return (
+            select(Attendance)
+            .where(Attendance.date >= start_date, Attendance.date <= end_date)
+            .order_by(Attendance.date)
+        )
+
+    @staticmethod
+    def _date_info(date_obj: date, note: Optional[str]) -> Dict[str, Any]:
+        """集計画面の日付一覧に表示する1日分の情報を生成する"""
+        return {
+            "date_str": date_obj.strftime("%Y-%m-%d"),
+            "date_jp": f"{date_obj.month}月{date_obj.day}日",
+            "date_mmdd": date_obj.strftime("%m/%d"),
+            "date_simple": f"{date_obj.month}/{date_obj.day}",
+            "note": note or "",
+        }
+
+    @staticmethod
+    def _user_dates_stmt(user_id: str, start_date: date, end_date: date) -> Select:
+        """1ユーザー・集計期間内の勤怠日と勤怠種別を日付順に取得するクエリを生成する"""
+        return (
+            select(Attendance.location_id, Attendance.date, Attendance.note)
+            .where(
+                Attendance.user_id == user_id,
+                Attendance.date >= start_date,
+                Attendance.date <= end_date,
+            )
+            .order_by(Attendance.date)
+        )
+
+    def _group_user_dates(self, rows: Iterable[Any]) -> Dict[int, List[Dict[str, Any]]]:
+        """`_user_dates_stmt` の結果を勤怠種別IDごとの日付一覧に変換する"""
+        dates: Dict[int, List[Dict[str, Any]]] = {}
+        for location_id, date_obj, note in rows:
+            dates.setdefault(int(location_id), []).append(self._date_info(date_obj, note))
+        return dates
+
+    def get_user_location_dates(
+        self, db: Session, *, user_id: str, start_date: date, end_date: date
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        1ユーザーの集計期間内の勤怠日付一覧を勤怠種別ごとに取得します。
+
+        年度集計では日数のみを月次集計テーブルから求めるため、日付一覧は
+        行を展開したときにこのメソッドでユーザー単位に取得します。
+
+        Args:
+            db: データベースセッション
+            user_id: 対象のユーザーID
+            start_date: 期間の開始日
+            end_date: 期間の終了日
+
+        Returns:
+            Dict[int, List[Dict[str, Any]]]: 勤怠種別ID -> 日付情報の一覧 (日付の昇順)
+        """
+        rows = db.execute(self._user_dates_stmt(user_id, start_date, end_date)).all()
+        return self._group_user_dates(rows)
+
+    async def get_user_location_dates_async(
+        self, db: AsyncSession, *, user_id: str, start_date: date, end_date: date
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """1ユーザーの集計期間内の勤怠日付一覧を勤怠種別ごとに取得します (非同期版)。"""
+        result = await db.execute(self._user_dates_stmt(user_id, start_date, end_date))
+        return self._group_user_dates(result.all())
+
+    @staticmethod
+    def _empty_analysis_data(month: Optional[str], fiscal_year: Optional[int]) -> Dict[str, Any]:
+        """エラー時に返す空の集計データを生成する"""
+        return {
+            "month": month or "",
+            "month_name": "エラー",
+            "period": {
+                "mode": "error",
+                "label": "エラー",
+                "start": None,
+                "end": None,
+                "fiscal_year": fiscal_year,
+                "month": month,
+            },
+            "users": {},
+            "locations": [],
+            "group_summary": {},
+            "location_details": {},
+            "summary": {
+                "total_users": 0,
+                "total_attendance_days": 0,
+                "location_totals": {},
+            },
+        }
+
+    def _build_analysis_data(
+        self,
+        period: Dict[str, Any],
+        users_data: List[Any],
+        locations: List[Location],
+        attendances: List[Attendance],
+        summary_counts: Optional[Dict[str, Dict[int, int]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        取得済みのユーザー・勤怠種別・勤怠データから集計結果を組み立てます。
+
+        同期版・非同期版の両方から呼び出されます (DBアクセスは行いません)。
+        `summary_counts` (月次集計テーブルから取得した日数) が指定された場合は日数をそこから求め、
+        `attendances` は日付一覧の作成にのみ使用します。
+        """
+        locations_sorted = sorted(
+            locations, key=lambda x: (str(x.category or ""), x.order or 999, x.id)
+        )
+
+        location_ids = [int(loc.id) for loc in locations_sorted if loc.id is not None]
+
+        # 勤怠データを1回の走査でユーザーごとに振り分ける (ユーザー数 × 勤怠件数の再走査を避ける)
+        attendances_by_user: Dict[str, List[Attendance]] = {}
+        for att in attendances:
+            attendances_by_user.setdefault(att.user_id, []).append(att)
+
+        # ユーザー別・勤怠種別別の日数を集計
+        user_analysis: Dict[str, Dict[str, Any]] = {}
+        location_totals = {loc_id: 0 for loc_id in location_ids}
+        location_details: Dict[int, Dict[str, List[Dict[str, Any]]]] = {
+            loc_id: {} for loc_id in location_ids
+        }
+
+        for user_name, user_id, group_name, user_type_name in users_data:
+            location_counts = {loc_id: 0 for loc_id in location_ids}
+            location_dates: Dict[int, List[Dict[str, Any]]] = {loc_id: [] for loc_id in location_ids}
+
+            if summary_counts is not None:
+                for loc_id, days in summary_counts.get(str(user_id), {}).items():
+                    if loc_id in location_counts:
+                        location_counts[loc_id] += days
+                        location_totals[loc_id] += days
+
+            for att in attendances_by_user.get(user_id, ()):
+                att_location_id = int(att.location_id)
+                if summary_counts is None:
+                    location_counts[att_location_id] += 1
+                    location_totals[att_location_id] += 1
+                location_dates[att_location_id].append(self._date_info(att.date, att.note))
+
+            # 日付を昇順に整列し、location_detailsにも格納
+            for loc_id, dates in location_dates.items():
+                if dates:
+                    sorted_dates = sorted(dates, key=lambda d: d["date_str"])
+                    location_dates[loc_id] = sorted_dates
+                    location_details[loc_id][str(user_id)] = sorted_dates
+
+            total_days = sum(location_counts.values())
+
+            user_analysis[user_id] = {
+                "user_name": user_name,
+                "group_name": group_name,
+                "user_type_name": user_type_name,
+                "location_counts": location_counts,
+                "location_dates": location_dates,
+                "total_days": total_days,
+            }
+
+        # 勤怠種別情報を整理
+        locations_info: List[SimpleNamespace] = []
+        for loc in locations_sorted:
+            if loc.id is None:
+                continue
+            locations_info.append(
+                SimpleNamespace(
+                    id=loc.id,
+                    name=loc.name,
+                    category=loc.category,
+                    order=loc.order,
+                    total_days=location_totals[int(loc.id)],
+                )
+            )
+
+        # グループ別サマリー
+        group_summary: Dict[str, Dict[str, Any]] = {}
+        for _, user_id, group_name, _ in users_data:
+            group_key = group_name or "未分類"
+            if group_key not in group_summary:
+                group_summary[group_key] = {
+                    "location_counts": {loc_id: 0 for loc_id in location_ids},
+                    "total_days": 0,
+                }
+            user_counts = user_analysis.get(user_id, {}).get("location_counts", {})
+            for loc_id, cnt in user_counts.items():
+                group_summary[group_key]["location_counts"][loc_id] += cnt
+                group_summary[group_key]["total_days"] += cnt
+
+        total_users = len(user_analysis)
+        total_attendance_days = sum(location_totals.values())
+
+        return {
+            "month": period["month"] or "",
+            "month_name": period["label"],
+            "period": period,
+            "users": user_analysis,
+            "locations": locations_info,
+            "group_summary": group_summary,
+            "location_details": location_details,
+            "summary": {
+                "total_users": total_users,
+                "total_attendance_days": total_attendance_days,
+                "location_totals": location_totals,
+            },
+        }
+
     def get_attendance_analysis_data(
-        self, db: Session, *, month: Optional[str] = None, fiscal_year: Optional[int] = None
+        self,
+        db: Session,
+        *,
+        month: Optional[str] = None,
+        fiscal_year: Optional[int] = None,
+        include_dates: bool = True,
     ) -> Dict[str, Any]:
         """
         勤怠集計用のデータを取得します。
@@ -416,6 +1087,8 @@ class CRUDAttendance(CRUDBase[Attendance, AttendanceCreate, AttendanceUpdate]):
             db: データベースセッション
             month: 対象月（YYYY-MM形式、指定がない場合は現在の月）
             fiscal_year: 対象年度（4月開始）。指定された場合は年度優先。
+            include_dates: False の場合は日付一覧を作成せず、日数を月次集計テーブルのみから求めます
+                (勤怠明細を走査しないため、年度の合計だけが必要な場合に使用します)。
 
         Returns:
             Dict[str, Any]: 分析データ
@@ -425,177 +1098,89 @@ class CRUDAttendance(CRUDBase[Attendance, AttendanceCreate, AttendanceUpdate]):
                 - group_summary: グループ別集計
                 - summary: 全体サマリー
         """
-        from datetime import datetime, date
-        import calendar
         from app.crud.user import user as user_crud
         from app.crud.location import location as location_crud
-        from sqlalchemy import and_
 
         try:
-            if fiscal_year is not None:
-                # 4月開始の年度
-                period_mode = "fiscal_year"
-                start_date = date(fiscal_year, 4, 1)
-                end_date = date(fiscal_year + 1, 3, 31)
-                period_label = f"{fiscal_year}年度"
-                month_value: Optional[str] = None
-            else:
-                current_date = datetime.now()
-                if month is None:
-                    month = f"{current_date.year}-{current_date.month:02d}"
-                year, month_num = map(int, month.split("-"))
-                period_mode = "month"
-                start_date = date(year, month_num, 1)
-                end_date = date(year, month_num, calendar.monthrange(year, month_num)[1])
-                period_label = f"{year}年{month_num}月"
-                month_value = month
+            period = self._resolve_analysis_period(month, fiscal_year)
 
             # ユーザー情報を取得（グループ、ユーザー種別含む）
             users_data = user_crud.get_all_users_with_details(db)
 
             # 勤怠種別情報を取得
             locations = location_crud.get_multi(db)
-            locations_sorted = sorted(
-                locations, key=lambda x: (str(x.category or ""), x.order or 999, x.id)
-            )
 
-            # 対象期間の勤怠データを取得
-            attendances = (
-                db.query(Attendance)
-                .filter(
-                    and_(
-                        Attendance.date >= start_date,
-                        Attendance.date <= end_date,
-                    )
+            if not include_dates:
+                # 月次集計テーブルから期間内の日数のみを取得
+                summary_counts = attendance_summary.get_location_counts(
+                    db, start_date=period["start"], end_date=period["end"]
                 )
-                .order_by(Attendance.date)
-                .all()
+                return self._build_analysis_data(period, users_data, locations, [], summary_counts)
+
+            # 対象期間の勤怠データを取得
+            attendances = list(
+                db.execute(self._analysis_attendances_stmt(period["start"], period["end"])).scalars().all()
             )
 
-            # ユーザー別・勤怠種別別の日数を集計
-            user_analysis: Dict[str, Dict[str, Any]] = {}
-            location_totals = {int(loc.id): 0 for loc in locations_sorted if loc.id is not None}
-            location_details: Dict[int, Dict[str, List[Dict[str, Any]]]] = {
-                int(loc.id): {} for loc in locations_sorted if loc.id is not None
-            }
+            return self._build_analysis_data(period, users_data, locations, attendances)
 
-            for user_name, user_id, group_name, user_type_name in users_data:
-                user_attendances = [att for att in attendances if att.user_id == user_id]
-                location_counts = {int(loc.id): 0 for loc in locations_sorted if loc.id is not None}
-                location_dates: Dict[int, List[Dict[str, Any]]] = {
-                    int(loc.id): [] for loc in locations_sorted if loc.id is not None
-                }
+        except Exception as e:
+            logger.error(f"勤怠集計データ取得中にエラーが発生しました: {str(e)}", exc_info=True)
+            return self._empty_analysis_data(month, fiscal_year)
+
+    async def get_attendance_analysis_data_async(
+        self,
+        db: AsyncSession,
+        *,
+        month: Optional[str] = None,
+        fiscal_year: Optional[int] = None,
+        include_dates: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        勤怠集計用のデータを取得します (非同期版)。
 
-                for att in user_attendances:
-                    location_counts[int(att.location_id)] += 1
-                    location_totals[int(att.location_id)] += 1
-                    date_info = {
-                        "date_str": att.date.strftime("%Y-%m-%d"),
-                        "date_jp": f"{att.date.month}月{att.date.day}日",
-                        "date_mmdd": att.date.strftime("%m/%d"),
-                        "date_simple": f"{att.date.month}/{att.date.day}",
-                        "note": att.note or "",
-                    }
-                    location_dates[int(att.location_id)].append(date_info)
-
-                # 日付を昇順に整列し、location_detailsにも格納
-                for loc_id, dates in location_dates.items():
-                    if dates:
-                        sorted_dates = sorted(dates, key=lambda d: d["date_str"])
-                        location_dates[int(loc_id)] = sorted_dates
-                        location_details[int(loc_id)][str(user_id)] = sorted_dates
-
-                total_days = sum(location_counts.values())
-
-                user_analysis[user_id] = {
-                    "user_name": user_name,
-                    "group_name": group_name,
-                    "user_type_name": user_type_name,
-                    "location_counts": location_counts,
-                    "location_dates": location_dates,
-                    "total_days": total_days,
-                }
+        件数の多い勤怠データは非同期クエリで取得し、件数の少ないマスタ類は
+        `AsyncSession.run_sync` 経由で同期版の CRUD を再利用します。
 
-            # 勤怠種別情報を整理
-            locations_info: List[SimpleNamespace] = []
-            for loc in locations_sorted:
-                if loc.id is None:
-                    continue
-                locations_info.append(
-                    SimpleNamespace(
-                        id=loc.id,
-                        name=loc.name,
-                        category=loc.category,
-                        order=loc.order,
-                        total_days=location_totals[int(loc.id)],
-                    )
-                )
+        Args:
+            db: 非同期データベースセッション
+            month: 対象月（YYYY-MM形式、指定がない場合は現在の月）
+            fiscal_year: 対象年度（4月開始）。指定された場合は年度優先。
+            include_dates: False の場合は日数を月次集計テーブルのみから求めます
 
-            # グループ別サマリー
-            group_summary: Dict[str, Dict[str, Any]] = {}
-            for _, user_id, group_name, _ in users_data:
-                group_key = group_name or "未分類"
-                if group_key not in group_summary:
-                    group_summary[group_key] = {
-                        "location_counts": {int(loc.id): 0 for loc in locations_sorted if loc.id is not None},
-                        "total_days": 0,
-                    }
-                user_counts = user_analysis.get(user_id, {}).get("location_counts", {})
-                for loc_id, cnt in user_counts.items():
-                    group_summary[group_key]["location_counts"][loc_id] += cnt
-                    group_summary[group_key]["total_days"] += cnt
+        Returns:
+            Dict[str, Any]: 分析データ (`get_attendance_analysis_data` と同じ形式)
+        """
+        from app.crud.user import user as user_crud
+        from app.crud.location import location as location_crud
+
+        try:
+            period = self._resolve_analysis_period(month, fiscal_year)
+            users_data = await db.run_sync(user_crud.get_all_users_with_details)
+            locations = await db.run_sync(location_crud.get_multi)
 
-            total_users = len(user_analysis)
-            total_attendance_days = sum(location_totals.values())
+            if not include_dates:
+                summary_counts = await attendance_summary.get_location_counts_async(
+                    db, start_date=period["start"], end_date=period["end"]
+                )
+                return self._build_analysis_data(period, users_data, locations, [], summary_counts)
 
-            return {
-                "month": month_value or "",
-                "month_name": period_label,
-                "period": {
-                    "mode": period_mode,
-                    "label": period_label,
-                    "start": start_date,
-                    "end": end_date,
-                    "fiscal_year": fiscal_year,
-                    "month": month_value,
-                },
-                "users": user_analysis,
-                "locations": locations_info,
-                "group_summary": group_summary,
-                "location_details": location_details,
-                "summary": {
-                    "total_users": total_users,
-                    "total_attendance_days": total_attendance_days,
-                    "location_totals": location_totals,
-                },
-            }
+            result = await db.execute(self._analysis_attendances_stmt(period["start"], period["end"]))
+            attendances = list(result.scalars().all())
+
+            return self._build_analysis_data(period, users_data, locations, attendances)
 
         except Exception as e:
             logger.error(f"勤怠集計データ取得中にエラーが発生しました: {str(e)}", exc_info=True)
-            return {
-                "month": month or "",
-                "month_name": "エラー",
-                "period": {
-                    "mode": "error",
-                    "label": "エラー",
-                    "start": None,
-                    "end": None,
-                    "fiscal_year": fiscal_year,
-                    "month": month,
-                },
-                "users": {},
-                "locations": [],
-                "group_summary": {},
-                "location_details": {},
-                "summary": {
-                    "total_users": 0,
-                    "total_attendance_days": 0,
-                    "location_totals": {},
-                },
-            }
+            return self._empty_analysis_data(month, fiscal_year)
 
     def get_attendance_by_type_for_fiscal_year(
-        self, db: Session, *, location_id: Optional[int] = None, year: Optional[int] = None
+        self,
+        db: Session,
+        *,
+        location_id: Optional[int] = None,
+        year: Optional[int] = None,
+        include_dates: bool = True,
     ) -> Dict[str, Any]:
         """
         年度ベースで指定された勤怠種別の詳細データを取得します。
@@ -605,6 +1190,7 @@ class CRUDAttendance(CRUDBase[Attendance, AttendanceCreate, AttendanceUpdate]):
             db: データベースセッション
             location_id: 勤怠種別ID（指定がない場合は最初の勤怠種別）
             year: 対象年度（指定がない場合は現在の年）
+            include_dates: False の場合は日付一覧を作成せず、日数を月次集計テーブルのみから求めます
 
         Returns:
             Dict[str, Any]: 勤怠種別別詳細データ
@@ -641,7 +1227,42 @@ class CRUDAttendance(CRUDBase[Attendance, AttendanceCreate, AttendanceUpdate]):
             
             # ユーザー情報を取得（グループ、ユーザー種別含む）
             users_data = user_crud.get_all_users_with_details(db)
-            
+
+            # 勤怠種別情報を整理（ラジオボタン用）
+            locations_info = []
+            for loc in locations_sorted:
+                locations_info.append({
+                    "id": loc.id,
+                    "name": loc.name,
+                    "category": loc.category
+                })
+
+            if not include_dates:
+                # 月次集計テーブルから年間の日数のみを取得
+                summary_counts = attendance_summary.get_location_counts(
+                    db, start_date=first_day, end_date=last_day
+                )
+                users_total_data = {}
+                for user_name, user_id, group_name, user_type_name in users_data:
+                    total_days = summary_counts.get(str(user_id), {}).get(location_id, 0)
+                    if total_days:
+                        users_total_data[user_id] = {
+                            "user_name": user_name,
+                            "group_name": group_name,
+                            "user_type_name": user_type_name,
+                            "attendance_dates": [],
+                            "total_days": total_days
+                        }
+                return {
+                    "year": year,
+                    "location_id": location_id,
+                    "location_name": location_name,
+                    "users_data": users_total_data,
+                    "locations": locations_info,
+                    "total_users": len(users_total_data),
+                    "total_records": sum(data["total_days"] for data in users_total_data.values())
+                }
+
             # 対象期間・勤怠種別の勤怠データを取得
             attendances = (
                 db.query(Attendance)
@@ -656,6 +1277,11 @@ class CRUDAttendance(CRUDBase[Attendance, AttendanceCreate, AttendanceUpdate]):
                 .all()
             )
             
+            # 勤怠データを1回の走査でユーザーごとに振り分ける
+            attendances_by_user: Dict[str, List[Attendance]] = {}
+            for att in attendances:
+                attendances_by_user.setdefault(att.user_id, []).append(att)
+
             # ユーザー別に勤怠日付をグループ化
             users_attendance_data = {}
             
@@ -663,7 +1289,7 @@ class CRUDAttendance(CRUDBase[Attendance, AttendanceCreate, AttendanceUpdate]):
                 user_name, user_id, group_name, user_type_name = user_data
                 
                 # このユーザーの勤怠データを抽出
-                user_attendances = [att for att in attendances if att.user_id == user_id]
+                user_attendances = attendances_by_user.get(user_id, [])
                 
                 # 日付一覧を作成
                 attendance_dates = []
@@ -686,15 +1312,6 @@ class CRUDAttendance(CRUDBase[Attendance, AttendanceCreate, AttendanceUpdate]):
                         "total_days": len(attendance_dates)
                     }
             
-            # 勤怠種別情報を整理（ラジオボタン用）
-            locations_info = []
-            for loc in locations_sorted:
-                locations_info.append({
-                    "id": loc.id,
-                    "name": loc.name,
-                    "category": loc.category
-                })
-            
             return {
                 "year": year,
                 "location_id": location_id,
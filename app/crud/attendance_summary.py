@@ -0,0 +1,207 @@
+"""
+勤怠月次集計CRUD操作
+==================
+
+ユーザー・月・勤怠種別ごとの登録日数を保持する集計テーブルを操作します。
+
+勤怠の書き込み時は該当ユーザー・該当月の行だけを勤怠明細から再計算し、
+全件の再構築は `rebuild` (scripts/rebuild_attendance_summary.py) で行います。
+"""
+
+import datetime
+from typing import Any, Dict, Iterable
+
+from sqlalchemy import Date, Select, delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.attendance import Attendance
+from app.models.attendance_summary import AttendanceSummary
+
+
+def month_start(date_obj: datetime.date) -> datetime.date:
+    """指定日が属する月の1日を返す"""
+    return date_obj.replace(day=1)
+
+
+def next_month_start(date_obj: datetime.date) -> datetime.date:
+    """指定日の翌月の1日を返す"""
+    if date_obj.month == 12:
+        return datetime.date(date_obj.year + 1, 1, 1)
+    return datetime.date(date_obj.year, date_obj.month + 1, 1)
+
+
+class CRUDAttendanceSummary:
+    """勤怠月次集計テーブルの操作クラス"""
+
+    def refresh_user_month(self, db: Session, *, user_id: str, date_obj: datetime.date) -> None:
+        """
+        指定ユーザー・指定日が属する月の集計行を勤怠明細から再計算します。
+
+        勤怠種別の付け替えや削除で旧勤怠種別の行が残らないよう、該当月の行を削除してから
+        作り直します。主キー (user_id, month, location_id) と (user_id, date) の一意インデックスで
+        範囲が絞られるため、再計算は該当ユーザーの1か月分の明細のみを対象とします。
+
+        注意: この関数はコミットを行いません。勤怠の書き込みと同じトランザクションで
+        コミットされることで、明細と集計が常に一致した状態で他の接続から見えます。
+
+        Args:
+            db: データベースセッション
+            user_id: 対象のユーザーID
+            date_obj: 対象月に含まれる日付
+        """
+        start = month_start(date_obj)
+        end = next_month_start(date_obj)
+        # 未反映の ORM 変更 (add/delete) を INSERT ... SELECT から見えるようにする
+        db.flush()
+        db.execute(
+            delete(AttendanceSummary).where(
+                AttendanceSummary.user_id == user_id, AttendanceSummary.month == start
+            )
+        )
+        counts = (
+            select(
+                Attendance.user_id,
+                literal(start, Date),
+                Attendance.location_id,
+                func.count(),
+            )
+            .where(Attendance.user_id == user_id, Attendance.date >= start, Attendance.date < end)
+            .group_by(Attendance.user_id, Attendance.location_id)
+        )
+        db.execute(
+            insert(AttendanceSummary).from_select(
+                ["user_id", "month", "location_id", "days"], counts
+            )
+        )
+
+    def refresh_users_range(
+        self,
+        db: Session,
+        *,
+        user_ids: Iterable[str],
+        start_date: datetime.date,
+        end_date: datetime.date,
+    ) -> None:
+        """
+        複数ユーザーについて、期間を含む各月の集計行をまとめて再計算します。
+
+        一括登録や CSV 取り込みのように多数の (ユーザー, 月) を書き換える場合に、
+        `refresh_user_month` を組み合わせごとに呼ぶ代わりに DELETE と INSERT ... SELECT を
+        1回ずつ実行します。期間内で実際には変更のない月も再計算されますが、結果は同じです。
+
+        注意: この関数はコミットを行いません。
+
+        Args:
+            db: データベースセッション
+            user_ids: 対象のユーザーID
+            start_date: 対象期間の開始日 (この日が属する月から)
+            end_date: 対象期間の終了日 (この日が属する月まで)
+        """
+        users = list(set(user_ids))
+        if not users:
+            return
+        start = month_start(start_date)
+        end = next_month_start(end_date)
+        month_expr = func.strftime("%Y-%m-01", Attendance.date)
+        db.flush()
+        db.execute(
+            delete(AttendanceSummary).where(
+                AttendanceSummary.user_id.in_(users),
+                AttendanceSummary.month >= start,
+                AttendanceSummary.month < end,
+            )
+        )
+        counts = (
+            select(Attendance.user_id, month_expr, Attendance.location_id, func.count())
+            .where(Attendance.user_id.in_(users), Attendance.date >= start, Attendance.date < end)
+            .group_by(Attendance.user_id, month_expr, Attendance.location_id)
+        )
+        db.execute(
+            insert(AttendanceSummary).from_select(
+                ["user_id", "month", "location_id", "days"], counts
+            )
+        )
+
+    def remove_user(self, db: Session, *, user_id: str) -> None:
+        """指定ユーザーの集計行を全て削除します (コミットは呼び出し元で行います)。"""
+        db.execute(delete(AttendanceSummary).where(AttendanceSummary.user_id == user_id))
+
+    def rebuild(self, db: Session) -> int:
+        """
+        集計テーブルを勤怠明細から全件再構築します。
+
+        注意: この関数はコミットを行いません。
+
+        Args:
+            db: データベースセッション
+
+        Returns:
+            int: 再構築後の集計行数
+        """
+        month_expr = func.strftime("%Y-%m-01", Attendance.date)
+        db.flush()
+        db.execute(delete(AttendanceSummary))
+        counts = select(
+            Attendance.user_id, month_expr, Attendance.location_id, func.count()
+        ).group_by(Attendance.user_id, month_expr, Attendance.location_id)
+        db.execute(
+            insert(AttendanceSummary).from_select(
+                ["user_id", "month", "location_id", "days"], counts
+            )
+        )
+        return int(db.scalar(select(func.count()).select_from(AttendanceSummary)) or 0)
+
+    @staticmethod
+    def _location_counts_stmt(start_date: datetime.date, end_date: datetime.date) -> Select:
+        """期間内のユーザー別・勤怠種別別日数を集計行から求めるクエリを生成する"""
+        return (
+            select(
+                AttendanceSummary.user_id,
+                AttendanceSummary.location_id,
+                func.sum(AttendanceSummary.days),
+            )
+            .where(
+                AttendanceSummary.month >= month_start(start_date),
+                AttendanceSummary.month <= month_start(end_date),
+            )
+            .group_by(AttendanceSummary.user_id, AttendanceSummary.location_id)
+        )
+
+    @staticmethod
+    def _to_counts(rows: Any) -> Dict[str, Dict[int, int]]:
+        """集計クエリの結果をユーザーIDをキーとする辞書に変換する"""
+        counts: Dict[str, Dict[int, int]] = {}
+        for user_id, location_id, days in rows:
+            counts.setdefault(str(user_id), {})[int(location_id)] = int(days)
+        return counts
+
+    def get_location_counts(
+        self, db: Session, *, start_date: datetime.date, end_date: datetime.date
+    ) -> Dict[str, Dict[int, int]]:
+        """
+        期間内のユーザー別・勤怠種別別の登録日数を取得します。
+
+        集計は月単位のため、期間は月初から月末までの範囲で指定します
+        (月別・年度別の集計期間はいずれもこの条件を満たします)。
+
+        Args:
+            db: データベースセッション
+            start_date: 期間の開始日
+            end_date: 期間の終了日
+
+        Returns:
+            Dict[str, Dict[int, int]]: ユーザーID -> {勤怠種別ID: 日数}
+        """
+        rows = db.execute(self._location_counts_stmt(start_date, end_date)).all()
+        return self._to_counts(rows)
+
+    async def get_location_counts_async(
+        self, db: AsyncSession, *, start_date: datetime.date, end_date: datetime.date
+    ) -> Dict[str, Dict[int, int]]:
+        """期間内のユーザー別・勤怠種別別の登録日数を取得します (非同期版)。"""
+        result = await db.execute(self._location_counts_stmt(start_date, end_date))
+        return self._to_counts(result.all())
+
+
+attendance_summary = CRUDAttendanceSummary()
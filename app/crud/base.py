@@ -34,6 +34,18 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model = model
 
+    def _on_write(self, db: Session, db_obj: ModelType) -> None:
+        """
+        書き込みの確定 (コミット) 直前に、同じトランザクション内で呼び出されるフック
+
+        既定では何もしません。派生クラスでキャッシュ世代の更新や無効化などに利用します。
+
+        Args:
+            db: データベースセッション
+            db_obj: 作成・更新・削除されるオブジェクト
+        """
+        return None
+
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
         """
         IDによるオブジェクト取得
@@ -103,6 +115,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             obj_in_data = obj_in.model_dump()
             db_obj = self.model(**obj_in_data)
             db.add(db_obj)
+            self._on_write(db, db_obj)
             db.commit()
             db.refresh(db_obj)
             return db_obj
@@ -142,6 +155,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 if hasattr(db_obj, field):
                     setattr(db_obj, field, value)
             db.add(db_obj)
+            self._on_write(db, db_obj)
             db.commit()
             db.refresh(db_obj)
             return db_obj
@@ -167,6 +181,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             if obj is None:
                 raise ValueError(f"ID {id} のオブジェクトが見つかりません")
             db.delete(obj)
+            self._on_write(db, obj)
             db.commit()
             return obj
         except Exception as e:
@@ -0,0 +1,217 @@
+"""
+キャッシュ世代CRUD操作
+====================
+
+プロセス内キャッシュをワーカー間で整合させるための世代カウンタを操作します。
+
+書き込み側は変更と同じトランザクション内で該当スコープの世代を進め、
+読み取り側はキャッシュ参照の直前に現在の世代を取得してエントリの世代と比較します。
+世代テーブルは主キー検索のみで参照されるため、リクエストごとの確認コストは小さく抑えられます。
+
+世代を進めた日付はセッションに記録し、コミットが成功した時点で勤怠変更通知バス
+(`app/core/change_bus.py`) へ流します。ロールバックされた変更は通知しません。
+"""
+
+import datetime
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+from sqlalchemy import Select, event, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import calendar_cache
+from app.core.change_bus import ALL_CHANGED, change_bus
+from app.models.cache_generation import CacheGeneration
+
+# マスタ変更など、全てのカレンダーデータに影響する変更のスコープ
+GLOBAL_SCOPE = "all"
+# カスタム祝日の変更スコープ (祝日キャッシュの再読み込み判定に使用)
+CUSTOM_HOLIDAY_SCOPE = "custom_holidays"
+
+
+def month_scope(year: int, month: int) -> str:
+    """勤怠の変更を月単位で追跡するスコープ名を返す"""
+    return f"month:{year:04d}-{month:02d}"
+
+
+DAY_SCOPE_PREFIX = "day:"
+# コミット後に通知する変更をセッションに記録するキー
+PENDING_CHANGES_KEY = "sokora_pending_changes"
+
+
+def day_scope(date_obj: datetime.date) -> str:
+    """勤怠の変更を日単位で追跡するスコープ名を返す (日別詳細の ETag に使用)"""
+    return f"{DAY_SCOPE_PREFIX}{date_obj.isoformat()}"
+
+
+def _record_changes(db: Session, changes: Iterable[Union[datetime.date, object]]) -> None:
+    """コミット後に通知する変更をセッションに記録する"""
+    pending: Set[Union[datetime.date, object]] = db.info.setdefault(PENDING_CHANGES_KEY, set())
+    pending.update(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_changes(session: Session) -> None:
+    """コミットされた変更を勤怠変更通知バスへ流す"""
+    pending = session.info.pop(PENDING_CHANGES_KEY, None)
+    if not pending:
+        return
+    if ALL_CHANGED in pending:
+        change_bus.publish(ALL_CHANGED)
+    else:
+        change_bus.publish(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_changes(session: Session) -> None:
+    """ロールバックされた変更の記録を破棄する"""
+    session.info.pop(PENDING_CHANGES_KEY, None)
+
+
+class CRUDCacheGeneration:
+    """キャッシュ世代カウンタの操作クラス"""
+
+    @staticmethod
+    def _generations_stmt(scopes: List[str]) -> Select:
+        """指定スコープの世代を取得するクエリを生成する"""
+        return select(CacheGeneration.scope, CacheGeneration.generation).where(
+            CacheGeneration.scope.in_(scopes)
+        )
+
+    def get_generations(self, db: Session, scopes: Iterable[str]) -> Dict[str, int]:
+        """
+        指定スコープの現在の世代を取得します。
+
+        Args:
+            db: データベースセッション
+            scopes: 取得対象のスコープ名
+
+        Returns:
+            Dict[str, int]: スコープ名をキーとする世代 (未記録のスコープは 0)
+        """
+        scope_list = list(scopes)
+        generations = {scope: 0 for scope in scope_list}
+        rows = (
+            db.query(CacheGeneration.scope, CacheGeneration.generation)
+            .filter(CacheGeneration.scope.in_(scope_list))
+            .all()
+        )
+        for scope, generation in rows:
+            generations[scope] = generation
+        return generations
+
+    async def get_generations_async(
+        self, db: AsyncSession, scopes: Iterable[str]
+    ) -> Dict[str, int]:
+        """指定スコープの現在の世代を取得します (非同期版)。"""
+        scope_list = list(scopes)
+        generations = {scope: 0 for scope in scope_list}
+        result = await db.execute(self._generations_stmt(scope_list))
+        for scope, generation in result.all():
+            generations[scope] = generation
+        return generations
+
+    def get_month_token(self, db: Session, year: int, month: int) -> Tuple[int, int]:
+        """
+        月次・日別カレンダーキャッシュの鮮度判定に使う世代トークンを取得します。
+
+        Args:
+            db: データベースセッション
+            year: 年
+            month: 月
+
+        Returns:
+            Tuple[int, int]: (全体の世代, 該当月の世代)
+        """
+        scope = month_scope(year, month)
+        generations = self.get_generations(db, [GLOBAL_SCOPE, scope])
+        return generations[GLOBAL_SCOPE], generations[scope]
+
+    async def get_month_token_async(
+        self, db: AsyncSession, year: int, month: int
+    ) -> Tuple[int, int]:
+        """月次・日別カレンダーキャッシュの世代トークンを取得します (非同期版)。"""
+        scope = month_scope(year, month)
+        generations = await self.get_generations_async(db, [GLOBAL_SCOPE, scope])
+        return generations[GLOBAL_SCOPE], generations[scope]
+
+    async def get_day_token_async(
+        self, db: AsyncSession, date_obj: datetime.date
+    ) -> Tuple[int, int]:
+        """
+        日別詳細の鮮度判定に使う世代トークンを取得します (非同期版)。
+
+        Returns:
+            Tuple[int, int]: (全体の世代, 該当日の世代)
+        """
+        scope = day_scope(date_obj)
+        generations = await self.get_generations_async(db, [GLOBAL_SCOPE, scope])
+        return generations[GLOBAL_SCOPE], generations[scope]
+
+    async def get_day_stamps_async(self, db: AsyncSession, year: int, month: int) -> Dict[str, int]:
+        """
+        指定月に属する日単位のスコープの世代を取得します (他ワーカーでの変更の検出に使用)。
+
+        日単位のスコープは書き込まれた日付ごとに増え続けるため、主キーの範囲で1か月分だけを読みます。
+
+        Returns:
+            Dict[str, int]: スコープ名をキーとする世代 (世代が記録された日のみ)
+        """
+        prefix = f"{DAY_SCOPE_PREFIX}{year:04d}-{month:02d}-"
+        result = await db.execute(
+            select(CacheGeneration.scope, CacheGeneration.generation).where(
+                CacheGeneration.scope >= f"{prefix}01",
+                CacheGeneration.scope <= f"{prefix}31",
+            )
+        )
+        return {scope: generation for scope, generation in result.all()}
+
+    def bump(self, db: Session, *scopes: str) -> None:
+        """
+        指定スコープの世代を1つ進めます。
+
+        注意: この関数はコミットを行いません。変更内容と同じトランザクションで
+        コミットされることで、他プロセスから変更と世代の更新が同時に見えるようになります。
+
+        Args:
+            db: データベースセッション
+            scopes: 世代を進めるスコープ名
+        """
+        if not scopes:
+            return
+        stmt = sqlite_insert(CacheGeneration).on_conflict_do_update(
+            index_elements=[CacheGeneration.scope],
+            set_={"generation": CacheGeneration.generation + 1},
+        )
+        # 複数スコープは executemany で1回の呼び出しにまとめる
+        db.execute(stmt, [{"scope": scope, "generation": 1} for scope in scopes])
+
+    def mark_date_changed(self, db: Session, date_obj: datetime.date) -> None:
+        """勤怠の変更を記録し、該当日・該当月のカレンダーキャッシュを破棄します。"""
+        self.bump(db, month_scope(date_obj.year, date_obj.month), day_scope(date_obj))
+        calendar_cache.invalidate_date(date_obj)
+        _record_changes(db, [date_obj])
+
+    def mark_dates_changed(self, db: Session, dates: Iterable[datetime.date]) -> None:
+        """複数日の勤怠の変更をまとめて記録します (月・日ごとに1回だけ世代を進めます)。"""
+        unique_dates = set(dates)
+        months = {(d.year, d.month) for d in unique_dates}
+        if months:
+            self.bump(
+                db,
+                *(month_scope(year, month) for year, month in sorted(months)),
+                *(day_scope(d) for d in sorted(unique_dates)),
+            )
+        for date_obj in unique_dates:
+            calendar_cache.invalidate_date(date_obj)
+        _record_changes(db, unique_dates)
+
+    def mark_all_changed(self, db: Session) -> None:
+        """全てのカレンダーデータに影響する変更を記録し、カレンダーキャッシュを全て破棄します。"""
+        self.bump(db, GLOBAL_SCOPE)
+        calendar_cache.invalidate_all()
+        _record_changes(db, [ALL_CHANGED])
+
+
+cache_generation = CRUDCacheGeneration()
@@ -6,12 +6,14 @@
 """
 
 import calendar
-from typing import Dict, List
+from typing import Dict, Iterable, List
 from datetime import date, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, func, and_, select
 
 from app.models.attendance import Attendance
+from app.models.location import Location
 from app.core.config import logger
 
 
@@ -20,7 +22,26 @@ calendar.setfirstweekday(6)
 
 
 class CRUDCalendar:
-    """カレンダー関連のデータアクセス操作クラス"""
+    """カレンダー関連のデータアクセス操作クラス
+
+    月次カレンダーの取得処理には、同期セッション用と非同期セッション用の2系統があります。
+    どちらも同じクエリ (select 文) を共有するため、結果は一致します。
+    """
+
+    @staticmethod
+    def _month_attendances_stmt(first_day: date, last_day: date) -> Select:
+        """期間内の勤怠データを取得するクエリを生成する"""
+        return select(Attendance).where(Attendance.date >= first_day, Attendance.date <= last_day)
+
+    @staticmethod
+    def _month_attendance_counts_stmt(first_day: date, last_day: date) -> Select:
+        """期間内の日付ごとの勤怠データ数を取得するクエリを生成する"""
+        day_column = func.extract('day', Attendance.date)
+        return (
+            select(day_column.label('day'), func.count('*').label('count'))
+            .where(and_(Attendance.date >= first_day, Attendance.date <= last_day))
+            .group_by(day_column)
+        )
 
     def get_month_attendances(
         self, db: Session, *, first_day: date, last_day: date
@@ -37,11 +58,28 @@ class CRUDCalendar:
             List[Attendance]: 勤怠データのリスト
         """
         try:
-            return (
-                db.query(Attendance)
-                .filter(Attendance.date >= first_day, Attendance.date <= last_day)
-                .all()
-            )
+            return list(db.execute(self._month_attendances_stmt(first_day, last_day)).scalars().all())
+        except Exception as e:
+            logger.error(f"Error getting month attendances: {str(e)}")
+            return []
+
+    async def get_month_attendances_async(
+        self, db: AsyncSession, *, first_day: date, last_day: date
+    ) -> List[Attendance]:
+        """
+        指定した期間内の勤怠データを取得 (非同期版)
+
+        Args:
+            db: 非同期データベースセッション
+            first_day: 期間の開始日
+            last_day: 期間の終了日
+
+        Returns:
+            List[Attendance]: 勤怠データのリスト
+        """
+        try:
+            result = await db.execute(self._month_attendances_stmt(first_day, last_day))
+            return list(result.scalars().all())
         except Exception as e:
             logger.error(f"Error getting month attendances: {str(e)}")
             return []
@@ -140,29 +178,60 @@ class CRUDCalendar:
             Dict[int, int]: 日付の日部分をキー、勤怠データ数を値とする辞書
         """
         try:
-            attendance_counts = {}
-            attendance_counts_query = (
-                db.query(
-                    func.extract('day', Attendance.date).label('day'),
-                    func.count('*').label('count')
-                )
-                .filter(
-                    and_(
-                        Attendance.date >= first_day,
-                        Attendance.date <= last_day
-                    )
-                )
-                .group_by(func.extract('day', Attendance.date))
-                .all()
-            )
-            
-            for day, count in attendance_counts_query:
-                attendance_counts[int(day)] = count
-                
-            return attendance_counts
+            rows = db.execute(self._month_attendance_counts_stmt(first_day, last_day)).all()
+            return {int(day): count for day, count in rows}
         except Exception as e:
             logger.error(f"Error getting month attendance counts: {str(e)}")
             return {}
 
+    async def get_month_attendance_counts_async(
+        self, db: AsyncSession, *, first_day: date, last_day: date
+    ) -> Dict[int, int]:
+        """
+        月内の日付ごとの勤怠データ数を一括取得 (非同期版)
+
+        Args:
+            db: 非同期データベースセッション
+            first_day: 月の初日
+            last_day: 月の末日
+
+        Returns:
+            Dict[int, int]: 日付の日部分をキー、勤怠データ数を値とする辞書
+        """
+        try:
+            result = await db.execute(self._month_attendance_counts_stmt(first_day, last_day))
+            return {int(day): count for day, count in result.all()}
+        except Exception as e:
+            logger.error(f"Error getting month attendance counts: {str(e)}")
+            return {}
+
+
+    async def get_day_location_counts_async(
+        self, db: AsyncSession, *, dates: Iterable[date]
+    ) -> Dict[date, Dict[str, int]]:
+        """
+        指定した日ごとの勤怠種別別の勤怠数を取得 (非同期版、ライブ更新の通知に使用)
+
+        Args:
+            db: 非同期データベースセッション
+            dates: 対象日
+
+        Returns:
+            Dict[date, Dict[str, int]]: 日付をキー、勤怠種別名→勤怠数の辞書を値とする辞書
+                (勤怠が無くなった日も空の辞書として含む)
+        """
+        date_list = sorted(set(dates))
+        counts: Dict[date, Dict[str, int]] = {d: {} for d in date_list}
+        if not date_list:
+            return counts
+        result = await db.execute(
+            select(Attendance.date, Location.name, func.count(Attendance.id))
+            .join(Location, Attendance.location_id == Location.id)
+            .where(Attendance.date.in_(date_list))
+            .group_by(Attendance.date, Location.name)
+        )
+        for day, location_name, count in result.all():
+            counts[day][str(location_name)] = count
+        return counts
 
 calendar_crud = CRUDCalendar()
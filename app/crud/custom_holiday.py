@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from app.models.custom_holiday import CustomHoliday
 from app.schemas.custom_holiday import CustomHolidayCreate, CustomHolidayUpdate
 from app.crud.base import CRUDBase
+from app.crud.cache_generation import cache_generation, CUSTOM_HOLIDAY_SCOPE
 
 
 class CRUDCustomHoliday(CRUDBase[CustomHoliday, CustomHolidayCreate, CustomHolidayUpdate]):
@@ -31,5 +32,11 @@ class CRUDCustomHoliday(CRUDBase[CustomHoliday, CustomHolidayCreate, CustomHolid
     def get_all(self, db: Session) -> List[CustomHoliday]:
         return db.query(CustomHoliday).order_by(asc(CustomHoliday.date)).all()
 
+    def _on_write(self, db: Session, db_obj: CustomHoliday) -> None:
+        """祝日表示は月次カレンダーに含まれるため、全ワーカーのカレンダーキャッシュを失効させます。"""
+        cache_generation.mark_all_changed(db)
+        # 祝日キャッシュを保持する他ワーカーに再読み込みを促す
+        cache_generation.bump(db, CUSTOM_HOLIDAY_SCOPE)
+
 
 custom_holiday = CRUDCustomHoliday(CustomHoliday)
@@ -14,6 +14,7 @@ from .base import CRUDBase
 from app.models.group import Group
 from app.models.user import User
 from app.schemas.group import GroupCreate, GroupUpdate
+from .cache_generation import cache_generation
 
 
 class CRUDGroup(CRUDBase[Group, GroupCreate, GroupUpdate]):
@@ -75,7 +76,13 @@ class CRUDGroup(CRUDBase[Group, GroupCreate, GroupUpdate]):
         
         # 依存関係がなければ削除を実行
         db.delete(db_obj)
+        self._on_write(db, db_obj)
         db.commit()
         return db_obj
 
+    def _on_write(self, db: Session, db_obj: Group) -> None:
+        """グループ名・表示順は日別詳細の表示に含まれるため、全ワーカーのカレンダーキャッシュを失効させます。"""
+        cache_generation.mark_all_changed(db)
+
+
 group = CRUDGroup(Group) 
\ No newline at end of file
@@ -14,6 +14,7 @@ from .base import CRUDBase
 from app.models.attendance import Attendance
 from app.models.location import Location
 from app.schemas.location import LocationCreate, LocationUpdate
+from .cache_generation import cache_generation
 from app.core.config import logger
 
 
@@ -129,6 +130,9 @@ class CRUDLocation(CRUDBase[Location, LocationCreate, LocationUpdate]):
         """
         複数の勤怠種別を取得または作成
 
+        既存の勤怠種別は1回のクエリでまとめて取得し、存在しないものだけを
+        1つのトランザクションで作成します。
+
         Args:
             db: データベースセッション
             location_names: 勤怠種別名のリスト
@@ -136,14 +140,26 @@ class CRUDLocation(CRUDBase[Location, LocationCreate, LocationUpdate]):
         Returns:
             Dict[str, Location]: 勤怠種別名をキーとする勤怠種別オブジェクトの辞書
         """
-        result = {}
-        for name in location_names:
-            if not name.strip():
-                continue
-            location = self.get_by_name(db, name=name)
-            if not location:
-                location = self.create_with_name(db, name=name)
-            result[name] = location
+        names = list(dict.fromkeys(name for name in location_names if name.strip()))
+        if not names:
+            return {}
+
+        result: Dict[str, Location] = {
+            str(loc.name): loc for loc in db.query(Location).filter(Location.name.in_(names))
+        }
+        missing = [name for name in names if name not in result]
+        if missing:
+            try:
+                for name in missing:
+                    db_obj = self.model(**LocationCreate(name=name).model_dump())
+                    db.add(db_obj)
+                    result[name] = db_obj
+                self._on_write(db, result[missing[0]])
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"勤怠種別の一括作成エラー: {str(e)}", exc_info=True)
+                raise
         return result
 
     def remove(self, db: Session, *, id: int) -> Location:
@@ -170,8 +186,13 @@ class CRUDLocation(CRUDBase[Location, LocationCreate, LocationUpdate]):
             )
         
         db.delete(db_obj)
+        self._on_write(db, db_obj)
         db.commit()
         return db_obj
 
+    def _on_write(self, db: Session, db_obj: Location) -> None:
+        """勤怠種別名は全ての月次集計に含まれるため、全ワーカーのカレンダーキャッシュを失効させます。"""
+        cache_generation.mark_all_changed(db)
+
 
 location = CRUDLocation(Location)
@@ -5,7 +5,7 @@
 ユーザーモデルの作成、読取、更新、削除操作を提供します。
 """
 
-from typing import List, Tuple, Optional
+from typing import List, Optional, Set, Tuple
 
 from sqlalchemy.orm import Session, joinedload
 
@@ -14,6 +14,7 @@ from app.models.user import User
 from app.models.group import Group
 from app.models.user_type import UserType
 from app.schemas.user import UserCreate, UserUpdate
+from .cache_generation import cache_generation
 
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
@@ -48,6 +49,38 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         users = db.query(User).all()
         return [(str(user.username), str(user.id), int(user.user_type_id)) for user in users]
 
+    def get_all_ids(self, db: Session) -> Set[str]:
+        """
+        すべてのユーザーIDを集合として取得
+
+        CSV取り込みなどで、行ごとにユーザーを問い合わせずに存在確認するために使用します。
+
+        Args:
+            db: データベースセッション
+
+        Returns:
+            Set[str]: ユーザーIDの集合
+        """
+        return {str(user_id) for (user_id,) in db.query(User.id)}
+
+    def get_all_with_relations(self, db: Session) -> List[User]:
+        """
+        全てのユーザーを、関連情報（グループ、社員種別）を読み込み済みの状態で取得します。
+
+        一覧画面でユーザーごとに `get` を呼び出す代わりに使用し、1回のクエリで取得します。
+
+        Args:
+            db: データベースセッション
+
+        Returns:
+            List[User]: 関連情報を含むユーザーモデルオブジェクトのリスト
+        """
+        return (
+            db.query(self.model)
+            .options(joinedload(self.model.group), joinedload(self.model.user_type))
+            .all()
+        )
+
     def get_user_with_details(self, db: Session, *, id: str) -> Optional[User]:
         """
         指定されたIDのユーザー情報を、関連情報（グループ、社員種別）を含めて取得します。
@@ -68,16 +101,25 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         )
 
     def get_all_users_with_details(
-        self, db: Session
+        self,
+        db: Session,
+        *,
+        group_id: Optional[int] = None,
+        user_type_id: Optional[int] = None,
     ) -> List[Tuple[str, str, Optional[str], Optional[str]]]:
         """
         全てのユーザー情報を関連情報（グループ名、ユーザータイプ名）と共に取得します。
+
+        Args:
+            db: データベースセッション
+            group_id: 指定した場合、このグループのユーザーのみを返します
+            user_type_id: 指定した場合、この社員種別のユーザーのみを返します
         
         Returns:
             List[Tuple[str, str, Optional[str], Optional[str]]]: 
                 (username, user_id, group_name, user_type_name) のリスト
         """
-        results = (
+        query = (
             db.query(
                 User.username,
                 User.id,
@@ -86,10 +128,13 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             )
             .outerjoin(Group, User.group_id == Group.id)
             .outerjoin(UserType, User.user_type_id == UserType.id)
-            # .order_by(User.username) # 既存のソートをコメントアウトまたは削除
-            .order_by(Group.name, UserType.name) # 新しいソート順を追加
-            .all()
         )
+        if group_id is not None:
+            query = query.filter(User.group_id == group_id)
+        if user_type_id is not None:
+            query = query.filter(User.user_type_id == user_type_id)
+        # グループ名・社員種別名順 (同順位はユーザーID順で順序を固定)
+        results = query.order_by(Group.name, UserType.name, User.id).all()
         # 結果をタプルのリストとして返す
         return [
             (
@@ -101,5 +146,9 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             for res in results
         ]
 
+    def _on_write(self, db: Session, db_obj: User) -> None:
+        """ユーザー名・所属は日別詳細の表示に含まれるため、全ワーカーのカレンダーキャッシュを失効させます。"""
+        cache_generation.mark_all_changed(db)
+
 
 user = CRUDUser(User)
@@ -13,6 +13,7 @@ from .base import CRUDBase
 from app.models.user import User
 from app.models.user_type import UserType
 from app.schemas.user_type import UserTypeCreate, UserTypeUpdate
+from .cache_generation import cache_generation
 from fastapi import HTTPException, status
 
 
@@ -72,8 +73,13 @@ class CRUDUserType(CRUDBase[UserType, UserTypeCreate, UserTypeUpdate]):
             )
             
         db.delete(db_obj)
+        self._on_write(db, db_obj)
         db.commit()
         return db_obj
 
+    def _on_write(self, db: Session, db_obj: UserType) -> None:
+        """社員種別名・表示順は日別詳細の表示に含まれるため、全ワーカーのカレンダーキャッシュを失効させます。"""
+        cache_generation.mark_all_changed(db)
+
 
 user_type = CRUDUserType(UserType) 
\ No newline at end of file
@@ -7,22 +7,92 @@ SQLAlchemyを使用したデータベース操作の基盤となるモジュー
 """
 
 from pathlib import Path
-from typing import Generator, Dict
-from sqlalchemy import create_engine
+from typing import Any, AsyncGenerator, Generator, Dict, List, Tuple, Union
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
 
-from app.core.config import logger
+from app.core.config import (
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_SIZE,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KIB,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_MMAP_SIZE_BYTES,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_TEMP_STORE,
+    logger,
+)
 
 # SQLiteデータベースファイルのパスとURL設定
 DB_PATH = Path("data/sokora.db")
 DB_URL = f"sqlite:///{DB_PATH.absolute()}"
+# 非同期エンジン用URL (aiosqlite ドライバ)
+ASYNC_DB_URL = f"sqlite+aiosqlite:///{DB_PATH.absolute()}"
+
+
+def get_sqlite_pragmas() -> List[Tuple[str, Union[str, int]]]:
+    """
+    接続ごとに適用する SQLite の PRAGMA 一覧を返します。
+
+    busy_timeout は journal_mode の切り替え時のロック待ちにも効くよう先頭に置きます。
+    cache_size は負の値を指定すると KiB 単位として解釈されます。
+    """
+    return [
+        ("busy_timeout", SQLITE_BUSY_TIMEOUT_MS),
+        ("journal_mode", SQLITE_JOURNAL_MODE),
+        ("synchronous", SQLITE_SYNCHRONOUS),
+        ("cache_size", -SQLITE_CACHE_SIZE_KIB),
+        ("mmap_size", SQLITE_MMAP_SIZE_BYTES),
+        ("temp_store", SQLITE_TEMP_STORE),
+    ]
+
+
+def apply_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    """
+    新しい DBAPI 接続に SQLite の PRAGMA を適用する engine の "connect" イベントハンドラ。
+
+    Args:
+        dbapi_connection: sqlite3 の接続オブジェクト
+        connection_record: SQLAlchemy の接続レコード (未使用)
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in get_sqlite_pragmas():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
 
 # SQLAlchemyエンジンを作成（SQLiteの同時接続に対応）
-engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
+engine = create_engine(
+    DB_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE_SECONDS,
+)
+event.listen(engine, "connect", apply_sqlite_pragmas)
 
 # セッション生成用のファクトリを設定
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 非同期エンジンを作成（イベントループ上で直接 SQLite にアクセスする読み取り系エンドポイント用）
+async_engine = create_async_engine(
+    ASYNC_DB_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE_SECONDS,
+)
+event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+
+# 非同期セッション生成用のファクトリを設定
+# コミット後に属性へアクセスしても暗黙の再読み込み (同期I/O) が起きないよう expire_on_commit を無効にします。
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 # モデル定義のベースクラスを作成
 Base = declarative_base()
 
@@ -48,6 +118,17 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    非同期データベースセッションを取得するための依存性注入（DI）用関数。
+
+    `get_db` の非同期版です。`async def` のエンドポイントで使用することで、
+    SQLite の待ち時間中もスレッドプールを占有せずにイベントループ上で処理できます。
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db() -> None:
     """
     データベーススキーマを初期化（テーブル作成）します。
@@ -9,17 +9,26 @@ from typing import Any, Dict, List
 
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
-from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 
 # ローカルモジュールのインポート
 from app.routers.api.v1 import router as api_v1_router  # API v1用ルーター
 from app.routers.pages import router as pages_router       # UIページ用ルーター
-from app.core.config import APP_VERSION, logger
-from app.db.session import initialize_database, SessionLocal
-from app.utils.holiday_cache import refresh_holiday_cache
+from app.core.assets import PrecompressedStaticFiles
+from app.core.change_bus import change_bus
+from app.core.config import (
+    APP_VERSION,
+    CHANGE_STREAM_POLL_SECONDS,
+    HOLIDAY_CACHE_CHECK_SECONDS,
+    logger,
+)
+from app.db.session import initialize_database, AsyncSessionLocal, SessionLocal
+from app.utils.holiday_cache import HolidayDataWatcher, refresh_holiday_cache
 from app.middleware.auth import AuthRequiredMiddleware
-from app.services.auth.settings import AuthSettings
+from app.middleware.compression import CompressionMiddleware
+from app.services.auth.oidc import close_http_client as close_oidc_http_client
+from app.services.auth.settings import auth_settings_provider
+from app.services.change_stream_service import GenerationWatcher
 
 # APIタグ定義
 API_TAGS: List[Dict[str, str]] = [
@@ -65,10 +74,11 @@ def create_application() -> FastAPI:
     )
 
     # /staticから静的ファイルを提供（開発時ファイル用）
-    app.mount("/static", StaticFiles(directory="app/static"), name="static")
+    app.mount("/static", PrecompressedStaticFiles(directory="app/static"), name="static")
 
     # /assetsからビルド時生成ファイルを提供（本番ファイル用）
-    app.mount("/assets", StaticFiles(directory="assets"), name="assets")
+    # ハッシュ付きファイル名は長期キャッシュし、.br/.gz の圧縮版があれば優先して返す
+    app.mount("/assets", PrecompressedStaticFiles(directory="assets"), name="assets")
 
     # UIページ用ルーターを組み込み（OpenAPI には含めない）
     app.include_router(pages_router, include_in_schema=False)
@@ -77,15 +87,18 @@ def create_application() -> FastAPI:
     app.include_router(api_v1_router)
 
     # セッション + 認証ガード
-    auth_settings = AuthSettings.from_env()
+    auth_settings = auth_settings_provider()
     app.state.auth_enabled = auth_settings.auth_enabled
-    app.add_middleware(AuthRequiredMiddleware, settings_provider=AuthSettings.from_env)
+    app.add_middleware(AuthRequiredMiddleware, settings_provider=auth_settings_provider)
     app.add_middleware(
         SessionMiddleware,
         secret_key=auth_settings.session_secret,
         max_age=auth_settings.session_ttl_seconds,
     )
 
+    # レスポンス圧縮（最後に追加して最も外側で動かし、認証のリダイレクト等も含めて対象にする）
+    app.add_middleware(CompressionMiddleware)
+
     return app
 
 
@@ -120,6 +133,11 @@ def create_openapi_schema(app: FastAPI) -> Dict[str, Any]:
 # アプリケーションインスタンスの作成
 app = create_application()
 
+# 他ワーカーでの勤怠変更をライブ更新の接続へ流すバックグラウンドタスク
+generation_watcher = GenerationWatcher(AsyncSessionLocal, CHANGE_STREAM_POLL_SECONDS)
+# 祝日キャッシュファイルの差し替えを再起動なしで反映するバックグラウンドタスク
+holiday_data_watcher = HolidayDataWatcher(SessionLocal, HOLIDAY_CACHE_CHECK_SECONDS)
+
 # OpenAPIスキーマの設定
 app.openapi = lambda: create_openapi_schema(app)  # type: ignore
 
@@ -138,3 +156,17 @@ async def startup_event() -> None:
         refresh_holiday_cache(db)
     finally:
         db.close()
+    generation_watcher.start()
+    holiday_data_watcher.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    """アプリケーション終了時の後処理を実行します。
+
+    ライブ更新の接続を終了させ、バックグラウンドタスクと OIDC の HTTP 接続を閉じます。
+    """
+    change_bus.close()
+    await generation_watcher.stop()
+    await holiday_data_watcher.stop()
+    await close_oidc_http_client()
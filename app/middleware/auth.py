@@ -1,23 +1,34 @@
-import logging
 import urllib.parse
-from typing import Callable, Iterable
+from typing import Any, Callable, Iterable, Mapping, Optional, Tuple
 
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import JSONResponse, RedirectResponse, Response
-from starlette.types import ASGIApp
+from starlette.responses import JSONResponse, RedirectResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.services.auth.settings import AuthSettings
 
-logger = logging.getLogger(__name__)
+DEFAULT_EXEMPT_PREFIXES = (
+    "/auth",
+    "/assets",
+    "/static",
+    "/favicon.ico",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+)
 
 
-def _is_exempt_path(path: str, exempt_prefixes: Iterable[str]) -> bool:
-    return any(path.startswith(prefix) for prefix in exempt_prefixes)
+def _is_exempt_path(path: str, exempt_prefixes: Tuple[str, ...]) -> bool:
+    # str.startswith にタプルを渡すと、前方一致の判定が1回の呼び出しで完結する
+    return path.startswith(exempt_prefixes)
 
 
-class AuthRequiredMiddleware(BaseHTTPMiddleware):
-    """セッションを前提に UI/API 双方へ認証ガードを適用するミドルウェア"""
+class AuthRequiredMiddleware:
+    """
+    セッションを前提に UI/API 双方へ認証ガードを適用する ASGI ミドルウェア
+
+    BaseHTTPMiddleware と異なりレスポンスを中継しないため、CSV ダウンロードなどの
+    StreamingResponse もアプリケーションから直接クライアントへ送られます。
+    """
 
     def __init__(
         self,
@@ -25,46 +36,37 @@ class AuthRequiredMiddleware(BaseHTTPMiddleware):
         settings_provider: Callable[[], AuthSettings],
         exempt_prefixes: Iterable[str] | None = None,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.settings_provider = settings_provider
-        self.exempt_prefixes = tuple(
-            exempt_prefixes
-            or (
-                "/auth",
-                "/assets",
-                "/static",
-                "/favicon.ico",
-                "/docs",
-                "/redoc",
-                "/openapi.json",
-            )
-        )
+        self.exempt_prefixes = tuple(exempt_prefixes or DEFAULT_EXEMPT_PREFIXES)
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        settings = self.settings_provider()
-        if not settings.auth_enabled:
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.settings_provider().auth_enabled:
+            await self.app(scope, receive, send)
+            return
 
-        path = request.url.path
+        path = scope.get("root_path", "") + scope["path"]
         if _is_exempt_path(path, self.exempt_prefixes):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
-        if request.session.get("auth"):
-            return await call_next(request)
+        session: Optional[Mapping[str, Any]] = scope.get("session")
+        if session and session.get("auth"):
+            await self.app(scope, receive, send)
+            return
 
         if path.startswith("/api/"):
-            return JSONResponse({"detail": "Unauthorized"}, status_code=401)
-
-        next_path = self._build_next_path(request)
-        login_url = f"/auth/login?next={urllib.parse.quote(next_path)}&reason=reauth"
-        return RedirectResponse(url=login_url, status_code=307)
+            response = JSONResponse({"detail": "Unauthorized"}, status_code=401)
+        else:
+            next_path = self._build_next_path(path, scope.get("query_string", b""))
+            login_url = f"/auth/login?next={urllib.parse.quote(next_path)}&reason=reauth"
+            response = RedirectResponse(url=login_url, status_code=307)
+        await response(scope, receive, send)
 
-    def _build_next_path(self, request: Request) -> str:
+    @staticmethod
+    def _build_next_path(path: str, query_string: bytes) -> str:
         """クエリ付きのリダイレクト先を安全に構成する"""
-        path = request.url.path
-        query = request.url.query
+        query = query_string.decode("latin-1")
         if not query:
             return path
         return f"{path}?{query}"
@@ -0,0 +1,222 @@
+"""
+レスポンス圧縮ミドルウェア
+=====================
+
+HTML フラグメント・JSON・CSV などのテキスト系レスポンスを gzip / brotli で圧縮します。
+
+- Accept-Encoding と設定 (`COMPRESSION_ENCODINGS`) の優先順からエンコーディングを選びます。
+  brotli は `brotli` パッケージがインストールされている場合のみ使用します。
+- 本文が一括で送られるレスポンスは `minimum_size` 未満なら圧縮しません。
+- StreamingResponse は `minimum_size` 以上たまるごとに圧縮して SYNC_FLUSH し、逐次クライアントへ送ります
+  (CSV ダウンロードの先頭行がすぐ届くようにしつつ、小さなチャンクごとの flush で圧縮率が落ちないようにするため)。
+  全体が `minimum_size` 未満で終わったストリームは圧縮しません。
+- 画像・フォント・Parquet など既に圧縮済みの形式、SSE、Content-Encoding 付きのレスポンスは対象外です。
+"""
+
+import zlib
+from typing import Iterable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import (
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_ENCODINGS,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MINIMUM_SIZE,
+)
+
+try:  # brotli は任意依存 (未インストール時は gzip のみ)
+    import brotli
+except ImportError:  # pragma: no cover - 環境依存
+    brotli = None
+
+# 圧縮しても縮まない (既に圧縮済みの) 形式、または逐次配信を妨げたくない形式
+EXCLUDED_MEDIA_TYPE_PREFIXES = (
+    "image/",
+    "video/",
+    "audio/",
+    "font/",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/octet-stream",
+    "application/vnd.apache.parquet",
+    "application/vnd.apache.arrow",
+    "text/event-stream",
+)
+
+
+def available_encodings(encodings: Iterable[str]) -> Tuple[str, ...]:
+    """設定されたエンコーディングのうち、この環境で利用できるものを返します。"""
+    return tuple(e for e in encodings if e == "gzip" or (e == "br" and brotli is not None))
+
+
+def choose_encoding(accept_encoding: str, encodings: Iterable[str]) -> Optional[str]:
+    """
+    Accept-Encoding ヘッダーから使用するエンコーディングを選びます。
+
+    クライアントが受け付ける (q > 0) もののうち、`encodings` の並びで最初のものを返します。
+    """
+    accepted = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(token)
+    for encoding in encodings:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+def is_compressible(headers: Headers) -> bool:
+    """レスポンスヘッダーから圧縮対象かどうかを判定します。"""
+    if "content-encoding" in headers:
+        return False
+    if "no-transform" in headers.get("cache-control", "").lower():
+        return False
+    media_type = headers.get("content-type", "").lower()
+    return not media_type.startswith(EXCLUDED_MEDIA_TYPE_PREFIXES)
+
+
+class _Compressor:
+    """エンコーディングごとの逐次圧縮器"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31 で gzip ヘッダー付きのストリームを生成する
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, *, final: bool) -> bytes:
+        """
+        データを圧縮します。
+
+        `final` が False の場合はここまでの入力をフラッシュし、クライアントが
+        その時点までを展開できる状態のバイト列を返します。
+        """
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """テキスト系レスポンスを gzip / brotli で圧縮する ASGI ミドルウェア"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: Iterable[str] = COMPRESSION_ENCODINGS,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+    ) -> None:
+        self.app = app
+        self.encodings = available_encodings(encodings)
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    """1リクエスト分の送信メッセージを受け取り、必要に応じて本文を圧縮して送る"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+        # まだ圧縮・送信していない本文 (`minimum_size` に達するまでまとめる)
+        self.pending = bytearray()
+
+    async def __call__(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # 本文の最初のメッセージを見るまで送信を保留する
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = message["status"] in (204, 304) or not is_compressible(headers)
+            return
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            await self._flush_start()
+            await self.send(message)
+            return
+
+        more_body: bool = message.get("more_body", False)
+        self.pending += message.get("body", b"")
+        if more_body and len(self.pending) < self.middleware.minimum_size:
+            # 小さなチャンクは閾値に達するまでまとめてから圧縮・flush する
+            return
+
+        body = bytes(self.pending)
+        self.pending.clear()
+        if self.compressor is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # 本文全体が閾値未満なら圧縮しない
+                self.passthrough = True
+                await self._flush_start()
+                await self.send({"type": "http.response.body", "body": body, "more_body": False})
+                return
+            self.compressor = _Compressor(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            compressed = self.compressor.compress(body, final=not more_body)
+            self._apply_headers(None if more_body else len(compressed))
+            await self._flush_start()
+        else:
+            compressed = self.compressor.compress(body, final=not more_body)
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+    def _apply_headers(self, content_length: Optional[int]) -> None:
+        """圧縮後のレスポンスに合わせてヘッダーを書き換えます。"""
+        assert self.start_message is not None
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        if content_length is None:
+            # ストリーミングでは長さが確定しないため chunked 転送に任せる
+            if "content-length" in headers:
+                del headers["content-length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # 圧縮後の本文は元と一致しないため、強い ETag は弱い ETag に変える
+            headers["ETag"] = f"W/{etag}"
+
+    async def _flush_start(self) -> None:
+        if self.start_message is not None:
+            message, self.start_message = self.start_message, None
+            await self.send(message)
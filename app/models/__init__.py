@@ -7,9 +7,11 @@ sokoraデータベースモデル
 
 from .user import User
 from .attendance import Attendance
+from .attendance_summary import AttendanceSummary
 from .location import Location
 from .group import Group
 from .user_type import UserType
 from .custom_holiday import CustomHoliday
+from .cache_generation import CacheGeneration
 
-__all__ = ["User", "Attendance", "Location", "Group", "UserType", "CustomHoliday"]
+__all__ = ["User", "Attendance", "AttendanceSummary", "Location", "Group", "UserType", "CustomHoliday", "CacheGeneration"]
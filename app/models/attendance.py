@@ -5,7 +5,7 @@
 ユーザーの勤怠記録を管理するSQLAlchemyモデル。
 """
 
-from sqlalchemy import Column, Date, ForeignKey, Integer, String
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -15,23 +15,19 @@ class Attendance(Base):  # type: ignore
     """ユーザーの日々の勤怠種別を表す勤怠モデル"""
 
     __tablename__ = "attendance"
+    # ユーザーIDと日付の組み合わせを一意にする複合インデックス
+    # (ユーザー・日付での検索と、upsert の ON CONFLICT 対象として使用)
+    __table_args__ = (
+        Index("ix_attendance_user_id_date", "user_id", "date", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     date = Column(Date, nullable=False, index=True)
-    location_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=False, index=True)
     note = Column(String, nullable=True)  # 備考フィールド追加
 
     # Userモデルとのリレーションシップ定義 (多対一)
     user = relationship("User", back_populates="attendance_records")
     # Locationモデルとのリレーションシップ定義 (多対一)
     location_info = relationship("Location", back_populates="attendances")
-
-    # SQLAlchemyのUniqueConstraintを使って複合ユニーク制約を定義
-    # (ユーザーIDと日付の組み合わせが一意であることを保証)
-    # from sqlalchemy import UniqueConstraint
-    # __table_args__ = (UniqueConstraint('user_id', 'date', name='_user_date_uc'),)
-    # ConfigクラスはPydanticで使用されるもので、SQLAlchemyモデルでは通常 __table_args__ を使用します。
-    # ただし、既存の動作を維持するため、ここではコメントアウトのままにします。
-    # class Config:
-    #     unique_together = ("user_id", "date")
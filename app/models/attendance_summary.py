@@ -0,0 +1,30 @@
+"""
+勤怠月次集計モデル定義
+==================
+
+ユーザー・月・勤怠種別ごとの登録日数を保持する集計テーブルのSQLAlchemyモデル。
+"""
+
+from sqlalchemy import Column, Date, ForeignKey, Integer, String
+
+from app.db.session import Base
+
+
+class AttendanceSummary(Base):  # type: ignore
+    """ユーザーの月別・勤怠種別別の登録日数を表す集計モデル
+
+    勤怠の書き込みと同じトランザクションで該当ユーザー・該当月の行が再計算されるため、
+    集計ページは勤怠明細を走査せずに期間内の日数を取得できます。
+    """
+
+    __tablename__ = "attendance_summary"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    # 対象月の1日 (年度などの期間指定で範囲検索するためインデックスを付与)
+    month = Column(Date, primary_key=True, index=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), primary_key=True)
+    days = Column(Integer, nullable=False, default=0)
+
+    def __str__(self) -> str:
+        """ユーザーID・月・勤怠種別・日数を返す"""
+        return f"{self.user_id}:{self.month:%Y-%m}:{self.location_id}={self.days}"
@@ -0,0 +1,27 @@
+"""
+キャッシュ世代モデル定義
+====================
+
+プロセス間でキャッシュの鮮度を共有するための世代カウンタを保持するモデル。
+"""
+
+from sqlalchemy import Column, Integer, String
+
+from app.db.session import Base
+
+
+class CacheGeneration(Base):  # type: ignore
+    """キャッシュ対象 (スコープ) ごとの世代カウンタを表すモデル
+
+    データを書き込むトランザクション内で該当スコープの世代を進めることで、
+    別プロセス (uvicorn の別ワーカー) が保持するキャッシュを失効させます。
+    """
+
+    __tablename__ = "cache_generations"
+
+    scope = Column(String, primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+
+    def __str__(self) -> str:
+        """スコープ名と世代を返す"""
+        return f"{self.scope}:{self.generation}"
@@ -12,7 +12,7 @@ __version__ = "0.1.0"
 from fastapi import APIRouter
 
 # データ操作API関連
-from app.routers.api.v1 import attendance, csv, group, location, user, user_type
+from app.routers.api.v1 import attendance, csv, export, group, location, user, user_type
 
 # メインAPIルーターの作成（すべてのAPIエンドポイントを統合）
 api_router = APIRouter(prefix="/api/v1")
@@ -59,5 +59,11 @@ api_router.include_router(
     tags=["Data"]
 )
 
+# 縦持ち形式の勤怠エクスポートAPI (CSV / Parquet / Arrow)
+api_router.include_router(
+    export.router,
+    tags=["Data"]
+)
+
 # v1 APIルーター
 router = api_router
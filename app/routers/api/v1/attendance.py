@@ -6,35 +6,162 @@
 """
 
 from datetime import date, datetime, timedelta
-from typing import Any, Optional, cast
+from typing import Any, Iterable, Iterator, List, Literal, Optional, Tuple, cast
+import base64
+import binascii
 import json # json をインポート
 import re # 正規表現を追加
+from urllib.parse import urlsplit
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status, Form, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Form, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.config import logger
+from app.utils.templates import templates
+
+from app.core.config import (
+    ATTENDANCE_API_MAX_PAGE_SIZE,
+    ATTENDANCE_API_PAGE_SIZE,
+    ATTENDANCE_BULK_MAX_OPERATIONS,
+    logger,
+)
 from app.crud.attendance import attendance
 from app.crud.location import location
 from app.crud.user import user
 from app.db.session import get_db
+from app.models.location import Location
+from app.models.user import User
 from app.schemas.attendance import (
+    AttendanceBulkRequest,
+    AttendanceBulkResult,
     AttendanceCreate,
-    AttendanceList,
+    AttendancePage,
     AttendanceUpdate,
 )
+from app.utils.holiday_cache import get_holiday_name, is_holiday, sync_holiday_cache
+from app.utils.ui_utils import get_location_color_classes
 
 # API用ルーター
 router = APIRouter(tags=["Attendance"])
 
+# 勤怠の変更後にセルだけを差し替える画面 (HX-Current-URL のパス → セルの種類)
+CELL_SWAP_PAGES = (
+    ("/attendance/weekly", "weekly"),
+    ("/attendance/monthly", "register"),
+)
+
+
+def encode_cursor(date_value: date, attendance_id: int) -> str:
+    """ページの最後の行の (date, id) を不透明なカーソル文字列に変換します。"""
+    raw = f"{date_value.isoformat()}:{attendance_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """
+    カーソル文字列を (date, id) に戻します。
+
+    Raises:
+        HTTPException: カーソルの形式が不正な場合 (400)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date_part, id_part = base64.urlsafe_b64decode(padded).decode().split(":")
+        return date.fromisoformat(date_part), int(id_part)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="カーソルの形式が無効です。"
+        )
+
+
+def _record_to_dict(row: Any) -> dict:
+    """勤怠の行を API の出力形式 (Attendance スキーマと同じ項目) の辞書に変換します。"""
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "date": row.date.isoformat(),
+        "location_id": row.location_id,
+        "note": row.note,
+    }
+
+
+def iter_ndjson_chunks(
+    rows: Iterable[Any],
+    *,
+    limit: Optional[int] = None,
+    chunk_rows: int = ATTENDANCE_API_PAGE_SIZE,
+) -> Iterator[bytes]:
+    """
+    勤怠の行を NDJSON に変換し、`chunk_rows` 行ずつまとめたバイト列を yield します。
+
+    1行ごとに yield すると行数分のスレッドプール往復と ASGI メッセージが発生するため、
+    `iter_csv_bytes` と同様にまとめて書き出します。
 
-@router.get("", response_model=AttendanceList)
-def get_attendances(db: Session = Depends(get_db)) -> Any:
+    Args:
+        rows: 勤怠の行 (`iter_filtered` の結果)
+        limit: 出力する最大件数 (None の場合は全件)
+        chunk_rows: 1回に書き出す行数
     """
-    全ての勤怠データを取得します。
+    lines: List[str] = []
+    for count, row in enumerate(rows, start=1):
+        lines.append(json.dumps(_record_to_dict(row), ensure_ascii=False))
+        if len(lines) >= chunk_rows:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines.clear()
+        if limit is not None and count >= limit:
+            break
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+@router.get("", response_model=AttendancePage)
+def get_attendances(
+    request: Request,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    user_id: Optional[str] = None,
+    group_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=ATTENDANCE_API_MAX_PAGE_SIZE),
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_db),
+) -> Any:
     """
-    attendances = db.query(attendance.model).all()
-    return {"records": attendances}
+    勤怠データを (date, id) 順に取得します。
+
+    - 期間 (start_date / end_date)、ユーザー、グループ、勤怠種別で絞り込めます。
+    - JSON 形式では最大 `limit` 件 (既定: SOKORA_ATTENDANCE_API_PAGE_SIZE) を返し、続きがある場合は
+      `next_cursor` を `cursor` に指定して次のページを取得します。
+    - `format=ndjson` (または Accept: application/x-ndjson) では、条件に合う全件 (`limit` 指定時はその件数まで) を
+      1行1レコードの NDJSON としてストリーミングします。サーバー側では一定件数ずつ読み進めるため、
+      件数が多くてもメモリ使用量は増えません。
+    """
+    after = decode_cursor(cursor) if cursor else None
+    filters = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "user_id": user_id,
+        "group_id": group_id,
+        "location_id": location_id,
+    }
+
+    if format == "ndjson" or "application/x-ndjson" in request.headers.get("accept", ""):
+        rows = attendance.iter_filtered(
+            db, batch_size=ATTENDANCE_API_PAGE_SIZE, after=after, **filters
+        )
+        return StreamingResponse(iter_ndjson_chunks(rows, limit=limit), media_type="application/x-ndjson")
+
+    page_size = limit or ATTENDANCE_API_PAGE_SIZE
+    # 1件多く取得し、次のページの有無を判定する
+    rows = attendance.get_page(db, limit=page_size + 1, after=after, **filters)
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
+    return {"records": [_record_to_dict(row) for row in rows], "next_cursor": next_cursor}
 
 
 @router.get("/day/{day}")
@@ -100,6 +227,69 @@ def extract_week_from_request(request: Request, attendance_date: Optional[date]
     return None
 
 
+def get_cell_variant(request: Request) -> Optional[str]:
+    """
+    勤怠グリッドのセルだけを差し替えられるリクエストかを判定します。
+
+    Args:
+        request: FastAPIリクエストオブジェクト
+
+    Returns:
+        Optional[str]: 差し替えるセルの種類 ("weekly" / "register")。
+            HTMX 以外のリクエストや、グリッドの無い画面からのリクエストの場合は None
+    """
+    if request.headers.get("HX-Request") != "true":
+        return None
+    path = urlsplit(request.headers.get("HX-Current-URL", "")).path
+    for prefix, variant in CELL_SWAP_PAGES:
+        if path.startswith(prefix):
+            return variant
+    return None
+
+
+def render_attendance_cell(
+    request: Request,
+    db: Session,
+    *,
+    variant: str,
+    user_obj: User,
+    attendance_date: date,
+    location_obj: Optional[Location] = None,
+    note: Optional[str] = None,
+    close_modal: str,
+) -> Response:
+    """
+    変更した日のセルを out-of-band スワップ用に描画したレスポンスを返します。
+
+    グリッド全体を再取得させる代わりに、1セル分の断片だけを返します。
+    モーダルは HTMX が空の本文で置き換えて閉じます。
+    """
+    # 他ワーカーで追加・削除されたカスタム祝日を反映する
+    sync_holiday_cache(db)
+    location_name = str(location_obj.name) if location_obj is not None else ""
+    context = {
+        "request": request,
+        "variant": variant,
+        "day": {
+            "date": attendance_date.isoformat(),
+            "day": attendance_date.day,
+            "is_holiday": is_holiday(attendance_date),
+            "holiday_name": get_holiday_name(attendance_date),
+        },
+        "weekday": attendance_date.weekday(),
+        "user_id": user_obj.id,
+        "user_name": user_obj.username,
+        "location_name": location_name,
+        "note": note or "",
+        "style_info": get_location_color_classes(int(location_obj.id)) if location_obj is not None else {},
+    }
+    return templates.TemplateResponse(
+        "components/partials/attendance/cell_oob.html",
+        context,
+        headers={"HX-Trigger": json.dumps({"closeModal": close_modal})},
+    )
+
+
 @router.post("", response_model=None, status_code=status.HTTP_204_NO_CONTENT)
 async def create_attendance(
     request: Request,
@@ -112,6 +302,7 @@ async def create_attendance(
     """
     勤怠データを作成します。
     成功時には HX-Trigger ヘッダー付きで 204 No Content を返します。
+    勤怠グリッドの画面からの HTMX リクエストでは、変更したセルの断片を 200 で返します。
     """
     try:
         # 文字列から date オブジェクトへの変換
@@ -124,8 +315,8 @@ async def create_attendance(
             )
 
         # ユーザーと勤怠種別の存在確認
-        user.get_or_404(db, id=user_id)
-        location.get_or_404(db, id=location_id)
+        user_obj = user.get_or_404(db, id=user_id)
+        location_obj = location.get_or_404(db, id=location_id)
 
         # 既存レコードのチェック
         existing_attendance = attendance.get_by_user_and_date(
@@ -142,6 +333,13 @@ async def create_attendance(
 
         # 勤怠データ作成
         attendance.create(db=db, obj_in=attendance_in)
+
+        variant = get_cell_variant(request)
+        if variant:
+            return render_attendance_cell(
+                request, db, variant=variant, user_obj=user_obj, attendance_date=attendance_date,
+                location_obj=location_obj, note=note, close_modal=f"attendance-modal-{user_id}-{date_str}",
+            )
         
         # 現在表示中の月/週情報を取得
         current_month = extract_month_from_request(request)
@@ -170,6 +368,49 @@ async def create_attendance(
         )
 
 
+@router.post("/bulk", response_model=AttendanceBulkResult)
+def bulk_apply_attendances(
+    payload: AttendanceBulkRequest,
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    複数の勤怠を一括で登録・更新・削除します。
+
+    全ての操作を1つのトランザクションで適用し、操作ごとの結果 (created / updated / deleted /
+    unchanged / error) を返します。location_id に null または -1 を指定した操作は削除として扱います。
+    `atomic` が true の場合、不正な操作が1件でもあれば何も適用せず 422 を返します。
+    """
+    if len(payload.operations) > ATTENDANCE_BULK_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"一度に適用できる操作は {ATTENDANCE_BULK_MAX_OPERATIONS} 件までです。"
+        )
+
+    try:
+        result = attendance.bulk_apply(db, operations=payload.operations, atomic=payload.atomic)
+    except Exception as e:
+        logger.error(f"勤怠一括登録エラー: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"勤怠データの一括登録中にエラーが発生しました: {str(e)}"
+        )
+
+    if not result["applied"]:
+        return JSONResponse(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            content=jsonable_encoder(AttendanceBulkResult(**result)),
+        )
+
+    logger.info(
+        f"勤怠一括登録: created={result['created']}, updated={result['updated']}, "
+        f"deleted={result['deleted']}, failed={result['failed']}"
+    )
+    return JSONResponse(
+        content=jsonable_encoder(AttendanceBulkResult(**result)),
+        headers={"HX-Trigger": json.dumps({"refreshAttendance": {}})},
+    )
+
+
 @router.put("/{attendance_id}", response_model=None, status_code=status.HTTP_204_NO_CONTENT)
 async def update_attendance(
     request: Request,
@@ -181,12 +422,13 @@ async def update_attendance(
     """
     勤怠データを更新します。
     成功時には HX-Trigger ヘッダー付きで 204 No Content を返します。
+    勤怠グリッドの画面からの HTMX リクエストでは、変更したセルの断片を 200 で返します。
     """
     try:
         attendance_obj = attendance.get_or_404(db=db, id=attendance_id)
         
         # 新しい勤怠種別IDの存在確認
-        location.get_or_404(db, id=location_id)
+        location_obj = location.get_or_404(db, id=location_id)
         
         # 更新データを作成
         attendance_in = AttendanceUpdate(location_id=location_id, note=note)
@@ -194,6 +436,14 @@ async def update_attendance(
         # 更新処理
         updated_obj = attendance.update(db=db, db_obj=attendance_obj, obj_in=attendance_in) # 更新後のオブジェクト取得
         logger.debug(f"勤怠ID {attendance_id} の更新に成功しました")
+
+        variant = get_cell_variant(request)
+        if variant:
+            return render_attendance_cell(
+                request, db, variant=variant, user_obj=user.get_or_404(db, id=updated_obj.user_id),
+                attendance_date=cast(date, updated_obj.date), location_obj=location_obj, note=note,
+                close_modal=f"attendance-modal-{updated_obj.user_id}-{updated_obj.date.isoformat()}",
+            )
         
         # 現在表示中の月/週情報を取得
         current_month = extract_month_from_request(request)
@@ -232,17 +482,26 @@ async def delete_attendance(
     """
     勤怠データを削除します。
     成功時には HX-Trigger ヘッダー付きで 204 No Content を返します。
+    勤怠グリッドの画面からの HTMX リクエストでは、空にしたセルの断片を 200 で返します。
     
     このエンドポイントは、JavaScript APIから直接勤怠IDを指定して削除する場合に使用します。
     """
     try:
         attendance_obj = attendance.get_or_404(db=db, id=attendance_id)
         user_id = attendance_obj.user_id  # 削除前にユーザーIDを取得
-        date_str = attendance_obj.date.isoformat()  # 削除前に日付を取得
-        current_week = extract_week_from_request(request, cast(date, attendance_obj.date))
+        attendance_date = cast(date, attendance_obj.date)  # 削除前に日付を取得
+        date_str = attendance_date.isoformat()
+        current_week = extract_week_from_request(request, attendance_date)
         
         attendance.remove(db=db, id=attendance_id)
         logger.debug(f"勤怠ID {attendance_id} の削除に成功しました")
+
+        variant = get_cell_variant(request)
+        if variant:
+            return render_attendance_cell(
+                request, db, variant=variant, user_obj=user.get_or_404(db, id=user_id),
+                attendance_date=attendance_date, close_modal=f"attendance-modal-{user_id}-{date_str}",
+            )
         
         # 現在表示中の月情報を取得
         current_month = extract_month_from_request(request)
@@ -280,6 +539,7 @@ def delete_attendance_by_user_date(
     """
     特定ユーザーの特定日の勤怠データを削除します。
     成功時には HX-Trigger ヘッダー付きで 204 No Content を返します。
+    勤怠グリッドの画面からの HTMX リクエストでは、空にしたセルの断片を 200 で返します。
     
     このエンドポイントは、モーダルUIから user_id と date を指定して削除する場合に使用します。
     """
@@ -298,6 +558,13 @@ def delete_attendance_by_user_date(
         # 勤怠データを削除
         attendance.remove(db=db, id=attendance_obj.id)
         logger.debug(f"ユーザー '{user_id}' の日付 '{date_str}' の勤怠削除に成功しました")
+
+        variant = get_cell_variant(request)
+        if variant:
+            return render_attendance_cell(
+                request, db, variant=variant, user_obj=user.get_or_404(db, id=user_id),
+                attendance_date=date, close_modal=f"attendance-modal-{user_id}-{date_str}",
+            )
         
         # 現在表示中の月情報を取得
         current_month = extract_month_from_request(request)
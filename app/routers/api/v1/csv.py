@@ -2,62 +2,45 @@
 CSVデータダウンロードAPI
 =====================
 
-CSVデータのダウンロードに関連するAPIエンドポイントを提供します。
+CSVデータのダウンロード・取り込みに関連するAPIエンドポイントを提供します。
 """
-import csv
-import io
-from typing import Optional, Generator, List
-from datetime import datetime
+import json
+from typing import Any, Optional, Literal
+from datetime import date, datetime
 
-from fastapi import APIRouter, Depends, Query, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, File, Query, HTTPException, UploadFile, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.config import logger
+from app.core.config import CSV_EXPORT_MAX_DAYS, logger
 from app.db.session import get_db
-from app.utils.csv_utils import generate_work_entries_csv_rows
+from app.schemas.csv import CsvImportResult
+from app.utils.csv_utils import generate_work_entries_csv_rows, import_work_entries_csv, iter_csv_bytes
 
 # ルーター定義
 router = APIRouter(prefix="/csv", tags=["Data"])
 
-def _iter_csv(row_generator: Generator[List[str], None, None], encoding: str = "utf-8") -> Generator[bytes, None, None]:
-    """CSV行ジェネレータを受け取り、エンコードされたバイト列をyieldするジェネレータ"""
-    buffer = io.StringIO()
-    writer = csv.writer(buffer)
-    
-    try:
-        for row in row_generator:
-            writer.writerow(row)
-            buffer.seek(0)
-            data = buffer.read()
-            buffer.seek(0)
-            buffer.truncate()
-            # エンコードしてyield
-            if encoding.lower() == "sjis":
-                yield data.encode("shift_jis", errors="replace")
-            else:
-                yield data.encode("utf-8")
-    except Exception as e:
-         logger.error(f"CSVストリーミング中にエラー: {e}", exc_info=True)
-         # エラー発生時にも何らかのバイト列を返す (例: エラーメッセージ)
-         error_msg = f"Error during CSV generation: {e}\n"
-         if encoding.lower() == "sjis":
-             yield error_msg.encode("shift_jis", errors="replace")
-         else:
-             yield error_msg.encode("utf-8")
-    finally:
-        buffer.close()
-
 @router.get("/download")
 def download_csv(
     month: Optional[str] = Query(None, description="フィルタリングする月（YYYY-MM形式）"),
+    start: Optional[date] = Query(None, description="出力期間の開始日（YYYY-MM-DD形式、endと併用）"),
+    end: Optional[date] = Query(None, description="出力期間の終了日（YYYY-MM-DD形式、startと併用）"),
+    group_id: Optional[int] = Query(None, description="出力するユーザーのグループID"),
+    user_type_id: Optional[int] = Query(None, description="出力するユーザーの社員種別ID"),
     encoding: str = Query("utf-8", description="CSVエンコーディング（utf-8またはsjis）"),
     db: Session = Depends(get_db)
 ) -> StreamingResponse:
     """
     勤怠データをCSV形式でストリーミングダウンロードします
+
+    期間は `month` (1か月) または `start`/`end` (年度など任意の期間) で指定し、
+    どちらもない場合は直近90日を出力します。
     """
-    logger.info(f"CSVダウンロードリクエスト: month={month}, encoding={encoding}")
+    logger.info(
+        f"CSVダウンロードリクエスト: month={month}, start={start}, end={end}, "
+        f"group_id={group_id}, user_type_id={user_type_id}, encoding={encoding}"
+    )
     
     # エンコーディング検証
     valid_encodings = ["utf-8", "sjis"]
@@ -78,9 +61,39 @@ def download_csv(
                  detail="月の形式が無効です。YYYY-MM形式で指定してください。"
              )
 
+    # 期間指定の検証 (start/end は両方指定し、month とは併用しない)
+    if start or end:
+        if month:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="month と start/end は同時に指定できません。"
+            )
+        if not (start and end):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="start と end は両方指定してください。"
+            )
+        if start > end:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="start には end 以前の日付を指定してください。"
+            )
+        if (end - start).days + 1 > CSV_EXPORT_MAX_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"出力期間は {CSV_EXPORT_MAX_DAYS} 日以内で指定してください。"
+            )
+
     try:
         # CSV行ジェネレータを取得
-        row_generator = generate_work_entries_csv_rows(db, month=month)
+        row_generator = generate_work_entries_csv_rows(
+            db,
+            month=month,
+            start_date=start,
+            end_date=end,
+            group_id=group_id,
+            user_type_id=user_type_id,
+        )
 
         # コンテンツタイプとファイル名を設定
         media_type = "text/csv"
@@ -88,6 +101,8 @@ def download_csv(
         filename = "work_entries.csv"
         if month:
             filename = f"work_entries_{month}.csv"
+        elif start and end:
+            filename = f"work_entries_{start:%Y%m%d}_{end:%Y%m%d}.csv"
 
         response_headers = {
             "Content-Disposition": f"attachment; filename=\"{filename}\"",
@@ -98,7 +113,7 @@ def download_csv(
 
         # ストリーミングレスポンスを返す
         return StreamingResponse(
-            _iter_csv(row_generator, normalized_encoding),
+            iter_csv_bytes(row_generator, normalized_encoding),
             media_type=media_type,
             headers=response_headers
         )
@@ -109,4 +124,36 @@ def download_csv(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="CSVファイルの生成中にエラーが発生しました。"
-        ) 
\ No newline at end of file
+        )
+
+
+@router.post("/import", response_model=CsvImportResult)
+def import_csv(
+    file: UploadFile = File(..., description="ダウンロードと同じ形式の勤怠CSV"),
+    encoding: Literal["auto", "utf-8", "sjis"] = Query("auto", description="CSVエンコーディング（auto, utf-8, sjis）"),
+    clear_empty: bool = Query(False, description="空のセルに対応する既存の勤怠を削除する"),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    `/download` と同じ形式 (ユーザー情報の列 + YYYY/MM/DD の日付列) のCSVを取り込みます。
+
+    セルの値は勤怠種別名として扱い、未登録の勤怠種別は作成します。空のセルは既定では変更しません。
+    書き込みは一定件数ごとのトランザクションで確定するため、ヘッダー以降の読み込みエラーで
+    400 を返した場合も、それまでに確定した分は取り込み済みです。
+    """
+    logger.info(f"CSV取り込みリクエスト: filename={file.filename}, encoding={encoding}, clear_empty={clear_empty}")
+    try:
+        result = import_work_entries_csv(db, file.file, encoding=encoding, clear_empty=clear_empty)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"CSV取り込み中にエラー: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="CSVファイルの取り込み中にエラーが発生しました。"
+        )
+
+    return JSONResponse(
+        content=jsonable_encoder(CsvImportResult(**result)),
+        headers={"HX-Trigger": json.dumps({"refreshAttendance": {}})},
+    )
@@ -0,0 +1,80 @@
+"""
+勤怠データエクスポートAPI
+=====================
+
+分析基盤向けに、勤怠を縦持ち形式 (user_id, date, location, note) で出力するエンドポイントを提供します。
+"""
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.config import logger
+from app.db.session import get_db
+from app.utils.export_utils import (
+    COLUMNAR_FORMATS,
+    EXPORT_FORMATS,
+    is_columnar_available,
+    iter_arrow_ipc_bytes,
+    iter_export_batches,
+    iter_long_csv_bytes,
+    iter_parquet_bytes,
+)
+
+# ルーター定義
+router = APIRouter(prefix="/export", tags=["Data"])
+
+
+@router.get("/attendances")
+def export_attendances(
+    start: date = Query(..., description="出力期間の開始日（YYYY-MM-DD形式）"),
+    end: date = Query(..., description="出力期間の終了日（YYYY-MM-DD形式）"),
+    format: Literal["csv", "parquet", "arrow"] = Query("csv", description="出力形式（csv, parquet, arrow）"),
+    group_id: Optional[int] = Query(None, description="出力するユーザーのグループID"),
+    user_type_id: Optional[int] = Query(None, description="出力するユーザーの社員種別ID"),
+    encoding: Literal["utf-8", "sjis"] = Query("utf-8", description="CSVエンコーディング（csv形式のみ）"),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """
+    指定期間の勤怠を1行1レコードの縦持ち形式でストリーミング出力します。
+
+    列は user_id, date, location (勤怠種別名), note で、(date, id) 順に並びます。
+    `parquet` と `arrow` (Arrow IPC ストリーム形式) は pyarrow がインストールされている場合のみ
+    利用でき、未インストールの場合は 501 を返します。
+    """
+    logger.info(
+        f"勤怠エクスポートリクエスト: start={start}, end={end}, format={format}, "
+        f"group_id={group_id}, user_type_id={user_type_id}"
+    )
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start には end 以前の日付を指定してください。"
+        )
+    if format in COLUMNAR_FORMATS and not is_columnar_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"{format} 形式の出力には pyarrow のインストールが必要です。"
+        )
+
+    batches = iter_export_batches(
+        db, start_date=start, end_date=end, group_id=group_id, user_type_id=user_type_id
+    )
+    if format == "parquet":
+        content = iter_parquet_bytes(batches)
+    elif format == "arrow":
+        content = iter_arrow_ipc_bytes(batches)
+    else:
+        content = iter_long_csv_bytes(batches, encoding)
+
+    media_type, extension = EXPORT_FORMATS[format]
+    if format == "csv" and encoding == "sjis":
+        media_type = "text/csv; charset=shift_jis"
+    filename = f"attendances_{start:%Y%m%d}_{end:%Y%m%d}.{extension}"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=\"{filename}\""},
+    )
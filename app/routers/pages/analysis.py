@@ -5,28 +5,76 @@
 勤怠集計に関連するルートハンドラー
 """
 
+from datetime import date
 from typing import Any, Optional, Dict, List, Tuple
 from fastapi import APIRouter, Depends, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from fastapi.responses import HTMLResponse, JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import logger
 from app.crud.attendance import attendance
-from app.db.session import get_db
+from app.crud.cache_generation import GLOBAL_SCOPE, cache_generation, month_scope
+from app.db.session import get_async_db
+from app.utils.etag_utils import build_etag, etag_headers, etag_matches, not_modified_response
+from app.utils.templates import templates
 
 # ルーター定義
 router = APIRouter(prefix="/analysis", tags=["Pages"])
-templates = Jinja2Templates(directory="app/templates")
+
+
+def _fiscal_year_months(fiscal_year: int) -> List[Tuple[int, int]]:
+    """4月開始の年度に含まれる (年, 月) を返す"""
+    return [(fiscal_year + (1 if m < 4 else 0), m) for m in (*range(4, 13), *range(1, 4))]
+
+
+def _location_counts_by_location(users: Dict[str, Dict[str, Any]]) -> Dict[int, Dict[str, int]]:
+    """ユーザー別の勤怠種別日数を、画面の合算表示用に勤怠種別ID -> {ユーザーID: 日数} へ組み替える"""
+    counts: Dict[int, Dict[str, int]] = {}
+    for user_id, user_info in users.items():
+        for location_id, days in user_info["location_counts"].items():
+            if days:
+                counts.setdefault(location_id, {})[str(user_id)] = days
+    return counts
+
+
+@router.get("/dates")
+async def get_analysis_user_dates(
+    request: Request,
+    user_id: str,
+    year: int,
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """年度集計で展開した1ユーザー分の勤怠日付一覧を返します
+
+    Args:
+        request: FastAPIリクエストオブジェクト
+        user_id: 対象のユーザーID
+        year: 対象年度（4月開始）
+        db: 非同期データベースセッション
+
+    Returns:
+        JSONResponse: 勤怠種別IDをキーとする日付一覧
+    """
+    generations = await cache_generation.get_generations_async(
+        db, [GLOBAL_SCOPE, *(month_scope(y, m) for y, m in _fiscal_year_months(year))]
+    )
+    etag = build_etag(request, sorted(generations.items()))
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+
+    dates = await attendance.get_user_location_dates_async(
+        db, user_id=user_id, start_date=date(year, 4, 1), end_date=date(year + 1, 3, 31)
+    )
+    return JSONResponse({"dates": dates}, headers=etag_headers(etag))
 
 
 @router.get("", response_class=HTMLResponse)
-def get_analysis_page(
+async def get_analysis_page(
     request: Request,
     month: Optional[str] = None,
     year: Optional[int] = None,
     detail_location_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Any:
     """勤怠集計ページを表示します
 
@@ -35,7 +83,7 @@ def get_analysis_page(
         month: 月（YYYY-MM形式、指定がない場合は現在の月）
         year: 年（指定がある場合は年ベースの集計表示）
         detail_location_id: 詳細表示する勤怠種別ID（従来の詳細表示用、現在は使用されない）
-        db: データベースセッション
+        db: 非同期データベースセッション
 
     Returns:
         HTMLResponse: レンダリングされた勤怠集計HTML
@@ -53,13 +101,28 @@ def get_analysis_page(
         is_year_mode = year is not None or mode_param == "year"
         target_fiscal_year = year if year is not None else fiscal_default
 
+        # 集計対象の月 (年度集計は4月〜翌3月)
         if is_year_mode:
-            analysis_data = attendance.get_attendance_analysis_data(
-                db, fiscal_year=target_fiscal_year
-            )
+            target_months = _fiscal_year_months(target_fiscal_year)
         else:
             month_value = month or f"{current_date.year}-{current_date.month:02d}"
-            analysis_data = attendance.get_attendance_analysis_data(db, month=month_value)
+            target_months = [tuple(map(int, month_value.split("-")))]
+
+        # 対象月の世代が前回の取得から変わっていなければ、集計と描画を省いて 304 を返す
+        generations = await cache_generation.get_generations_async(
+            db, [GLOBAL_SCOPE, *(month_scope(y, m) for y, m in target_months)]
+        )
+        etag = build_etag(request, sorted(generations.items()))
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+
+        if is_year_mode:
+            # 年度の日数は月次集計テーブルから求め、日付一覧は行の展開時に /analysis/dates で取得する
+            analysis_data = await attendance.get_attendance_analysis_data_async(
+                db, fiscal_year=target_fiscal_year, include_dates=False
+            )
+        else:
+            analysis_data = await attendance.get_attendance_analysis_data_async(db, month=month_value)
 
         # ナビゲーション用に前月・次月を計算（月次モードのみ）
         prev_month = next_month = None
@@ -79,8 +142,8 @@ def get_analysis_page(
         from app.crud.group import group as group_crud
         from app.crud.user_type import user_type as user_type_crud
 
-        groups = group_crud.get_multi(db)
-        user_types = user_type_crud.get_multi(db)
+        groups = await db.run_sync(group_crud.get_multi)
+        user_types = await db.run_sync(user_type_crud.get_multi)
 
         group_sort_info: Dict[str, Tuple[int, int]] = {}
         for group in groups:
@@ -148,10 +211,11 @@ def get_analysis_page(
             "sorted_group_names": sorted_group_names,
             "group_user_types": group_user_types,
             "location_details": analysis_data.get("location_details", {}),
+            "location_counts": _location_counts_by_location(analysis_data["users"]),
             "group_summary": analysis_data.get("group_summary", {}),
         }
 
-        return templates.TemplateResponse("pages/analysis.html", context)
+        return templates.TemplateResponse("pages/analysis.html", context, headers=etag_headers(etag))
 
     except Exception as e:
         logger.error(f"勤怠集計ページ表示中にエラーが発生しました: {str(e)}", exc_info=True)
@@ -188,6 +252,7 @@ def get_analysis_page(
             "sorted_group_names": [],
             "group_user_types": {},
             "location_details": {},
+            "location_counts": {},
             "group_summary": {},
         }
         return templates.TemplateResponse("pages/analysis.html", error_context) 
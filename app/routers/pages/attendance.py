@@ -7,13 +7,12 @@
 
 import logging
 from typing import Any, Dict, List, Optional
-from datetime import date
+from datetime import date, timedelta
 import operator
 import json
 
 from fastapi import APIRouter, Depends, Request, status
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
 from app.crud.attendance import attendance
@@ -26,11 +25,12 @@ from app.db.session import get_db
 from app.models.location import Location
 from app.models.attendance import Attendance as AttendanceModel
 from app.utils.calendar_utils import build_week_calendar_data, parse_week, get_current_week_formatted, format_date_jp
+from app.utils.holiday_cache import sync_holiday_cache
 from app.utils.ui_utils import get_location_color_classes
+from app.utils.templates import templates
 
 # ルーター定義
 router = APIRouter(prefix="/attendance", tags=["Pages"])
-templates = Jinja2Templates(directory="app/templates")
 
 # ロガー定義
 logger = logging.getLogger(__name__)
@@ -69,6 +69,9 @@ def attendance_page(
             current_week = get_current_week_formatted()
             return RedirectResponse(url=f"/attendance/weekly?week={current_week}")
 
+    # 他ワーカーで追加・削除されたカスタム祝日を反映する
+    sync_holiday_cache(db)
+
     # DBからカレンダー構築に必要なデータを取得
     try:
         monday = parse_week(week)
@@ -115,26 +118,26 @@ def attendance_page(
             # さらにエラーなら空データを設定
             calendar_data = {"weeks": [], "week_name": "エラー", "prev_week": week, "next_week": week}
 
-    # 全ユーザー情報を取得します。
-    all_users = user.get_all_users(db)
+    # 全ユーザー (グループ・社員種別を読み込み済み) と表示週の勤怠データをまとめて取得します。
+    # ユーザーごとの問い合わせや全期間の勤怠の読み込みを行わないため、
+    # 取得件数は表示するセルの数に比例します。
+    monday = parse_week(week)
+    users_with_entries = attendance.get_users_with_attendance(
+        db, start_date=monday, end_date=monday + timedelta(days=6)
+    )
 
     # 検索クエリが指定されている場合、ユーザーをフィルタリングします。
     if search_query and search_query.strip():
         search_term = search_query.lower().strip()
-        filtered_users = [
-            (user_name, user_id, user_type_id) for user_name, user_id, user_type_id in all_users
-            if search_term in user_name.lower() or search_term in user_id.lower()
+        users_with_entries = [
+            (user_obj, entries) for user_obj, entries in users_with_entries
+            if search_term in str(user_obj.username).lower() or search_term in str(user_obj.id).lower()
         ]
-        base_users = filtered_users
-    else:
-        base_users = all_users
 
-    # フィルタリング後のユーザーリストに、完全なUserオブジェクトを追加します。
-    users = []
-    for user_name, user_id, user_type_id in base_users:
-        user_obj = user.get(db, id=user_id)
-        if user_obj:
-            users.append((user_name, user_id, user_type_id, user_obj))
+    users = [
+        (str(user_obj.username), str(user_obj.id), int(user_obj.user_type_id), user_obj)
+        for user_obj, _ in users_with_entries
+    ]
 
     # グループ情報をIDをキーとする辞書として取得します。
     groups = group.get_multi(db)
@@ -208,12 +211,12 @@ def attendance_page(
     # JavaScript用に Location ID と Name のマッピングを作成
     location_data_for_js = {loc.id: str(loc.name) for loc in location_objects}
 
-    # 各ユーザーの勤怠データを日付をキーとして取得・整形します。
+    # 各ユーザーの勤怠データを日付をキーとして整形します。
     user_attendances = {}
     user_attendance_locations = {}
     user_attendance_notes = {}  # 備考データを追加
-    for user_name, user_id, user_type_id, user_obj in users:
-        user_entries = attendance.get_user_data(db, user_id=user_id)
+    for user_obj, user_entries in users_with_entries:
+        user_id = str(user_obj.id)
 
         user_dates = {} # 特定の日に勤怠データが存在するか (True/False)
         locations_map = {} # 特定の日の勤怠種別名
@@ -4,7 +4,6 @@ import urllib.parse
 
 from fastapi import APIRouter, Depends, Form, HTTPException, Request, status
 from fastapi.responses import HTMLResponse, RedirectResponse, Response
-from fastapi.templating import Jinja2Templates
 
 from app.services.auth.dependencies import (
     get_auth_settings,
@@ -12,11 +11,11 @@ from app.services.auth.dependencies import (
     get_optional_oidc_client,
 )
 from app.services.auth.oidc import OIDCClient, OIDCError
-from app.services.auth.settings import AuthSettings
+from app.services.auth.settings import AuthSettings, auth_settings_provider
 from app.services.auth.state import AuthState, AuthStateStore
+from app.utils.templates import templates
 
 router = APIRouter(prefix="/auth", tags=["Auth"], include_in_schema=False)
-templates = Jinja2Templates(directory="app/templates")
 logger = logging.getLogger(__name__)
 
 
@@ -113,7 +112,7 @@ async def oidc_redirect(
     request.session["oidc_nonce"] = nonce
     request.session["auth_next"] = _safe_next_path(next)
     try:
-        redirect_url = oidc_client.build_authorization_url(state=state, nonce=nonce)
+        redirect_url = await oidc_client.build_authorization_url(state=state, nonce=nonce)
     except Exception as exc:  # noqa: BLE001
         logger.exception("Failed to build authorization URL: %s", exc)
         raise HTTPException(
@@ -140,7 +139,7 @@ async def oidc_callback(
         )
 
     try:
-        result = oidc_client.exchange_code(
+        result = await oidc_client.exchange_code(
             code=code,
             state=state,
             nonce=nonce or "",
@@ -211,7 +210,7 @@ async def logout(
     if auth_session and auth_session.get("method") == "oidc" and id_token and oidc_client:
         try:
             post_logout_redirect = f"{request.url_for('login_page')}?reason=logout"
-            logout_url = oidc_client.get_logout_url(
+            logout_url = await oidc_client.get_logout_url(
                 id_token_hint=id_token,
                 post_logout_redirect_uri=post_logout_redirect,
             )
@@ -248,5 +247,7 @@ async def toggle_oidc(
 ) -> Response:
     _require_local_admin(request)
     state_store.save_state(AuthState(oidc_enabled=enabled))
+    # 更新日時の粒度によらず、このワーカーでは次のリクエストから確実に反映する
+    auth_settings_provider.invalidate()
     request.session["auth_info"] = "OIDC 設定を更新しました。"
     return RedirectResponse(url="/auth/settings", status_code=303)
@@ -5,24 +5,23 @@
 カレンダー表示に関連するルートハンドラー
 """
 
-import time
 from typing import Any, Dict, List, Optional
 from datetime import date
 import calendar
 
 from fastapi import APIRouter, Depends, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import logger
+from app.core import calendar_cache
+from app.core.change_bus import change_bus
+from app.core.config import CHANGE_STREAM_MAX_CLIENTS, logger
 from app.crud.attendance import attendance
+from app.crud.cache_generation import cache_generation
 from app.crud.group import group
 from app.crud.location import location as location_crud
 from app.crud.calendar import calendar_crud
-from app.crud.user import user
-from app.crud.user_type import user_type
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.utils.calendar_utils import (
     build_calendar_data,
     get_current_month_formatted,
@@ -31,31 +30,33 @@ from app.utils.calendar_utils import (
     format_date_jp,
     parse_date
 )
+from app.utils.etag_utils import build_etag, etag_headers, etag_matches, not_modified_response
+from app.utils.holiday_cache import sync_holiday_cache
 from app.utils.ui_utils import (
     get_location_color_classes,
 )
 from app.models.location import Location
+from app.utils.templates import templates
+from app.services.change_stream_service import (
+    SSE_MEDIA_TYPE,
+    format_month_token,
+    iter_calendar_events,
+)
 
 # ルーター定義
 router = APIRouter(prefix="/calendar", tags=["Pages"])
-templates = Jinja2Templates(directory="app/templates")
-
-# カレンダーデータのキャッシュ（パフォーマンス最適化）
-_calendar_cache: Dict[str, Dict[str, Any]] = {}
-_calendar_cache_ttl = 60  # キャッシュの有効期間（秒）
-_calendar_cache_timestamp: Dict[str, float] = {}
 
 
 @router.get("", response_class=HTMLResponse)
-def get_calendar(
-    request: Request, month: Optional[str] = None, db: Session = Depends(get_db)
+async def get_calendar(
+    request: Request, month: Optional[str] = None, db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """指定された月のカレンダーを表示します
 
     Args:
         request: FastAPIリクエストオブジェクト
         month: 月（YYYY-MM形式、指定がない場合は現在の月）
-        db: データベースセッション
+        db: 非同期データベースセッション
 
     Returns:
         HTMLResponse: レンダリングされたカレンダーHTML
@@ -63,11 +64,27 @@ def get_calendar(
     if month is None:
         month = get_current_month_formatted()
 
-    # キャッシュチェック（パフォーマンス最適化）
-    current_time = time.time()
-    # キャッシュされたデータ構造にはDBから取得したデータも含まれるようにする必要がある
-    cached_data = _calendar_cache.get(month)
-    if cached_data and current_time - _calendar_cache_timestamp.get(month, 0) < _calendar_cache_ttl:
+    # HTMXリクエストの場合、innerHTMLで入れ替えるようにヘッダーを追加
+    headers = {"HX-Reswap": "innerHTML"} if request.headers.get("HX-Request") == "true" else {}
+
+    # キャッシュチェック（他ワーカーでの書き込みも世代の比較で検出される）
+    generation = None
+    etag = None
+    try:
+        cache_year, cache_month = parse_month(month)
+        generation = await cache_generation.get_month_token_async(db, cache_year, cache_month)
+    except ValueError:
+        cached_data = None
+    else:
+        # 前回の取得から月の世代が変わっていなければ、描画せずに 304 を返す
+        etag = build_etag(request, generation)
+        if etag_matches(request, etag):
+            return not_modified_response(etag, headers)
+        cached_data = calendar_cache.get_month_data(cache_year, cache_month, generation)
+
+    # 他ワーカーで追加・削除されたカスタム祝日を反映する
+    await db.run_sync(sync_holiday_cache)
+    if cached_data:
         calendar_data = cached_data
     else:
         # DBからデータを取得
@@ -76,11 +93,15 @@ def get_calendar(
             first_day = date(year, month_num, 1)
             last_day = date(year, month_num, calendar.monthrange(year, month_num)[1])
 
-            attendances = calendar_crud.get_month_attendances(db, first_day=first_day, last_day=last_day)
-            attendance_counts = calendar_crud.get_month_attendance_counts(db, first_day=first_day, last_day=last_day)
+            attendances = await calendar_crud.get_month_attendances_async(
+                db, first_day=first_day, last_day=last_day
+            )
+            attendance_counts = await calendar_crud.get_month_attendance_counts_async(
+                db, first_day=first_day, last_day=last_day
+            )
             
             # Location オブジェクトを取得 (IDを含む)
-            location_objects_unsorted: List[Location] = location_crud.get_multi(db)
+            location_objects_unsorted: List[Location] = await db.run_sync(location_crud.get_multi)
             location_objects = sorted(location_objects_unsorted, key=lambda loc: int(loc.id))
             location_names = [str(loc.name) for loc in location_objects]
 
@@ -119,10 +140,9 @@ def get_calendar(
                 updated_locations.append(loc_data)
             calendar_data["locations"] = updated_locations
 
-            # 取得した元データもキャッシュに含めるか、または build_calendar_data の結果だけをキャッシュするかは要検討
-            # ここでは加工後の calendar_data をキャッシュする
-            _calendar_cache[month] = calendar_data
-            _calendar_cache_timestamp[month] = current_time
+            # 加工後の calendar_data をキャッシュする (エラー時の空データは登録しない)
+            if calendar_data.get("weeks"):
+                calendar_cache.set_month_data(year, month_num, calendar_data, generation)
         except ValueError as e:
             logger.error(f"月解析エラー ({month}): {e}")
             calendar_data = None # エラー発生
@@ -132,6 +152,7 @@ def get_calendar(
 
     # カレンダーデータの取得に失敗した場合、現在の月にフォールバックします。
     if not calendar_data or "weeks" not in calendar_data:
+        etag = None  # エラー表示は再検証の対象にしない
         logger.error(f"カレンダーデータの取得または生成に失敗: {month}")
         # エラー時は空のカレンダー情報を設定
         calendar_data = {
@@ -157,10 +178,12 @@ def get_calendar(
         "request": request,
         "month": calendar_data["month_name"],
         "calendar": calendar_data,
-        "today_date": today_date  # テンプレートに今日の日付を渡す
+        "today_date": today_date,  # テンプレートに今日の日付を渡す
+        # ライブ更新の接続時に、描画後の変更を検出するための月の世代
+        "stream_token": format_month_token(generation) if generation else "",
     }
-    # HTMXリクエストの場合、innerHTMLで入れ替えるようにヘッダーを追加
-    headers = {"HX-Reswap": "innerHTML"} if request.headers.get("HX-Request") == "true" else {}
+    if etag:
+        headers.update(etag_headers(etag))
     logger.debug(f"Returning template with headers: {headers}")
     return templates.TemplateResponse(
         "components/top/summary_calendar.html", 
@@ -169,38 +192,91 @@ def get_calendar(
     )
 
 
+@router.get("/stream")
+async def stream_calendar_changes(
+    request: Request,
+    month: Optional[str] = None,
+    since: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """表示中の月の勤怠変更を Server-Sent Events で配信します
+
+    勤怠が変わった日の勤怠種別ごとの件数 (`counts`) と、月全体の再取得が必要なこと
+    (`invalidate`) を通知します。
+
+    Args:
+        request: リクエスト (再接続時の Last-Event-ID を参照)
+        month: 月（YYYY-MM形式、指定がない場合は現在の月）
+        since: 表示中のカレンダーを描画した時点の月の世代トークン
+        db: 非同期データベースセッション (件数の取得時だけ接続を使用)
+
+    Returns:
+        StreamingResponse: text/event-stream のレスポンス
+    """
+    if month is None:
+        month = get_current_month_formatted()
+    try:
+        year, month_num = parse_month(month)
+    except ValueError:
+        return PlainTextResponse("月の形式が無効です。", status_code=400)
+
+    if change_bus.subscriber_count >= CHANGE_STREAM_MAX_CLIENTS:
+        logger.warning("ライブ更新の同時接続数が上限に達しています")
+        return PlainTextResponse(
+            "ライブ更新の接続数が上限に達しています。", status_code=503, headers={"Retry-After": "30"}
+        )
+
+    return StreamingResponse(
+        iter_calendar_events(
+            db,
+            year=year,
+            month=month_num,
+            # 再接続時はブラウザが最後に受け取ったイベントの id を送ってくる
+            last_event_id=request.headers.get("last-event-id") or since,
+        ),
+        media_type=SSE_MEDIA_TYPE,
+        # プロキシでのバッファリングを止め、通知を即時に届ける
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/day/{day}", response_class=HTMLResponse)
-def get_day_detail(
-    request: Request, day: str, db: Session = Depends(get_db)
+async def get_day_detail(
+    request: Request, day: str, db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """指定された日の詳細を表示します
 
     Args:
         request: FastAPIリクエストオブジェクト
         day: 日付（YYYY-MM-DD形式）
-        db: データベースセッション
+        db: 非同期データベースセッション
 
     Returns:
         HTMLResponse: レンダリングされた日別詳細HTML
     """
-    detail = attendance.get_day_data(db, day=day)
+    # 前回の取得からその日の世代が変わっていなければ、描画せずに 304 を返す
+    etag = None
+    target_date = parse_date(day)
+    if target_date is not None:
+        day_token = await cache_generation.get_day_token_async(db, target_date)
+        etag = build_etag(request, day_token)
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+
+    detail = await attendance.get_day_data_async(db, day=day)
 
     # attendance.get_day_data から返されるデータを attendance_data として使用します。
     attendance_data = detail
 
-    # グループ情報をIDをキーとする辞書として取得します。
-    groups = group.get_multi(db)
-    groups_map = {g.id: g for g in groups}
-    
+    # グループ情報を取得します (並び順の決定に使用)。
+    # マスタ類は件数が少ないため、同期版の CRUD を run_sync 経由で再利用します。
+    groups = await db.run_sync(group.get_multi)
+
     # グループのorder情報を保存する辞書
     group_orders = {g.id: (g.order if g.order is not None else float('inf')) for g in groups}
 
-    # ユーザータイプ情報をIDをキーとする辞書として取得します。
-    user_types = user_type.get_multi(db)
-    user_types_map = {ut.id: ut for ut in user_types}
-
     # 全勤怠種別オブジェクトを取得します。
-    location_objects_unsorted: List[Location] = location_crud.get_multi(db)
+    location_objects_unsorted: List[Location] = await db.run_sync(location_crud.get_multi)
     location_objects = sorted(location_objects_unsorted, key=lambda loc: int(loc.id))
 
     # 勤怠種別IDに対応するUIカラークラス情報を生成します。
@@ -218,97 +294,72 @@ def get_day_detail(
             "bg_class": color_info.get("bg_class", "")
         })
 
-    # UI表示用に、勤怠種別ごとにユーザーをグルーピングします。
-    organized_data: Dict[str, Dict[str, Any]] = {}
-    for location_name, users_list in attendance_data.items():
-        # 各勤怠種別内で、ユーザーを所属グループごとに整理します。
-        grouped_users: Dict[str, List] = {}
-        for user_data in users_list:
-            user_obj = user.get(db, id=user_data["user_id"])
-            if not user_obj:
-                continue
-
-            group_obj = groups_map.get(user_obj.group_id)
-            group_name = str(group_obj.name) if group_obj else "未分類"
-
-            user_data["group_id"] = str(user_obj.group_id)
-            user_data["group_name"] = group_name
-
-            if group_name not in grouped_users:
-                grouped_users[group_name] = []
-
-            grouped_users[group_name].append(user_data)
-
-        # 各グループ内のユーザーリストを社員種別IDでソートします。
-        for g_name in list(grouped_users.keys()):
-            grouped_users[g_name].sort(key=lambda u: u.get("user_type_id", 999))
-
-        # 整理したデータを勤怠種別名をキーとして格納します。
-        organized_data[location_name] = {
-            "groups": grouped_users,
-            "group_names": sorted(list(grouped_users.keys())) # グループ名をソートして格納
-        }
-
-    # さらに、グループを主キーとしてユーザーを整理するデータ構造も作成します。
-    organized_by_group: Dict[str, Dict[str, Any]] = {}
     # グループをorder順でソート
     sorted_groups = sorted(groups, key=lambda g: (group_orders.get(g.id, float('inf')), g.id or 9999))
     sorted_group_names = [str(g.name) for g in sorted_groups]
 
-    # ユーザー種別IDとorderのマッピング (ソート用)
-    user_type_id_mapping = {}
-    user_type_info_mapping = {}  # 社員種別名 -> (order, id) のマッピング
+    # 社員種別名 -> (order, id, 名前) のマッピング (ソート用)
+    user_type_info_mapping = {}
 
-    # 全勤怠データを再度ループし、グループ主キーのデータ構造を構築します。
+    # get_day_data がユーザー・グループ・社員種別を結合済みで返すため、ユーザーごとの追加クエリは行わず、
+    # 勤怠種別主キー (organized_data) とグループ主キー (organized_by_group) の両方を1回の走査で構築します。
+    organized_data: Dict[str, Dict[str, Any]] = {}
+    organized_by_group: Dict[str, Dict[str, Any]] = {}
     for location_name, users_list in attendance_data.items():
-        # 対応する Location オブジェクトを探す
-        matched_loc = next((loc for loc in location_objects if str(loc.name) == location_name), None)
-        location_id = int(matched_loc.id) if matched_loc else None
-        color_info = get_location_color_classes(location_id)
+        location_id = users_list[0]["location_id"]
+        color_info = location_color_map.get(location_id) or get_location_color_classes(location_id)
         location_text_class = color_info.get("text_class", "")
         location_bg_class = color_info.get("bg_class", "")
 
+        # 各勤怠種別内で、ユーザーを所属グループごとに整理します。
+        grouped_users: Dict[str, List] = {}
         for user_data in users_list:
-            # ユーザーデータに必要な情報を追加します。
-            user_data["location_name"] = location_name
-            user_data["location_text_class"] = location_text_class # テキストクラスを追加
-            user_data["location_bg_class"] = location_bg_class   # 背景クラスを追加
-
-            user_obj = user.get(db, id=user_data["user_id"])
-            if not user_obj:
-                continue
-
-            group_obj = groups_map.get(user_obj.group_id)
-            group_name = str(group_obj.name) if group_obj else "未分類"
+            group_id = user_data.get("group_id")
+            group_name = user_data.get("group_name") or "未分類"
+
+            # キャッシュ上の辞書を書き換えないよう、表示用の項目を加えた複製を使用します。
+            entry = {
+                **user_data,
+                "group_id": str(group_id),
+                "group_name": group_name,
+                "location_name": location_name,
+                "location_text_class": location_text_class,  # テキストクラスを追加
+                "location_bg_class": location_bg_class,  # 背景クラスを追加
+            }
+            grouped_users.setdefault(group_name, []).append(entry)
 
-            # 社員種別情報を取得し、ソート用のIDマッピングも更新します。
+            # 社員種別情報を取得し、ソート用のマッピングも更新します。
             user_type_name = "未分類"
-            user_type_id = 9999
-            user_type_order = 9999
-            if user_obj.user_type_id in user_types_map:
-                user_type_obj = user_types_map[user_obj.user_type_id]
-                user_type_name = str(user_type_obj.name)
-                user_type_id = int(user_type_obj.id)
-                user_type_order = int(user_type_obj.order) if user_type_obj.order is not None else 9999
-                user_type_id_mapping[user_type_name] = user_type_id
-                user_type_info_mapping[user_type_name] = (user_type_order, user_type_id, user_type_name)
+            if user_data.get("user_type_name"):
+                user_type_name = str(user_data["user_type_name"])
+                user_type_order = user_data.get("user_type_order")
+                user_type_info_mapping[user_type_name] = (
+                    int(user_type_order) if user_type_order is not None else 9999,
+                    int(user_data["user_type_id"]),
+                    user_type_name,
+                )
 
             # グループキーの辞書が存在しない場合は初期化します。
             if group_name not in organized_by_group:
                 organized_by_group[group_name] = {
                     "user_types": set(), # このグループに含まれる社員種別名のセット
                     "user_types_data": {}, # 社員種別名をキーとするユーザーリストの辞書
-                    "group_id": int(user_obj.group_id) if user_obj.group_id is not None else 9999,
-                    "group_order": group_orders.get(user_obj.group_id, float('inf')) # groupのorder情報を追加
+                    "group_id": int(group_id) if group_id is not None else 9999,
+                    "group_order": group_orders.get(group_id, float('inf')) # groupのorder情報を追加
                 }
 
             organized_by_group[group_name]["user_types"].add(user_type_name)
+            organized_by_group[group_name]["user_types_data"].setdefault(user_type_name, []).append(entry)
 
-            # 社員種別キーのリストが存在しない場合は初期化します。
-            if user_type_name not in organized_by_group[group_name]["user_types_data"]:
-                organized_by_group[group_name]["user_types_data"][user_type_name] = []
+        # 各グループ内のユーザーリストを社員種別IDでソートします。
+        for g_name in list(grouped_users.keys()):
+            grouped_users[g_name].sort(key=lambda u: u.get("user_type_id") or 999)
 
-            organized_by_group[group_name]["user_types_data"][user_type_name].append(user_data)
+        # 整理したデータを勤怠種別名をキーとして格納します。
+        organized_data[location_name] = {
+            "groups": grouped_users,
+            "group_names": sorted(list(grouped_users.keys())) # グループ名をソートして格納
+        }
 
     # 各グループ内の社員種別リストを、社員種別のorder、次にIDに基づいてソートします。
     for group_name in organized_by_group:
@@ -351,5 +402,6 @@ def get_day_detail(
     }
 
     return templates.TemplateResponse(
-        "components/top/day_detail.html", context
+        "components/top/day_detail.html", context,
+        headers=etag_headers(etag) if etag else None
     ) 
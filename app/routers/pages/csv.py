@@ -9,13 +9,12 @@ from typing import Any
 
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 
 from app.utils.csv_utils import get_available_months
+from app.utils.templates import templates
 
 # ルーター定義
 router = APIRouter(prefix="/csv", tags=["Pages"])
-templates = Jinja2Templates(directory="app/templates")
 
 @router.get("", response_class=HTMLResponse)
 def csv_page(request: Request) -> Any:
@@ -10,17 +10,16 @@ import json
 
 from fastapi import APIRouter, Depends, Request, HTTPException, status
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
 from app.crud.group import group
 from app.db.session import get_db
 from app import schemas # スキーマをインポート
 from app.services import group_service # group_service をインポート
+from app.utils.templates import templates
 
 # ルーター定義
 router = APIRouter(prefix="/groups", tags=["Pages"])
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("", response_class=HTMLResponse)
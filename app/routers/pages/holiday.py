@@ -7,7 +7,6 @@ from typing import Any, Optional
 
 from fastapi import APIRouter, Depends, Request, HTTPException, status
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
 from app import schemas
@@ -15,9 +14,9 @@ from app.crud import custom_holiday as crud_custom_holiday
 from app.db.session import get_db
 from app.services import custom_holiday_service
 from app.utils.holiday_cache import get_cache_info
+from app.utils.templates import templates
 
 router = APIRouter(prefix="/holidays", tags=["Pages"])
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("", response_class=HTMLResponse)
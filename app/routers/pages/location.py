@@ -11,17 +11,16 @@ from collections import defaultdict
 
 from fastapi import APIRouter, Depends, Request, HTTPException, status
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
 from app.crud.location import location
 from app.db.session import get_db
 from app import schemas # スキーマをインポート
 from app.services import location_service # location_service をインポート
+from app.utils.templates import templates
 
 # ルーター定義
 router = APIRouter(prefix="/locations", tags=["Pages"])
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("", response_class=HTMLResponse)
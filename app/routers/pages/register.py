@@ -13,23 +13,25 @@ import operator
 
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
 from app.crud.attendance import attendance
 from app.crud.group import group
 from app.crud.location import location as location_crud
+from app.crud.cache_generation import cache_generation
 from app.crud.calendar import calendar_crud
 from app.crud.user import user
 from app.crud.user_type import user_type
 from app.db.session import get_db
 from app.models.location import Location
 from app.utils.calendar_utils import build_calendar_data, parse_month, get_current_month_formatted
+from app.utils.etag_utils import build_etag, etag_headers, etag_matches, not_modified_response
+from app.utils.holiday_cache import sync_holiday_cache
 from app.utils.ui_utils import get_location_color_classes
+from app.utils.templates import templates
 
 # ルーター定義
 router = APIRouter(prefix="/attendance/monthly", tags=["Pages"])
-templates = Jinja2Templates(directory="app/templates")
 
 # ロガー定義
 logger = logging.getLogger(__name__)
@@ -68,6 +70,9 @@ def register_page(
             current_month = get_current_month_formatted()
             return RedirectResponse(url=f"/attendance/monthly?month={current_month}")
 
+    # 他ワーカーで追加・削除されたカスタム祝日を反映する
+    sync_holiday_cache(db)
+
     # DBからカレンダー構築に必要なデータを取得
     try:
         year, month_num = parse_month(month)
@@ -118,26 +123,24 @@ def register_page(
             # さらにエラーなら空データを設定
             calendar_data = {"weeks": [], "month_name": "エラー", "prev_month": month, "next_month": month}
 
-    # 全ユーザー情報を取得します。
-    all_users = user.get_all_users(db)
+    # 全ユーザーをグループ・社員種別を読み込み済みの状態で1回のクエリで取得します。
+    # (ユーザーの勤怠はカレンダー展開時に表示月の分だけ取得します)
+    all_users = user.get_all_with_relations(db)
 
     # 検索クエリが指定されている場合、ユーザーをフィルタリングします。
     if search_query and search_query.strip():
         search_term = search_query.lower().strip()
-        filtered_users = [
-            (user_name, user_id, user_type_id) for user_name, user_id, user_type_id in all_users
-            if search_term in user_name.lower() or search_term in user_id.lower()
+        base_users = [
+            user_obj for user_obj in all_users
+            if search_term in str(user_obj.username).lower() or search_term in str(user_obj.id).lower()
         ]
-        base_users = filtered_users
     else:
         base_users = all_users
 
-    # フィルタリング後のユーザーリストに、完全なUserオブジェクトを追加します。
-    users = []
-    for user_name, user_id, user_type_id in base_users:
-        user_obj = user.get(db, id=user_id)
-        if user_obj:
-            users.append((user_name, user_id, user_type_id, user_obj))
+    users = [
+        (str(user_obj.username), str(user_obj.id), int(user_obj.user_type_id), user_obj)
+        for user_obj in base_users
+    ]
 
     # グループ情報をIDをキーとする辞書として取得します。
     groups = group.get_multi(db)
@@ -284,6 +287,19 @@ def user_calendar(
         logger.error(f"ユーザーが見つかりません: {user_id}")
         return HTMLResponse(content="ユーザーが見つかりません。", status_code=404)
 
+    # HTMXリクエストの場合、カレンダー部分のみを入れ替える
+    headers = {"HX-Reswap": "outerHTML"} if request.headers.get("HX-Request") == "true" else {}
+
+    # 前回の取得から月の世代が変わっていなければ、描画せずに 304 を返す
+    # (ユーザー情報やマスタの変更は全体の世代に反映される)
+    year, month_num = parse_month(month)
+    etag: Optional[str] = build_etag(request, cache_generation.get_month_token(db, year, month_num))
+    if etag_matches(request, etag):
+        return not_modified_response(etag, headers)
+
+    # 他ワーカーで追加・削除されたカスタム祝日を反映する
+    sync_holiday_cache(db)
+
     # カレンダーデータの構築
     try:
         year, month_num = parse_month(month)
@@ -304,9 +320,15 @@ def user_calendar(
     except Exception:
         logger.exception(f"カレンダーデータの構築に失敗: {month}")
         calendar_data = {"weeks": [], "month_name": "エラー", "prev_month": month, "next_month": month}
-
-    # ユーザーの勤怠データを取得
-    user_entries = attendance.get_user_data(db, user_id=user_id)
+        etag = None  # エラー表示は再検証の対象にしない
+
+    # ユーザーの勤怠データを表示月の分だけ取得
+    user_entries = attendance.get_period_entries(
+        db,
+        start_date=date(year, month_num, 1),
+        end_date=date(year, month_num, calendar.monthrange(year, month_num)[1]),
+        user_ids=[user_id],
+    ).get(user_id, [])
     user_attendances = {}
     
     for entry in user_entries:
@@ -337,14 +359,11 @@ def user_calendar(
         "location_objects": location_objects,
     }
 
-    # HTMXリクエストの場合、カレンダー部分のみを返す
-    if request.headers.get("HX-Request") == "true":
-        return templates.TemplateResponse(
-            "components/partials/register/user_calendar.html", context,
-            headers={"HX-Reswap": "outerHTML"}
-        )
+    if etag:
+        headers.update(etag_headers(etag))
 
-    # 通常リクエストの場合も同じテンプレートを使用
+    # HTMXリクエスト・通常リクエストとも同じ部分テンプレートを使用
     return templates.TemplateResponse(
-        "components/partials/register/user_calendar.html", context
+        "components/partials/register/user_calendar.html", context,
+        headers=headers
     ) 
@@ -9,13 +9,12 @@ import logging
 
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse, Response
-from fastapi.templating import Jinja2Templates
 
 from app.utils.calendar_utils import get_today_formatted
+from app.utils.templates import templates
 
 # ページ表示用ルーター
 router = APIRouter(prefix="", tags=["Pages"])
-templates = Jinja2Templates(directory="app/templates")
 
 logger = logging.getLogger(__name__)
 
@@ -10,7 +10,6 @@ import json
 
 from fastapi import APIRouter, Depends, Request, HTTPException, status
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
 from app.crud.group import group
@@ -20,10 +19,10 @@ from app.db.session import get_db
 from app import schemas # スキーマをインポート
 from app.services import user_service # user_service を直接インポート
 from app.models.user import User # User モデルをインポート
+from app.utils.templates import templates
 
 # ルーター定義
 router = APIRouter(prefix="/users", tags=["Pages"])
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("", response_class=HTMLResponse)
@@ -10,17 +10,16 @@ import json
 
 from fastapi import APIRouter, Depends, Request, HTTPException, status
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
 from app.crud.user_type import user_type
 from app.db.session import get_db
 from app import schemas # スキーマをインポート
 from app.services import user_type_service # user_type_service をインポート
+from app.utils.templates import templates
 
 # ルーター定義
 router = APIRouter(prefix="/user-types", tags=["Pages"])
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("", response_class=HTMLResponse)
@@ -11,11 +11,17 @@ from .attendance import (
     AttendanceCreate,
     AttendanceUpdate,
     AttendanceList,
+    AttendancePage,
+    AttendanceBulkOperation,
+    AttendanceBulkRequest,
+    AttendanceBulkItemResult,
+    AttendanceBulkResult,
     UserAttendance,
 )
 from .location import Location, LocationCreate, LocationUpdate, LocationList
 from .group import Group, GroupCreate, GroupUpdate, GroupList
 from .custom_holiday import CustomHoliday, CustomHolidayCreate, CustomHolidayUpdate
+from .csv import CsvImportError, CsvImportResult
 
 __all__ = [
     "User",
@@ -26,6 +32,11 @@ __all__ = [
     "AttendanceCreate",
     "AttendanceUpdate",
     "AttendanceList",
+    "AttendancePage",
+    "AttendanceBulkOperation",
+    "AttendanceBulkRequest",
+    "AttendanceBulkItemResult",
+    "AttendanceBulkResult",
     "UserAttendance",
     "Location",
     "LocationCreate",
@@ -38,4 +49,6 @@ __all__ = [
     "CustomHoliday",
     "CustomHolidayCreate",
     "CustomHolidayUpdate",
+    "CsvImportError",
+    "CsvImportResult",
 ]
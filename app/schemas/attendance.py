@@ -81,6 +81,52 @@ class AttendanceList(BaseModel):
     )
 
 
+class AttendancePage(AttendanceList):
+    """勤怠記録一覧 (keyset ページング) 用スキーマ"""
+
+    next_cursor: Optional[str] = None  # 次のページを取得するためのカーソル (最終ページでは None)
+
+
+class AttendanceBulkOperation(BaseModel):
+    """勤怠一括登録の1操作分のスキーマ
+
+    location_id が None または -1 の場合は、該当ユーザー・日付の勤怠を削除します。
+    """
+
+    user_id: str
+    date: date
+    location_id: Optional[int] = None
+    note: Optional[str] = None
+
+
+class AttendanceBulkRequest(BaseModel):
+    """勤怠一括登録リクエスト用スキーマ"""
+
+    operations: List[AttendanceBulkOperation]
+    atomic: bool = False  # True の場合、1件でも不正な操作があれば何も適用しない
+
+
+class AttendanceBulkItemResult(BaseModel):
+    """勤怠一括登録の操作ごとの結果スキーマ"""
+
+    index: int
+    user_id: str
+    date: date
+    status: str  # created / updated / deleted / unchanged / error
+    detail: Optional[str] = None
+
+
+class AttendanceBulkResult(BaseModel):
+    """勤怠一括登録レスポンス用スキーマ"""
+
+    applied: bool
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    failed: int = 0
+    results: List[AttendanceBulkItemResult]
+
+
 class UserAttendance(BaseModel):
     """ユーザー固有の勤怠データ用スキーマ"""
 
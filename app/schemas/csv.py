@@ -0,0 +1,32 @@
+"""
+CSV取り込みスキーマ定義
+==================
+
+CSV取り込みAPIのレスポンス用Pydanticスキーマ。
+"""
+
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class CsvImportError(BaseModel):
+    """CSV取り込みで適用できなかった行・セルの情報"""
+
+    row: Optional[int] = None  # CSV上の行番号 (ヘッダーを1行目とする)
+    user_id: Optional[str] = None
+    date: Optional[date] = None
+    detail: str
+
+
+class CsvImportResult(BaseModel):
+    """CSV取り込みレスポンス用スキーマ"""
+
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    failed: int = 0
+    created_locations: List[str] = []
+    errors: List[CsvImportError] = []  # 先頭の一定件数のみ
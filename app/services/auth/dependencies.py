@@ -3,12 +3,12 @@ from typing import Any, Dict
 from fastapi import Depends, HTTPException, Request, status
 
 from app.services.auth.oidc import OIDCClient, OIDCError
-from app.services.auth.settings import AuthSettings
+from app.services.auth.settings import AuthSettings, auth_settings_provider
 
 
 def get_auth_settings() -> AuthSettings:
-    """リクエスト毎に環境変数から最新の設定を構築する"""
-    return AuthSettings.from_env()
+    """環境変数・認証状態ファイルから構築した設定を返す (変更が無ければ解析済みの設定を再利用する)"""
+    return auth_settings_provider()
 
 
 def get_oidc_client(settings: AuthSettings = Depends(get_auth_settings)) -> OIDCClient:
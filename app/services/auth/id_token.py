@@ -0,0 +1,85 @@
+from typing import Any, Dict, Mapping
+
+import jwt
+
+
+class IDTokenError(Exception):
+    """ID トークンが不正であることを示す例外"""
+
+
+class UnsupportedIDTokenError(IDTokenError):
+    """ローカルでは検証できない ID トークン (UserInfo での確認にフォールバックする)"""
+
+
+RSA_ALGORITHMS = frozenset({"RS256", "RS384", "RS512"})
+HMAC_ALGORITHMS = frozenset({"HS256", "HS384", "HS512"})
+
+# 署名の検証のみを PyJWT に任せ、クレームは validate_claims で検証する
+_SIGNATURE_ONLY_OPTIONS = {
+    "verify_signature": True,
+    "verify_exp": False,
+    "verify_nbf": False,
+    "verify_iat": False,
+    "verify_aud": False,
+    "verify_iss": False,
+}
+
+
+def get_unverified_header(token: str) -> Dict[str, Any]:
+    """JWS コンパクト形式のヘッダーを取り出す (署名は検証しない)"""
+    try:
+        return jwt.get_unverified_header(token)
+    except jwt.InvalidTokenError as exc:
+        raise IDTokenError("Malformed ID token") from exc
+
+
+def rsa_key_from_jwk(jwk: Mapping[str, Any], alg: str) -> Any:
+    """JWK から RSA 公開鍵を読み込む"""
+    try:
+        return jwt.PyJWK(dict(jwk), algorithm=alg).key
+    except (jwt.PyJWKError, jwt.InvalidKeyError) as exc:
+        raise UnsupportedIDTokenError(f"Signing key cannot be used: {exc}") from exc
+
+
+def verify_signature(token: str, alg: str, key: Any) -> Dict[str, Any]:
+    """指定した方式と鍵で署名を検証し、クレームを返す"""
+    try:
+        claims = jwt.decode(token, key=key, algorithms=[alg], options=_SIGNATURE_ONLY_OPTIONS)
+    except jwt.InvalidKeyError as exc:
+        raise UnsupportedIDTokenError(f"Signing key cannot be used: {exc}") from exc
+    except jwt.InvalidSignatureError as exc:
+        raise IDTokenError("Invalid ID token signature") from exc
+    except jwt.InvalidTokenError as exc:
+        raise IDTokenError("Malformed ID token") from exc
+    if not isinstance(claims, dict):
+        raise IDTokenError("Malformed ID token")
+    return claims
+
+
+def validate_claims(
+    claims: Mapping[str, Any],
+    *,
+    issuer: str,
+    client_id: str,
+    nonce: str | None,
+    now: float,
+    leeway: float = 60.0,
+) -> None:
+    """ID トークンのクレーム (OpenID Connect Core 3.1.3.7) を検証する"""
+    if claims.get("iss") != issuer:
+        raise IDTokenError("ID token issuer mismatch")
+
+    audience = claims.get("aud")
+    audiences = [audience] if isinstance(audience, str) else list(audience or [])
+    if client_id not in audiences:
+        raise IDTokenError("ID token audience mismatch")
+    if len(audiences) > 1 and claims.get("azp") not in (None, client_id):
+        raise IDTokenError("ID token authorized party mismatch")
+
+    expires_at = claims.get("exp")
+    if not isinstance(expires_at, (int, float)) or expires_at + leeway < now:
+        raise IDTokenError("ID token expired")
+    if nonce and claims.get("nonce") != nonce:
+        raise IDTokenError("ID token nonce mismatch")
+    if not claims.get("sub"):
+        raise IDTokenError("ID token missing sub")
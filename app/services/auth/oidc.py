@@ -1,14 +1,34 @@
+import asyncio
 import logging
+import time
 import urllib.parse
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Dict, Optional, Tuple
 
 import httpx
 
+from app.services.auth.id_token import (
+    HMAC_ALGORITHMS,
+    RSA_ALGORITHMS,
+    IDTokenError,
+    UnsupportedIDTokenError,
+    get_unverified_header,
+    rsa_key_from_jwk,
+    validate_claims,
+    verify_signature,
+)
 from app.services.auth.settings import AuthSettings
 
 logger = logging.getLogger(__name__)
 
+# Discovery の取得に失敗した場合に、再取得を控える秒数
+DISCOVERY_FAILURE_RETRY_SECONDS = 30.0
+# 未知の鍵 ID による JWKS の再取得を、この秒数に1回までに抑える (不正なトークンで IdP を叩かせないため)
+JWKS_MIN_REFRESH_SECONDS = 60.0
+# ワーカー内で共有する HTTP クライアントの接続数の上限
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 10
+
 
 class OIDCError(Exception):
     """OIDC フロー中のエラーを示す例外"""
@@ -25,18 +45,139 @@ class OIDCLoginResult:
     refresh_token: str | None = None
 
 
+_http_client: httpx.AsyncClient | None = None
+_http_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """ワーカー内で共有する非同期 HTTP クライアントを返す (IdP への接続を使い回す)"""
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            )
+        )
+        _http_client_loop = loop
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """共有 HTTP クライアントを閉じる (アプリケーション終了時)"""
+    global _http_client, _http_client_loop
+    client, _http_client, _http_client_loop = _http_client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+class OIDCMetadataCache:
+    """IdP の Discovery ドキュメントと JWKS を TTL 付きで保持するキャッシュ"""
+
+    def __init__(self, jwks_min_refresh_seconds: float = JWKS_MIN_REFRESH_SECONDS) -> None:
+        self.jwks_min_refresh_seconds = jwks_min_refresh_seconds
+        # issuer -> (有効期限, Discovery ドキュメント)
+        self._discovery: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # jwks_uri -> (有効期限, 取得時刻, 鍵 ID -> JWK)
+        self._jwks: Dict[str, Tuple[float, float, Dict[str | None, Dict[str, Any]]]] = {}
+
+    def clear(self) -> None:
+        self._discovery.clear()
+        self._jwks.clear()
+
+    async def get_discovery(
+        self, http_client: httpx.AsyncClient, issuer: str, *, ttl: float, timeout: float
+    ) -> Dict[str, Any]:
+        """Discovery ドキュメントを返す (取得できない場合は空の辞書)"""
+        now = time.monotonic()
+        cached = self._discovery.get(issuer)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        url = f"{issuer.rstrip('/')}/.well-known/openid-configuration"
+        try:
+            resp = await http_client.get(url, timeout=timeout)
+            resp.raise_for_status()
+            document = resp.json()
+            if not isinstance(document, dict):
+                raise ValueError("Discovery document is not a JSON object")
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to fetch OIDC discovery document: %s", exc)
+            # 失敗は短時間だけ記録し、既定のエンドポイントで続行する
+            self._discovery[issuer] = (now + min(ttl, DISCOVERY_FAILURE_RETRY_SECONDS), {})
+            return {}
+        self._discovery[issuer] = (now + ttl, document)
+        return document
+
+    async def get_signing_key(
+        self,
+        http_client: httpx.AsyncClient,
+        jwks_uri: str,
+        kid: str | None,
+        *,
+        ttl: float,
+        timeout: float,
+    ) -> Dict[str, Any] | None:
+        """署名検証用の JWK を返す (未知の鍵 ID の場合は鍵のローテーションとみなして再取得する)"""
+        now = time.monotonic()
+        cached = self._jwks.get(jwks_uri)
+        if cached is not None:
+            expires_at, fetched_at, keys = cached
+            key = self._select_key(keys, kid)
+            if expires_at > now and (key is not None or now - fetched_at < self.jwks_min_refresh_seconds):
+                return key
+
+        try:
+            resp = await http_client.get(jwks_uri, timeout=timeout)
+            resp.raise_for_status()
+            keys = {
+                jwk.get("kid"): jwk
+                for jwk in resp.json().get("keys", [])
+                if isinstance(jwk, dict) and jwk.get("use", "sig") == "sig"
+            }
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to fetch OIDC JWKS: %s", exc)
+            return None
+        self._jwks[jwks_uri] = (now + ttl, now, keys)
+        return self._select_key(keys, kid)
+
+    @staticmethod
+    def _select_key(keys: Dict[str | None, Dict[str, Any]], kid: str | None) -> Dict[str, Any] | None:
+        if kid is None and len(keys) == 1:
+            return next(iter(keys.values()))
+        return keys.get(kid)
+
+
+# ワーカー内で共有するメタデータキャッシュ
+metadata_cache = OIDCMetadataCache()
+
+
 class OIDCClient:
     """Keycloak OIDC と対話するクライアント"""
 
-    def __init__(self, settings: AuthSettings, http_client: httpx.Client | None = None) -> None:
+    def __init__(
+        self,
+        settings: AuthSettings,
+        http_client: httpx.AsyncClient | None = None,
+        cache: OIDCMetadataCache | None = None,
+    ) -> None:
         if not settings.oidc_enabled:
             raise OIDCError("OIDC settings are incomplete")
         self.settings = settings
-        timeout = settings.oidc_http_timeout
-        self.http_client = http_client or httpx.Client(timeout=timeout)
+        self._http_client = http_client
+        self.cache = cache or metadata_cache
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        return self._http_client or get_http_client()
 
-    def build_authorization_url(self, state: str, nonce: str) -> str:
-        endpoint = self._authorization_endpoint()
+    async def build_authorization_url(self, state: str, nonce: str) -> str:
+        endpoint = await self._endpoint(
+            "authorization_endpoint",
+            self.settings.authorization_endpoint_override,
+            "/protocol/openid-connect/auth",
+        )
         query = urllib.parse.urlencode(
             {
                 "response_type": "code",
@@ -49,14 +190,18 @@ class OIDCClient:
         )
         return f"{endpoint}?{query}"
 
-    def exchange_code(
+    async def exchange_code(
         self,
         code: str,
         state: str,
         nonce: str,
         redirect_uri: str | None = None,
     ) -> OIDCLoginResult:
-        token_url = self._token_endpoint()
+        token_url = await self._endpoint(
+            "token_endpoint",
+            self.settings.token_endpoint_override,
+            "/protocol/openid-connect/token",
+        )
         callback_uri = redirect_uri or self.settings.oidc_redirect_uri or ""
         data = {
             "grant_type": "authorization_code",
@@ -66,7 +211,9 @@ class OIDCClient:
             "redirect_uri": callback_uri,
         }
         try:
-            token_resp = self.http_client.post(token_url, data=data)
+            token_resp = await self.http_client.post(
+                token_url, data=data, timeout=self.settings.oidc_http_timeout
+            )
             token_resp.raise_for_status()
         except Exception as exc:  # noqa: BLE001
             logger.exception("Failed to exchange code with Keycloak: %s", exc)
@@ -78,8 +225,16 @@ class OIDCClient:
         refresh_token = token_payload.get("refresh_token")
         if not access_token or not id_token:
             raise OIDCError("Token response missing access_token or id_token")
+        if not isinstance(id_token, str):
+            raise OIDCError("Token response contains a malformed id_token")
 
-        subject, username = self._fetch_userinfo(access_token)
+        claims = await self._validate_id_token(id_token, nonce)
+        if claims is not None:
+            # 署名を検証できた ID トークンから利用者を特定し、UserInfo への問い合わせを省く
+            subject = str(claims["sub"])
+            username = claims.get("preferred_username") or subject
+        else:
+            subject, username = await self._fetch_userinfo(access_token)
         return OIDCLoginResult(
             subject=subject,
             username=username,
@@ -88,8 +243,15 @@ class OIDCClient:
             refresh_token=refresh_token,
         )
 
-    def get_logout_url(self, id_token_hint: str, post_logout_redirect_uri: str) -> str | None:
-        endpoint = self._logout_endpoint()
+    async def get_logout_url(self, id_token_hint: str, post_logout_redirect_uri: str) -> str | None:
+        if self.settings.logout_endpoint_override:
+            endpoint: str | None = self.settings.logout_endpoint_override
+        elif not self.settings.oidc_issuer:
+            endpoint = None
+        else:
+            endpoint = await self._endpoint(
+                "end_session_endpoint", None, "/protocol/openid-connect/logout"
+            )
         if endpoint is None:
             return None
         query = urllib.parse.urlencode(
@@ -100,37 +262,87 @@ class OIDCClient:
         )
         return f"{endpoint}?{query}"
 
-    def _authorization_endpoint(self) -> str:
-        if self.settings.authorization_endpoint_override:
-            return self.settings.authorization_endpoint_override
-        issuer = self.settings.oidc_issuer or ""
-        return f"{issuer}/protocol/openid-connect/auth"
+    async def _discovery(self) -> Dict[str, Any]:
+        issuer = self.settings.oidc_issuer
+        if not issuer:
+            return {}
+        return await self.cache.get_discovery(
+            self.http_client,
+            issuer,
+            ttl=self.settings.oidc_metadata_cache_seconds,
+            timeout=self.settings.oidc_http_timeout,
+        )
 
-    def _token_endpoint(self) -> str:
-        if self.settings.token_endpoint_override:
-            return self.settings.token_endpoint_override
+    async def _endpoint(self, name: str, override: str | None, default_path: str) -> str:
+        """上書き設定、Discovery、Keycloak の既定パスの順にエンドポイントを決める"""
+        if override:
+            return override
+        endpoint = (await self._discovery()).get(name)
+        if isinstance(endpoint, str) and endpoint:
+            return endpoint
         issuer = self.settings.oidc_issuer or ""
-        return f"{issuer}/protocol/openid-connect/token"
+        return f"{issuer}{default_path}"
 
-    def _userinfo_endpoint(self) -> str:
-        if self.settings.userinfo_endpoint_override:
-            return self.settings.userinfo_endpoint_override
-        issuer = self.settings.oidc_issuer or ""
-        return f"{issuer}/protocol/openid-connect/userinfo"
+    async def _validate_id_token(self, id_token: str, nonce: str) -> Optional[Dict[str, Any]]:
+        """
+        ID トークンの署名とクレームを検証する
 
-    def _logout_endpoint(self) -> str | None:
-        if self.settings.logout_endpoint_override:
-            return self.settings.logout_endpoint_override
-        if not self.settings.oidc_issuer:
+        検証できた場合はクレームを返し、ローカルで検証できない場合 (未対応の署名方式、
+        JWKS を取得できないなど) は None を返す。不正なトークンの場合は OIDCError を送出する。
+        """
+        try:
+            header = get_unverified_header(id_token)
+            alg = header.get("alg")
+            if alg in HMAC_ALGORITHMS:
+                secret = self.settings.oidc_client_secret
+                if not secret:
+                    raise UnsupportedIDTokenError("Client secret is not configured")
+                claims = verify_signature(id_token, alg, secret.encode("utf-8"))
+                discovery = await self._discovery()
+            elif alg in RSA_ALGORITHMS:
+                discovery = await self._discovery()
+                jwks_uri = discovery.get("jwks_uri")
+                if not jwks_uri:
+                    raise UnsupportedIDTokenError("JWKS URI is not available")
+                jwk = await self.cache.get_signing_key(
+                    self.http_client,
+                    jwks_uri,
+                    header.get("kid"),
+                    ttl=self.settings.oidc_metadata_cache_seconds,
+                    timeout=self.settings.oidc_http_timeout,
+                )
+                if jwk is None:
+                    raise UnsupportedIDTokenError("Signing key not found")
+                claims = verify_signature(id_token, alg, rsa_key_from_jwk(jwk, alg))
+            else:
+                raise UnsupportedIDTokenError(f"Unsupported ID token algorithm: {alg}")
+
+            validate_claims(
+                claims,
+                issuer=discovery.get("issuer") or self.settings.oidc_issuer or "",
+                client_id=self.settings.oidc_client_id or "",
+                nonce=nonce,
+                now=time.time(),
+            )
+        except UnsupportedIDTokenError as exc:
+            logger.info("ID token cannot be validated locally, using userinfo: %s", exc)
             return None
-        return f"{self.settings.oidc_issuer}/protocol/openid-connect/logout"
+        except IDTokenError as exc:
+            logger.warning("ID token validation failed: %s", exc)
+            raise OIDCError("Invalid ID token") from exc
+        return claims
 
-    def _fetch_userinfo(self, access_token: str) -> tuple[str, str]:
-        userinfo_url = self._userinfo_endpoint()
+    async def _fetch_userinfo(self, access_token: str) -> tuple[str, str]:
+        userinfo_url = await self._endpoint(
+            "userinfo_endpoint",
+            self.settings.userinfo_endpoint_override,
+            "/protocol/openid-connect/userinfo",
+        )
         try:
-            resp = self.http_client.get(
+            resp = await self.http_client.get(
                 userinfo_url,
                 headers={"Authorization": f"Bearer {access_token}"},
+                timeout=self.settings.oidc_http_timeout,
             )
             resp.raise_for_status()
         except Exception as exc:  # noqa: BLE001
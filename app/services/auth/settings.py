@@ -1,9 +1,33 @@
+import threading
 from dataclasses import dataclass
 from os import environ
 from pathlib import Path
+from typing import Optional, Tuple
 
 from app.services.auth.state import AuthStateStore
 
+# AuthSettings.from_env が参照する環境変数 (キャッシュの再構築判定に使用するため、追加時はここにも加える)
+AUTH_ENV_NAMES = (
+    "SOKORA_AUTH_STATE_PATH",
+    "SOKORA_AUTH_ENABLED",
+    "SOKORA_AUTH_SESSION_SECRET",
+    "SOKORA_AUTH_SESSION_TTL_SECONDS",
+    "SOKORA_LOCAL_AUTH_ENABLED",
+    "OIDC_ISSUER",
+    "OIDC_CLIENT_ID",
+    "OIDC_CLIENT_SECRET",
+    "OIDC_REDIRECT_URL",
+    "OIDC_SCOPES",
+    "OIDC_HTTP_TIMEOUT",
+    "OIDC_METADATA_CACHE_SECONDS",
+    "OIDC_AUTHORIZATION_ENDPOINT",
+    "OIDC_TOKEN_ENDPOINT",
+    "OIDC_USERINFO_ENDPOINT",
+    "OIDC_LOGOUT_ENDPOINT",
+    "SOKORA_LOCAL_ADMIN_USERNAME",
+    "SOKORA_LOCAL_ADMIN_PASSWORD",
+)
+
 
 def _get_bool(name: str, default: bool = False) -> bool:
     value = environ.get(name)
@@ -47,6 +71,7 @@ class AuthSettings:
     oidc_redirect_uri: str | None
     oidc_scope: str
     oidc_http_timeout: float
+    oidc_metadata_cache_seconds: float
     authorization_endpoint_override: str | None
     token_endpoint_override: str | None
     userinfo_endpoint_override: str | None
@@ -90,6 +115,7 @@ class AuthSettings:
             oidc_redirect_uri=environ.get("OIDC_REDIRECT_URL"),
             oidc_scope=environ.get("OIDC_SCOPES", "openid profile email"),
             oidc_http_timeout=_get_float("OIDC_HTTP_TIMEOUT", default=3.0),
+            oidc_metadata_cache_seconds=_get_float("OIDC_METADATA_CACHE_SECONDS", default=3600.0),
             authorization_endpoint_override=environ.get("OIDC_AUTHORIZATION_ENDPOINT"),
             token_endpoint_override=environ.get("OIDC_TOKEN_ENDPOINT"),
             userinfo_endpoint_override=environ.get("OIDC_USERINFO_ENDPOINT"),
@@ -98,3 +124,53 @@ class AuthSettings:
             local_admin_username=environ.get("SOKORA_LOCAL_ADMIN_USERNAME"),
             local_admin_password=environ.get("SOKORA_LOCAL_ADMIN_PASSWORD"),
         )
+
+
+class AuthSettingsProvider:
+    """
+    解析済みの AuthSettings を保持し、必要な場合だけ作り直すプロバイダー
+
+    環境変数の値は比較のみ、認証状態ファイルは stat のみを行い、どちらかが変わった場合
+    (OIDC 有効/無効の切り替えでファイルが書き換えられた場合など) にだけファイルを開いて
+    設定を作り直します。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cached: Optional[Tuple[tuple, AuthSettings]] = None
+
+    @staticmethod
+    def _build_key() -> tuple:
+        env_values = tuple(environ.get(name) for name in AUTH_ENV_NAMES)
+        try:
+            stat_result = AuthStateStore().path.stat()
+            state_signature: Optional[Tuple[int, int, int]] = (
+                stat_result.st_mtime_ns,
+                stat_result.st_size,
+                stat_result.st_ino,
+            )
+        except OSError:
+            state_signature = None
+        return (env_values, state_signature)
+
+    def __call__(self) -> AuthSettings:
+        # ファイルの確認は読み込みより先に行う (読み込み中に書き換えられても次回に作り直される)
+        key = self._build_key()
+        cached = self._cached
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with self._lock:
+            cached = self._cached
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            settings = AuthSettings.from_env()
+            self._cached = (key, settings)
+            return settings
+
+    def invalidate(self) -> None:
+        """保持している設定を破棄します (認証状態ファイルを書き換えた直後など)。"""
+        self._cached = None
+
+
+# アプリケーション全体で共有する設定プロバイダー
+auth_settings_provider = AuthSettingsProvider()
@@ -0,0 +1,279 @@
+"""
+勤怠確認ページのライブ更新サービス
+==============================
+
+勤怠変更通知バス (`app/core/change_bus.py`) の通知を、勤怠確認ページ (`/calendar`) 向けの
+Server-Sent Events に変換します。
+
+- `counts` イベント: 表示中の月で勤怠が変わった日の、勤怠種別ごとの件数 (その日の最新値)
+- `invalidate` イベント: マスタ変更や通知の取りこぼしにより、月全体の再取得が必要なこと
+
+件数は差分ではなくその日の最新値を送るため、通知の重複があっても表示がずれません。
+同じ通知を受け取った接続の間では、実行中の件数の取得を1回のクエリにまとめます。
+
+各 `counts` イベントの id には月の世代トークンを付けます。ブラウザは再接続時に最後の id を
+`Last-Event-ID` として送るため、切断中に変更があった場合は接続直後に `invalidate` を送ります。
+
+他のワーカーでの書き込みは `GenerationWatcher` が DB の世代カウンタを定期的に確認して検出し、
+このワーカーの通知バスへ流します。
+"""
+
+import asyncio
+import datetime
+import json
+from typing import Any, AsyncIterator, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.change_bus import ALL_CHANGED, CLOSED, ChangeBus, change_bus
+from app.core.config import (
+    CHANGE_STREAM_HEARTBEAT_SECONDS,
+    CHANGE_STREAM_MAX_AGE_SECONDS,
+    logger,
+)
+from app.crud.cache_generation import DAY_SCOPE_PREFIX, GLOBAL_SCOPE, cache_generation, month_scope
+from app.crud.calendar import calendar_crud
+
+SSE_MEDIA_TYPE = "text/event-stream"
+# 切断時にブラウザが再接続するまでの待ち時間 (ミリ秒)
+SSE_RETRY_MILLISECONDS = 5000
+
+DayCounts = Dict[datetime.date, Dict[str, int]]
+LoadResult = Tuple[DayCounts, str]
+
+
+def format_sse(event: str, data: Any, event_id: Optional[str] = None) -> str:
+    """Server-Sent Events の1イベント分の文字列を生成します。"""
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event}\ndata: {payload}\n\n"
+
+
+def format_month_token(token: Tuple[int, int]) -> str:
+    """月の世代トークン (全体の世代, 該当月の世代) をイベント id 用の文字列にします。"""
+    return f"{token[0]}-{token[1]}"
+
+
+class DayCountsLoader:
+    """
+    同じ日付の組の件数と月の世代の取得を、実行中のものに限って全接続で共有する
+
+    取得は通知バスの通知数 (`ChangeBus.sequence`) ごとに分けます。後の書き込みの通知を受け取った
+    接続が、その書き込みより前に始まった取得の結果 (古い件数) を受け取らないようにするためです。
+    完了した結果は保持せず、次の通知では改めて取得します。
+    """
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[Tuple[FrozenSet[datetime.date], int], "asyncio.Future[Optional[LoadResult]]"] = {}
+
+    async def load(
+        self, db: AsyncSession, dates: FrozenSet[datetime.date], *, sequence: int
+    ) -> Optional[LoadResult]:
+        """
+        同じ月に属する指定日の勤怠種別ごとの件数と、その月の世代トークンを取得します。
+
+        Args:
+            db: 非同期データベースセッション (取得後に閉じます)
+            dates: 同じ月に属する日付
+            sequence: 呼び出し時点の通知バスの通知数
+
+        Returns:
+            Optional[LoadResult]: (件数, 月の世代トークン)。取得に失敗した場合は None
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._inflight = {}
+        key = (dates, sequence)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future: "asyncio.Future[Optional[LoadResult]]" = loop.create_future()
+        self._inflight[key] = future
+        result: Optional[LoadResult] = None
+        try:
+            sample = next(iter(dates))
+            # 件数と世代を同じトランザクションで読み、両者の時点を揃える
+            counts = await calendar_crud.get_day_location_counts_async(db, dates=dates)
+            token = await cache_generation.get_month_token_async(db, sample.year, sample.month)
+            result = (counts, format_month_token(token))
+        except Exception as e:
+            logger.warning(f"ライブ更新用の勤怠数の取得に失敗しました: {e}")
+        finally:
+            # 完了した結果は共有しない (失敗・切断時に待っている接続には月の再取得を促す)
+            self._inflight.pop(key, None)
+            future.set_result(result)
+            # 読み取りのトランザクションを終え、接続をプールに返す (ストリームの間は保持しない)
+            await db.close()
+        return result
+
+
+day_counts_loader = DayCountsLoader()
+
+
+async def iter_calendar_events(
+    db: AsyncSession,
+    *,
+    year: int,
+    month: int,
+    last_event_id: Optional[str] = None,
+    bus: ChangeBus = change_bus,
+    heartbeat_seconds: float = CHANGE_STREAM_HEARTBEAT_SECONDS,
+    max_age_seconds: float = CHANGE_STREAM_MAX_AGE_SECONDS,
+) -> AsyncIterator[str]:
+    """
+    表示中の月に関する変更を Server-Sent Events として送ります。
+
+    購読はストリームの開始時に行い、クライアントの切断・アプリケーションの終了・
+    `max_age_seconds` の経過で解除します。ストリームを定期的に終えることで、再起動時に
+    サーバーが接続の終了を待ち続けないようにしています (ブラウザは自動で再接続し、
+    再接続時に月を再検証します)。
+
+    Args:
+        db: 非同期データベースセッション (件数の取得時だけ接続を使用)
+        year: 表示中の年
+        month: 表示中の月
+        last_event_id: クライアントが最後に受け取った月の世代トークン
+            (再接続時の Last-Event-ID、初回は表示中のカレンダーを描画した時点のトークン)
+        bus: 購読する通知バス
+        heartbeat_seconds: 変更が無い間にコメント行を送る間隔 (秒)
+        max_age_seconds: ストリームを終えるまでの秒数
+    """
+    month_key = f"{year:04d}-{month:02d}"
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_age_seconds
+    subscription = bus.subscribe(month=(year, month))
+    try:
+        yield f"retry: {SSE_RETRY_MILLISECONDS}\n\n"
+        if last_event_id:
+            # 切断中・接続前に表示中の月が変わっていれば、まず再取得を促す
+            try:
+                token = await cache_generation.get_month_token_async(db, year, month)
+            finally:
+                await db.close()
+            if format_month_token(token) != last_event_id:
+                yield format_sse("invalidate", {"month": month_key})
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            notice = await subscription.get(timeout=min(heartbeat_seconds, remaining))
+            if notice is None:
+                yield ": ping\n\n"
+                continue
+            if notice is CLOSED:
+                return
+            if notice is ALL_CHANGED:
+                yield format_sse("invalidate", {"month": month_key})
+                continue
+
+            dates = frozenset(d for d in notice if d.year == year and d.month == month)
+            if not dates:
+                continue
+            loaded = await day_counts_loader.load(db, dates, sequence=bus.sequence)
+            if loaded is None:
+                yield format_sse("invalidate", {"month": month_key})
+                continue
+            counts, token_str = loaded
+            yield format_sse(
+                "counts", {"days": {d.isoformat(): counts[d] for d in sorted(counts)}}, event_id=token_str
+            )
+    finally:
+        subscription.close()
+
+
+class GenerationWatcher:
+    """
+    他のワーカーでの勤怠変更を DB の世代カウンタから検出し、通知バスへ流すバックグラウンドタスク
+
+    購読中の接続がある間だけ問い合わせを行います。このワーカー自身の書き込みも検出されますが、
+    送る件数は最新値のため、重複して届いても表示は変わりません。
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        interval_seconds: float,
+        bus: ChangeBus = change_bus,
+    ) -> None:
+        self._session_factory = session_factory
+        self._interval_seconds = interval_seconds
+        self._bus = bus
+        self._stamps: Optional[Dict[str, int]] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    async def poll_once(self) -> None:
+        """
+        世代を1回確認し、前回から変わったスコープを通知します。
+
+        購読中の接続が表示している月の世代だけを主キーで読み、世代が変わった月についてのみ
+        その月の日単位の世代を読んで変更された日を特定します (日単位の行は書き込まれた日付ごとに
+        増え続けるため、全件は読みません)。新たに表示され始めた月は、最初の確認を基準にします。
+        """
+        months = self._bus.watched_months
+        if not months:
+            # 購読が無い間は確認しない (再開時は最初の確認を基準にする)
+            self._stamps = None
+            return
+        previous = self._stamps
+        known = previous or {}
+        async with self._session_factory() as db:
+            stamps = await cache_generation.get_generations_async(
+                db, [GLOBAL_SCOPE, *(month_scope(y, m) for y, m in months)]
+            )
+            changed_months = [
+                (y, m) for y, m in months if known.get(month_scope(y, m)) != stamps[month_scope(y, m)]
+            ]
+            day_stamps: Dict[str, int] = {}
+            for year, month in changed_months:
+                day_stamps.update(await cache_generation.get_day_stamps_async(db, year, month))
+
+        # 世代が変わっていない表示中の月は、前回読んだ日単位の世代を引き継ぐ
+        unchanged_prefixes = tuple(
+            f"{DAY_SCOPE_PREFIX}{y:04d}-{m:02d}-" for y, m in months if (y, m) not in changed_months
+        )
+        stamps.update(
+            (scope, generation)
+            for scope, generation in known.items()
+            if scope.startswith(unchanged_prefixes)
+        )
+        stamps.update(day_stamps)
+        self._stamps = stamps
+        if previous is None:
+            return
+        if stamps[GLOBAL_SCOPE] != previous.get(GLOBAL_SCOPE):
+            self._bus.publish(ALL_CHANGED)
+            return
+        changed: List[datetime.date] = []
+        for scope, generation in day_stamps.items():
+            day = datetime.date.fromisoformat(scope[len(DAY_SCOPE_PREFIX):])
+            # 前回の確認時に表示されていなかった月は基準の記録のみ
+            if month_scope(day.year, day.month) in previous and previous.get(scope) != generation:
+                changed.append(day)
+        self._bus.publish(changed)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval_seconds)
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.warning(f"勤怠変更の検出に失敗しました: {e}")
+
+    def start(self) -> None:
+        """バックグラウンドでの確認を開始します。"""
+        if self._task is None and self._interval_seconds > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """バックグラウンドでの確認を停止します。"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
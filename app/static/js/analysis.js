@@ -10,7 +10,14 @@ let selectedLocationName = ''
 function initializeAnalysisPage(config) {
   const isDetailMode = Boolean(config?.isDetailMode)
   const locationDetails = config?.locationDetails || {}
+  const locationCounts = config?.locationCounts || {}
   const period = config?.period || {}
+  // 年度集計では日付一覧を埋め込まず、行ごとに /analysis/dates から取得する
+  const detailOptions = {
+    locationCounts,
+    lazyYear: period?.mode === 'fiscal_year' ? period.fiscal_year : null,
+    loadedUsers: new Set(),
+  }
 
   const setup = () => {
     // テーブルの横スクロール時のヘッダー固定を改善
@@ -157,12 +164,12 @@ function initializeAnalysisPage(config) {
           toggleLocationColumn(locationId, isChecked)
 
           // 詳細データを更新
-          updateDetailColumns(locationDetails)
+          updateDetailColumns(locationDetails, detailOptions)
         })
       })
 
       // 初期表示時に詳細データを更新（DOMContentLoaded後に実行）
-      updateDetailColumns(locationDetails)
+      updateDetailColumns(locationDetails, detailOptions)
     }
   }
 
@@ -173,8 +180,30 @@ function initializeAnalysisPage(config) {
   }
 }
 
+// 1ユーザー分の年度の日付一覧を取得して詳細列を再描画する
+function loadUserDates(userId, locationDetails, options) {
+  const params = new URLSearchParams({ user_id: userId, year: options.lazyYear })
+  return fetch(`/analysis/dates?${params}`, { headers: { 'X-Requested-With': 'fetch' } })
+    .then((res) => {
+      if (!res.ok) throw new Error(`HTTP ${res.status}`)
+      return res.json()
+    })
+    .then((data) => {
+      Object.entries(data.dates || {}).forEach(([locationId, dates]) => {
+        locationDetails[locationId] = locationDetails[locationId] || {}
+        locationDetails[locationId][userId] = dates
+      })
+      options.loadedUsers.add(userId)
+      updateDetailColumns(locationDetails, options)
+    })
+}
+
 // 詳細列のデータを更新する関数
-function updateDetailColumns(locationDetails) {
+function updateDetailColumns(locationDetails, options) {
+  const locationCounts = options?.locationCounts || {}
+  const lazyYear = options?.lazyYear ?? null
+  const loadedUsers = options?.loadedUsers || new Set()
+
   // 選択された勤怠種別IDリストを取得
   const checkedBoxes = document.querySelectorAll('.location-checkbox:checked')
   const selectedLocationIds = Array.from(checkedBoxes).map((cb) => parseInt(cb.dataset.locationId))
@@ -199,8 +228,8 @@ function updateDetailColumns(locationDetails) {
       // 選択された勤怠種別の合算日数を計算
       let totalDays = 0
       selectedLocationIds.forEach((locationId) => {
-        if (locationDetails[locationId] && locationDetails[locationId][userId]) {
-          totalDays += locationDetails[locationId][userId].length
+        if (locationCounts[locationId] && locationCounts[locationId][userId]) {
+          totalDays += locationCounts[locationId][userId]
         }
       })
 
@@ -227,7 +256,26 @@ function updateDetailColumns(locationDetails) {
     const userId = cell.dataset.userId
     const datesDiv = cell.querySelector('div')
 
-    if (userId && selectedLocationIds.length > 0) {
+    const hasSelectedDays = selectedLocationIds.some(
+      (locationId) => locationCounts[locationId] && locationCounts[locationId][userId]
+    )
+
+    if (userId && hasSelectedDays && lazyYear !== null && !loadedUsers.has(userId)) {
+      // 年度集計は日付一覧を未取得のため、展開ボタンを表示する
+      datesDiv.className = 'flex flex-wrap gap-2 text-sm'
+      datesDiv.innerHTML = ''
+      const button = document.createElement('button')
+      button.type = 'button'
+      button.className = 'btn btn-ghost btn-xs'
+      button.textContent = '日付を表示'
+      button.addEventListener('click', () => {
+        button.disabled = true
+        loadUserDates(userId, locationDetails, options).catch(() => {
+          button.disabled = false
+        })
+      })
+      datesDiv.appendChild(button)
+    } else if (userId && selectedLocationIds.length > 0) {
       // 勤怠種別ごとに日付をグループ化
       const locationGroups = {}
       selectedLocationIds.forEach((locationId) => {
@@ -3,6 +3,8 @@
 
   let serverTodayDate = null
   let cachedTodayDate = null
+  // ライブ更新で月を再取得した後も維持する選択日
+  let preservedSelectedDate = null
 
   function getTodayDate() {
     if (cachedTodayDate) {
@@ -70,6 +72,14 @@
     let targetDate = null
     let targetCell = null
 
+    // ライブ更新による再取得では、それまでの選択日を維持する
+    const preservedDate = preservedSelectedDate
+    preservedSelectedDate = null
+    if (preservedDate && document.querySelector(`th.calendar-cell[data-date="${preservedDate}"]`)) {
+      highlightSelectedDate(preservedDate)
+      return true
+    }
+
     // 初回アクセス時は常に今日の日付を優先表示
     targetCell = document.querySelector(`th.calendar-cell[data-date="${todayDate}"]`)
     if (targetCell) {
@@ -124,6 +134,99 @@
     } else {
       console.warn('No calendar cells found during init.')
     }
+
+    connectLiveUpdates(metadataElement)
+  }
+
+  // --- ライブ更新 (Server-Sent Events) ---
+
+  let liveSource = null
+  let liveStreamUrl = null
+  let liveRetryTimer = null
+  // 接続が拒否された場合 (接続数の上限など) に再接続するまでの待ち時間
+  const LIVE_RETRY_DELAY_MS = 30000
+
+  /**
+   * 表示中の月を再取得する (選択中の日付は維持する)
+   * @param {string} month - YYYY-MM形式の月
+   */
+  function reloadCalendarMonth(month) {
+    if (typeof htmx === 'undefined' || !document.getElementById('calendar-area')) return
+    preservedSelectedDate = localStorage.getItem('selectedDate')
+    htmx.ajax('GET', `/calendar?month=${encodeURIComponent(month)}`, { target: '#calendar-area' })
+  }
+
+  /**
+   * 変更された日の勤怠数を表示に反映する
+   * @param {Object<string, Object<string, number>>} days - 日付 → 勤怠種別名 → 件数 (その日の最新値)
+   */
+  function applyDayCounts(days) {
+    Object.entries(days).forEach(([date, counts]) => {
+      document.querySelectorAll(`td.calendar-cell[data-date="${date}"][data-location]`).forEach((cell) => {
+        const span = cell.querySelector('span')
+        if (span) {
+          const count = counts[cell.dataset.location] || 0
+          span.textContent = count > 0 ? String(count) : ''
+        }
+      })
+    })
+
+    // 表示中の日別詳細が変わった場合は再取得する
+    const selectedDate = localStorage.getItem('selectedDate')
+    if (selectedDate && Object.prototype.hasOwnProperty.call(days, selectedDate)) {
+      loadDayDetail(selectedDate)
+    }
+  }
+
+  function disconnectLiveUpdates() {
+    if (liveRetryTimer) {
+      clearTimeout(liveRetryTimer)
+      liveRetryTimer = null
+    }
+    if (liveSource) {
+      liveSource.close()
+      liveSource = null
+    }
+    liveStreamUrl = null
+  }
+
+  /**
+   * 表示中の月の変更通知を購読する (月が変わった場合は接続し直す)
+   * @param {HTMLElement|null} metadataElement - #calendar-metadata 要素
+   */
+  function connectLiveUpdates(metadataElement) {
+    const streamUrl = metadataElement ? metadataElement.dataset.streamUrl : null
+    const month = metadataElement ? metadataElement.dataset.month : null
+    if (!window.EventSource || !streamUrl || !month) {
+      disconnectLiveUpdates()
+      return
+    }
+    if (liveSource && liveStreamUrl === streamUrl) return
+
+    disconnectLiveUpdates()
+    liveStreamUrl = streamUrl
+    const source = new EventSource(streamUrl)
+    liveSource = source
+
+    source.addEventListener('counts', (event) => {
+      try {
+        applyDayCounts(JSON.parse(event.data).days || {})
+      } catch (e) {
+        console.warn('ライブ更新の受信データを解析できません:', e)
+      }
+    })
+    source.addEventListener('invalidate', () => reloadCalendarMonth(month))
+    source.addEventListener('error', () => {
+      // 一時的な切断はブラウザが自動で再接続し、サーバーが切断中の変更を検出する
+      if (source.readyState === EventSource.CLOSED && liveSource === source) {
+        liveSource = null
+        liveRetryTimer = setTimeout(() => {
+          liveRetryTimer = null
+          liveStreamUrl = null
+          connectLiveUpdates(document.getElementById('calendar-metadata'))
+        }, LIVE_RETRY_DELAY_MS)
+      }
+    })
   }
 
   // --- イベントリスナー設定 ---
@@ -1,3 +1,4 @@
+from pathlib import Path
 from typing import AsyncGenerator, Generator, List, Any
 import time
 
@@ -9,20 +10,38 @@ from httpx import AsyncClient, ASGITransport
 # 同期エンジン作成用の create_engine と StaticPool をインポート
 from sqlalchemy import create_engine, StaticPool
 from sqlalchemy.orm import sessionmaker, Session # Session をインポート
-# from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker # 不要
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import NullPool
 
 # --- アプリケーションとDB設定のインポート ---
-from app.db.session import Base, get_db # get_db と Base をインポート
+from app.db.session import Base, get_db, get_async_db # get_db と Base をインポート
 from app.main import app as main_app
 # トップレベルでモデルをインポート
 # from app.models import User, Attendance, Location, Group, UserType
 
+# --- プロセス内キャッシュのリセット ---
+@pytest.fixture(autouse=True)
+def clear_calendar_cache() -> Generator[None, None, None]:
+    """テストごとにDBが作り直されるため、共有カレンダーキャッシュも毎回空にする"""
+    from app.core import calendar_cache
+
+    calendar_cache.invalidate_all()
+    yield
+    calendar_cache.invalidate_all()
+
+
 # --- テスト用データベースフィクスチャ ---
 @pytest.fixture(scope="function")
-def db() -> Generator[Session, None, None]:
-    """テスト関数ごとにインメモリDBとセッションを作成・提供するフィクスチャ"""
+def db_path(tmp_path: Path) -> Path:
+    """テスト関数ごとのSQLiteファイルのパス (同期・非同期セッションで共有する)"""
+    return tmp_path / "test.db"
+
+
+@pytest.fixture(scope="function")
+def db(db_path: Path) -> Generator[Session, None, None]:
+    """テスト関数ごとに一時ファイルDBとセッションを作成・提供するフィクスチャ"""
     engine = create_engine(
-        "sqlite:///:memory:",
+        f"sqlite:///{db_path}",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
@@ -37,8 +56,17 @@ def db() -> Generator[Session, None, None]:
     try:
         yield db_session # テスト関数にセッションを提供
     finally:
-        Base.metadata.drop_all(bind=engine) # テーブル削除
         db_session.close()
+        Base.metadata.drop_all(bind=engine) # テーブル削除
+        engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def async_session_factory(db: Session, db_path: Path) -> async_sessionmaker:
+    """同期の db フィクスチャと同じDBファイルに接続する非同期セッションファクトリ"""
+    # テストごとにイベントループが変わるため、接続はプールせずセッションごとに開く
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    return async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 
 @pytest.fixture(scope="function")
@@ -151,10 +179,16 @@ def db_with_data(db: Session, test_data_tracker: dict) -> Session:
 
 # test_app フィクスチャ (dbフィクスチャに依存)
 @pytest.fixture(scope="function")
-def test_app(db: Session) -> Generator[FastAPI, None, None]: # db フィクスチャを引数で受け取る
+def test_app(db: Session, async_session_factory: async_sessionmaker) -> Generator[FastAPI, None, None]: # db フィクスチャを引数で受け取る
     """依存関係をオーバーライドしたテスト用FastAPIアプリケーションインスタンス"""
     # override_get_db を使わず、dbフィクスチャのセッションを直接返すようにlambdaで上書き
     main_app.dependency_overrides[get_db] = lambda: db 
+
+    async def override_get_async_db() -> AsyncGenerator[AsyncSession, None]:
+        async with async_session_factory() as async_db:
+            yield async_db
+
+    main_app.dependency_overrides[get_async_db] = override_get_async_db
     yield main_app
     main_app.dependency_overrides.clear()
 
@@ -0,0 +1,95 @@
+"""
+core/assets.py のテストケース
+"""
+
+import gzip
+import json
+from pathlib import Path
+from typing import Generator
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.core import assets
+from app.core.assets import PrecompressedStaticFiles, asset_url, load_asset_manifest
+
+SCRIPT = b"console.log('sokora');\n" * 50
+
+
+@pytest.fixture
+def reset_manifest() -> Generator[None, None, None]:
+    """読み込み済みのマニフェストをテストごとに破棄する"""
+    assets._manifest = None
+    yield
+    assets._manifest = None
+
+
+@pytest.fixture
+def static_client(tmp_path: Path) -> TestClient:
+    js_dir = tmp_path / "js"
+    js_dir.mkdir()
+    (js_dir / "main.js").write_bytes(SCRIPT)
+    (js_dir / "main.0123456789ab.js").write_bytes(SCRIPT)
+    (js_dir / "main.0123456789ab.js.gz").write_bytes(gzip.compress(SCRIPT, mtime=0))
+    app = Starlette(routes=[Mount("/assets", PrecompressedStaticFiles(directory=tmp_path))])
+    return TestClient(app)
+
+
+class TestAssetUrl:
+    """asset_url 関数のテスト"""
+
+    def test_resolves_logical_name_from_manifest(self, tmp_path: Path, reset_manifest: None) -> None:
+        """マニフェストにある論理名はハッシュ付きURLに解決されることを確認"""
+        manifest_file = tmp_path / "manifest.json"
+        manifest_file.write_text(
+            json.dumps({"/static/js/main.js": "/assets/static/js/main.0123456789ab.js"}),
+            encoding="utf-8",
+        )
+        load_asset_manifest(str(manifest_file))
+
+        assert asset_url("/static/js/main.js") == "/assets/static/js/main.0123456789ab.js"
+        assert asset_url("/static/js/other.js") == "/static/js/other.js"
+
+    def test_missing_manifest_falls_back_to_logical_name(self, tmp_path: Path, reset_manifest: None) -> None:
+        """マニフェストが無い場合は論理名をそのまま返すことを確認"""
+        load_asset_manifest(str(tmp_path / "missing.json"))
+
+        assert asset_url("/assets/css/main.css") == "/assets/css/main.css"
+
+
+class TestPrecompressedStaticFiles:
+    """PrecompressedStaticFiles クラスのテスト"""
+
+    def test_hashed_file_served_precompressed_and_immutable(self, static_client: TestClient) -> None:
+        """ハッシュ付きファイルは .gz 版が immutable キャッシュ付きで返ることを確認"""
+        response = static_client.get(
+            "/assets/js/main.0123456789ab.js", headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"].startswith("text/javascript")
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert "immutable" in response.headers["cache-control"]
+        assert response.content == SCRIPT
+
+        not_modified = static_client.get(
+            "/assets/js/main.0123456789ab.js",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]},
+        )
+        assert not_modified.status_code == 304
+        assert "immutable" in not_modified.headers["cache-control"]
+
+    def test_identity_and_unhashed_files(self, static_client: TestClient) -> None:
+        """圧縮を受け付けない場合は元ファイル、ハッシュ無しのファイルは再検証させることを確認"""
+        identity = static_client.get(
+            "/assets/js/main.0123456789ab.js", headers={"Accept-Encoding": "identity"}
+        )
+        unhashed = static_client.get("/assets/js/main.js", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in identity.headers
+        assert identity.content == SCRIPT
+        assert unhashed.headers["cache-control"] == "no-cache"
+        assert unhashed.content == SCRIPT
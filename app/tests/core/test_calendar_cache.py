@@ -0,0 +1,88 @@
+"""
+core/calendar_cache.py のテストケース
+"""
+
+import datetime
+from unittest.mock import patch
+
+from app.core.calendar_cache import CalendarCache
+
+
+class TestCalendarCache:
+    """CalendarCacheクラスのテスト"""
+
+    def test_month_and_day_roundtrip(self) -> None:
+        """月・日単位で登録したデータを取得できることを確認"""
+        cache = CalendarCache(max_entries=8, ttl_seconds=60)
+        target = datetime.date(2025, 4, 1)
+
+        cache.set_month(2025, 4, {"weeks": [1]})
+        cache.set_day(target, {"Office": []})
+
+        assert cache.get_month(2025, 4) == {"weeks": [1]}
+        assert cache.get_day(target) == {"Office": []}
+        assert cache.get_month(2025, 5) is None
+
+    def test_invalidate_date_drops_day_and_month(self) -> None:
+        """日付の無効化で該当日と該当月のみが破棄されることを確認"""
+        cache = CalendarCache(max_entries=8, ttl_seconds=60)
+        target = datetime.date(2025, 4, 10)
+        other_day = datetime.date(2025, 4, 11)
+
+        cache.set_month(2025, 4, {"weeks": []})
+        cache.set_month(2025, 5, {"weeks": []})
+        cache.set_day(target, {})
+        cache.set_day(other_day, {})
+
+        cache.invalidate_date(target)
+
+        assert cache.get_month(2025, 4) is None
+        assert cache.get_day(target) is None
+        assert cache.get_month(2025, 5) == {"weeks": []}
+        assert cache.get_day(other_day) == {}
+
+    def test_lru_eviction(self) -> None:
+        """件数上限を超えると最も古く参照されたエントリが破棄されることを確認"""
+        cache = CalendarCache(max_entries=2, ttl_seconds=60)
+
+        cache.set_month(2025, 1, "jan")
+        cache.set_month(2025, 2, "feb")
+        # 1月を参照して最新扱いにする
+        assert cache.get_month(2025, 1) == "jan"
+        cache.set_month(2025, 3, "mar")
+
+        assert cache.get_month(2025, 2) is None
+        assert cache.get_month(2025, 1) == "jan"
+        assert cache.get_month(2025, 3) == "mar"
+        assert cache.get_cache_info()["entries"] == 2
+
+    def test_ttl_expiry(self) -> None:
+        """TTLを過ぎたエントリは取得できないことを確認"""
+        cache = CalendarCache(max_entries=8, ttl_seconds=10)
+
+        with patch("app.core.calendar_cache.time.monotonic", return_value=100.0):
+            cache.set_month(2025, 4, "apr")
+        with patch("app.core.calendar_cache.time.monotonic", return_value=105.0):
+            assert cache.get_month(2025, 4) == "apr"
+        with patch("app.core.calendar_cache.time.monotonic", return_value=111.0):
+            assert cache.get_month(2025, 4) is None
+
+    def test_clear(self) -> None:
+        """clearで全エントリが破棄されることを確認"""
+        cache = CalendarCache(max_entries=8, ttl_seconds=60)
+        cache.set_month(2025, 4, "apr")
+        cache.set_day(datetime.date(2025, 4, 1), {})
+
+        cache.clear()
+
+        assert cache.get_cache_info()["entries"] == 0
+
+    def test_generation_mismatch(self) -> None:
+        """登録時と異なる世代で参照した場合はヒットせず、エントリが破棄されることを確認"""
+        cache = CalendarCache(max_entries=8, ttl_seconds=60)
+
+        cache.set_month(2025, 4, "apr", generation=(0, 1))
+
+        assert cache.get_month(2025, 4, generation=(0, 1)) == "apr"
+        assert cache.get_month(2025, 4, generation=(0, 2)) is None
+        assert cache.get_cache_info()["entries"] == 0
@@ -0,0 +1,74 @@
+"""
+core/change_bus.py のテストケース
+"""
+
+import datetime
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.change_bus import ALL_CHANGED, CLOSED, ChangeBus, change_bus
+
+
+class TestChangeBus:
+    """ChangeBusクラスのテスト"""
+
+    async def test_publish_merges_queued_dates(self) -> None:
+        """溜まっている日付の通知は1つにまとめて受け取れることを確認"""
+        bus = ChangeBus(queue_size=8)
+        subscription = bus.subscribe()
+
+        bus.publish([datetime.date(2025, 4, 1)])
+        bus.publish([datetime.date(2025, 4, 2)])
+        bus.publish([])  # 空の通知は配信しない
+        assert bus.sequence == 2
+
+        notice = await subscription.get(timeout=1)
+        assert notice == frozenset({datetime.date(2025, 4, 1), datetime.date(2025, 4, 2)})
+        assert await subscription.get(timeout=0.01) is None
+
+    async def test_overflow_becomes_all_changed(self) -> None:
+        """キューが溢れた購読には個々の通知の代わりに ALL_CHANGED が1回だけ届くことを確認"""
+        bus = ChangeBus(queue_size=2)
+        subscription = bus.subscribe()
+
+        for day in range(1, 6):
+            bus.publish([datetime.date(2025, 4, day)])
+
+        assert await subscription.get(timeout=1) is ALL_CHANGED
+        assert subscription.dropped == 3
+        assert await subscription.get(timeout=0.01) is None
+
+    async def test_close_is_delivered_even_when_full(self) -> None:
+        """溢れている購読にも停止の通知が届き、解除後は配信されないことを確認"""
+        bus = ChangeBus(queue_size=1)
+        subscription = bus.subscribe()
+        bus.publish([datetime.date(2025, 4, 1)])
+        bus.publish([datetime.date(2025, 4, 2)])
+
+        bus.close()
+        assert await subscription.get(timeout=1) is CLOSED
+
+        subscription.close()
+        assert bus.subscriber_count == 0
+
+
+async def test_commit_publishes_changed_dates(db: Session) -> None:
+    """世代の記録はコミット後にだけ通知され、ロールバックされた変更は通知されない"""
+    subscription = change_bus.subscribe()
+    try:
+        crud.cache_generation.mark_date_changed(db, datetime.date(2025, 4, 1))
+        db.rollback()
+        crud.cache_generation.mark_dates_changed(db, [datetime.date(2025, 4, 2), datetime.date(2025, 4, 3)])
+        assert await subscription.get(timeout=0.01) is None
+        db.commit()
+
+        assert await subscription.get(timeout=1) == frozenset(
+            {datetime.date(2025, 4, 2), datetime.date(2025, 4, 3)}
+        )
+
+        crud.cache_generation.mark_all_changed(db)
+        db.commit()
+        assert await subscription.get(timeout=1) is ALL_CHANGED
+    finally:
+        subscription.close()
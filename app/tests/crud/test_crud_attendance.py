@@ -1,12 +1,14 @@
 import pytest
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import date, timedelta
 from typing import Any, Dict
 from unittest.mock import patch, MagicMock
 
 from app import crud
+from app.core import calendar_cache
 from app.schemas.attendance import AttendanceCreate, AttendanceUpdate
-from app.models import User as UserModel, Location as LocationModel
+from app.models import User as UserModel, Location as LocationModel, Attendance as AttendanceModel
 from app.schemas.user import UserCreate
 from app.schemas.group import GroupCreate
 from app.schemas.user_type import UserTypeCreate
@@ -210,8 +212,8 @@ def test_delete_by_user_and_date(db_with_attendance_data: Session) -> None:
     crud.attendance.create(db=db, obj_in=attendance_in)
 
     # キャッシュに擬似データを追加
-    day_key = attendance_date.strftime("%Y-%m-%d")
-    crud.attendance._day_data_cache[day_key] = {"test": []}
+    calendar_cache.set_day_data(attendance_date, {"test": []})
+    calendar_cache.set_month_data(attendance_date.year, attendance_date.month, {"weeks": []})
 
     # 削除実行（delete_by_user_and_dateもコミットしないため、手動でコミット）
     result = crud.attendance.delete_by_user_and_date(
@@ -219,8 +221,9 @@ def test_delete_by_user_and_date(db_with_attendance_data: Session) -> None:
     )
     assert result is True
     db.commit()  # 削除をコミット
-    # キャッシュがクリアされていることを確認
-    assert day_key not in crud.attendance._day_data_cache
+    # 日・月のキャッシュがクリアされていることを確認
+    assert calendar_cache.get_day_data(attendance_date) is None
+    assert calendar_cache.get_month_data(attendance_date.year, attendance_date.month) is None
 
     # 削除した後、再度削除を試みる（存在しない記録の削除）
     result_not_found = crud.attendance.delete_by_user_and_date(
@@ -404,6 +407,50 @@ def test_update_attendance_method(db_with_attendance_data: Session) -> None:
     assert updated_attendance.note == "更新後備考"
 
 
+def test_update_user_entry_upserts_in_place(db_with_attendance_data: Session) -> None:
+    """update_user_entry が既存レコードを同じIDのまま更新し、重複を作らないことを確認"""
+    db = db_with_attendance_data
+    user = db.query(UserModel).filter(UserModel.username == "Attendance Test User").first()
+    office = db.query(LocationModel).filter(LocationModel.name == "Test Location Office").first()
+    remote = db.query(LocationModel).filter(LocationModel.name == "Test Location Remote").first()
+    assert user and office and remote
+    target = date(2024, 6, 3)
+
+    assert crud.attendance.update_user_entry(
+        db=db, user_id=str(user.id), date_str="2024-06-03", location_id=int(office.id)
+    )
+    original = crud.attendance.get_by_user_and_date(db=db, user_id=str(user.id), date=target)
+    assert original
+    original_id = original.id
+
+    assert crud.attendance.update_user_entry(
+        db=db, user_id=str(user.id), date_str="2024-06-03", location_id=int(remote.id), note="変更"
+    )
+
+    rows = db.query(AttendanceModel).filter(
+        AttendanceModel.user_id == str(user.id), AttendanceModel.date == target
+    ).all()
+    assert len(rows) == 1
+    assert rows[0].id == original_id
+    assert rows[0].location_id == remote.id
+    assert rows[0].note == "変更"
+
+
+def test_user_date_unique_index(db_with_attendance_data: Session) -> None:
+    """同一ユーザー・同一日付の勤怠は一意インデックスで拒否されることを確認"""
+    db = db_with_attendance_data
+    user = db.query(UserModel).filter(UserModel.username == "Attendance Test User").first()
+    location = db.query(LocationModel).filter(LocationModel.name == "Test Location Office").first()
+    assert user and location
+
+    db.add(AttendanceModel(user_id=str(user.id), date=date(2024, 6, 4), location_id=int(location.id)))
+    db.commit()
+    db.add(AttendanceModel(user_id=str(user.id), date=date(2024, 6, 4), location_id=int(location.id)))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+
+
 def test_update_user_entry_create(db_with_attendance_data: Session) -> None:
     """update_user_entry 新規作成テスト"""
     db = db_with_attendance_data
@@ -545,34 +592,75 @@ def test_get_day_data(db_with_attendance_data: Session) -> None:
     assert invalid_data == {}
 
 
-def test_get_attendance_data_for_csv(db_with_attendance_data: Session) -> None:
-    """CSV用データ取得テスト"""
+def test_get_day_data_reflects_writes_after_cache(db_with_attendance_data: Session) -> None:
+    """キャッシュ済みの日別データが勤怠・勤怠種別の書き込み直後に更新されることを確認"""
+    db = db_with_attendance_data
+    user = db.query(UserModel).filter(UserModel.username == "Attendance Test User").first()
+    office = db.query(LocationModel).filter(LocationModel.name == "Test Location Office").first()
+    remote = db.query(LocationModel).filter(LocationModel.name == "Test Location Remote").first()
+    assert user and office and remote
+
+    day_str = date.today().strftime("%Y-%m-%d")
+    assert crud.attendance.get_day_data(db=db, day=day_str) == {}
+
+    # 勤怠の作成
+    assert crud.attendance.update_user_entry(
+        db=db, user_id=str(user.id), date_str=day_str, location_id=int(office.id)
+    )
+    assert list(crud.attendance.get_day_data(db=db, day=day_str)) == ["Test Location Office"]
+
+    # 勤怠の更新
+    assert crud.attendance.update_user_entry(
+        db=db, user_id=str(user.id), date_str=day_str, location_id=int(remote.id)
+    )
+    assert list(crud.attendance.get_day_data(db=db, day=day_str)) == ["Test Location Remote"]
+
+    # 勤怠種別名の変更 (マスタ更新はキャッシュ全体を無効化)
+    crud.location.update(db=db, db_obj=remote, obj_in={"name": "Renamed Remote"})
+    assert list(crud.attendance.get_day_data(db=db, day=day_str)) == ["Renamed Remote"]
+
+    # 勤怠の削除
+    assert crud.attendance.update_user_entry(
+        db=db, user_id=str(user.id), date_str=day_str, location_id=-1
+    )
+    assert crud.attendance.get_day_data(db=db, day=day_str) == {}
+
+
+def test_iter_csv_entries(db_with_attendance_data: Session) -> None:
+    """CSV出力用の勤怠をユーザー・期間で絞り込んで取得するテスト"""
     db = db_with_attendance_data
     user = db.query(UserModel).filter(UserModel.username == "Attendance Test User").first()
     location = db.query(LocationModel).filter(LocationModel.name == "Test Location Office").first()
     assert user and location
 
     attendance_date = date.today()
-    attendance_in = AttendanceCreate(
-        user_id=str(user.id),
-        date=attendance_date,
-        location_id=int(location.id)
+    crud.attendance.create(
+        db=db,
+        obj_in=AttendanceCreate(user_id=str(user.id), date=attendance_date, location_id=int(location.id)),
     )
-    crud.attendance.create(db=db, obj_in=attendance_in)
 
-    # 全データ取得
-    csv_data = crud.attendance.get_attendance_data_for_csv(db=db)
-    expected_key = f"{user.id}_{attendance_date.strftime('%Y-%m-%d')}"
-    assert expected_key in csv_data
-    assert csv_data[expected_key] == "Test Location Office"
+    entries = list(
+        crud.attendance.iter_csv_entries(
+            db,
+            user_ids=[str(user.id)],
+            start_date=attendance_date - timedelta(days=1),
+            end_date=attendance_date + timedelta(days=1),
+        )
+    )
+    assert entries == [(str(user.id), attendance_date, "Test Location Office")]
 
-    # 日付範囲指定
-    start_date = attendance_date - timedelta(days=1)
-    end_date = attendance_date + timedelta(days=1)
-    csv_data_range = crud.attendance.get_attendance_data_for_csv(
-        db=db, start_date=start_date, end_date=end_date
+    # 範囲外の期間・対象外のユーザーは含まれない
+    assert not list(
+        crud.attendance.iter_csv_entries(
+            db,
+            user_ids=[str(user.id)],
+            start_date=attendance_date + timedelta(days=1),
+            end_date=attendance_date + timedelta(days=2),
+        )
+    )
+    assert not list(
+        crud.attendance.iter_csv_entries(db, user_ids=[], start_date=attendance_date, end_date=attendance_date)
     )
-    assert expected_key in csv_data_range
 
 
 def test_get_attendance_analysis_data(db_with_attendance_data: Session) -> None:
@@ -700,20 +788,6 @@ def test_error_handling_get_day_data(mock_logger: MagicMock, db_with_attendance_
         mock_logger.error.assert_called()
 
 
-@patch('app.crud.attendance.logger')
-def test_error_handling_get_attendance_data_for_csv(mock_logger: MagicMock, db_with_attendance_data: Session) -> None:
-    """get_attendance_data_for_csv エラーハンドリングテスト"""
-    db = db_with_attendance_data
-    
-    # データベースエラーをシミュレート
-    with patch.object(db, 'query') as mock_query:
-        mock_query.side_effect = Exception("Database error")
-        
-        result = crud.attendance.get_attendance_data_for_csv(db=db)
-        assert result == {}
-        mock_logger.error.assert_called()
-
-
 @patch('app.crud.attendance.logger')
 def test_error_handling_analysis_data(mock_logger: MagicMock, db_with_attendance_data: Session) -> None:
     """get_attendance_analysis_data エラーハンドリングテスト"""
@@ -742,3 +816,109 @@ def test_error_handling_fiscal_year_data(mock_logger: MagicMock, db_with_attenda
         assert result["location_name"] == "エラー"
         assert result["users_data"] == {}
         mock_logger.error.assert_called() 
+
+
+async def test_async_day_and_analysis_data_match_sync(db_with_attendance_data: Session, async_session_factory) -> None:
+    """非同期版の日別データ・集計データが同期版と同じ結果を返すことを確認"""
+    db = db_with_attendance_data
+    user = db.query(UserModel).filter(UserModel.username == "Attendance Test User").first()
+    location = db.query(LocationModel).filter(LocationModel.name == "Test Location Office").first()
+    assert user and location
+    crud.attendance.create(
+        db, obj_in=AttendanceCreate(user_id=str(user.id), date=date(2024, 5, 7), location_id=int(location.id))
+    )
+
+    sync_day = crud.attendance.get_day_data(db=db, day="2024-05-07")
+    sync_analysis = crud.attendance.get_attendance_analysis_data(db=db, month="2024-05")
+    calendar_cache.invalidate_all()
+
+    async with async_session_factory() as async_db:
+        async_day = await crud.attendance.get_day_data_async(async_db, day="2024-05-07")
+        async_analysis = await crud.attendance.get_attendance_analysis_data_async(async_db, month="2024-05")
+
+    assert async_day == sync_day
+    assert async_analysis["users"] == sync_analysis["users"]
+    assert async_analysis["summary"] == sync_analysis["summary"]
+    assert async_analysis["users"][str(user.id)]["total_days"] == 1
+
+
+def test_build_analysis_data_scales_linearly() -> None:
+    """集計処理が勤怠データを1回だけ走査し、ユーザー数に比例した再走査を行わないことを確認"""
+    from types import SimpleNamespace
+
+    class CountingAttendance:
+        """user_id の参照回数を数える勤怠データのスタブ"""
+
+        reads = 0
+
+        def __init__(self, user_id: str, day: date, location_id: int) -> None:
+            self._user_id = user_id
+            self.date = day
+            self.location_id = location_id
+            self.note = None
+
+        @property
+        def user_id(self) -> str:
+            CountingAttendance.reads += 1
+            return self._user_id
+
+    locations = [SimpleNamespace(id=1, name="出社", category="出社", order=1)]
+    users_data = [(f"user{i}", f"u{i}", "G", "T") for i in range(200)]
+    attendances = [
+        CountingAttendance(f"u{i}", date(2024, 4, 1) + timedelta(days=d), 1)
+        for i in range(200)
+        for d in range(5)
+    ]
+    period = crud.attendance._resolve_analysis_period("2024-04", None)
+
+    result = crud.attendance._build_analysis_data(period, users_data, locations, attendances)
+
+    # 二重ループであれば 200 × 1000 回参照される
+    assert CountingAttendance.reads == len(attendances)
+    assert result["summary"]["total_attendance_days"] == len(attendances)
+    assert result["users"]["u0"]["location_counts"] == {1: 5}
+
+
+def test_get_users_with_attendance_is_bounded_to_period(db_with_attendance_data: Session) -> None:
+    """一覧用の一括取得が、関連情報付きのユーザーと期間内の勤怠のみを返すことを確認"""
+    db = db_with_attendance_data
+    user = db.query(UserModel).filter(UserModel.username == "Attendance Test User").first()
+    location = db.query(LocationModel).filter(LocationModel.name == "Test Location Office").first()
+    assert user and location
+    for day in [date(2024, 6, 2), date(2024, 6, 3), date(2024, 6, 10)]:
+        crud.attendance.create(
+            db, obj_in=AttendanceCreate(user_id=str(user.id), date=day, location_id=int(location.id), note="n")
+        )
+
+    result = crud.attendance.get_users_with_attendance(
+        db, start_date=date(2024, 6, 3), end_date=date(2024, 6, 9)
+    )
+
+    entries_by_user = {str(user_obj.id): entries for user_obj, entries in result}
+    assert [entry["date"] for entry in entries_by_user[str(user.id)]] == ["2024-06-03"]
+    assert entries_by_user[str(user.id)][0]["location_name"] == "Test Location Office"
+    assert entries_by_user[str(user.id)][0]["note"] == "n"
+    loaded_user = next(user_obj for user_obj, _ in result if str(user_obj.id) == str(user.id))
+    assert loaded_user.group.name == "Attendance Test Group"
+
+
+def test_iter_filtered_reads_in_keyset_batches(db_with_attendance_data: Session) -> None:
+    """iter_filtered がバッチ境界をまたいでも (date, id) 順に全件を1回ずつ返すことを確認"""
+    db = db_with_attendance_data
+    user = db.query(UserModel).filter(UserModel.username == "Attendance Test User").first()
+    location = db.query(LocationModel).filter(LocationModel.name == "Test Location Office").first()
+    assert user and location
+    for offset in range(9):
+        crud.attendance.upsert_attendance(
+            db, user_id=str(user.id), date_obj=date(2024, 7, 1) + timedelta(days=offset), location_id=int(location.id)
+        )
+    db.commit()
+
+    rows = list(crud.attendance.iter_filtered(db, batch_size=4, user_id=str(user.id)))
+    keys = [(row.date, row.id) for row in rows]
+
+    assert len(keys) == 9
+    assert keys == sorted(keys)
+    # 先頭4件の後から読み進めると残りの5件が返る
+    after = keys[3]
+    assert [(r.date, r.id) for r in crud.attendance.get_page(db, limit=10, after=after)] == keys[4:]
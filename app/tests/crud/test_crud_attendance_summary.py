@@ -0,0 +1,110 @@
+from datetime import date
+from typing import Dict, Tuple
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.models import Attendance, AttendanceSummary
+from app.schemas.attendance import AttendanceCreate
+from app.schemas.group import GroupCreate
+from app.schemas.location import LocationCreate
+from app.schemas.user import UserCreate
+from app.schemas.user_type import UserTypeCreate
+
+
+@pytest.fixture(scope="function")
+def summary_data(db: Session) -> Dict[str, int]:
+    """集計テスト用のユーザー1名と勤怠種別2件を投入"""
+    group = crud.group.create(db, obj_in=GroupCreate(name="集計グループ"))
+    user_type = crud.user_type.create(db, obj_in=UserTypeCreate(name="集計種別"))
+    crud.user.create(
+        db,
+        obj_in=UserCreate(id="summary-user", username="集計ユーザー", group_id=group.id, user_type_id=user_type.id),
+    )
+    office = crud.location.create(db, obj_in=LocationCreate(name="集計出社"))
+    remote = crud.location.create(db, obj_in=LocationCreate(name="集計在宅"))
+    return {"office": int(office.id), "remote": int(remote.id)}
+
+
+def _summary_rows(db: Session) -> Dict[Tuple[str, date, int], int]:
+    rows = db.execute(
+        select(AttendanceSummary.user_id, AttendanceSummary.month, AttendanceSummary.location_id, AttendanceSummary.days)
+    ).all()
+    return {(user_id, month, location_id): days for user_id, month, location_id, days in rows}
+
+
+def test_summary_follows_attendance_writes(db: Session, summary_data: Dict[str, int]) -> None:
+    """作成・upsert・更新・削除のいずれでも該当ユーザー・該当月の集計が追従する"""
+    office, remote = summary_data["office"], summary_data["remote"]
+    april = date(2025, 4, 1)
+
+    crud.attendance.create(db, obj_in=AttendanceCreate(user_id="summary-user", date=date(2025, 4, 1), location_id=office))
+    crud.attendance.update_user_entry(db, user_id="summary-user", date_str="2025-04-02", location_id=office)
+    assert _summary_rows(db) == {("summary-user", april, office): 2}
+
+    # 勤怠種別の付け替えで旧勤怠種別の日数が減る
+    crud.attendance.update_user_entry(db, user_id="summary-user", date_str="2025-04-02", location_id=remote)
+    assert _summary_rows(db) == {("summary-user", april, office): 1, ("summary-user", april, remote): 1}
+
+    # 日付を別の月へ移すと変更前の月も再計算される
+    record = crud.attendance.get_by_user_and_date(db, user_id="summary-user", date=date(2025, 4, 1))
+    assert record is not None
+    crud.attendance.update(db, db_obj=record, obj_in={"date": date(2025, 5, 1)})
+    assert _summary_rows(db) == {("summary-user", april, remote): 1, ("summary-user", date(2025, 5, 1), office): 1}
+
+    crud.attendance.update_user_entry(db, user_id="summary-user", date_str="2025-04-02", location_id=-1)
+    crud.attendance.remove(db, id=record.id)
+    assert _summary_rows(db) == {}
+
+
+def test_rebuild_matches_incremental_summary(db: Session, summary_data: Dict[str, int]) -> None:
+    """明細を直接投入した後の再構築結果が、書き込み時の集計と一致する"""
+    office, remote = summary_data["office"], summary_data["remote"]
+    for day, location_id in [(date(2025, 4, 1), office), (date(2025, 4, 2), remote), (date(2025, 6, 3), office)]:
+        crud.attendance.update_user_entry(
+            db, user_id="summary-user", date_str=day.isoformat(), location_id=location_id
+        )
+    incremental = _summary_rows(db)
+
+    # 集計を経由しない書き込み (SQLでの直接投入など) は再構築で反映される
+    db.add(Attendance(user_id="summary-user", date=date(2025, 6, 4), location_id=office))
+    db.commit()
+    rows = crud.attendance_summary.rebuild(db)
+    db.commit()
+
+    assert rows == len(incremental)
+    expected = dict(incremental)
+    expected[("summary-user", date(2025, 6, 1), office)] += 1
+    assert _summary_rows(db) == expected
+
+
+def test_fiscal_year_counts_from_summary_match_full_scan(db: Session, summary_data: Dict[str, int]) -> None:
+    """集計テーブルのみから求めた年度の日数が、明細を走査した結果と一致する"""
+    office, remote = summary_data["office"], summary_data["remote"]
+    for day, location_id in [
+        (date(2025, 3, 31), office),  # 前年度
+        (date(2025, 4, 1), office),
+        (date(2025, 12, 24), remote),
+        (date(2026, 3, 31), office),
+    ]:
+        crud.attendance.update_user_entry(
+            db, user_id="summary-user", date_str=day.isoformat(), location_id=location_id
+        )
+
+    full = crud.attendance.get_attendance_analysis_data(db, fiscal_year=2025)
+    totals_only = crud.attendance.get_attendance_analysis_data(db, fiscal_year=2025, include_dates=False)
+
+    assert totals_only["summary"] == full["summary"]
+    assert totals_only["group_summary"] == full["group_summary"]
+    assert totals_only["users"]["summary-user"]["location_counts"] == {office: 2, remote: 1}
+    assert totals_only["location_details"] == {office: {}, remote: {}}
+
+    # 勤怠種別別の表示は暦年 (1月〜12月) 単位
+    by_type_full = crud.attendance.get_attendance_by_type_for_fiscal_year(db, location_id=office, year=2025)
+    by_type = crud.attendance.get_attendance_by_type_for_fiscal_year(
+        db, location_id=office, year=2025, include_dates=False
+    )
+    assert by_type["users_data"]["summary-user"]["total_days"] == 2
+    assert by_type["total_records"] == by_type_full["total_records"] == 2
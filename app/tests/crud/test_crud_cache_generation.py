@@ -0,0 +1,90 @@
+from datetime import date
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core import calendar_cache
+from app.crud.cache_generation import GLOBAL_SCOPE, day_scope, month_scope
+from app.models import Attendance, User
+from app.schemas.location import LocationCreate
+from app.schemas.user import UserCreate
+from app.schemas.group import GroupCreate
+from app.schemas.user_type import UserTypeCreate
+
+
+def test_get_generations_defaults_to_zero(db: Session) -> None:
+    """未記録のスコープは世代0として扱われる"""
+    generations = crud.cache_generation.get_generations(db, [GLOBAL_SCOPE, "month:2025-04"])
+    assert generations == {GLOBAL_SCOPE: 0, "month:2025-04": 0}
+
+
+def test_bump_increments_generation(db: Session) -> None:
+    """bumpで世代が1ずつ進み、コミットで確定する"""
+    crud.cache_generation.bump(db, GLOBAL_SCOPE)
+    crud.cache_generation.bump(db, GLOBAL_SCOPE, month_scope(2025, 4))
+    db.commit()
+
+    assert crud.cache_generation.get_month_token(db, 2025, 4) == (2, 1)
+    assert crud.cache_generation.get_month_token(db, 2025, 5) == (2, 0)
+
+
+def test_bump_is_rolled_back_with_transaction(db: Session) -> None:
+    """書き込みがロールバックされた場合は世代も進まない"""
+    crud.cache_generation.bump(db, GLOBAL_SCOPE)
+    db.rollback()
+
+    assert crud.cache_generation.get_generations(db, [GLOBAL_SCOPE])[GLOBAL_SCOPE] == 0
+
+
+def test_master_write_bumps_global_generation(db: Session) -> None:
+    """マスタの書き込みで全体の世代が進む"""
+    crud.location.create(db, obj_in=LocationCreate(name="世代テスト"))
+
+    assert crud.cache_generation.get_month_token(db, 2025, 4)[0] == 1
+
+
+def test_day_data_detects_write_from_other_worker(db: Session) -> None:
+    """別ワーカーでの書き込み (ローカルキャッシュは無効化されない) を世代の比較で検出する"""
+    group = crud.group.create(db, obj_in=GroupCreate(name="世代グループ"))
+    user_type = crud.user_type.create(db, obj_in=UserTypeCreate(name="世代種別"))
+    crud.user.create(
+        db,
+        obj_in=UserCreate(id="gen_user", username="世代ユーザー", group_id=int(group.id), user_type_id=int(user_type.id)),
+    )
+    location = crud.location.create(db, obj_in=LocationCreate(name="世代オフィス"))
+    target = date(2025, 4, 10)
+
+    assert crud.attendance.get_day_data(db, day=target.isoformat()) == {}
+
+    # 別プロセスの書き込みを再現: データと世代のみを更新し、このプロセスのキャッシュには触れない
+    user = db.query(User).filter(User.id == "gen_user").one()
+    db.add(Attendance(user_id=user.id, date=target, location_id=int(location.id)))
+    crud.cache_generation.bump(db, month_scope(target.year, target.month))
+    db.commit()
+    assert calendar_cache.get_cache_info()["entries"] == 1
+
+    day_data = crud.attendance.get_day_data(db, day=target.isoformat())
+    assert [entry["user_id"] for entry in day_data[str(location.name)]] == ["gen_user"]
+
+
+def test_mark_dates_changed_bumps_each_month_once(db: Session) -> None:
+    """複数日の変更をまとめて記録すると、月ごとに世代が1回だけ進む"""
+    crud.cache_generation.mark_dates_changed(
+        db, [date(2025, 4, 1), date(2025, 4, 2), date(2025, 4, 30), date(2025, 5, 1)]
+    )
+    db.commit()
+
+    assert crud.cache_generation.get_month_token(db, 2025, 4) == (0, 1)
+    assert crud.cache_generation.get_month_token(db, 2025, 5) == (0, 1)
+
+
+def test_mark_dates_changed_bumps_only_changed_days(db: Session) -> None:
+    """日単位の世代は変更のあった日だけ進む"""
+    crud.cache_generation.mark_dates_changed(db, [date(2025, 4, 1), date(2025, 4, 1)])
+    crud.cache_generation.mark_date_changed(db, date(2025, 4, 2))
+    db.commit()
+
+    generations = crud.cache_generation.get_generations(
+        db, [day_scope(date(2025, 4, d)) for d in (1, 2, 3)]
+    )
+    assert list(generations.values()) == [1, 1, 0]
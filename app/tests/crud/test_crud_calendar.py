@@ -132,4 +132,26 @@ def test_get_month_attendance_counts(db_with_calendar_test_data: Session) -> Non
       if 1 >= first_day.day and 1 <= last_day.day: expected_days_with_data += 1
       if 2 >= first_day.day and 2 <= last_day.day: expected_days_with_data += 1
       if today.day > 2 and today.day >= first_day.day and today.day <= last_day.day: expected_days_with_data += 1
-    assert len(counts) == expected_days_with_data 
\ No newline at end of file
+    assert len(counts) == expected_days_with_data 
+
+async def test_async_month_queries_match_sync(db_with_calendar_test_data: Session, async_session_factory) -> None:
+    """非同期版の月次取得が同期版と同じ結果を返すことを確認"""
+    db = db_with_calendar_test_data
+    today = date.today()
+    first_day = date(today.year, today.month, 1)
+    last_day = (first_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+    sync_ids = sorted(att.id for att in calendar_crud.get_month_attendances(db, first_day=first_day, last_day=last_day))
+    sync_counts = calendar_crud.get_month_attendance_counts(db, first_day=first_day, last_day=last_day)
+
+    async with async_session_factory() as async_db:
+        async_attendances = await calendar_crud.get_month_attendances_async(
+            async_db, first_day=first_day, last_day=last_day
+        )
+        async_counts = await calendar_crud.get_month_attendance_counts_async(
+            async_db, first_day=first_day, last_day=last_day
+        )
+
+    assert sorted(att.id for att in async_attendances) == sync_ids
+    assert async_counts == sync_counts
+    assert sync_ids
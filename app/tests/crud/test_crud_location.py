@@ -47,4 +47,18 @@ def test_remove_location(db: Session) -> None:
     location_after_remove = crud.location.get(db=db, id=location_id)
 
     assert removed_location.id == location_id
-    assert location_after_remove is None 
\ No newline at end of file
+    assert location_after_remove is None 
+
+
+def test_get_or_create_multiple(db: Session) -> None:
+    """既存の勤怠種別はそのまま返し、存在しないものだけを作成するテスト"""
+    existing = crud.location.create(db=db, obj_in=LocationCreate(name=random_lower_string()))
+    new_name = random_lower_string()
+
+    result = crud.location.get_or_create_multiple(
+        db, location_names=[str(existing.name), new_name, new_name, "  "]
+    )
+
+    assert set(result) == {existing.name, new_name}
+    assert result[str(existing.name)].id == existing.id
+    assert crud.location.get_by_name(db, name=new_name) is not None
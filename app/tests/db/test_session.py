@@ -4,6 +4,7 @@ db/session.py のテストケース
 
 from pathlib import Path
 from unittest.mock import patch, MagicMock
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import Session
 
 import app.db.session as session_module
@@ -11,6 +12,8 @@ from app.db.session import (
     get_db,
     init_db,
     initialize_database,
+    apply_sqlite_pragmas,
+    get_sqlite_pragmas,
     SessionLocal,
     Base,
     engine,
@@ -49,6 +52,10 @@ class TestDatabaseConfiguration:
         assert Base is not None
         assert hasattr(Base, 'metadata')
 
+    def test_engine_applies_sqlite_pragmas_on_connect(self) -> None:
+        """エンジンの接続イベントにPRAGMA適用処理が登録されていることを確認"""
+        assert event.contains(engine, "connect", apply_sqlite_pragmas)
+
     def test_legacy_db_path_removed(self) -> None:
         """旧DBパス互換の定数が存在しないことを確認"""
         assert not hasattr(session_module, "LEGACY_DB_PATH")
@@ -257,3 +264,39 @@ class TestInitializeDatabaseSeeding:
         mock_init_db.assert_called_once()
         mock_seed_database.assert_not_called()
         mock_logger.info.assert_any_call("データベースの初期化が正常に完了しました。")
+
+
+class TestSqlitePragmas:
+    """SQLite PRAGMA 適用のテスト"""
+
+    def test_default_pragmas(self) -> None:
+        """既定のPRAGMA設定がWAL向けの値になっていることを確認"""
+        pragmas = dict(get_sqlite_pragmas())
+
+        assert pragmas["journal_mode"] == "WAL"
+        assert pragmas["synchronous"] == "NORMAL"
+        assert pragmas["temp_store"] == "MEMORY"
+        assert pragmas["busy_timeout"] == 5000
+        assert pragmas["cache_size"] < 0  # KiB 指定
+
+    def test_pragmas_applied_to_file_database(self, tmp_path: Path) -> None:
+        """ファイルDBへの接続ごとにPRAGMAが適用されることを確認"""
+        file_engine = create_engine(f"sqlite:///{tmp_path / 'pragma.db'}")
+        event.listen(file_engine, "connect", apply_sqlite_pragmas)
+        try:
+            with file_engine.connect() as conn:
+                assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+                assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+                assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+                assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        finally:
+            file_engine.dispose()
+
+    def test_invalid_choice_falls_back_to_default(self) -> None:
+        """選択肢にない環境変数の値は既定値にフォールバックすることを確認"""
+        from app.core.config import _get_choice_env
+
+        with patch.dict("os.environ", {"SOKORA_SQLITE_JOURNAL_MODE": "bogus"}):
+            assert _get_choice_env("SOKORA_SQLITE_JOURNAL_MODE", "WAL", ("WAL", "DELETE")) == "WAL"
+        with patch.dict("os.environ", {"SOKORA_SQLITE_JOURNAL_MODE": "delete"}):
+            assert _get_choice_env("SOKORA_SQLITE_JOURNAL_MODE", "WAL", ("WAL", "DELETE")) == "DELETE"
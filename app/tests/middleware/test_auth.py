@@ -0,0 +1,80 @@
+"""
+middleware/auth.py のテストケース
+"""
+
+import dataclasses
+from typing import Any, Dict, List, Optional
+
+from starlette.types import Message, Receive, Scope, Send
+
+from app.middleware.auth import AuthRequiredMiddleware
+from app.services.auth.settings import AuthSettings
+
+
+def _settings(auth_enabled: bool = True) -> AuthSettings:
+    return dataclasses.replace(AuthSettings.from_env(), auth_enabled=auth_enabled)
+
+
+async def _inner_app(scope: Scope, receive: Receive, send: Send) -> None:
+    """ストリーミングで3チャンクを返すアプリケーション"""
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/csv")]})
+    for i in range(3):
+        await send({"type": "http.response.body", "body": f"row{i}\n".encode(), "more_body": True})
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def _call(
+    path: str,
+    *,
+    session: Optional[Dict[str, Any]] = None,
+    query_string: bytes = b"",
+    auth_enabled: bool = True,
+) -> List[Message]:
+    middleware = AuthRequiredMiddleware(_inner_app, settings_provider=lambda: _settings(auth_enabled))
+    scope: Scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "root_path": "",
+        "query_string": query_string,
+        "headers": [],
+        "session": session or {},
+    }
+    messages: List[Message] = []
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages
+
+
+def _header(message: Message, name: bytes) -> Optional[bytes]:
+    return dict(message["headers"]).get(name)
+
+
+async def test_authenticated_stream_is_passed_through() -> None:
+    """認証済みのリクエストではレスポンスのチャンクがそのまま送られる"""
+    messages = await _call("/api/v1/csv/download", session={"auth": {"username": "u"}})
+
+    assert messages[0]["status"] == 200
+    assert [m["body"] for m in messages[1:]] == [b"row0\n", b"row1\n", b"row2\n", b""]
+
+
+async def test_exempt_prefix_and_disabled_guard_pass_through() -> None:
+    """除外パスと認証無効時は未認証でも通す"""
+    assert (await _call("/static/js/main.js"))[0]["status"] == 200
+    assert (await _call("/attendance", auth_enabled=False))[0]["status"] == 200
+
+
+async def test_unauthenticated_requests_are_rejected() -> None:
+    """未認証の API は 401、画面はクエリ付きの遷移先を保ったままログインへリダイレクトする"""
+    api = await _call("/api/v1/locations")
+    assert api[0]["status"] == 401
+
+    page = await _call("/calendar", query_string=b"month=2025-04")
+    assert page[0]["status"] == 307
+    assert _header(page[0], b"location") == b"/auth/login?next=/calendar%3Fmonth%3D2025-04&reason=reauth"
@@ -0,0 +1,161 @@
+"""
+middleware/compression.py のテストケース
+"""
+
+import asyncio
+import gzip
+import zlib
+from typing import AsyncGenerator, Iterator, List
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.types import Message
+
+from app.middleware.compression import CompressionMiddleware, choose_encoding
+
+LARGE_HTML = "<tr><td>出社</td></tr>" * 200
+
+
+def _csv_chunks() -> Iterator[bytes]:
+    yield b"user_id,date\n"
+    for i in range(3):
+        yield f"u{i},2025-04-01\n".encode() * 200
+
+
+def _tick_chunks() -> Iterator[bytes]:
+    for i in range(500):
+        yield f"u{i},2025-04-01\n".encode()
+
+
+def _build_app(minimum_size: int = 1024) -> Starlette:
+    async def html(request: Request) -> Response:
+        return HTMLResponse(LARGE_HTML, headers={"ETag": '"abc"'})
+
+    async def small(request: Request) -> Response:
+        return JSONResponse({"ok": True})
+
+    async def csv(request: Request) -> Response:
+        return StreamingResponse(_csv_chunks(), media_type="text/csv")
+
+    async def ticks(request: Request) -> Response:
+        return StreamingResponse(_tick_chunks(), media_type="text/csv")
+
+    async def image(request: Request) -> Response:
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    app = Starlette(
+        routes=[
+            Route("/html", html),
+            Route("/small", small),
+            Route("/csv", csv),
+            Route("/ticks", ticks),
+            Route("/image", image),
+        ]
+    )
+    app.add_middleware(CompressionMiddleware, encodings=("gzip",), minimum_size=minimum_size)
+    return app
+
+
+@pytest_asyncio.fixture
+async def client() -> AsyncGenerator[AsyncClient, None]:
+    transport = ASGITransport(app=_build_app())
+    async with AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+def test_choose_encoding() -> None:
+    """設定の優先順と q 値を考慮してエンコーディングを選ぶことを確認"""
+    assert choose_encoding("gzip, deflate, br", ("br", "gzip")) == "br"
+    assert choose_encoding("gzip, br;q=0", ("br", "gzip")) == "gzip"
+    assert choose_encoding("identity", ("br", "gzip")) is None
+    assert choose_encoding("*", ("gzip",)) == "gzip"
+
+
+async def test_large_html_is_gzipped(client: AsyncClient) -> None:
+    """閾値以上のHTMLが gzip 圧縮され、ヘッダーが調整されることを確認"""
+    response = await client.get("/html", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"abc"'
+    assert int(response.headers["content-length"]) < len(LARGE_HTML.encode())
+    assert response.text == LARGE_HTML
+
+
+async def test_small_or_unaccepted_responses_are_not_compressed(client: AsyncClient) -> None:
+    """閾値未満や Accept-Encoding なしの場合は圧縮しないことを確認"""
+    small = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+    plain = await client.get("/html", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in small.headers
+    assert small.json() == {"ok": True}
+    assert "content-encoding" not in plain.headers
+    assert plain.text == LARGE_HTML
+
+
+async def test_excluded_media_type_is_not_compressed(client: AsyncClient) -> None:
+    """既に圧縮済みの形式 (画像など) は圧縮しないことを確認"""
+    response = await client.get("/image", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.content == b"\x89PNG" * 1000
+
+
+async def _stream(path: str) -> List[Message]:
+    """ミドルウェアを直接呼び出し、送信された ASGI メッセージを返す"""
+    messages: List[Message] = []
+
+    async def receive() -> Message:
+        # 切断の監視は応答完了時にキャンセルされるため、ここでは待ち続ける
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "headers": [(b"accept-encoding", b"gzip")],
+    }
+    await _build_app()(scope, receive, send)
+    return messages
+
+
+async def test_streaming_csv_is_flushed_per_chunk() -> None:
+    """StreamingResponse が閾値以上のチャンクごとに展開可能な形で送られることを確認"""
+    messages = await _stream("/csv")
+
+    start = messages[0]
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+
+    header, *rows = list(_csv_chunks())
+    bodies = [m for m in messages[1:] if m["type"] == "http.response.body"]
+    decompressor = zlib.decompressobj(31)
+    # 閾値未満の先頭行は次のチャンクとまとめられ、以降は各時点で受信済みの行まで展開できる
+    expected = [header + rows[0], *rows[1:], b""]
+    assert [decompressor.decompress(m["body"]) for m in bodies] == expected
+    assert bodies[-1]["more_body"] is False
+    assert gzip.decompress(b"".join(m["body"] for m in bodies)) == header + b"".join(rows)
+
+
+async def test_small_streaming_chunks_are_coalesced() -> None:
+    """小さなチャンクを大量に送るストリームは、チャンク数よりずっと少ないフレームで送られる"""
+    messages = await _stream("/ticks")
+
+    bodies = [m for m in messages[1:] if m["type"] == "http.response.body"]
+    chunks = list(_tick_chunks())
+    total = sum(len(chunk) for chunk in chunks)
+    # 閾値 (1024 バイト) ごとの flush と最後の終端のみ
+    assert len(bodies) <= total // 1024 + 2
+    assert len(bodies) < len(chunks) // 10
+    assert gzip.decompress(b"".join(m["body"] for m in bodies)) == b"".join(chunks)
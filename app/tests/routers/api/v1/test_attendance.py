@@ -1,6 +1,8 @@
 """
 勤怠APIエンドポイント (/api/v1/attendances) のテスト
 """
+import json
+
 import pytest
 from httpx import AsyncClient
 from fastapi import status
@@ -461,4 +463,281 @@ async def test_delete_attendance_by_user_date_invalid_date(async_client: AsyncCl
 
 # ... (他の PUT テスト) ...
 
-# ... (他の DELETE テスト) ... 
\ No newline at end of file
+# ... (他の DELETE テスト) ... 
+
+# --- GET /api/v1/attendances (ページング・絞り込み・ストリーミング) Tests ---
+
+@pytest.fixture
+def paged_attendance_data(db) -> dict:
+    """2グループ・3ユーザー・2勤怠種別で10日分の勤怠を投入"""
+    from app import crud
+    from app.schemas.attendance import AttendanceCreate
+    from app.schemas.group import GroupCreate
+    from app.schemas.location import LocationCreate
+    from app.schemas.user import UserCreate
+    from app.schemas.user_type import UserTypeCreate
+
+    group_a = crud.group.create(db, obj_in=GroupCreate(name="PageGroupA"))
+    group_b = crud.group.create(db, obj_in=GroupCreate(name="PageGroupB"))
+    user_type = crud.user_type.create(db, obj_in=UserTypeCreate(name="PageType"))
+    office = crud.location.create(db, obj_in=LocationCreate(name="PageOffice"))
+    remote = crud.location.create(db, obj_in=LocationCreate(name="PageRemote"))
+    for user_id, group in [("page_a1", group_a), ("page_a2", group_a), ("page_b1", group_b)]:
+        crud.user.create(
+            db, obj_in=UserCreate(id=user_id, username=user_id, group_id=group.id, user_type_id=user_type.id)
+        )
+        for offset in range(10):
+            crud.attendance.upsert_attendance(
+                db,
+                user_id=user_id,
+                date_obj=date(2025, 1, 1) + timedelta(days=offset),
+                location_id=int(office.id if offset % 2 == 0 else remote.id),
+            )
+    db.commit()
+    return {"group_a": group_a.id, "office": office.id, "remote": remote.id}
+
+
+async def test_get_attendances_keyset_pagination(async_client: AsyncClient, paged_attendance_data: dict) -> None:
+    """カーソルをたどると全件を (date, id) 順に重複・欠落なく取得できる"""
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 7}
+        if cursor:
+            params["cursor"] = cursor
+        response = await async_client.get("/api/v1/attendances", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        seen.extend((record["date"], record["id"]) for record in body["records"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 5  # 30件を7件ずつ
+    assert len(seen) == 30
+    assert seen == sorted(seen)
+    assert len(set(seen)) == 30
+
+
+async def test_get_attendances_filters(async_client: AsyncClient, paged_attendance_data: dict) -> None:
+    """期間・グループ・ユーザー・勤怠種別で絞り込める"""
+    response = await async_client.get(
+        "/api/v1/attendances",
+        params={
+            "start_date": "2025-01-03",
+            "end_date": "2025-01-06",
+            "group_id": paged_attendance_data["group_a"],
+            "location_id": paged_attendance_data["office"],
+        },
+    )
+    records = response.json()["records"]
+    assert {(r["user_id"], r["date"]) for r in records} == {
+        (user_id, day) for user_id in ("page_a1", "page_a2") for day in ("2025-01-03", "2025-01-05")
+    }
+
+    response = await async_client.get("/api/v1/attendances", params={"user_id": "page_b1"})
+    assert {r["user_id"] for r in response.json()["records"]} == {"page_b1"}
+    assert len(response.json()["records"]) == 10
+
+
+async def test_get_attendances_ndjson_stream(async_client: AsyncClient, paged_attendance_data: dict) -> None:
+    """NDJSON 形式では全件が1行1レコードで返り、カーソルから再開できる"""
+    response = await async_client.get("/api/v1/attendances", params={"format": "ndjson"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 30
+    assert [(r["date"], r["id"]) for r in lines] == sorted((r["date"], r["id"]) for r in lines)
+
+    first_page = (await async_client.get("/api/v1/attendances", params={"limit": 10})).json()
+    resumed = await async_client.get(
+        "/api/v1/attendances",
+        params={"cursor": first_page["next_cursor"], "limit": 5},
+        headers={"Accept": "application/x-ndjson"},
+    )
+    resumed_ids = [json.loads(line)["id"] for line in resumed.text.splitlines()]
+    assert resumed_ids == [r["id"] for r in lines[10:15]]
+
+
+async def test_iter_ndjson_chunks_groups_rows(db, paged_attendance_data: dict) -> None:
+    """NDJSON は1行ずつではなく指定行数ごとにまとめて書き出される"""
+    from app.crud.attendance import attendance as crud_attendance
+    from app.routers.api.v1.attendance import iter_ndjson_chunks
+
+    rows = crud_attendance.iter_filtered(db, batch_size=7)
+    chunks = list(iter_ndjson_chunks(rows, chunk_rows=8))
+    assert [chunk.count(b"\n") for chunk in chunks] == [8, 8, 8, 6]
+
+    limited = list(iter_ndjson_chunks(crud_attendance.iter_filtered(db, batch_size=7), limit=10, chunk_rows=8))
+    assert [chunk.count(b"\n") for chunk in limited] == [8, 2]
+
+
+async def test_get_attendances_invalid_cursor(async_client: AsyncClient) -> None:
+    """不正なカーソルは 400 を返す"""
+    response = await async_client.get("/api/v1/attendances", params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+# --- POST /api/v1/attendances/bulk Tests ---
+
+async def test_bulk_apply_reports_each_operation(
+    async_client: AsyncClient, paged_attendance_data: dict, db
+) -> None:
+    """一括登録で作成・更新・削除・エラーが操作ごとに報告され、有効な操作のみ適用される"""
+    from app import crud
+    from app.models import AttendanceSummary
+
+    office = paged_attendance_data["office"]
+    payload = {
+        "operations": [
+            {"user_id": "page_a1", "date": "2025-02-01", "location_id": office, "note": "新規"},
+            {"user_id": "page_a1", "date": "2025-01-02", "location_id": office},
+            {"user_id": "page_a2", "date": "2025-01-01", "location_id": None},
+            {"user_id": "page_a2", "date": "2025-03-01", "location_id": -1},
+            {"user_id": "missing", "date": "2025-01-01", "location_id": office},
+            {"user_id": "page_b1", "date": "2025-01-01", "location_id": 99999},
+        ]
+    }
+
+    response = await async_client.post("/api/v1/attendances/bulk", json=payload)
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert [r["status"] for r in body["results"]] == [
+        "created", "updated", "deleted", "unchanged", "error", "error"
+    ]
+    assert (body["created"], body["updated"], body["deleted"], body["failed"]) == (1, 1, 1, 2)
+    assert body["applied"] is True
+
+    created = crud.attendance.get_by_user_and_date(db, user_id="page_a1", date=date(2025, 2, 1))
+    assert created is not None and created.note == "新規"
+    assert crud.attendance.get_by_user_and_date(db, user_id="page_a1", date=date(2025, 1, 2)).location_id == office
+    assert crud.attendance.get_by_user_and_date(db, user_id="page_a2", date=date(2025, 1, 1)) is None
+    # 月次集計も同じトランザクションで更新されている
+    feb = db.query(AttendanceSummary).filter(
+        AttendanceSummary.user_id == "page_a1", AttendanceSummary.month == date(2025, 2, 1)
+    ).one()
+    assert feb.days == 1
+
+
+async def test_bulk_apply_counts_final_state_for_duplicate_keys(
+    async_client: AsyncClient, paged_attendance_data: dict, db
+) -> None:
+    """同じユーザー・日付への複数の操作は、件数を書き込む最終状態と適用前の状態の差で数える"""
+    from app import crud
+
+    office, remote = paged_attendance_data["office"], paged_attendance_data["remote"]
+    payload = {
+        "operations": [
+            # 新規作成した行をさらに更新 → 作成1件
+            {"user_id": "page_a1", "date": "2025-02-10", "location_id": office},
+            {"user_id": "page_a1", "date": "2025-02-10", "location_id": remote},
+            # 新規作成した行を削除 → 何も書き込まない
+            {"user_id": "page_a1", "date": "2025-02-11", "location_id": office},
+            {"user_id": "page_a1", "date": "2025-02-11", "location_id": None},
+            # 既存の行を削除して作り直す → 更新1件
+            {"user_id": "page_a1", "date": "2025-01-03", "location_id": None},
+            {"user_id": "page_a1", "date": "2025-01-03", "location_id": remote},
+            # 既存の行を更新して削除 → 削除1件
+            {"user_id": "page_a1", "date": "2025-01-04", "location_id": remote},
+            {"user_id": "page_a1", "date": "2025-01-04", "location_id": None},
+        ]
+    }
+
+    response = await async_client.post("/api/v1/attendances/bulk", json=payload)
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    # 操作ごとの結果は、それまでの操作を反映した状態に対して報告される
+    assert [r["status"] for r in body["results"]] == [
+        "created", "updated", "created", "deleted", "deleted", "created", "updated", "deleted"
+    ]
+    assert (body["created"], body["updated"], body["deleted"], body["failed"]) == (1, 1, 1, 0)
+
+    assert crud.attendance.get_by_user_and_date(db, user_id="page_a1", date=date(2025, 2, 10)).location_id == remote
+    assert crud.attendance.get_by_user_and_date(db, user_id="page_a1", date=date(2025, 2, 11)) is None
+    assert crud.attendance.get_by_user_and_date(db, user_id="page_a1", date=date(2025, 1, 3)).location_id == remote
+    assert crud.attendance.get_by_user_and_date(db, user_id="page_a1", date=date(2025, 1, 4)) is None
+
+
+async def test_bulk_apply_atomic_rejects_all(async_client: AsyncClient, paged_attendance_data: dict, db) -> None:
+    """atomic 指定時は不正な操作が1件でもあれば何も適用しない"""
+    from app import crud
+
+    payload = {
+        "atomic": True,
+        "operations": [
+            {"user_id": "page_a1", "date": "2025-04-01", "location_id": paged_attendance_data["office"]},
+            {"user_id": "missing", "date": "2025-04-01", "location_id": paged_attendance_data["office"]},
+        ],
+    }
+
+    response = await async_client.post("/api/v1/attendances/bulk", json=payload)
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json()["applied"] is False
+    assert crud.attendance.get_by_user_and_date(db, user_id="page_a1", date=date(2025, 4, 1)) is None
+
+
+# --- 勤怠グリッドのセル差し替え (HTMX) Tests ---
+
+async def test_create_and_update_from_weekly_grid_return_oob_cell(async_client: AsyncClient) -> None:
+    """週次グリッドからの登録・更新では、変更したセルだけを out-of-band で返すことをテストします。"""
+    group_id = await create_test_group_via_api(async_client, "AttTestGroupCell")
+    user_type_id = await create_test_user_type_via_api(async_client, "AttTestUserTypeCell")
+    user_id = await create_test_user_via_api(async_client, "att_user_cell", "Att User Cell", group_id, user_type_id)
+    location_id = await create_test_location_via_api(async_client, "AttTestLocation Cell")
+    other_location_id = await create_test_location_via_api(async_client, "AttTestLocation Cell2")
+
+    test_date = date.today().isoformat()
+    htmx_headers = {"HX-Request": "true", "HX-Current-URL": "http://test/attendance/weekly?week=2025-04-07"}
+
+    response = await async_client.post(
+        "/api/v1/attendances",
+        data={"user_id": user_id, "date": test_date, "location_id": str(location_id)},
+        headers=htmx_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert f'id="att-cell-{user_id}-{test_date}"' in response.text
+    assert 'hx-swap-oob="outerHTML"' in response.text
+    assert "AttTestLocation Cell" in response.text
+    triggers = json.loads(response.headers["HX-Trigger"])
+    assert triggers == {"closeModal": f"attendance-modal-{user_id}-{test_date}"}
+
+    records = (await async_client.get(f"/api/v1/attendances?user_id={user_id}")).json()["records"]
+    response = await async_client.put(
+        f"/api/v1/attendances/{records[0]['id']}",
+        data={"location_id": str(other_location_id), "note": "午後から"},
+        headers=htmx_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "AttTestLocation Cell2" in response.text
+    assert 'data-tip="午後から"' in response.text
+
+
+async def test_delete_from_register_calendar_returns_empty_oob_cell(async_client: AsyncClient) -> None:
+    """個別登録カレンダーからの削除では、空にしたセル (日付入り) を返すことをテストします。"""
+    group_id = await create_test_group_via_api(async_client, "AttTestGroupCellDel")
+    user_type_id = await create_test_user_type_via_api(async_client, "AttTestUserTypeCellDel")
+    user_id = await create_test_user_via_api(async_client, "att_user_cell_del", "Att User Cell Del", group_id, user_type_id)
+    location_id = await create_test_location_via_api(async_client, "AttTestLocation CellDel")
+
+    test_date = date.today().isoformat()
+    await async_client.post(
+        "/api/v1/attendances", data={"user_id": user_id, "date": test_date, "location_id": str(location_id)}
+    )
+
+    response = await async_client.delete(
+        f"/api/v1/attendances?user_id={user_id}&date={test_date}",
+        headers={"HX-Request": "true", "HX-Current-URL": f"http://test/attendance/monthly?user_id={user_id}"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert f'id="reg-cell-{user_id}-{test_date}"' in response.text
+    assert 'data-has-data="false"' in response.text
+    assert "?mode=register" in response.text
+    assert "AttTestLocation CellDel" not in response.text
@@ -312,4 +312,127 @@ async def test_download_csv_invalid_encoding(async_client: AsyncClient) -> None:
     """無効なエンコーディングでリクエストした場合に400エラーが返されることをテストします。"""
     response = await async_client.get("/api/v1/csv/download?encoding=invalid-encoding")
     assert response.status_code == status.HTTP_400_BAD_REQUEST
-    assert "無効なエンコーディングです" in response.json()["detail"] 
\ No newline at end of file
+    assert "無効なエンコーディングです" in response.json()["detail"] 
+
+# --- POST /api/v1/csv/import Tests ---
+
+def _build_import_csv(month_start: date, rows: List[List[str]], days: int = 3) -> str:
+    """取り込みテスト用に、ダウンロードと同じ形式のCSV文字列を組み立てる"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    headers = ["user_name", "user_id", "group_name", "user_type"]
+    headers += [(month_start + timedelta(days=i)).strftime("%Y/%m/%d") for i in range(days)]
+    writer.writerow(headers)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("encoding,codec", [("auto", "shift_jis"), ("utf-8", "utf-8-sig")])
+async def test_import_csv_roundtrip(
+    async_client: AsyncClient, setup_test_users: Dict[str, Any], encoding: str, codec: str
+) -> None:
+    """取り込んだCSVがダウンロードでそのまま再現され、未登録の勤怠種別が作成されることをテストします。"""
+    month_start = (date.today() + relativedelta(months=2)).replace(day=1)
+    month = month_start.strftime("%Y-%m")
+    location_name = setup_test_users["location"]["name"]
+    content = _build_import_csv(month_start, [
+        ["User AX", "user_ax", "", "", location_name, "在宅勤務_取込", ""],
+        ["User BX", "user_bx", "", "", "", location_name, location_name],
+    ])
+
+    response = await async_client.post(
+        f"/api/v1/csv/import?encoding={encoding}",
+        files={"file": ("import.csv", content.encode(codec), "text/csv")},
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    result = response.json()
+    assert result["rows"] == 2
+    assert result["created"] == 4
+    assert result["failed"] == 0
+    assert result["created_locations"] == ["在宅勤務_取込"]
+
+    download = await async_client.get(f"/api/v1/csv/download?month={month}")
+    rows = {row[1]: row for row in csv.reader(io.StringIO(download.text))}
+    assert rows["user_ax"][4:7] == [location_name, "在宅勤務_取込", ""]
+    assert rows["user_bx"][4:7] == ["", location_name, location_name]
+
+    # 同じ内容を再度取り込むと更新扱いになり、件数は増えない
+    response = await async_client.post(
+        f"/api/v1/csv/import?encoding={encoding}",
+        files={"file": ("import.csv", content.encode(codec), "text/csv")},
+    )
+    assert response.json()["updated"] == 4
+    assert response.json()["created"] == 0
+
+
+async def test_import_csv_unknown_user_and_clear_empty(
+    async_client: AsyncClient, setup_test_users: Dict[str, Any]
+) -> None:
+    """存在しないユーザーの行はエラーとして報告され、clear_empty で空セルの勤怠が削除されることをテストします。"""
+    month_start = (date.today() + relativedelta(months=3)).replace(day=1)
+    location_name = setup_test_users["location"]["name"]
+    first = _build_import_csv(month_start, [["User AY", "user_ay", "", "", location_name, location_name, ""]])
+    response = await async_client.post("/api/v1/csv/import", files={"file": ("a.csv", first.encode("utf-8"))})
+    assert response.json()["created"] == 2
+
+    second = _build_import_csv(month_start, [
+        ["User AY", "user_ay", "", "", location_name, "", ""],
+        ["Nobody", "no_such_user", "", "", location_name, "", ""],
+    ])
+    response = await async_client.post(
+        "/api/v1/csv/import?clear_empty=true", files={"file": ("b.csv", second.encode("utf-8"))}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    result = response.json()
+    assert result["deleted"] == 1
+    assert result["failed"] == 1
+    assert result["errors"][0]["row"] == 3
+    assert result["errors"][0]["user_id"] == "no_such_user"
+
+    download = await async_client.get(f"/api/v1/csv/download?month={month_start.strftime('%Y-%m')}")
+    rows = {row[1]: row for row in csv.reader(io.StringIO(download.text))}
+    assert rows["user_ay"][4:7] == [location_name, "", ""]
+
+
+async def test_import_csv_invalid_header(async_client: AsyncClient) -> None:
+    """ヘッダーが不正なCSVを取り込むと400エラーが返されることをテストします。"""
+    content = "name,id\nfoo,bar\n"
+    response = await async_client.post("/api/v1/csv/import", files={"file": ("bad.csv", content.encode("utf-8"))})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "ヘッダー" in response.json()["detail"]
+
+
+async def test_download_csv_date_range_and_group_filter(
+    async_client: AsyncClient, setup_test_users: Dict[str, Any]
+) -> None:
+    """start/end で任意期間を指定し、グループで絞り込んでダウンロードできることをテストします。"""
+    today = date.today()
+    start, end = today - timedelta(days=40), today + timedelta(days=40)
+    group_a_id = setup_test_users["groups"][0]["id"]
+
+    response = await async_client.get(
+        f"/api/v1/csv/download?start={start.isoformat()}&end={end.isoformat()}&group_id={group_a_id}"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert f"work_entries_{start:%Y%m%d}_{end:%Y%m%d}.csv" in response.headers["content-disposition"]
+
+    rows = list(csv.reader(io.StringIO(response.text)))
+    header = rows[0]
+    assert len(header) == 4 + 81
+    assert header[4] == start.strftime("%Y/%m/%d")
+    assert header[-1] == end.strftime("%Y/%m/%d")
+    assert [row[1] for row in rows[1:]] == ["user_ax", "user_ay"]
+    today_column = header.index(today.strftime("%Y/%m/%d"))
+    assert rows[1][today_column] == setup_test_users["location"]["name"]
+
+
+@pytest.mark.parametrize("query", [
+    "start=2024-04-01",
+    "month=2024-04&start=2024-04-01&end=2024-04-30",
+    "start=2024-05-01&end=2024-04-01",
+    "start=2000-01-01&end=2024-12-31",
+])
+async def test_download_csv_invalid_range(async_client: AsyncClient, query: str) -> None:
+    """期間指定が不正な場合に400エラーが返されることをテストします。"""
+    response = await async_client.get(f"/api/v1/csv/download?{query}")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,117 @@
+"""
+勤怠エクスポートAPI (/api/v1/export/attendances) のテスト
+"""
+import csv
+import io
+
+import pytest
+from httpx import AsyncClient
+from fastapi import status
+from datetime import date, timedelta
+
+from app.utils.export_utils import is_columnar_available
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def export_data(db) -> dict:
+    """2グループ・2社員種別・3ユーザーで5日分の勤怠を投入"""
+    from app import crud
+    from app.schemas.group import GroupCreate
+    from app.schemas.location import LocationCreate
+    from app.schemas.user import UserCreate
+    from app.schemas.user_type import UserTypeCreate
+
+    group_a = crud.group.create(db, obj_in=GroupCreate(name="ExportGroupA"))
+    group_b = crud.group.create(db, obj_in=GroupCreate(name="ExportGroupB"))
+    regular = crud.user_type.create(db, obj_in=UserTypeCreate(name="ExportRegular"))
+    contract = crud.user_type.create(db, obj_in=UserTypeCreate(name="ExportContract"))
+    office = crud.location.create(db, obj_in=LocationCreate(name="ExportOffice"))
+    remote = crud.location.create(db, obj_in=LocationCreate(name="ExportRemote"))
+    users = [("exp_a1", group_a, regular), ("exp_a2", group_a, contract), ("exp_b1", group_b, regular)]
+    for user_id, group, user_type in users:
+        crud.user.create(
+            db, obj_in=UserCreate(id=user_id, username=user_id, group_id=group.id, user_type_id=user_type.id)
+        )
+        for offset in range(5):
+            crud.attendance.upsert_attendance(
+                db,
+                user_id=user_id,
+                date_obj=date(2025, 4, 1) + timedelta(days=offset),
+                location_id=int(office.id if offset % 2 == 0 else remote.id),
+                note="午後休" if offset == 1 else None,
+            )
+    db.commit()
+    return {"group_a": group_a.id, "regular": regular.id}
+
+
+async def test_export_long_csv(async_client: AsyncClient, export_data: dict) -> None:
+    """縦持ちCSVが (date, id) 順に1行1レコードで出力され、期間・フィルタが適用される"""
+    response = await async_client.get(
+        "/api/v1/export/attendances",
+        params={"start": "2025-04-02", "end": "2025-04-04", "group_id": export_data["group_a"]},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert "attendances_20250402_20250404.csv" in response.headers["content-disposition"]
+
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["user_id", "date", "location", "note"]
+    assert rows[1:] == [
+        ["exp_a1", "2025-04-02", "ExportRemote", "午後休"],
+        ["exp_a2", "2025-04-02", "ExportRemote", "午後休"],
+        ["exp_a1", "2025-04-03", "ExportOffice", ""],
+        ["exp_a2", "2025-04-03", "ExportOffice", ""],
+        ["exp_a1", "2025-04-04", "ExportRemote", ""],
+        ["exp_a2", "2025-04-04", "ExportRemote", ""],
+    ]
+
+
+async def test_export_long_csv_user_type_filter(async_client: AsyncClient, export_data: dict) -> None:
+    """社員種別で絞り込める"""
+    response = await async_client.get(
+        "/api/v1/export/attendances",
+        params={"start": "2025-04-01", "end": "2025-04-30", "user_type_id": export_data["regular"]},
+    )
+    rows = list(csv.reader(io.StringIO(response.text)))[1:]
+    assert len(rows) == 10
+    assert {row[0] for row in rows} == {"exp_a1", "exp_b1"}
+
+
+async def test_export_invalid_range(async_client: AsyncClient) -> None:
+    """start が end より後の場合は400エラー"""
+    response = await async_client.get(
+        "/api/v1/export/attendances", params={"start": "2025-05-01", "end": "2025-04-01"}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.skipif(is_columnar_available(), reason="pyarrow がインストールされている")
+async def test_export_columnar_requires_pyarrow(async_client: AsyncClient) -> None:
+    """pyarrow が無い環境では parquet / arrow 形式は501エラー"""
+    for export_format in ("parquet", "arrow"):
+        response = await async_client.get(
+            "/api/v1/export/attendances",
+            params={"start": "2025-04-01", "end": "2025-04-30", "format": export_format},
+        )
+        assert response.status_code == status.HTTP_501_NOT_IMPLEMENTED
+
+
+@pytest.mark.parametrize("export_format", ["parquet", "arrow"])
+async def test_export_columnar_roundtrip(async_client: AsyncClient, export_data: dict, export_format: str) -> None:
+    """parquet / arrow 形式の出力を pyarrow で読み戻せる"""
+    pa = pytest.importorskip("pyarrow")
+    response = await async_client.get(
+        "/api/v1/export/attendances",
+        params={"start": "2025-04-01", "end": "2025-04-30", "format": export_format},
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    if export_format == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(pa.BufferReader(response.content))
+    else:
+        table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == ["user_id", "date", "location", "note"]
+    assert table.num_rows == 15
+    assert table.column("date")[0].as_py() == date(2025, 4, 1)
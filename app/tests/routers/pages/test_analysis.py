@@ -0,0 +1,69 @@
+import json
+import re
+from datetime import date
+from typing import Dict
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.schemas.group import GroupCreate
+from app.schemas.location import LocationCreate
+from app.schemas.user import UserCreate
+from app.schemas.user_type import UserTypeCreate
+
+
+@pytest.fixture(scope="function")
+def analysis_data(db: Session) -> Dict[str, int]:
+    """年度集計テスト用のユーザー1名と勤怠種別2件、年度をまたぐ勤怠を投入"""
+    group = crud.group.create(db, obj_in=GroupCreate(name="集計画面グループ"))
+    user_type = crud.user_type.create(db, obj_in=UserTypeCreate(name="集計画面種別"))
+    crud.user.create(
+        db,
+        obj_in=UserCreate(id="ANA01", username="集計太郎", group_id=group.id, user_type_id=user_type.id),
+    )
+    office = int(crud.location.create(db, obj_in=LocationCreate(name="集計画面出社")).id)
+    remote = int(crud.location.create(db, obj_in=LocationCreate(name="集計画面在宅")).id)
+    for day, location_id in [
+        (date(2025, 3, 31), office),  # 前年度
+        (date(2025, 4, 1), office),
+        (date(2025, 12, 24), remote),
+        (date(2026, 3, 31), office),
+    ]:
+        crud.attendance.update_user_entry(
+            db, user_id="ANA01", date_str=day.isoformat(), location_id=location_id
+        )
+    return {"office": office, "remote": remote}
+
+
+async def test_year_mode_counts_without_embedding_dates(async_client, analysis_data: Dict[str, int]) -> None:
+    """年度集計は日数を表示し、日付一覧はページに埋め込まない"""
+    response = await async_client.get("/analysis?mode=year&year=2025")
+
+    assert response.status_code == 200
+    assert "集計太郎" in response.text
+    match = re.search(r'<script id="analysis-config" type="application/json">(.*?)</script>', response.text, re.S)
+    assert match is not None
+    config = json.loads(match.group(1))
+    office, remote = str(analysis_data["office"]), str(analysis_data["remote"])
+    assert config["locationCounts"] == {office: {"ANA01": 2}, remote: {"ANA01": 1}}
+    assert config["locationDetails"] == {office: {}, remote: {}}
+    assert "2025-12-24" not in response.text
+
+
+async def test_user_dates_are_bounded_to_fiscal_year(async_client, analysis_data: Dict[str, int]) -> None:
+    """展開時の日付一覧は指定ユーザー・指定年度の分だけを返す"""
+    response = await async_client.get("/analysis/dates", params={"user_id": "ANA01", "year": 2025})
+
+    assert response.status_code == 200
+    dates = response.json()["dates"]
+    office, remote = str(analysis_data["office"]), str(analysis_data["remote"])
+    assert [d["date_str"] for d in dates[office]] == ["2025-04-01", "2026-03-31"]
+    assert [d["date_simple"] for d in dates[remote]] == ["12/24"]
+
+    cached = await async_client.get(
+        "/analysis/dates",
+        params={"user_id": "ANA01", "year": 2025},
+        headers={"If-None-Match": response.headers["etag"]},
+    )
+    assert cached.status_code == 304
@@ -0,0 +1,37 @@
+from datetime import date
+
+from app.crud import attendance as crud_attendance
+from app.crud import group as crud_group
+from app.crud import user_type as crud_user_type
+from app.crud import location as crud_location
+from app.crud import user as crud_user
+from app.schemas.attendance import AttendanceCreate
+from app.schemas.group import GroupCreate
+from app.schemas.user_type import UserTypeCreate
+from app.schemas.location import LocationCreate
+from app.schemas.user import UserCreate
+
+
+async def test_weekly_page_shows_only_displayed_week(async_client, db) -> None:
+    """勤怠登録（週次）で表示週のユーザー行と勤怠セルが表示される"""
+    group = crud_group.create(db, obj_in=GroupCreate(name="週次グループ"))
+    user_type = crud_user_type.create(db, obj_in=UserTypeCreate(name="週次種別"))
+    office = crud_location.create(db, obj_in=LocationCreate(name="週次出社"))
+    remote = crud_location.create(db, obj_in=LocationCreate(name="週次在宅"))
+    crud_user.create(
+        db,
+        obj_in=UserCreate(id="W001", username="週次太郎", group_id=int(group.id), user_type_id=int(user_type.id)),
+    )
+    # 2024-12-02 (月) の週に出社、翌週に在宅を登録
+    crud_attendance.create(
+        db, obj_in=AttendanceCreate(user_id="W001", date=date(2024, 12, 3), location_id=int(office.id))
+    )
+    crud_attendance.create(
+        db, obj_in=AttendanceCreate(user_id="W001", date=date(2024, 12, 10), location_id=int(remote.id))
+    )
+
+    response = await async_client.get("/attendance/weekly?week=2024-12-02")
+
+    assert response.status_code == 200
+    assert "週次太郎" in response.text
+    assert "/attendance/modals/W001/2024-12-03" in response.text
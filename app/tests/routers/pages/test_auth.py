@@ -41,7 +41,7 @@ class FakeOIDCClient:
         self.result = result or DummyOIDCResult()
         self.authorization_endpoint = "http://keycloak.example.com/auth"
 
-    def build_authorization_url(
+    async def build_authorization_url(
         self,
         state: str,
         nonce: str,
@@ -60,7 +60,7 @@ class FakeOIDCClient:
         )
         return f"{self.authorization_endpoint}?{query}"
 
-    def exchange_code(
+    async def exchange_code(
         self,
         code: str,
         state: str,
@@ -80,7 +80,7 @@ class RecordingLogoutOIDCClient(FakeOIDCClient):
         self.logout_endpoint = logout_endpoint
         self.last_logout_redirect: str | None = None
 
-    def get_logout_url(self, id_token_hint: str, post_logout_redirect_uri: str) -> str | None:  # type: ignore[override]
+    async def get_logout_url(self, id_token_hint: str, post_logout_redirect_uri: str) -> str | None:  # type: ignore[override]
         self.last_logout_redirect = post_logout_redirect_uri
         query = urllib.parse.urlencode(
             {"id_token_hint": id_token_hint, "post_logout_redirect_uri": post_logout_redirect_uri}
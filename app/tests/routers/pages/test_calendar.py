@@ -0,0 +1,167 @@
+from datetime import date
+from typing import List
+
+from sqlalchemy import event
+
+from app.crud import attendance as crud_attendance
+from app.crud import group as crud_group
+from app.crud import user_type as crud_user_type
+from app.crud import location as crud_location
+from app.crud import user as crud_user
+from app.schemas.attendance import AttendanceCreate
+from app.schemas.group import GroupCreate
+from app.schemas.user_type import UserTypeCreate
+from app.schemas.location import LocationCreate
+from app.schemas.user import UserCreate
+
+
+def _seed_attendance(db) -> None:
+    group = crud_group.create(db, obj_in=GroupCreate(name="カレンダーグループ"))
+    user_type = crud_user_type.create(db, obj_in=UserTypeCreate(name="カレンダー種別"))
+    location = crud_location.create(db, obj_in=LocationCreate(name="在宅"))
+    crud_user.create(
+        db,
+        obj_in=UserCreate(
+            id="CAL01",
+            username="カレンダー花子",
+            group_id=int(group.id),
+            user_type_id=int(user_type.id),
+        ),
+    )
+    crud_attendance.create(
+        db,
+        obj_in=AttendanceCreate(user_id="CAL01", date=date(2024, 11, 5), location_id=int(location.id)),
+    )
+
+
+async def test_calendar_month_uses_async_session(async_client, db) -> None:
+    """月次カレンダーが非同期セッション経由で同期セッションの書き込みを参照できる"""
+    _seed_attendance(db)
+
+    response = await async_client.get("/calendar?month=2024-11")
+
+    assert response.status_code == 200
+    assert "在宅" in response.text
+    assert "2024-11-05" in response.text
+
+
+async def test_day_detail_uses_async_session(async_client, db) -> None:
+    """日別詳細が非同期セッション経由でユーザーとグループを表示できる"""
+    _seed_attendance(db)
+
+    response = await async_client.get("/calendar/day/2024-11-05")
+
+    assert response.status_code == 200
+    assert "カレンダー花子" in response.text
+    assert "カレンダーグループ" in response.text
+
+
+async def test_day_detail_reflects_write_after_cache(async_client, db) -> None:
+    """キャッシュ済みの日別詳細が、その後の書き込みを反映する"""
+    _seed_attendance(db)
+    first = await async_client.get("/calendar/day/2024-11-06")
+    assert "カレンダー花子" not in first.text
+
+    location = crud_location.get_by_name(db, name="在宅")
+    crud_attendance.create(
+        db,
+        obj_in=AttendanceCreate(user_id="CAL01", date=date(2024, 11, 6), location_id=int(location.id)),
+    )
+
+    second = await async_client.get("/calendar/day/2024-11-06")
+    assert "カレンダー花子" in second.text
+
+
+async def _count_day_detail_queries(async_client, async_session_factory, day: str) -> int:
+    """日別詳細の表示中に非同期エンジンへ発行されたSQLの件数を返す"""
+    statements: List[str] = []
+    engine = async_session_factory.kw["bind"].sync_engine
+
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        response = await async_client.get(f"/calendar/day/{day}")
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    assert response.status_code == 200
+    return len(statements)
+
+
+async def test_day_detail_query_count_is_independent_of_headcount(
+    async_client, db, async_session_factory
+) -> None:
+    """日別詳細のクエリ数が出勤者数に比例しない (ユーザーごとの追加クエリが無い)"""
+    _seed_attendance(db)
+    group = crud_group.get_by_name(db, name="カレンダーグループ")
+    user_type = crud_user_type.get_by_name(db, name="カレンダー種別")
+    location = crud_location.get_by_name(db, name="在宅")
+    for i in range(10):
+        crud_user.create(
+            db,
+            obj_in=UserCreate(
+                id=f"CALX{i}", username=f"追加社員{i}", group_id=int(group.id), user_type_id=int(user_type.id)
+            ),
+        )
+        crud_attendance.create(
+            db,
+            obj_in=AttendanceCreate(user_id=f"CALX{i}", date=date(2024, 11, 7), location_id=int(location.id)),
+        )
+
+    single = await _count_day_detail_queries(async_client, async_session_factory, "2024-11-05")
+    many = await _count_day_detail_queries(async_client, async_session_factory, "2024-11-07")
+
+    assert many == single
+    # キャッシュ済みのデータに表示用の項目が書き込まれていない
+    cached = crud_attendance.get_day_data(db, day="2024-11-07")
+    assert all("location_text_class" not in entry for entry in cached["在宅"])
+
+
+async def test_calendar_month_returns_304_until_month_changes(async_client, db) -> None:
+    """月の世代が変わるまでは If-None-Match に対して 304 を返し、書き込み後は再描画する"""
+    _seed_attendance(db)
+    first = await async_client.get("/calendar?month=2024-11")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    cached = await async_client.get("/calendar?month=2024-11", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    # 別の月への書き込みでは ETag は変わらない
+    location = crud_location.get_by_name(db, name="在宅")
+    crud_attendance.create(
+        db,
+        obj_in=AttendanceCreate(user_id="CAL01", date=date(2024, 12, 2), location_id=int(location.id)),
+    )
+    other_month = await async_client.get("/calendar?month=2024-11", headers={"If-None-Match": etag})
+    assert other_month.status_code == 304
+
+    crud_attendance.create(
+        db,
+        obj_in=AttendanceCreate(user_id="CAL01", date=date(2024, 11, 6), location_id=int(location.id)),
+    )
+    changed = await async_client.get("/calendar?month=2024-11", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert "2024-11-06" in changed.text
+
+
+async def test_day_detail_etag_tracks_only_that_day(async_client, db) -> None:
+    """日別詳細の ETag はその日の書き込みでのみ変わる"""
+    _seed_attendance(db)
+    first = await async_client.get("/calendar/day/2024-11-05")
+    etag = first.headers["etag"]
+
+    location = crud_location.get_by_name(db, name="在宅")
+    crud_attendance.create(
+        db,
+        obj_in=AttendanceCreate(user_id="CAL01", date=date(2024, 11, 7), location_id=int(location.id)),
+    )
+    same_month = await async_client.get("/calendar/day/2024-11-05", headers={"If-None-Match": etag})
+    assert same_month.status_code == 304
+
+    crud_location.create(db, obj_in=LocationCreate(name="出張"))
+    master_changed = await async_client.get("/calendar/day/2024-11-05", headers={"If-None-Match": etag})
+    assert master_changed.status_code == 200
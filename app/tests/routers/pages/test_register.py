@@ -32,3 +32,47 @@ async def test_register_user_calendar_partial(async_client, db) -> None:
     assert 'id="user-calendar"' in response.text
     # 1日目のセルに対するモーダル呼び出しURL（パスプレフィックスなし）を確認
     assert "/attendance/modals/U001/2024-12-01" in response.text
+
+
+async def test_register_page_lists_users_by_group(async_client, db) -> None:
+    """勤怠登録（個別）の一覧にグループ・社員種別ごとのユーザーが表示され、検索で絞り込める"""
+    group = crud_group.create(db, obj_in=GroupCreate(name="一覧グループ"))
+    user_type = crud_user_type.create(db, obj_in=UserTypeCreate(name="一覧種別"))
+    for user_id, username in [("L001", "一覧太郎"), ("L002", "一覧花子")]:
+        crud_user.create(
+            db,
+            obj_in=UserCreate(id=user_id, username=username, group_id=int(group.id), user_type_id=int(user_type.id)),
+        )
+
+    response = await async_client.get("/attendance/monthly?month=2024-12")
+    assert response.status_code == 200
+    assert "一覧グループ" in response.text
+    assert "一覧太郎" in response.text and "一覧花子" in response.text
+
+    filtered = await async_client.get("/attendance/monthly?month=2024-12&search_query=l002")
+    assert "一覧花子" in filtered.text
+    assert "一覧太郎" not in filtered.text
+
+
+async def test_register_user_calendar_conditional_get(async_client, db) -> None:
+    """ユーザーカレンダーは世代が変わるまで 304 を返し、HTMX 用の入れ替え指定も維持する"""
+    group = crud_group.create(db, obj_in=GroupCreate(name="ETagグループ"))
+    user_type = crud_user_type.create(db, obj_in=UserTypeCreate(name="ETag種別"))
+    crud_location.create(db, obj_in=LocationCreate(name="出社"))
+    crud_user.create(
+        db,
+        obj_in=UserCreate(id="U002", username="ETag次郎", group_id=int(group.id), user_type_id=int(user_type.id)),
+    )
+    url = "/attendance/monthly/users/U002?month=2024-12"
+    hx_headers = {"HX-Request": "true"}
+
+    first = await async_client.get(url, headers=hx_headers)
+    etag = first.headers["etag"]
+    cached = await async_client.get(url, headers={**hx_headers, "If-None-Match": etag})
+    # HTMX 以外のリクエストは別の ETag になる
+    plain = await async_client.get(url, headers={"If-None-Match": etag})
+
+    assert cached.status_code == 304
+    assert cached.headers["hx-reswap"] == "outerHTML"
+    assert plain.status_code == 200
+    assert plain.headers["etag"] != etag
@@ -0,0 +1,46 @@
+"""
+services/auth/settings.py のテストケース
+"""
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.services.auth.settings import AuthSettings, AuthSettingsProvider
+
+
+def test_provider_reuses_parsed_settings(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """環境変数・認証状態ファイルが変わらなければ設定を作り直さない"""
+    monkeypatch.setenv("SOKORA_AUTH_STATE_PATH", str(tmp_path / "auth_state.json"))
+    monkeypatch.setenv("SOKORA_AUTH_ENABLED", "true")
+    provider = AuthSettingsProvider()
+
+    with patch.object(AuthSettings, "from_env", wraps=AuthSettings.from_env) as from_env:
+        first = provider()
+        assert provider() is first
+        assert from_env.call_count == 1
+
+        # 環境変数が変わった場合は作り直す
+        monkeypatch.setenv("SOKORA_AUTH_ENABLED", "false")
+        assert provider().auth_enabled is False
+        assert from_env.call_count == 2
+
+
+def test_provider_reloads_when_state_file_changes(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """認証状態ファイルが書き換えられた場合と、明示的に破棄した場合は読み込み直す"""
+    state_path = tmp_path / "auth_state.json"
+    monkeypatch.setenv("SOKORA_AUTH_STATE_PATH", str(state_path))
+    provider = AuthSettingsProvider()
+    assert provider().oidc_toggle_enabled is True
+
+    state_path.write_text(json.dumps({"oidc_enabled": False}), encoding="utf-8")
+    assert provider().oidc_toggle_enabled is False
+
+    with patch.object(AuthSettings, "from_env", wraps=AuthSettings.from_env) as from_env:
+        provider()
+        assert from_env.call_count == 0
+        provider.invalidate()
+        provider()
+        assert from_env.call_count == 1
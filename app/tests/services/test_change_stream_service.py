@@ -0,0 +1,188 @@
+"""
+services/change_stream_service.py のテストケース
+"""
+
+import asyncio
+import datetime
+import json
+from typing import AsyncIterator, Tuple
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.change_bus import ALL_CHANGED, ChangeBus
+from app.models import Attendance
+from app.schemas.group import GroupCreate
+from app.schemas.location import LocationCreate
+from app.schemas.user import UserCreate
+from app.schemas.user_type import UserTypeCreate
+from app.services.change_stream_service import (
+    DayCountsLoader,
+    GenerationWatcher,
+    format_month_token,
+    iter_calendar_events,
+)
+
+
+def _parse_event(frame: str) -> Tuple[str, dict]:
+    """SSE の1イベント分の文字列からイベント名とデータを取り出す"""
+    fields = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+def _add_attendance(db: Session, target: datetime.date) -> str:
+    """勤怠を1件登録し、勤怠種別名を返す"""
+    group = crud.group.create(db, obj_in=GroupCreate(name="配信グループ"))
+    user_type = crud.user_type.create(db, obj_in=UserTypeCreate(name="配信種別"))
+    user = crud.user.create(
+        db,
+        obj_in=UserCreate(id="stream_user", username="配信ユーザー", group_id=int(group.id), user_type_id=int(user_type.id)),
+    )
+    location = crud.location.create(db, obj_in=LocationCreate(name="配信オフィス"))
+    db.add(Attendance(user_id=user.id, date=target, location_id=int(location.id)))
+    db.commit()
+    return str(location.name)
+
+
+async def _month_token(factory: async_sessionmaker, year: int, month: int) -> str:
+    """月の世代トークンを取得する"""
+    async with factory() as db:
+        return format_month_token(await crud.cache_generation.get_month_token_async(db, year, month))
+
+
+async def test_stream_sends_counts_for_changed_days(
+    db: Session, async_session_factory: async_sessionmaker
+) -> None:
+    """表示中の月の変更は、その日の最新の件数として配信される"""
+    target = datetime.date(2025, 4, 10)
+    location_name = _add_attendance(db, target)
+    bus = ChangeBus()
+    events: AsyncIterator[str] = iter_calendar_events(
+        async_session_factory(), year=2025, month=4, bus=bus, heartbeat_seconds=0.05, max_age_seconds=5
+    )
+    try:
+        assert (await events.__anext__()).startswith("retry:")
+
+        # 他の月の変更は無視され、ハートビートだけが送られる
+        bus.publish([datetime.date(2025, 5, 1)])
+        assert await events.__anext__() == ": ping\n\n"
+
+        bus.publish([target, datetime.date(2025, 4, 11)])
+        frame = await events.__anext__()
+        event, data = _parse_event(frame)
+        assert event == "counts"
+        assert data == {"days": {"2025-04-10": {location_name: 1}, "2025-04-11": {}}}
+        token = await _month_token(async_session_factory, 2025, 4)
+        assert frame.startswith(f"id: {token}\n")
+
+        bus.publish(ALL_CHANGED)
+        assert _parse_event(await events.__anext__()) == ("invalidate", {"month": "2025-04"})
+    finally:
+        await events.aclose()
+    assert bus.subscriber_count == 0
+
+
+async def test_day_counts_loader_shares_only_inflight_loads(
+    db: Session, async_session_factory: async_sessionmaker
+) -> None:
+    """同時の取得は共有され、完了後の書き込みは次の取得にすぐ反映される"""
+    target = datetime.date(2025, 4, 10)
+    location_name = _add_attendance(db, target)
+    loader = DayCountsLoader()
+    dates = frozenset([target])
+
+    first, shared = await asyncio.gather(
+        loader.load(async_session_factory(), dates, sequence=1),
+        loader.load(async_session_factory(), dates, sequence=1),
+    )
+    assert first is shared
+    assert first is not None and first[0] == {target: {location_name: 1}}
+
+    # 直後の書き込みでも、完了済みの結果ではなく最新の件数と世代が返る
+    first_user = crud.user.get(db, id="stream_user")
+    crud.user.create(
+        db,
+        obj_in=UserCreate(
+            id="stream_user2",
+            username="配信ユーザー2",
+            group_id=int(first_user.group_id),
+            user_type_id=int(first_user.user_type_id),
+        ),
+    )
+    db.add(Attendance(user_id="stream_user2", date=target, location_id=int(crud.location.get_multi(db)[0].id)))
+    db.commit()
+
+    second = await loader.load(async_session_factory(), dates, sequence=2)
+    assert second is not None
+    assert second[0] == {target: {location_name: 2}}
+    assert second[1] == await _month_token(async_session_factory, 2025, 4) != first[1]
+
+
+async def test_stream_invalidates_when_month_changed_since_last_event(
+    db: Session, async_session_factory: async_sessionmaker
+) -> None:
+    """再接続時に最後に受け取った世代から月が変わっていれば、まず再取得を促す"""
+    stale_token = await _month_token(async_session_factory, 2025, 4)
+    _add_attendance(db, datetime.date(2025, 4, 10))
+    current_token = await _month_token(async_session_factory, 2025, 4)
+
+    for last_event_id, expected in ((stale_token, "invalidate"), (current_token, None)):
+        events = iter_calendar_events(
+            async_session_factory(),
+            year=2025,
+            month=4,
+            last_event_id=last_event_id,
+            bus=ChangeBus(),
+            heartbeat_seconds=0.05,
+            max_age_seconds=5,
+        )
+        try:
+            await events.__anext__()  # retry
+            frame = await events.__anext__()
+            if expected is None:
+                assert frame == ": ping\n\n"
+            else:
+                assert _parse_event(frame)[0] == expected
+        finally:
+            await events.aclose()
+
+
+async def test_generation_watcher_publishes_changes_from_other_workers(
+    db: Session, async_session_factory: async_sessionmaker
+) -> None:
+    """DB の世代の変化 (他ワーカーでの書き込み) のうち、表示中の月の変更が通知バスへ流れる"""
+    bus = ChangeBus()
+    watcher = GenerationWatcher(async_session_factory, interval_seconds=0, bus=bus)
+    subscription = bus.subscribe(month=(2025, 4))
+    try:
+        await watcher.poll_once()  # 基準となる世代を記録
+        crud.cache_generation.mark_dates_changed(db, [datetime.date(2025, 4, 10), datetime.date(2025, 5, 1)])
+        db.commit()
+        await watcher.poll_once()
+        # 表示されていない月の変更は読み取り対象外
+        assert await subscription.get(timeout=1) == frozenset({datetime.date(2025, 4, 10)})
+
+        # 新たに表示され始めた月は最初の確認を基準にし、以降の変更を通知する
+        may = bus.subscribe(month=(2025, 5))
+        await watcher.poll_once()
+        assert await subscription.get(timeout=0.01) is None
+        crud.cache_generation.mark_date_changed(db, datetime.date(2025, 5, 2))
+        db.commit()
+        await watcher.poll_once()
+        assert await subscription.get(timeout=1) == frozenset({datetime.date(2025, 5, 2)})
+        may.close()
+
+        crud.cache_generation.mark_all_changed(db)
+        db.commit()
+        await watcher.poll_once()
+        assert await subscription.get(timeout=1) is ALL_CHANGED
+    finally:
+        subscription.close()
+
+
+async def test_stream_endpoint_rejects_invalid_month(async_client: AsyncClient) -> None:
+    """月の形式が無効な場合は 400 を返す"""
+    response = await async_client.get("/calendar/stream?month=2025-13")
+    assert response.status_code == 400
@@ -0,0 +1,217 @@
+"""
+services/auth/oidc.py のテストケース (ローカルのスタブ IdP を使用)
+"""
+
+import base64
+import dataclasses
+import json
+import time
+from typing import Any, AsyncGenerator, Dict, List
+
+import httpx
+import jwt
+import pytest
+import pytest_asyncio
+from cryptography.hazmat.primitives.asymmetric import rsa
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from app.services.auth.oidc import OIDCClient, OIDCError, OIDCMetadataCache
+from app.services.auth.settings import AuthSettings
+
+ISSUER = "http://idp.test/realms/sokora"
+CLIENT_ID = "sokora-web"
+CLIENT_SECRET = "sokora-web-client-secret-for-tests"
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+class StubIdP:
+    """Discovery・JWKS・トークン・UserInfo を返すスタブ IdP"""
+
+    def __init__(self, kid: str, key: rsa.RSAPrivateKey) -> None:
+        self.keys: Dict[str, rsa.RSAPrivateKey] = {kid: key}
+        self.signing_kid = kid
+        self.hits: Dict[str, int] = {}
+        self.claims_override: Dict[str, Any] = {}
+        self.nonce = ""
+        self.app = Starlette(
+            routes=[
+                Route("/realms/sokora/.well-known/openid-configuration", self.discovery),
+                Route("/realms/sokora/certs", self.jwks),
+                Route("/realms/sokora/token", self.token, methods=["POST"]),
+                Route("/realms/sokora/userinfo", self.userinfo),
+            ]
+        )
+
+    def _hit(self, name: str) -> None:
+        self.hits[name] = self.hits.get(name, 0) + 1
+
+    def rotate(self, kid: str, key: rsa.RSAPrivateKey) -> None:
+        """新しい鍵を追加し、以降はその鍵で署名する"""
+        self.keys[kid] = key
+        self.signing_kid = kid
+
+    def sign(self, claims: Dict[str, Any]) -> str:
+        return jwt.encode(claims, self.keys[self.signing_kid], algorithm="RS256", headers={"kid": self.signing_kid})
+
+    async def discovery(self, request: Request) -> Response:
+        self._hit("discovery")
+        return JSONResponse(
+            {
+                "issuer": ISSUER,
+                "authorization_endpoint": f"{ISSUER}/auth",
+                "token_endpoint": f"{ISSUER}/token",
+                "userinfo_endpoint": f"{ISSUER}/userinfo",
+                "end_session_endpoint": f"{ISSUER}/logout",
+                "jwks_uri": f"{ISSUER}/certs",
+            }
+        )
+
+    async def jwks(self, request: Request) -> Response:
+        self._hit("jwks")
+        keys: List[Dict[str, Any]] = [
+            {**jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key(), as_dict=True), "kid": kid, "use": "sig", "alg": "RS256"}
+            for kid, key in self.keys.items()
+        ]
+        return JSONResponse({"keys": keys})
+
+    async def token(self, request: Request) -> Response:
+        self._hit("token")
+        claims = {
+            "iss": ISSUER,
+            "aud": CLIENT_ID,
+            "sub": "kc-user-1",
+            "preferred_username": "taro",
+            "nonce": self.nonce,
+            "exp": int(time.time()) + 300,
+            **self.claims_override,
+        }
+        return JSONResponse({"access_token": "access", "id_token": self.sign(claims), "refresh_token": "refresh"})
+
+    async def userinfo(self, request: Request) -> Response:
+        self._hit("userinfo")
+        return JSONResponse({"sub": "kc-user-1", "preferred_username": "taro-userinfo"})
+
+
+@pytest.fixture(scope="module")
+def idp_keys() -> Dict[str, rsa.RSAPrivateKey]:
+    """鍵の生成は時間がかかるため、モジュール内で使い回す"""
+    return {kid: rsa.generate_private_key(public_exponent=65537, key_size=2048) for kid in ("k1", "k2")}
+
+
+@pytest.fixture
+def idp(idp_keys: Dict[str, rsa.RSAPrivateKey]) -> StubIdP:
+    return StubIdP("k1", idp_keys["k1"])
+
+
+@pytest_asyncio.fixture
+async def oidc_client(idp: StubIdP) -> AsyncGenerator[OIDCClient, None]:
+    settings = dataclasses.replace(
+        AuthSettings.from_env(),
+        oidc_issuer=ISSUER,
+        oidc_client_id=CLIENT_ID,
+        oidc_client_secret=CLIENT_SECRET,
+        oidc_redirect_uri="http://test/auth/callback",
+        oidc_toggle_enabled=True,
+        authorization_endpoint_override=None,
+        token_endpoint_override=None,
+        userinfo_endpoint_override=None,
+        logout_endpoint_override=None,
+        oidc_metadata_cache_seconds=3600.0,
+    )
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=idp.app)) as http_client:
+        yield OIDCClient(settings, http_client=http_client, cache=OIDCMetadataCache(jwks_min_refresh_seconds=0))
+
+
+async def test_login_uses_discovery_and_validates_id_token_locally(oidc_client: OIDCClient, idp: StubIdP) -> None:
+    """Discovery のエンドポイントを使い、署名を検証できた ID トークンでは UserInfo を呼ばない"""
+    url = await oidc_client.build_authorization_url(state="s", nonce="n1")
+    assert url.startswith(f"{ISSUER}/auth?")
+
+    idp.nonce = "n1"
+    result = await oidc_client.exchange_code(code="c", state="s", nonce="n1")
+    assert (result.subject, result.username) == ("kc-user-1", "taro")
+
+    idp.nonce = "n2"
+    await oidc_client.exchange_code(code="c", state="s", nonce="n2")
+    logout_url = await oidc_client.get_logout_url("token", "http://test/auth/login")
+
+    assert logout_url is not None and logout_url.startswith(f"{ISSUER}/logout?")
+    # Discovery と JWKS はキャッシュされ、UserInfo への問い合わせは発生しない
+    assert idp.hits == {"discovery": 1, "jwks": 1, "token": 2}
+
+
+async def test_key_rotation_refreshes_jwks(
+    oidc_client: OIDCClient, idp: StubIdP, idp_keys: Dict[str, rsa.RSAPrivateKey]
+) -> None:
+    """未知の鍵 ID で署名された ID トークンを受け取ると JWKS を再取得する"""
+    await oidc_client.exchange_code(code="c", state="s", nonce="")
+    idp.rotate("k2", idp_keys["k2"])
+
+    result = await oidc_client.exchange_code(code="c", state="s", nonce="")
+
+    assert result.username == "taro"
+    assert idp.hits["jwks"] == 2
+    assert "userinfo" not in idp.hits
+
+
+@pytest.mark.parametrize(
+    "override",
+    [
+        {"nonce": "other"},
+        {"aud": "other-client"},
+        {"iss": "http://evil.test"},
+        {"exp": int(time.time()) - 3600},
+    ],
+)
+async def test_invalid_id_token_is_rejected(oidc_client: OIDCClient, idp: StubIdP, override: Dict[str, Any]) -> None:
+    """クレームが一致しない ID トークンはログインを失敗させる"""
+    idp.nonce = "n1"
+    idp.claims_override = override
+    with pytest.raises(OIDCError):
+        await oidc_client.exchange_code(code="c", state="s", nonce="n1")
+
+
+async def test_tampered_signature_is_rejected(oidc_client: OIDCClient, idp: StubIdP) -> None:
+    """署名が一致しない ID トークンはログインを失敗させる"""
+    original_sign = idp.sign
+    idp.sign = lambda claims: original_sign(claims)[:-4] + "AAAA"  # type: ignore[method-assign]
+    with pytest.raises(OIDCError):
+        await oidc_client.exchange_code(code="c", state="s", nonce="")
+
+
+async def test_unsupported_algorithm_falls_back_to_userinfo(oidc_client: OIDCClient, idp: StubIdP) -> None:
+    """ローカルで検証できない署名方式の場合は UserInfo で利用者を確認する"""
+    header = _b64url(json.dumps({"alg": "ES256", "kid": "k1"}).encode())
+    payload = _b64url(json.dumps({"iss": ISSUER, "aud": CLIENT_ID, "sub": "kc-user-1"}).encode())
+    idp.sign = lambda claims: f"{header}.{payload}.{_b64url(b'sig')}"  # type: ignore[method-assign]
+
+    result = await oidc_client.exchange_code(code="c", state="s", nonce="")
+
+    assert result.username == "taro-userinfo"
+    assert idp.hits["userinfo"] == 1
+
+
+async def test_hmac_signed_id_token_is_validated_with_client_secret(oidc_client: OIDCClient, idp: StubIdP) -> None:
+    """HS256 の ID トークンはクライアントシークレットで検証し、一致しなければ拒否する"""
+    idp.sign = lambda claims: jwt.encode(claims, CLIENT_SECRET, algorithm="HS256")  # type: ignore[method-assign]
+    result = await oidc_client.exchange_code(code="c", state="s", nonce="")
+    assert result.username == "taro"
+    assert "userinfo" not in idp.hits
+
+    idp.sign = lambda claims: jwt.encode(claims, CLIENT_SECRET[::-1], algorithm="HS256")  # type: ignore[method-assign]
+    with pytest.raises(OIDCError):
+        await oidc_client.exchange_code(code="c", state="s", nonce="")
+
+
+@pytest.mark.parametrize("id_token", ["not-a-jwt", ["a", "b", "c"], {"alg": "none"}])
+async def test_malformed_id_token_is_rejected(oidc_client: OIDCClient, idp: StubIdP, id_token: Any) -> None:
+    """JWT として解釈できない、または文字列でない ID トークンは 500 にならず OIDCError になる"""
+    idp.sign = lambda claims: id_token  # type: ignore[method-assign]
+    with pytest.raises(OIDCError):
+        await oidc_client.exchange_code(code="c", state="s", nonce="")
@@ -326,13 +326,11 @@ class TestCalendarDataBuilding:
         self.attendance_counts = {1: 5}
         self.location_types = ["オフィス", "リモート"]
 
-    @patch('app.utils.calendar_utils.is_holiday')
-    @patch('app.utils.calendar_utils.get_holiday_name')
+    @patch('app.utils.calendar_utils.holidays_in_range')
     @patch('app.utils.calendar_utils.generate_location_data')
-    def test_build_week_calendar_data(self, mock_generate_location_data: Any, mock_get_holiday_name: Any, mock_is_holiday: Any) -> None:
+    def test_build_week_calendar_data(self, mock_generate_location_data: Any, mock_holidays_in_range: Any) -> None:
         """build_week_calendar_data関数のテスト"""
-        mock_is_holiday.return_value = False
-        mock_get_holiday_name.return_value = None
+        mock_holidays_in_range.return_value = {}
         mock_generate_location_data.return_value = [{"id": 1, "name": "オフィス", "count": 5}]
         
         result = build_week_calendar_data(
@@ -349,14 +347,14 @@ class TestCalendarDataBuilding:
         assert "locations" in result
         assert len(result["weeks"]) == 1
         assert len(result["weeks"][0]) == 7
+        # 祝日は週の範囲について1回だけ取得する
+        mock_holidays_in_range.assert_called_once_with(datetime.date(2024, 1, 15), datetime.date(2024, 1, 21))
 
-    @patch('app.utils.calendar_utils.is_holiday')
-    @patch('app.utils.calendar_utils.get_holiday_name')
+    @patch('app.utils.calendar_utils.holidays_in_range')
     @patch('app.utils.calendar_utils.generate_location_data')
-    def test_build_calendar_data(self, mock_generate_location_data: Any, mock_get_holiday_name: Any, mock_is_holiday: Any) -> None:
+    def test_build_calendar_data(self, mock_generate_location_data: Any, mock_holidays_in_range: Any) -> None:
         """build_calendar_data関数のテスト"""
-        mock_is_holiday.return_value = False
-        mock_get_holiday_name.return_value = None
+        mock_holidays_in_range.return_value = {}
         mock_generate_location_data.return_value = [{"id": 1, "name": "オフィス", "count": 5}]
         
         result = build_calendar_data(
@@ -372,13 +370,13 @@ class TestCalendarDataBuilding:
         assert "next_month" in result
         assert "locations" in result
         assert len(result["weeks"]) > 0
+        # 祝日は月の範囲について1回だけ取得する
+        mock_holidays_in_range.assert_called_once_with(datetime.date(2024, 1, 1), datetime.date(2024, 1, 31))
 
-    @patch('app.utils.calendar_utils.is_holiday')
-    @patch('app.utils.calendar_utils.get_holiday_name')
-    def test_build_calendar_data_with_holiday(self, mock_get_holiday_name: Any, mock_is_holiday: Any) -> None:
+    @patch('app.utils.calendar_utils.holidays_in_range')
+    def test_build_calendar_data_with_holiday(self, mock_holidays_in_range: Any) -> None:
         """build_calendar_data関数のテスト（祝日あり）"""
-        mock_is_holiday.side_effect = lambda d: d.day == 1  # 1日を祝日に設定
-        mock_get_holiday_name.side_effect = lambda d: "元日" if d.day == 1 else None
+        mock_holidays_in_range.return_value = {datetime.date(2024, 1, 1): "元日"}  # 1日を祝日に設定
         
         with patch('app.utils.calendar_utils.generate_location_data') as mock_generate_location_data:
             mock_generate_location_data.return_value = []
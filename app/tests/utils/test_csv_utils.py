@@ -9,7 +9,7 @@ from typing import Any
 
 from app.utils.csv_utils import (
     get_available_months, get_date_range_for_month, _generate_date_headers,
-    generate_work_entries_csv_rows
+    generate_work_entries_csv_rows, iter_csv_bytes, _iter_work_entry_rows
 )
 
 
@@ -148,12 +148,11 @@ class TestGenerateWorkEntriesCsvRows:
             ("佐藤花子", "user002", "開発部", "契約社員")
         ]
         
-        mock_crud_attendance.get_attendance_data_for_csv.return_value = {
-            "user001_2024-02-01": "オフィス",
-            "user001_2024-02-02": "リモート",
-            "user002_2024-02-01": "リモート",
-            "user002_2024-02-02": ""
-        }
+        mock_crud_attendance.iter_csv_entries.return_value = iter([
+            ("user001", datetime.date(2024, 2, 1), "オフィス"),
+            ("user001", datetime.date(2024, 2, 2), "リモート"),
+            ("user002", datetime.date(2024, 2, 1), "リモート"),
+        ])
         
         # ジェネレータからリストに変換
         rows = list(generate_work_entries_csv_rows(self.mock_db, "2024-02"))
@@ -182,6 +181,14 @@ class TestGenerateWorkEntriesCsvRows:
         assert rows[2][4] == "リモート"  # 2024/02/01
         assert rows[2][5] == ""  # 2024/02/02
 
+        # 勤怠は対象ユーザー・対象月の範囲で1回だけ問い合わせる
+        mock_crud_attendance.iter_csv_entries.assert_called_once_with(
+            self.mock_db,
+            user_ids=["user001", "user002"],
+            start_date=datetime.date(2024, 2, 1),
+            end_date=datetime.date(2024, 2, 29),
+        )
+
     @patch('app.utils.csv_utils.crud_user')
     @patch('app.utils.csv_utils.crud_attendance')
     def test_generate_work_entries_csv_rows_no_users(self, mock_crud_attendance: Any, mock_crud_user: Any) -> None:
@@ -201,7 +208,7 @@ class TestGenerateWorkEntriesCsvRows:
         mock_crud_user.get_all_users_with_details.return_value = [
             ("テストユーザー", "test001", "テスト部", "テスト")
         ]
-        mock_crud_attendance.get_attendance_data_for_csv.return_value = {}
+        mock_crud_attendance.iter_csv_entries.return_value = iter([])
         
         with patch('app.utils.csv_utils.date') as mock_date:
             mock_date.today.return_value = datetime.date(2024, 3, 15)
@@ -235,7 +242,7 @@ class TestGenerateWorkEntriesCsvRows:
             (None, None, None, None),
             ("田中太郎", "user001", None, "正社員")
         ]
-        mock_crud_attendance.get_attendance_data_for_csv.return_value = {}
+        mock_crud_attendance.iter_csv_entries.return_value = iter([])
         
         rows = list(generate_work_entries_csv_rows(self.mock_db, "2024-01"))
         
@@ -248,4 +255,58 @@ class TestGenerateWorkEntriesCsvRows:
         assert rows[2][0] == "田中太郎"
         assert rows[2][1] == "user001"
         assert rows[2][2] == ""  # None → ""
-        assert rows[2][3] == "正社員" 
\ No newline at end of file
+        assert rows[2][3] == "正社員"
+
+
+class TestIterCsvBytes:
+    """iter_csv_bytes関数のテスト"""
+
+    def test_rows_are_batched_into_chunks(self) -> None:
+        """複数行がまとめて書き出され、連結すると全行のCSVになることを確認"""
+        rows = [["user_name", "user_id"]] + [[f"ユーザー{i}", f"u{i}"] for i in range(100)]
+
+        chunks = list(iter_csv_bytes(iter(rows), "utf-8", chunk_size=256))
+
+        assert 1 < len(chunks) < len(rows)
+        decoded = b"".join(chunks).decode("utf-8").splitlines()
+        assert decoded[0] == "user_name,user_id"
+        assert decoded[-1] == "ユーザー99,u99"
+
+    def test_sjis_encoding(self) -> None:
+        """SJIS指定時はShift_JISでエンコードされることを確認"""
+        chunks = list(iter_csv_bytes(iter([["出社", "在宅"]]), "sjis"))
+
+        assert b"".join(chunks) == "出社,在宅\r\n".encode("shift_jis")
+
+
+class TestIterWorkEntryRows:
+    """_iter_work_entry_rows関数のテスト"""
+
+    @patch('app.utils.csv_utils.crud_user')
+    @patch('app.utils.csv_utils.crud_attendance')
+    def test_users_are_read_in_batches_in_display_order(self, mock_crud_attendance: Any, mock_crud_user: Any) -> None:
+        """ユーザーを区切りごとに問い合わせ、表示順 (ユーザーID順ではない) を保って出力することを確認"""
+        mock_crud_user.get_all_users_with_details.return_value = [
+            ("B", "user_b", "G1", "T"),
+            ("A", "user_a", "G1", "T"),
+            ("C", "user_c", "G2", "T"),
+        ]
+        entries = {
+            "user_b": [("user_b", datetime.date(2024, 4, 2), "在宅")],
+            "user_a": [("user_a", datetime.date(2024, 4, 1), "出社")],
+            "user_c": [],
+        }
+        mock_crud_attendance.iter_csv_entries.side_effect = lambda db, user_ids, **kwargs: iter(
+            [entry for user_id in sorted(user_ids) for entry in entries[user_id]]
+        )
+        dates = [datetime.date(2024, 4, 1), datetime.date(2024, 4, 2)]
+
+        rows = list(_iter_work_entry_rows(MagicMock(spec=Session), dates, group_id=1, batch_size=2))
+
+        assert rows[0][4:] == ["2024/04/01", "2024/04/02"]
+        assert [row[1] for row in rows[1:]] == ["user_b", "user_a", "user_c"]
+        assert rows[1][4:] == ["", "在宅"]
+        assert rows[2][4:] == ["出社", ""]
+        assert rows[3][4:] == ["", ""]
+        assert mock_crud_attendance.iter_csv_entries.call_count == 2
+        assert mock_crud_user.get_all_users_with_details.call_args.kwargs == {"group_id": 1, "user_type_id": None}
@@ -15,7 +15,11 @@ from app.utils.holiday_cache import (
     get_holiday_name,
     get_cache_info,
     refresh_holiday_cache,
+    sync_holiday_cache,
+    check_holiday_updates,
 )
+from app import crud
+from app.crud.cache_generation import CUSTOM_HOLIDAY_SCOPE
 from app.models.custom_holiday import CustomHoliday
 
 
@@ -44,7 +48,9 @@ class TestHolidayCache:
         with patch('builtins.open', mock_open(read_data=json.dumps(cache_data))):
             holiday_cache = HolidayCache()
             
-            assert holiday_cache._cache == cache_data['holidays']
+            assert holiday_cache._cache == {
+                datetime.date.fromisoformat(k): v for k, v in cache_data['holidays'].items()
+            }
             assert holiday_cache._build_time_cache is True
 
     @patch('app.utils.holiday_cache.CACHE_FILE')
@@ -63,7 +69,9 @@ class TestHolidayCache:
         with patch('builtins.open', mock_open(read_data=json.dumps(cache_data))):
             holiday_cache = HolidayCache()
             
-            assert holiday_cache._cache == cache_data['holidays']
+            assert holiday_cache._cache == {
+                datetime.date.fromisoformat(k): v for k, v in cache_data['holidays'].items()
+            }
             assert holiday_cache._build_time_cache is False
 
     @patch('app.utils.holiday_cache.CACHE_FILE')
@@ -90,7 +98,8 @@ class TestHolidayCache:
     def test_is_holiday_true(self) -> None:
         """is_holiday関数のテスト（祝日）"""
         holiday_cache = HolidayCache()
-        holiday_cache._cache = {'2024-01-01': '元日'}
+        holiday_cache._file_cache = {datetime.date(2024, 1, 1): '元日'}
+        holiday_cache._merge_cache()
         
         test_date = datetime.date(2024, 1, 1)
         result = holiday_cache.is_holiday(test_date)
@@ -100,7 +109,8 @@ class TestHolidayCache:
     def test_is_holiday_false(self) -> None:
         """is_holiday関数のテスト（平日）"""
         holiday_cache = HolidayCache()
-        holiday_cache._cache = {'2024-01-01': '元日'}
+        holiday_cache._file_cache = {datetime.date(2024, 1, 1): '元日'}
+        holiday_cache._merge_cache()
         
         test_date = datetime.date(2024, 1, 2)
         result = holiday_cache.is_holiday(test_date)
@@ -110,7 +120,8 @@ class TestHolidayCache:
     def test_get_holiday_name_exists(self) -> None:
         """get_holiday_name関数のテスト（祝日名あり）"""
         holiday_cache = HolidayCache()
-        holiday_cache._cache = {'2024-01-01': '元日'}
+        holiday_cache._file_cache = {datetime.date(2024, 1, 1): '元日'}
+        holiday_cache._merge_cache()
         
         test_date = datetime.date(2024, 1, 1)
         result = holiday_cache.get_holiday_name(test_date)
@@ -120,7 +131,8 @@ class TestHolidayCache:
     def test_get_holiday_name_not_exists(self) -> None:
         """get_holiday_name関数のテスト（祝日名なし）"""
         holiday_cache = HolidayCache()
-        holiday_cache._cache = {'2024-01-01': '元日'}
+        holiday_cache._file_cache = {datetime.date(2024, 1, 1): '元日'}
+        holiday_cache._merge_cache()
         
         test_date = datetime.date(2024, 1, 2)
         result = holiday_cache.get_holiday_name(test_date)
@@ -133,11 +145,12 @@ class TestHolidayCache:
         mock_cache_file.exists.return_value = True
         
         holiday_cache = HolidayCache()
-        holiday_cache._cache = {
-            '2024-01-01': '元日',
-            '2024-05-03': '憲法記念日',
-            '2025-01-01': '元日'
+        holiday_cache._file_cache = {
+            datetime.date(2024, 1, 1): '元日',
+            datetime.date(2024, 5, 3): '憲法記念日',
+            datetime.date(2025, 1, 1): '元日'
         }
+        holiday_cache._merge_cache()
         holiday_cache._build_time_cache = True
         
         result = holiday_cache.get_cache_info()
@@ -148,10 +161,32 @@ class TestHolidayCache:
         assert '2024' in result['years_covered']
         assert '2025' in result['years_covered']
 
+    def test_holidays_in_range(self) -> None:
+        """holidays_in_range関数のテスト（月・年をまたぐ期間）"""
+        holiday_cache = HolidayCache()
+        holiday_cache._file_cache = {
+            datetime.date(2024, 12, 23): '範囲外',
+            datetime.date(2024, 12, 30): '年末休暇',
+            datetime.date(2025, 1, 1): '元日',
+            datetime.date(2025, 1, 13): '成人の日',
+        }
+        holiday_cache._custom_cache = {datetime.date(2024, 12, 31): '社内特別休'}
+        holiday_cache._merge_cache()
+
+        result = holiday_cache.holidays_in_range(datetime.date(2024, 12, 30), datetime.date(2025, 1, 5))
+
+        assert result == {
+            datetime.date(2024, 12, 30): '年末休暇',
+            datetime.date(2024, 12, 31): '社内特別休',
+            datetime.date(2025, 1, 1): '元日',
+        }
+        assert holiday_cache.holidays_in_range(datetime.date(2025, 2, 1), datetime.date(2025, 2, 28)) == {}
+
     def test_get_cache_info_empty_cache(self) -> None:
         """get_cache_info関数のテスト（空のキャッシュ）"""
         holiday_cache = HolidayCache()
-        holiday_cache._cache = {}
+        holiday_cache._file_cache = {}
+        holiday_cache._merge_cache()
         holiday_cache._build_time_cache = False
         
         result = holiday_cache.get_cache_info()
@@ -288,3 +323,51 @@ def test_refresh_holiday_cache_function(db: Session) -> None:
     db.query(CustomHoliday).delete()
     db.commit()
     refresh_holiday_cache(db)
+
+
+def test_sync_holiday_cache_detects_change_from_other_worker(db: Session) -> None:
+    """他ワーカーでのカスタム祝日の変更を世代の比較で検出して再読込する"""
+    refresh_holiday_cache(db)
+    target = datetime.date(2025, 1, 3)
+    assert is_holiday(target) is False
+
+    # 別プロセスの書き込みを再現: このプロセスのキャッシュは更新しない
+    db.add(CustomHoliday(date=target, name="別ワーカー休日"))
+    crud.cache_generation.bump(db, CUSTOM_HOLIDAY_SCOPE)
+    db.commit()
+    assert is_holiday(target) is False
+
+    sync_holiday_cache(db)
+    assert get_holiday_name(target) == "別ワーカー休日"
+
+    # 後続テストへの影響を避けるためにリセット
+    db.query(CustomHoliday).delete()
+    db.commit()
+    refresh_holiday_cache(db)
+
+
+def test_check_holiday_updates_reloads_replaced_file(db: Session, tmp_path: Any) -> None:
+    """祝日キャッシュファイルが差し替えられると読み込み直し、全体の世代を進める"""
+    cache_file = tmp_path / "holidays_cache.json"
+    cache_file.write_text(json.dumps({"holidays": {"2030-01-01": "元日"}, "build_time": True}), encoding="utf-8")
+
+    with patch('app.utils.holiday_cache.CACHE_FILE', cache_file):
+        cache = HolidayCache()
+        with patch('app.utils.holiday_cache._holiday_cache', cache):
+            # 変更が無ければ読み込み直さない
+            assert check_holiday_updates(db) is False
+            assert crud.cache_generation.get_month_token(db, 2030, 1)[0] == 0
+
+            cache_file.write_text(
+                json.dumps({"holidays": {"2030-01-01": "元日", "2030-01-14": "成人の日"}, "build_time": True}),
+                encoding="utf-8",
+            )
+            assert check_holiday_updates(db) is True
+
+            assert cache.get_holiday_name(datetime.date(2030, 1, 14)) == "成人の日"
+            assert crud.cache_generation.get_month_token(db, 2030, 1)[0] == 1
+
+            # 書き込み途中などで読み込めない場合は、読み込み済みのデータを維持する
+            cache_file.write_text('{"holidays": {', encoding="utf-8")
+            assert check_holiday_updates(db) is False
+            assert cache.is_holiday(datetime.date(2030, 1, 14)) is True
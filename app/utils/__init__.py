@@ -14,8 +14,12 @@ from . import ui_utils
 # CSVデータ操作関連ユーティリティ
 from . import csv_utils
 
+# 縦持ち形式 (CSV / Parquet / Arrow) のエクスポート関連ユーティリティ
+from . import export_utils
+
 __all__ = [
     "calendar_utils",
     "ui_utils",
-    "csv_utils"
+    "csv_utils",
+    "export_utils"
 ]
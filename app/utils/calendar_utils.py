@@ -17,7 +17,7 @@ from urllib.parse import urlparse
 
 from app.models.attendance import Attendance # Attendancesの型ヒント用に必要
 from app.utils.ui_utils import generate_location_data
-from app.utils.holiday_cache import is_holiday, get_holiday_name
+from app.utils.holiday_cache import holidays_in_range
 from app.core.config import logger
 
 # --- 設定 ---
@@ -375,6 +375,9 @@ def build_week_calendar_data(
             location_name = str(attendance_record.location_info)
             location_counts[day][location_name] += 1
 
+        # 週の祝日を一括取得
+        holidays = holidays_in_range(week_days[0], week_days[-1])
+
         # カレンダー表示用のデータ構造を構築（1週間分）
         week_data = []
         for day_date in week_days:
@@ -385,14 +388,13 @@ def build_week_calendar_data(
             attendance_count = attendance_counts.get(day, 0)
 
             # 祝日判定と祝日名取得
-            is_holiday_flag = is_holiday(day_date)
-            holiday_name = get_holiday_name(day_date)
+            holiday_name = holidays.get(day_date, "")
 
             day_data = {
                 "day": day,
                 "date": date_str,
                 "has_data": attendance_count > 0,
-                "is_holiday": is_holiday_flag,
+                "is_holiday": day_date in holidays,
                 "holiday_name": holiday_name
             }
 
@@ -460,6 +462,11 @@ def build_calendar_data(
         # 月のカレンダーを生成
         cal = calendar.monthcalendar(year, month_num)
 
+        # 月の祝日を一括取得
+        holidays = holidays_in_range(
+            date(year, month_num, 1), date(year, month_num, calendar.monthrange(year, month_num)[1])
+        )
+
         # 日付をキー、勤怠種別名をサブキーとするネストしたカウント辞書を初期化
         location_counts: DefaultDict[int, DefaultDict[str, int]] = defaultdict(lambda: defaultdict(int))
 
@@ -497,14 +504,13 @@ def build_calendar_data(
                     attendance_count = attendance_counts.get(day, 0)
 
                     # 祝日判定と祝日名取得
-                    is_holiday_flag = is_holiday(current_date)
-                    holiday_name = get_holiday_name(current_date)
+                    holiday_name = holidays.get(current_date, "")
 
                     day_data = {
                         "day": day,
                         "date": date_str,
                         "has_data": attendance_count > 0,
-                        "is_holiday": is_holiday_flag,
+                        "is_holiday": current_date in holidays,
                         "holiday_name": holiday_name
                     }
 
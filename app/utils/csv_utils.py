@@ -5,15 +5,29 @@ CSV変換ユーティリティ
 勤怠データをCSV形式に変換するためのユーティリティ関数を提供します。
 """
 
-from typing import Dict, List, Optional, Tuple, Generator
-from datetime import datetime, date
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple, Generator
+from datetime import datetime, date, timedelta
 import calendar
+import codecs
+import csv
+import io
 from dateutil.relativedelta import relativedelta  # type: ignore
 from sqlalchemy.orm import Session
 
 from app.crud.user import user as crud_user # エイリアス変更
 from app.crud.attendance import attendance as crud_attendance # エイリアス変更
-from app.core.config import logger # loggerを追加
+from app.crud.location import location as crud_location
+from app.core.config import CSV_EXPORT_CHUNK_SIZE, CSV_IMPORT_CHUNK_SIZE, logger # loggerを追加
+from app.schemas.attendance import AttendanceBulkOperation
+
+# 勤怠CSVの先頭に並ぶユーザー情報の列 (以降は YYYY/MM/DD 形式の日付列)
+CSV_USER_COLUMNS = ["user_name", "user_id", "group_name", "user_type"]
+# 取り込み結果に含めるエラーの最大件数
+_MAX_IMPORT_ERRORS = 100
+# CSV出力で1回の勤怠カーソルにまとめるユーザー数
+_EXPORT_USER_BATCH_SIZE = 200
+# エンコーディング自動判定で先読みするバイト数
+_ENCODING_SNIFF_BYTES = 64 * 1024
 
 def get_available_months(num_months: int = 12) -> List[Dict[str, str]]:
     """
@@ -59,99 +73,313 @@ def get_date_range_for_month(month: str) -> Tuple[date, date]:
     
     return start_date, end_date
 
+def _date_range(start_date: date, end_date: date) -> List[date]:
+    """開始日から終了日までの日付のリストを返します。"""
+    return [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+def _generate_dates(month: Optional[str] = None) -> List[date]:
+    """CSVの日付列に対応する日付のリストを昇順で生成します。"""
+    if month:
+        return _date_range(*get_date_range_for_month(month))
+    # 月指定がない場合はデフォルトで過去3ヶ月（約90日）とする
+    # 仕様に応じて調整可能
+    num_days = 90
+    today = date.today()
+    return [today - timedelta(days=i) for i in range(num_days - 1, -1, -1)]
+
 def _generate_date_headers(month: Optional[str] = None) -> List[str]:
     """CSV用の日付ヘッダーリストを生成します。"""
-    today = date.today()
-    if month:
-        start_date, end_date = get_date_range_for_month(month)
-        current_date = start_date
-        date_headers = []
-        while current_date <= end_date:
-            date_headers.append(current_date.strftime("%Y/%m/%d"))
-            current_date += relativedelta(days=1)
-    else:
-        # 月指定がない場合はデフォルトで過去3ヶ月（約90日）とする
-        # 仕様に応じて調整可能
-        num_days = 90 
-        date_headers = [
-            (today - relativedelta(days=i)).strftime("%Y/%m/%d") 
-            for i in range(num_days)
-        ]
-        date_headers.sort() # 日付順にソート
-    return date_headers
+    return [d.strftime("%Y/%m/%d") for d in _generate_dates(month)]
 
-def generate_work_entries_csv_rows(
-    db: Session, month: Optional[str] = None
+def _iter_work_entry_rows(
+    db: Session,
+    dates: List[date],
+    *,
+    group_id: Optional[int] = None,
+    user_type_id: Optional[int] = None,
+    batch_size: int = _EXPORT_USER_BATCH_SIZE,
 ) -> Generator[List[str], None, None]:
     """
-    勤怠データのCSV行を生成するジェネレータ。
+    指定した日付列で勤怠データのCSV行 (ヘッダー行を含む) を生成します。
 
-    Args:
-        db: データベースセッション
-        month: 'YYYY-MM'形式の月文字列（Noneの場合はデフォルト期間）
-
-    Yields:
-        List[str]: CSVの1行を表す文字列リスト（ヘッダー行を含む）
+    ユーザーを表示順に `batch_size` 人ずつ区切り、区切りごとに勤怠をユーザー・日付順の
+    カーソルで読みながら行を組み立てます。保持するのは1区切り分のセルだけのため、
+    期間やユーザー数が増えてもメモリ使用量は一定で、最初の行もすぐに送り出せます。
+    日付→列番号の対応は最初に1回だけ作り、セルごとの日付の解析・整形は行いません。
     """
     try:
-        date_headers = _generate_date_headers(month)
-        headers = ["user_name", "user_id", "group_name", "user_type"] + date_headers
+        headers = CSV_USER_COLUMNS + [d.strftime("%Y/%m/%d") for d in dates]
         yield headers # ヘッダー行をyield
 
         # ユーザーデータを関連情報と共に取得
-        users_data = crud_user.get_all_users_with_details(db)
+        users_data = crud_user.get_all_users_with_details(db, group_id=group_id, user_type_id=user_type_id)
         if not users_data:
             logger.info("CSV生成: 対象ユーザーが見つかりませんでした。")
             return # ユーザーがいなければ終了
+        if not dates:
+            for user_name, user_id, group_name, user_type_name in users_data:
+                yield [user_name or "", user_id or "", group_name or "", user_type_name or ""]
+            return
+
+        logger.debug(f"勤怠データ取得範囲: {dates[0]} - {dates[-1]}")
+        column_of = {d: i for i, d in enumerate(dates)}
+        num_dates = len(dates)
 
-        # 勤怠データの日付範囲を決定
-        date_range_start: Optional[date] = None
-        date_range_end: Optional[date] = None
-        if date_headers: # ヘッダーがあれば範囲を決定
-            try:
-                # ヘッダーは YYYY/MM/DD 形式
-                date_range_start = datetime.strptime(date_headers[0], "%Y/%m/%d").date()
-                date_range_end = datetime.strptime(date_headers[-1], "%Y/%m/%d").date()
-            except (ValueError, IndexError) as e:
-                logger.error(f"日付ヘッダーからの範囲決定に失敗: {e}")
-                # エラーが発生した場合、範囲指定なしで取得 (あるいはエラー終了)
-                pass
-
-        # 勤怠データを一括取得
-        logger.debug(f"勤怠データ取得範囲: {date_range_start} - {date_range_end}")
-        attendance_data = crud_attendance.get_attendance_data_for_csv(
-            db, start_date=date_range_start, end_date=date_range_end
-        )
-        logger.debug(f"取得した勤怠データ件数: {len(attendance_data)}")
-
-        # 各ユーザーについて行を生成
-        for user_name, user_id, group_name, user_type_name in users_data:
-            row_data = [
-                user_name or "",
-                user_id or "",
-                group_name or "",
-                user_type_name or ""
-            ]
-
-            # 各日付列のデータを追加
-            for date_str_header in date_headers:
-                # ヘッダー形式 (YYYY/MM/DD) からDB検索用のキー形式 (YYYY-MM-DD) へ
-                try:
-                    db_date_str = datetime.strptime(date_str_header, "%Y/%m/%d").strftime("%Y-%m-%d")
-                    user_date_key = f"{user_id}_{db_date_str}"
-                    location_name = attendance_data.get(user_date_key, "")
-                    row_data.append(location_name)
-                except ValueError:
-                    # 日付変換エラー時は空文字を追加
-                    row_data.append("")
-
-            yield row_data # データ行をyield
+        for offset in range(0, len(users_data), batch_size):
+            batch = users_data[offset : offset + batch_size]
+            cells_by_user: Dict[str, List[str]] = {}
+            entries = crud_attendance.iter_csv_entries(
+                db,
+                user_ids=[user_id for _, user_id, _, _ in batch if user_id],
+                start_date=dates[0],
+                end_date=dates[-1],
+            )
+            for user_id, date_obj, location_name in entries:
+                cells = cells_by_user.get(user_id)
+                if cells is None:
+                    cells = cells_by_user[user_id] = [""] * num_dates
+                column = column_of.get(date_obj)
+                if column is not None:
+                    cells[column] = location_name
+
+            # 各ユーザーについて行を生成
+            for user_name, user_id, group_name, user_type_name in batch:
+                row_data = [
+                    user_name or "",
+                    user_id or "",
+                    group_name or "",
+                    user_type_name or ""
+                ]
+                row_data.extend(cells_by_user.get(user_id) or [""] * num_dates)
+                yield row_data # データ行をyield
 
     except Exception as e:
         logger.error(f"CSV行生成中にエラー: {e}", exc_info=True)
         # エラーが発生した場合、エラーを示す特別な行を返すか、ログに記録して終了
         yield ["Error generating CSV data"] # エラーを示す行 (ヘッダーとは異なる列数)
 
+def generate_work_entries_csv_rows(
+    db: Session,
+    month: Optional[str] = None,
+    *,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    group_id: Optional[int] = None,
+    user_type_id: Optional[int] = None,
+) -> Generator[List[str], None, None]:
+    """
+    勤怠データのCSV行を生成するジェネレータ。
+
+    Args:
+        db: データベースセッション
+        month: 'YYYY-MM'形式の月文字列（Noneの場合はデフォルト期間）
+        start_date: 出力期間の開始日（end_date と併用し、month より優先）
+        end_date: 出力期間の終了日
+        group_id: 指定した場合、このグループのユーザーのみを出力
+        user_type_id: 指定した場合、この社員種別のユーザーのみを出力
+
+    Yields:
+        List[str]: CSVの1行を表す文字列リスト（ヘッダー行を含む）
+    """
+    if start_date and end_date:
+        dates = _date_range(start_date, end_date)
+    else:
+        dates = _generate_dates(month)
+    yield from _iter_work_entry_rows(db, dates, group_id=group_id, user_type_id=user_type_id)
+
+def iter_csv_bytes(
+    row_generator: Iterable[List[str]],
+    encoding: str = "utf-8",
+    chunk_size: int = CSV_EXPORT_CHUNK_SIZE,
+) -> Generator[bytes, None, None]:
+    """
+    CSV行を書き出し、おおよそ `chunk_size` 文字ごとにエンコードしたバイト列をyieldします。
+
+    行ごとにバッファの読み出し・エンコードを行わず、まとめて書き出すことで
+    ストリーミング時の呼び出し回数とエンコード回数を減らします。
+
+    Args:
+        row_generator: CSVの行を返すイテラブル
+        encoding: "utf-8" または "sjis"
+        chunk_size: 1回に書き出す文字数の目安
+    """
+    is_sjis = encoding.lower() == "sjis"
+    codec = "shift_jis" if is_sjis else "utf-8"
+    errors = "replace" if is_sjis else "strict"
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    try:
+        for row in row_generator:
+            writer.writerow(row)
+            if buffer.tell() >= chunk_size:
+                yield buffer.getvalue().encode(codec, errors)
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode(codec, errors)
+    except Exception as e:
+        logger.error(f"CSVストリーミング中にエラー: {e}", exc_info=True)
+        # エラー発生時にも何らかのバイト列を返す (例: エラーメッセージ)
+        yield f"Error during CSV generation: {e}\n".encode(codec, "replace")
+    finally:
+        buffer.close()
+
+def _resolve_import_codec(stream: BinaryIO, encoding: str) -> str:
+    """
+    CSV取り込みで使用するコーデック名を決定します。
+
+    "auto" の場合はアップロードの先頭だけを読み、UTF-8 として解釈できなければ
+    Shift_JIS (Windows 拡張を含む cp932) とみなします。読み取り位置は先頭に戻します。
+    """
+    if encoding == "sjis":
+        return "cp932"
+    if encoding == "utf-8":
+        return "utf-8-sig"
+    head = stream.read(_ENCODING_SNIFF_BYTES)
+    stream.seek(0)
+    try:
+        # 先読みの末尾で切れたマルチバイト文字はエラーにしない
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "cp932"
+
+
+def _parse_import_header(header: List[str]) -> List[Tuple[int, date]]:
+    """
+    CSVのヘッダー行を検証し、日付列の (列番号, 日付) のリストを返します。
+
+    Raises:
+        ValueError: ユーザー情報の列が不足している、または日付列の形式が無効な場合
+    """
+    if [h.strip() for h in header[: len(CSV_USER_COLUMNS)]] != CSV_USER_COLUMNS:
+        raise ValueError(f"ヘッダーの先頭は {', '.join(CSV_USER_COLUMNS)} である必要があります")
+    date_columns: List[Tuple[int, date]] = []
+    for index in range(len(CSV_USER_COLUMNS), len(header)):
+        value = header[index].strip()
+        try:
+            date_columns.append((index, datetime.strptime(value, "%Y/%m/%d").date()))
+        except ValueError:
+            raise ValueError(f"日付列の形式が無効です: '{value}' (YYYY/MM/DD形式で指定してください)")
+    return date_columns
+
+
+def import_work_entries_csv(
+    db: Session,
+    stream: BinaryIO,
+    *,
+    encoding: str = "auto",
+    chunk_size: int = CSV_IMPORT_CHUNK_SIZE,
+    clear_empty: bool = False,
+) -> Dict[str, Any]:
+    """
+    `generate_work_entries_csv_rows` と同じ横持ち形式のCSVを読み込み、勤怠を登録・更新します。
+
+    アップロードは1行ずつデコード・解析し、全体をメモリに載せません。
+    ユーザーIDと勤怠種別名は最初にまとめて読み込んだ集合・辞書で解決し、未登録の勤怠種別は
+    `get_or_create_multiple` で作成します。書き込みは `chunk_size` セル程度ごとに
+    `bulk_apply` で1トランザクションずつ確定するため、途中でエラーになった場合も
+    それまでのチャンクは取り込み済みのまま残ります。CSVに含まれない備考は変更しません。
+
+    Args:
+        db: データベースセッション
+        stream: アップロードされたCSVのバイナリストリーム
+        encoding: "utf-8"、"sjis"、または先頭から判定する "auto"
+        chunk_size: 1トランザクションにまとめるセル数の目安
+        clear_empty: True の場合、空のセルに対応する既存の勤怠を削除します
+
+    Returns:
+        Dict[str, Any]: `CsvImportResult` と同じ形式の取り込み結果
+
+    Raises:
+        ValueError: ヘッダーが不正、またはデコード・CSV解析に失敗した場合
+    """
+    result: Dict[str, Any] = {
+        "rows": 0,
+        "created": 0,
+        "updated": 0,
+        "deleted": 0,
+        "failed": 0,
+        "created_locations": [],
+        "errors": [],
+    }
+
+    def add_error(row: Optional[int], user_id: Optional[str], detail: str, date_obj: Optional[date] = None) -> None:
+        result["failed"] += 1
+        if len(result["errors"]) < _MAX_IMPORT_ERRORS:
+            result["errors"].append({"row": row, "user_id": user_id, "date": date_obj, "detail": detail})
+
+    pending: List[AttendanceBulkOperation] = []
+    pending_rows: List[int] = []
+
+    def flush() -> None:
+        if not pending:
+            return
+        applied = crud_attendance.bulk_apply(db, operations=pending, commit=True, update_note=False)
+        for key in ("created", "updated", "deleted"):
+            result[key] += applied[key]
+        for item in applied["results"]:
+            if item["status"] == "error":
+                add_error(pending_rows[item["index"]], item["user_id"], item["detail"], item["date"])
+        pending.clear()
+        pending_rows.clear()
+
+    codec = _resolve_import_codec(stream, encoding)
+    text = io.TextIOWrapper(stream, encoding=codec, newline="")
+    reader = csv.reader(text)
+    try:
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("CSVファイルが空です")
+        date_columns = _parse_import_header(header)
+
+        known_users = crud_user.get_all_ids(db)
+        location_ids = {name: location_id for location_id, name in crud_location.get_location_dict(db).items()}
+
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            line = reader.line_num
+            result["rows"] += 1
+            user_id = row[1].strip() if len(row) > 1 else ""
+            if user_id not in known_users:
+                add_error(line, user_id or None, f"ユーザー '{user_id}' が見つかりません")
+                continue
+
+            cells = [(date_obj, row[index].strip() if index < len(row) else "") for index, date_obj in date_columns]
+            new_names = sorted({name for _, name in cells if name and name not in location_ids})
+            if new_names:
+                for name, loc in crud_location.get_or_create_multiple(db, location_names=new_names).items():
+                    location_ids[name] = int(loc.id)
+                result["created_locations"].extend(new_names)
+
+            for date_obj, name in cells:
+                if name:
+                    location_id: Optional[int] = location_ids[name]
+                elif clear_empty:
+                    location_id = None
+                else:
+                    continue
+                pending.append(AttendanceBulkOperation(user_id=user_id, date=date_obj, location_id=location_id))
+                pending_rows.append(line)
+
+            # 1行の途中ではチャンクを区切らない
+            if len(pending) >= chunk_size:
+                flush()
+        flush()
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ValueError(f"{reader.line_num}行目付近でCSVの読み込みに失敗しました: {e}") from e
+    finally:
+        # アップロードのファイルオブジェクトは呼び出し元が閉じるため、ラッパーだけを切り離す
+        text.detach()
+
+    logger.info(
+        "CSV取り込み完了: rows=%s created=%s updated=%s deleted=%s failed=%s",
+        result["rows"], result["created"], result["updated"], result["deleted"], result["failed"],
+    )
+    return result
+
 # get_work_entries_csv 関数は不要になる (エンドポイントで直接ジェネレータを使うため)
 # def get_work_entries_csv(...) -> bytes:
 #    ... (古い実装) ... 
\ No newline at end of file
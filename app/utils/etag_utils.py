@@ -0,0 +1,96 @@
+"""
+ETag・条件付きGETユーティリティ
+===========================
+
+カレンダー・日別詳細・勤怠集計などの HTMX ビューに、データの世代
+(`cache_generations` の世代カウンタ) から求めた ETag を付与し、
+`If-None-Match` が一致する場合はクエリとテンプレートの描画を省いて 304 を返すための関数を提供します。
+
+ETag には世代のほか、リクエストURL・今日の日付・ログイン状態・テンプレートと
+アセットマニフェストの内容を含めるため、表示が変わりうる要因のいずれかが変われば一致しなくなります。
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+from fastapi import Request
+from starlette.responses import Response
+
+from app.core.assets import get_asset_manifest
+from app.utils.calendar_utils import get_today_formatted
+
+TEMPLATE_DIR = Path("app/templates")
+
+# ブラウザには保存させつつ、利用前に毎回 ETag で再検証させる
+CONDITIONAL_CACHE_CONTROL = "private, no-cache"
+
+
+@lru_cache(maxsize=1)
+def get_template_version() -> str:
+    """
+    テンプレートとアセットマニフェストの内容から版を求めます (プロセスごとに1回だけ計算)。
+
+    全ワーカーで同じ値になるため、ワーカーをまたいでも ETag が一致します。
+    """
+    digest = hashlib.sha1()
+    if TEMPLATE_DIR.is_dir():
+        for path in sorted(TEMPLATE_DIR.rglob("*.html")):
+            digest.update(str(path.relative_to(TEMPLATE_DIR)).encode())
+            digest.update(path.read_bytes())
+    digest.update(json.dumps(get_asset_manifest(), sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def build_etag(request: Request, *parts: Any) -> str:
+    """
+    データの世代などから弱い ETag を生成します。
+
+    Args:
+        request: リクエスト (URL・HTMX かどうか・ログイン状態を ETag に含める)
+        parts: ETag に含める値 (世代トークンなど)
+
+    Returns:
+        str: `W/"..."` 形式の ETag
+    """
+    session: Optional[Mapping[str, Any]] = request.scope.get("session")
+    auth = session.get("auth") if session else None
+    key = json.dumps(
+        [
+            get_template_version(),
+            str(request.url),
+            request.headers.get("HX-Request") == "true",
+            get_today_formatted(),
+            auth,
+            parts,
+        ],
+        default=str,
+        sort_keys=True,
+    )
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match に ETag が含まれるかを弱い比較で判定します。"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def not_modified_response(etag: str, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """304 Not Modified レスポンスを返します。"""
+    return Response(status_code=304, headers={**(headers or {}), **etag_headers(etag)})
+
+
+def etag_headers(etag: str) -> dict:
+    """描画したレスポンスに付与する ETag 関連のヘッダーを返します。"""
+    # HTMX リクエストと通常のリクエストでは ETag が異なるため、ブラウザのキャッシュも分ける
+    return {"ETag": etag, "Cache-Control": CONDITIONAL_CACHE_CONTROL, "Vary": "HX-Request"}
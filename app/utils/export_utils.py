@@ -0,0 +1,198 @@
+"""
+勤怠データエクスポートユーティリティ
+==============================
+
+分析基盤への取り込み向けに、勤怠を1行1レコードの縦持ち形式
+(user_id, date, location, note) で出力するためのユーティリティを提供します。
+
+CSV に加え、pyarrow がインストールされている場合は Parquet と Arrow IPC (ストリーム形式)
+でも出力できます。いずれの形式も keyset ページングで読み進めたバッチを1つの
+行グループ (レコードバッチ) として書き出すため、長期間の出力でもメモリ使用量は一定です。
+"""
+
+import io
+from datetime import date
+from typing import Any, Generator, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import EXPORT_ROW_GROUP_SIZE
+from app.crud.attendance import attendance as crud_attendance
+from app.crud.location import location as crud_location
+from app.utils.csv_utils import iter_csv_bytes
+
+try:  # pyarrow は任意依存 (Parquet / Arrow 形式の出力にのみ使用)
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 環境依存
+    pa = None
+    pa_ipc = None
+    pq = None
+
+# 縦持ち形式の列名
+EXPORT_COLUMNS = ["user_id", "date", "location", "note"]
+
+# 形式ごとの Content-Type と拡張子
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+ExportRow = Tuple[str, date, str, Optional[str]]
+
+
+def is_columnar_available() -> bool:
+    """Parquet / Arrow 形式の出力に必要な pyarrow が利用可能かを返します。"""
+    return pa is not None
+
+
+def iter_export_batches(
+    db: Session,
+    *,
+    start_date: date,
+    end_date: date,
+    group_id: Optional[int] = None,
+    user_type_id: Optional[int] = None,
+    batch_size: int = EXPORT_ROW_GROUP_SIZE,
+) -> Generator[List[ExportRow], None, None]:
+    """
+    条件に合う勤怠を (date, id) 順に `batch_size` 件ずつのリストで返します。
+
+    勤怠種別名は最初に読み込んだ ID→名前の辞書で解決します。
+
+    Yields:
+        List[ExportRow]: (user_id, date, 勤怠種別名, 備考) のリスト
+    """
+    location_names = crud_location.get_location_dict(db)
+    rows = crud_attendance.iter_filtered(
+        db,
+        batch_size=batch_size,
+        start_date=start_date,
+        end_date=end_date,
+        group_id=group_id,
+        user_type_id=user_type_id,
+    )
+    batch: List[ExportRow] = []
+    for row in rows:
+        batch.append((str(row.user_id), row.date, location_names.get(row.location_id, ""), row.note))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_long_csv_bytes(batches: Iterator[Sequence[ExportRow]], encoding: str = "utf-8") -> Generator[bytes, None, None]:
+    """縦持ち形式のバッチをCSVのバイト列として書き出します。"""
+
+    def rows() -> Generator[List[str], None, None]:
+        yield EXPORT_COLUMNS
+        for batch in batches:
+            for user_id, date_obj, location_name, note in batch:
+                yield [user_id, date_obj.isoformat(), location_name, note or ""]
+
+    yield from iter_csv_bytes(rows(), encoding)
+
+
+class _ChunkSink(io.RawIOBase):
+    """pyarrow の書き込み先として使い、書き込まれたバイト列を逐次取り出すためのバッファ"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        """これまでに書き込まれたバイト列を取り出し、バッファを空にします。"""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_schema() -> Any:
+    """縦持ち形式の Arrow スキーマ"""
+    return pa.schema(
+        [
+            ("user_id", pa.string()),
+            ("date", pa.date32()),
+            ("location", pa.string()),
+            ("note", pa.string()),
+        ]
+    )
+
+
+def _to_record_batch(batch: Sequence[ExportRow], schema: Any) -> Any:
+    """バッチを列ごとの配列に変換して RecordBatch を作成します。"""
+    user_ids, dates, locations, notes = zip(*batch)
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array(user_ids, type=pa.string()),
+            pa.array(dates, type=pa.date32()),
+            pa.array(locations, type=pa.string()),
+            pa.array(notes, type=pa.string()),
+        ],
+        schema=schema,
+    )
+
+
+def iter_parquet_bytes(batches: Iterator[Sequence[ExportRow]]) -> Generator[bytes, None, None]:
+    """
+    縦持ち形式のバッチを、バッチごとに1つの行グループとして Parquet (zstd 圧縮) で書き出します。
+
+    user_id・勤怠種別名のように値の種類が少ない列は Parquet 側で辞書エンコードされます。
+
+    Raises:
+        RuntimeError: pyarrow がインストールされていない場合
+    """
+    if not is_columnar_available():
+        raise RuntimeError("Parquet 形式の出力には pyarrow が必要です")
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            writer.write_batch(_to_record_batch(batch, schema), row_group_size=len(batch))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        # フッター (メタデータ) は close 時に書き込まれる
+        writer.close()
+    yield sink.drain()
+
+
+def iter_arrow_ipc_bytes(batches: Iterator[Sequence[ExportRow]]) -> Generator[bytes, None, None]:
+    """
+    縦持ち形式のバッチを、Arrow IPC ストリーム形式 (zstd 圧縮) のレコードバッチとして書き出します。
+
+    Raises:
+        RuntimeError: pyarrow がインストールされていない場合
+    """
+    if not is_columnar_available():
+        raise RuntimeError("Arrow 形式の出力には pyarrow が必要です")
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    writer = pa_ipc.new_stream(sink, schema, options=pa_ipc.IpcWriteOptions(compression="zstd"))
+    try:
+        yield sink.drain()  # スキーマメッセージ
+        for batch in batches:
+            writer.write_batch(_to_record_batch(batch, schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
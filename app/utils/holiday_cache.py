@@ -4,83 +4,178 @@
 
 ビルド時に取得した祝日データをローカルファイルから読み込み、DBのカスタム祝日とマージします。
 運用時にはAPIアクセスを行いません。
+
+カスタム祝日の変更はDB上のキャッシュ世代で追跡し、別ワーカーで行われた変更も
+`sync_holiday_cache` の呼び出し時に検出して再読み込みします。
+
+祝日は `datetime.date` をキーに保持し、年月ごとの索引も読み込み時に作成します。
+カレンダーの描画では `holidays_in_range` で表示範囲の祝日を一度に取得してください。
+
+祝日キャッシュファイルの差し替え (年次の祝日データの更新など) は、`HolidayDataWatcher` が
+バックグラウンドで更新日時・サイズを定期的に確認して検出し、内容が変わっていれば読み込み直します。
+読み込み直した場合は全体の世代を進めるため、各ワーカーのカレンダーキャッシュと ETag も失効します。
+リクエストの処理中にファイルを読むことはありません。
 """
 
+import asyncio
+import hashlib
 import json
 import datetime
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Mapping, Optional, Tuple
 from pathlib import Path
 
 from sqlalchemy.orm import Session
 
 from app.core.config import logger
 from app import crud
+from app.crud.cache_generation import CUSTOM_HOLIDAY_SCOPE
 
 # キャッシュファイルのパス
 ASSETS_JSON_DIR = Path(__file__).parent.parent.parent / "assets" / "json"
 CACHE_FILE = ASSETS_JSON_DIR / "holidays_cache.json"
 
 
+def _parse_holidays(holidays: Mapping[str, str]) -> Dict[datetime.date, str]:
+    """キャッシュファイルの `YYYY-MM-DD` → 祝日名 の辞書を日付キーに変換する"""
+    parsed: Dict[datetime.date, str] = {}
+    for date_str, name in holidays.items():
+        try:
+            parsed[datetime.date.fromisoformat(date_str)] = str(name)
+        except (TypeError, ValueError):
+            logger.warning(f"祝日キャッシュの日付を解析できないため無視します: {date_str}")
+    return parsed
+
+
 class HolidayCache:
     """祝日データのキャッシュ管理クラス（読み取り専用）"""
 
     def __init__(self) -> None:
-        self._file_cache: Dict[str, str] = {}
-        self._custom_cache: Dict[str, str] = {}
-        self._cache: Dict[str, str] = {}
+        self._file_cache: Dict[datetime.date, str] = {}
+        self._custom_cache: Dict[datetime.date, str] = {}
+        self._cache: Dict[datetime.date, str] = {}
+        # (年, 月) → その月の祝日 (日付順)
+        self._month_index: Dict[Tuple[int, int], Dict[datetime.date, str]] = {}
         self._build_time_cache: bool = False
+        # 最後に確認したキャッシュファイルの (更新日時, サイズ) と、読み込んだ内容のハッシュ
+        self._file_signature: Optional[Tuple[int, int]] = None
+        self._file_digest: Optional[str] = None
+        # 最後に読み込んだカスタム祝日の世代 (未読み込みの場合は None)
+        self._custom_generation: Optional[int] = None
         self._load_cache()
 
     def _merge_cache(self) -> None:
-        """ビルド時キャッシュとカスタム祝日をマージする"""
-        self._cache = {**self._file_cache, **self._custom_cache}
+        """ビルド時キャッシュとカスタム祝日をマージし、年月ごとの索引を作り直す"""
+        cache = {**self._file_cache, **self._custom_cache}
+        month_index: Dict[Tuple[int, int], Dict[datetime.date, str]] = {}
+        for date_obj in sorted(cache):
+            month_index.setdefault((date_obj.year, date_obj.month), {})[date_obj] = cache[date_obj]
+        # 参照側が読み込み途中の状態を見ないよう、完成した辞書に差し替える
+        self._cache, self._month_index = cache, month_index
+
+    @staticmethod
+    def _stat_file() -> Optional[Tuple[int, int]]:
+        """キャッシュファイルの (更新日時, サイズ) を取得する (ファイルが無い場合は None)"""
+        try:
+            stat_result = CACHE_FILE.stat()
+        except OSError:
+            return None
+        return (stat_result.st_mtime_ns, stat_result.st_size)
 
     def _load_cache(self) -> None:
-        """ビルド時キャッシュファイルからデータを読み込む"""
+        """
+        ビルド時キャッシュファイルからデータを読み込む
+
+        読み込みに失敗した場合 (書き込み途中のファイルなど) は、読み込み済みのデータを維持する。
+        """
+        self._file_signature = self._stat_file()
         try:
             if CACHE_FILE.exists():
                 with open(CACHE_FILE, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    self._file_cache = data.get("holidays", {})
-                    self._build_time_cache = data.get("build_time", False)
-
-                    if self._build_time_cache:
-                        logger.info(f"ビルド時祝日キャッシュを読み込みました: {len(self._file_cache)}件")
-                    else:
-                        logger.warning("レガシーキャッシュファイルを読み込みました。ビルド時キャッシュの作成を推奨します。")
+                    content = f.read()
+                data = json.loads(content)
+                self._file_cache = _parse_holidays(data.get("holidays", {}))
+                self._build_time_cache = data.get("build_time", False)
+                self._file_digest = hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+                if self._build_time_cache:
+                    logger.info(f"ビルド時祝日キャッシュを読み込みました: {len(self._file_cache)}件")
+                else:
+                    logger.warning("レガシーキャッシュファイルを読み込みました。ビルド時キャッシュの作成を推奨します。")
             else:
                 logger.error(f"祝日キャッシュファイルが見つかりません: {CACHE_FILE}")
                 logger.error("コンテナビルド時に祝日データの取得が失敗した可能性があります。")
-                self._file_cache = {}
         except Exception as e:
             logger.error(f"祝日キャッシュの読み込みに失敗しました: {e}")
-            self._file_cache = {}
         finally:
             self._merge_cache()
 
+    def reload_file_if_changed(self) -> bool:
+        """
+        キャッシュファイルの更新日時・サイズが変わっていれば読み込み直す
+
+        Returns:
+            bool: 読み込み直した結果、祝日データの内容が変わった場合は True
+        """
+        if self._stat_file() == self._file_signature:
+            return False
+        previous_digest = self._file_digest
+        self._load_cache()
+        changed = self._file_digest != previous_digest
+        if changed:
+            logger.info("祝日キャッシュファイルの更新を検出し、読み込み直しました")
+        return changed
+
+    def _get_custom_generation(self, db: Session) -> int:
+        """DB上のカスタム祝日の世代を取得する"""
+        generations = crud.cache_generation.get_generations(db, [CUSTOM_HOLIDAY_SCOPE])
+        return generations[CUSTOM_HOLIDAY_SCOPE]
+
     def refresh_from_db(self, db: Session) -> None:
         """DB上のカスタム祝日を読み込み、キャッシュを更新する"""
         try:
+            # 読み込み中の変更を取りこぼさないよう、世代はデータより先に取得する
+            generation = self._get_custom_generation(db)
             custom_holidays = crud.custom_holiday.get_all(db)
-            self._custom_cache = {
-                holiday.date.strftime("%Y-%m-%d"): str(holiday.name) for holiday in custom_holidays
-            }
+            self._custom_cache = {holiday.date: str(holiday.name) for holiday in custom_holidays}
+            self._custom_generation = generation
             logger.info(f"カスタム祝日を読み込みました: {len(self._custom_cache)}件")
         except Exception as e:
             logger.error(f"カスタム祝日の読み込みに失敗しました: {e}", exc_info=True)
             self._custom_cache = {}
+            self._custom_generation = None
         finally:
             self._merge_cache()
 
+    def sync_from_db(self, db: Session) -> None:
+        """DB上のカスタム祝日の世代が変わっている場合のみキャッシュを再読み込みする"""
+        try:
+            generation = self._get_custom_generation(db)
+        except Exception as e:
+            logger.error(f"カスタム祝日の世代取得に失敗しました: {e}", exc_info=True)
+            return
+        if generation != self._custom_generation:
+            logger.debug(f"カスタム祝日の世代変更を検出しました: {self._custom_generation} -> {generation}")
+            self.refresh_from_db(db)
+
     def is_holiday(self, date_obj: datetime.date) -> bool:
         """指定日が祝日かどうかを判定する"""
-        date_str = date_obj.strftime("%Y-%m-%d")
-        return date_str in self._cache
+        return date_obj in self._cache
 
     def get_holiday_name(self, date_obj: datetime.date) -> str:
         """指定日の祝日名を取得する"""
-        date_str = date_obj.strftime("%Y-%m-%d")
-        return self._cache.get(date_str, "")
+        return self._cache.get(date_obj, "")
+
+    def holidays_in_range(self, start: datetime.date, end: datetime.date) -> Dict[datetime.date, str]:
+        """指定期間 (両端を含む) の祝日を 日付 → 祝日名 の辞書で取得する"""
+        month_index = self._month_index
+        result: Dict[datetime.date, str] = {}
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            for date_obj, name in month_index.get((year, month), {}).items():
+                if start <= date_obj <= end:
+                    result[date_obj] = name
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return result
 
     def get_cache_info(self) -> Dict[str, Any]:
         """キャッシュの情報を取得する（デバッグ用）"""
@@ -88,7 +183,7 @@ class HolidayCache:
             "total_holidays": len(self._cache),
             "build_time_cache": self._build_time_cache,
             "cache_file_exists": CACHE_FILE.exists(),
-            "years_covered": sorted(list(set(date[:4] for date in self._cache.keys()))) if self._cache else [],
+            "years_covered": sorted({str(year) for year, _ in self._month_index}),
             "custom_total": len(self._custom_cache),
         }
 
@@ -121,6 +216,21 @@ def get_holiday_name(date_obj: datetime.date) -> str:
     return _holiday_cache.get_holiday_name(date_obj)
 
 
+def holidays_in_range(start: datetime.date, end: datetime.date) -> Dict[datetime.date, str]:
+    """指定期間の祝日をまとめて取得する
+
+    カレンダーの描画では日ごとに `is_holiday` を呼ぶ代わりに、表示範囲について1回だけ呼び出します。
+
+    Args:
+        start: 期間の開始日
+        end: 期間の終了日 (この日を含む)
+
+    Returns:
+        Dict[datetime.date, str]: 日付 → 祝日名
+    """
+    return _holiday_cache.holidays_in_range(start, end)
+
+
 def get_cache_info() -> Dict[str, Any]:
     """キャッシュの情報を取得する（デバッグ用）
 
@@ -130,6 +240,72 @@ def get_cache_info() -> Dict[str, Any]:
     return _holiday_cache.get_cache_info()
 
 
+def check_holiday_updates(db: Session) -> bool:
+    """祝日キャッシュファイルとカスタム祝日の更新を確認し、変わっていれば読み込み直す
+
+    ファイルの内容が変わった場合は全体の世代を進め、全ワーカーのカレンダーキャッシュと
+    ETag を失効させます (カスタム祝日の変更は書き込み時に世代が進められています)。
+
+    Returns:
+        bool: 祝日キャッシュファイルの内容が変わった場合は True
+    """
+    file_changed = _holiday_cache.reload_file_if_changed()
+    _holiday_cache.sync_from_db(db)
+    if file_changed:
+        crud.cache_generation.mark_all_changed(db)
+        db.commit()
+    return file_changed
+
+
+class HolidayDataWatcher:
+    """祝日データの更新を定期的に確認するバックグラウンドタスク"""
+
+    def __init__(self, session_factory: Callable[[], Session], interval_seconds: float) -> None:
+        self._session_factory = session_factory
+        self._interval_seconds = interval_seconds
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def check_once(self) -> bool:
+        """祝日データの更新を1回確認します (ファイル・DBへのアクセスを伴うためスレッドで実行)。"""
+        db = self._session_factory()
+        try:
+            return check_holiday_updates(db)
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval_seconds)
+            try:
+                await asyncio.to_thread(self.check_once)
+            except Exception as e:
+                logger.warning(f"祝日データの更新確認に失敗しました: {e}")
+
+    def start(self) -> None:
+        """バックグラウンドでの確認を開始します。"""
+        if self._task is None and self._interval_seconds > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """バックグラウンドでの確認を停止します。"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
 def refresh_holiday_cache(db: Session) -> None:
     """DBのカスタム祝日を反映してキャッシュを更新する"""
     _holiday_cache.refresh_from_db(db)
+
+
+def sync_holiday_cache(db: Session) -> None:
+    """他ワーカーでカスタム祝日が変更されていればキャッシュを更新する
+
+    世代の確認は主キー検索1回のみのため、カレンダー描画のたびに呼び出して構いません。
+    """
+    _holiday_cache.sync_from_db(db)
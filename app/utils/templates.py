@@ -0,0 +1,14 @@
+"""
+テンプレート設定
+=============
+
+各ルーターで共有する `Jinja2Templates` のインスタンスを提供します。
+テンプレートから参照するグローバル関数 (`asset_url` など) はここで1回だけ登録します。
+"""
+
+from fastapi.templating import Jinja2Templates
+
+from app.core.assets import asset_url
+
+templates = Jinja2Templates(directory="app/templates")
+templates.env.globals["asset_url"] = asset_url
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+勤怠集計処理ベンチマークスクリプト
+==============================
+
+合成データで勤怠集計 (CRUDAttendance._build_analysis_data) の処理時間を計測し、
+ユーザー数・勤怠件数に対して線形に伸びることを確認する。
+
+使用例:
+    python scripts/benchmark/bench_analysis.py
+    python scripts/benchmark/bench_analysis.py --users 500 1000 2000 --days 20
+"""
+
+import argparse
+import datetime
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, List, Tuple
+
+# プロジェクトルートをパスに追加
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.crud.attendance import attendance  # noqa: E402
+
+LOCATION_COUNT = 5
+
+
+def build_dataset(users: int, days: int) -> Tuple[List[Any], List[Any], List[Any]]:
+    """ユーザー数 × 日数分の勤怠データを合成する"""
+    locations = [
+        SimpleNamespace(id=i, name=f"勤怠種別{i}", category="出社", order=i)
+        for i in range(1, LOCATION_COUNT + 1)
+    ]
+    users_data = [(f"ユーザー{i}", f"u{i:05d}", f"グループ{i % 10}", "正社員") for i in range(users)]
+    start = datetime.date(2024, 4, 1)
+    attendances = [
+        SimpleNamespace(
+            user_id=f"u{i:05d}",
+            date=start + datetime.timedelta(days=d),
+            location_id=(i + d) % LOCATION_COUNT + 1,
+            note=None,
+        )
+        for d in range(days)
+        for i in range(users)
+    ]
+    return users_data, locations, attendances
+
+
+def measure(users: int, days: int, repeat: int) -> float:
+    """集計処理を repeat 回実行し、最短時間 (秒) を返す"""
+    users_data, locations, attendances = build_dataset(users, days)
+    period = attendance._resolve_analysis_period(None, 2024)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        attendance._build_analysis_data(period, users_data, locations, attendances)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="勤怠集計処理のベンチマーク")
+    parser.add_argument("--users", type=int, nargs="+", default=[250, 500, 1000, 2000])
+    parser.add_argument("--days", type=int, default=20, help="ユーザーあたりの勤怠件数")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'users':>8} {'records':>10} {'seconds':>10} {'us/record':>10}")
+    for users in args.users:
+        elapsed = measure(users, args.days, args.repeat)
+        records = users * args.days
+        print(f"{users:>8} {records:>10} {elapsed:>10.4f} {elapsed / records * 1e6:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
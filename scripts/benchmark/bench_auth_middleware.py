@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+認証ガードミドルウェアのベンチマークスクリプト
+=====================================
+
+認証ガードを BaseHTTPMiddleware で実装した従来版と、ASGI ミドルウェアとして実装した現行版
+(`app.middleware.auth.AuthRequiredMiddleware`) で、次の2点を比較する。
+
+- 小さな JSON レスポンスの requests/sec
+- StreamingResponse による CSV 配信のスループット (MB/s) と最初のチャンクまでの時間
+
+ネットワークやサーバーの影響を除くため、ASGI アプリケーションを直接呼び出して計測する。
+認証済みのセッションは、SessionMiddleware の代わりに scope へ直接設定する。
+
+使用例:
+    python scripts/benchmark/bench_auth_middleware.py
+    python scripts/benchmark/bench_auth_middleware.py --requests 20000 --chunks 5000
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import sys
+import time
+import urllib.parse
+from pathlib import Path
+from typing import AsyncIterator, Callable, Tuple
+
+# プロジェクトルートをパスに追加
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import JSONResponse, RedirectResponse, Response, StreamingResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+from starlette.types import ASGIApp, Message, Receive, Scope, Send  # noqa: E402
+
+from app.middleware.auth import DEFAULT_EXEMPT_PREFIXES, AuthRequiredMiddleware  # noqa: E402
+from app.services.auth.settings import AuthSettings  # noqa: E402
+
+CSV_ROW = "u00001,ユーザー1,グループ,正社員," + ",".join(["出社"] * 20) + "\n"
+
+
+class LegacyAuthRequiredMiddleware(BaseHTTPMiddleware):
+    """比較用: BaseHTTPMiddleware による従来の認証ガード"""
+
+    def __init__(self, app: ASGIApp, settings_provider: Callable[[], AuthSettings]) -> None:
+        super().__init__(app)
+        self.settings_provider = settings_provider
+        self.exempt_prefixes = DEFAULT_EXEMPT_PREFIXES
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        settings = self.settings_provider()
+        if not settings.auth_enabled:
+            return await call_next(request)
+        path = request.url.path
+        if any(path.startswith(prefix) for prefix in self.exempt_prefixes):
+            return await call_next(request)
+        if request.session.get("auth"):
+            return await call_next(request)
+        if path.startswith("/api/"):
+            return JSONResponse({"detail": "Unauthorized"}, status_code=401)
+        login_url = f"/auth/login?next={urllib.parse.quote(path)}&reason=reauth"
+        return RedirectResponse(url=login_url, status_code=307)
+
+
+class FakeSessionMiddleware:
+    """認証済みのセッションを scope に設定する (署名 Cookie の処理を計測から除く)"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        scope["session"] = {"auth": {"username": "bench", "role": "user"}}
+        await self.app(scope, receive, send)
+
+
+def build_app(guard: type, chunks: int, chunk_rows: int) -> Starlette:
+    """認証ガードを組み込んだ計測用アプリケーションを生成する"""
+    settings = dataclasses.replace(AuthSettings.from_env(), auth_enabled=True)
+    chunk = (CSV_ROW * chunk_rows).encode("utf-8")
+
+    async def ping(request: Request) -> Response:
+        return JSONResponse({"ok": True})
+
+    async def iter_csv() -> AsyncIterator[bytes]:
+        for _ in range(chunks):
+            yield chunk
+
+    async def csv(request: Request) -> Response:
+        return StreamingResponse(iter_csv(), media_type="text/csv")
+
+    app = Starlette(routes=[Route("/api/v1/ping", ping), Route("/api/v1/csv", csv)])
+    app.add_middleware(guard, settings_provider=lambda: settings)
+    app.add_middleware(FakeSessionMiddleware)
+    return app
+
+
+async def request_once(app: ASGIApp, path: str) -> Tuple[int, float]:
+    """1リクエストを処理し、(受信バイト数, 最初の本文チャンクまでの秒数) を返す"""
+    scope: Scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "server": ("bench", 80),
+        "client": ("127.0.0.1", 50000),
+    }
+    size = 0
+    first_chunk = 0.0
+    started = time.perf_counter()
+    request_sent = False
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # 切断の検知待ち (BaseHTTPMiddleware が待ち受ける) はレスポンス完了まで返さない
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal size, first_chunk
+        if message["type"] == "http.response.body" and message.get("body"):
+            if not size:
+                first_chunk = time.perf_counter() - started
+            size += len(message["body"])
+
+    await app(scope, receive, send)
+    return size, first_chunk
+
+
+async def bench_requests(app: ASGIApp, count: int) -> float:
+    """小さな JSON レスポンスの requests/sec を返す"""
+    for _ in range(min(count, 200)):  # ウォームアップ
+        await request_once(app, "/api/v1/ping")
+    started = time.perf_counter()
+    for _ in range(count):
+        await request_once(app, "/api/v1/ping")
+    return count / (time.perf_counter() - started)
+
+
+async def bench_stream(app: ASGIApp, repeat: int) -> Tuple[float, float]:
+    """CSV 配信の (最大 MB/s, 最初のチャンクまでの最短秒数) を返す"""
+    best_rate = 0.0
+    best_first = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size, first_chunk = await request_once(app, "/api/v1/csv")
+        elapsed = time.perf_counter() - started
+        best_rate = max(best_rate, size / elapsed / 1e6)
+        best_first = min(best_first, first_chunk)
+    return best_rate, best_first
+
+
+async def run(args: argparse.Namespace) -> None:
+    print(f"requests={args.requests} chunks={args.chunks} chunk_rows={args.chunk_rows}")
+    print(f"{'guard':>16} {'req/sec':>10} {'csv MB/s':>10} {'first(ms)':>10}")
+    for label, guard in (("BaseHTTP(before)", LegacyAuthRequiredMiddleware), ("ASGI(after)", AuthRequiredMiddleware)):
+        app = build_app(guard, args.chunks, args.chunk_rows)
+        rps = await bench_requests(app, args.requests)
+        rate, first_chunk = await bench_stream(app, args.repeat)
+        print(f"{label:>16} {rps:>10.0f} {rate:>10.1f} {first_chunk * 1000:>10.3f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="認証ガードミドルウェアのベンチマーク")
+    parser.add_argument("--requests", type=int, default=5000, help="JSON レスポンスのリクエスト数")
+    parser.add_argument("--chunks", type=int, default=2000, help="CSV 配信のチャンク数")
+    parser.add_argument("--chunk-rows", type=int, default=50, help="1チャンクあたりの行数")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
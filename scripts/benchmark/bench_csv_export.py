@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+CSVエクスポートベンチマークスクリプト
+================================
+
+一時ファイルの SQLite に合成データ (ユーザー数 × 日数) を投入し、
+`/api/v1/csv/download` と同じ経路 (行生成 + チャンク単位のエンコード) の
+処理時間、最初のチャンクまでの時間と rows/sec を計測する。
+
+使用例:
+    python scripts/benchmark/bench_csv_export.py
+    python scripts/benchmark/bench_csv_export.py --users 1000 --days 365 --encoding sjis
+"""
+
+import argparse
+import datetime
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Tuple
+
+# プロジェクトルートをパスに追加
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from sqlalchemy import create_engine, event, insert  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+from app.db.session import Base, apply_sqlite_pragmas  # noqa: E402
+from app.models import Attendance, Group, Location, User, UserType  # noqa: E402
+from app.utils.csv_utils import _iter_work_entry_rows, iter_csv_bytes  # noqa: E402
+
+LOCATION_NAMES = ["出社", "在宅勤務", "出張", "休暇", "その他"]
+START_DATE = datetime.date(2024, 4, 1)
+
+
+def populate(db: Session, users: int, days: int, fill_ratio: float) -> None:
+    """ユーザー数 × 日数分の勤怠データを投入する (fill_ratio の割合の日だけ登録)"""
+    db.execute(insert(Group), [{"id": 1, "name": "グループ"}])
+    db.execute(insert(UserType), [{"id": 1, "name": "正社員"}])
+    db.execute(insert(Location), [{"id": i + 1, "name": name} for i, name in enumerate(LOCATION_NAMES)])
+    db.execute(
+        insert(User),
+        [{"id": f"u{i:05d}", "username": f"ユーザー{i}", "group_id": 1, "user_type_id": 1} for i in range(users)],
+    )
+    step = max(1, round(1 / fill_ratio)) if fill_ratio > 0 else 0
+    rows = [
+        {
+            "user_id": f"u{i:05d}",
+            "date": START_DATE + datetime.timedelta(days=d),
+            "location_id": (i + d) % len(LOCATION_NAMES) + 1,
+        }
+        for i in range(users)
+        for d in range(days)
+        if step and (i + d) % step == 0
+    ]
+    db.execute(insert(Attendance), rows)
+    db.commit()
+
+
+def measure(db: Session, days: int, encoding: str, repeat: int) -> Tuple[float, float, int]:
+    """CSVを repeat 回生成し、(最短時間, 最初のチャンクまでの最短時間, バイト数) を返す"""
+    dates = [START_DATE + datetime.timedelta(days=d) for d in range(days)]
+    best = first_chunk = float("inf")
+    size = 0
+    for _ in range(repeat):
+        size = 0
+        started = time.perf_counter()
+        for chunk in iter_csv_bytes(_iter_work_entry_rows(db, dates), encoding):
+            if not size:
+                first_chunk = min(first_chunk, time.perf_counter() - started)
+            size += len(chunk)
+        best = min(best, time.perf_counter() - started)
+    return best, first_chunk, size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="CSVエクスポートのベンチマーク")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--fill-ratio", type=float, default=1.0, help="勤怠が登録されている日の割合")
+    parser.add_argument("--encoding", choices=["utf-8", "sjis"], default="utf-8")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            populate(db, args.users, args.days, args.fill_ratio)
+            elapsed, first_chunk, size = measure(db, args.days, args.encoding, args.repeat)
+        finally:
+            db.close()
+            engine.dispose()
+
+    rows = args.users  # ユーザーごとに1行 (ヘッダー行を除く)
+    cells = rows * args.days
+    print(f"users={args.users} days={args.days} encoding={args.encoding}")
+    print(f"{'rows':>8} {'seconds':>10} {'first(s)':>10} {'rows/sec':>10} {'cells/sec':>12} {'MB':>8}")
+    print(
+        f"{rows:>8} {elapsed:>10.4f} {first_chunk:>10.4f} {rows / elapsed:>10.0f}"
+        f" {cells / elapsed:>12.0f} {size / 1e6:>8.2f}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
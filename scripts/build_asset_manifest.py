@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+アセットのフィンガープリント付与スクリプト
+====================================
+
+ビルド済みの `assets/css`・`assets/js` と `app/static/css`・`app/static/js` の各ファイルについて、
+内容のハッシュを含むファイル名のコピー (例: `main.3f2a9c1b7d4e.css`) と、
+その `.gz` / `.br` 圧縮版を `assets/` 以下に出力し、論理名→URL の対応を
+`assets/manifest.json` に書き出す。
+
+- `/assets/css/main.css` → `/assets/css/main.<hash>.css`
+- `/static/js/main.js`   → `/assets/static/js/main.<hash>.js`
+
+`.br` は brotli パッケージがインストールされている場合のみ出力する。
+`--clean` を指定すると、出力済みのファイルとマニフェストを削除する (開発時用)。
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+try:  # brotli は任意依存
+    import brotli
+except ImportError:
+    brotli = None
+
+# データディレクトリの設定
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+ASSETS_DIR = PROJECT_ROOT / "assets"
+STATIC_DIR = PROJECT_ROOT / "app" / "static"
+MANIFEST_FILE = ASSETS_DIR / "manifest.json"
+
+# (元ディレクトリ, 論理名のURLプレフィックス, 出力ディレクトリ, 出力のURLプレフィックス)
+SOURCES = [
+    (ASSETS_DIR / "css", "/assets/css", ASSETS_DIR / "css", "/assets/css"),
+    (ASSETS_DIR / "js", "/assets/js", ASSETS_DIR / "js", "/assets/js"),
+    (STATIC_DIR / "css", "/static/css", ASSETS_DIR / "static" / "css", "/assets/static/css"),
+    (STATIC_DIR / "js", "/static/js", ASSETS_DIR / "static" / "js", "/assets/static/js"),
+]
+
+# ハッシュの桁数 (app/core/assets.py の HASHED_FILENAME_PATTERN と揃える)
+HASH_LENGTH = 12
+HASHED_FILENAME_PATTERN = re.compile(r"\.[0-9a-f]{%d}\.[^./]+(\.gz|\.br)?$" % HASH_LENGTH)
+
+
+def iter_source_files(source_dir: Path) -> Iterator[Path]:
+    """フィンガープリント対象のファイル (出力済みのファイルを除く) を列挙する"""
+    if not source_dir.is_dir():
+        return
+    for path in sorted(source_dir.iterdir()):
+        if path.is_file() and not HASHED_FILENAME_PATTERN.search(path.name):
+            yield path
+
+
+def remove_outputs(output_dir: Path) -> int:
+    """出力ディレクトリ内のフィンガープリント付きファイルを削除する"""
+    removed = 0
+    if not output_dir.is_dir():
+        return removed
+    for path in output_dir.iterdir():
+        if path.is_file() and HASHED_FILENAME_PATTERN.search(path.name):
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def write_fingerprinted(source: Path, output_dir: Path) -> Tuple[str, int]:
+    """ハッシュ付きのコピーと圧縮版を書き出し、出力ファイル名と圧縮版の数を返す"""
+    data = source.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    hashed_name = f"{source.stem}.{digest}{source.suffix}"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    target = output_dir / hashed_name
+    target.write_bytes(data)
+
+    variants = 0
+    # mtime=0 で再ビルド時も同じバイト列になるようにする
+    compressed = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed[".br"] = brotli.compress(data, quality=11)
+    for suffix, body in compressed.items():
+        # 縮まない場合は出力しない (元ファイルをそのまま配信する)
+        if len(body) < len(data):
+            (output_dir / f"{hashed_name}{suffix}").write_bytes(body)
+            variants += 1
+    return hashed_name, variants
+
+
+def build_manifest() -> Dict[str, str]:
+    """全ソースをフィンガープリントし、論理名→URL の対応を返す"""
+    manifest: Dict[str, str] = {}
+    for source_dir, logical_prefix, output_dir, output_prefix in SOURCES:
+        remove_outputs(output_dir)
+        for source in iter_source_files(source_dir):
+            hashed_name, variants = write_fingerprinted(source, output_dir)
+            manifest[f"{logical_prefix}/{source.name}"] = f"{output_prefix}/{hashed_name}"
+            print(f"[asset] {logical_prefix}/{source.name} -> {output_prefix}/{hashed_name} (+{variants})")
+    return manifest
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="アセットにハッシュ付きファイル名と圧縮版を付与する")
+    parser.add_argument("--clean", action="store_true", help="出力済みのファイルとマニフェストを削除する")
+    args = parser.parse_args()
+
+    if args.clean:
+        removed = sum(remove_outputs(output_dir) for _, _, output_dir, _ in SOURCES)
+        MANIFEST_FILE.unlink(missing_ok=True)
+        print(f"[clean] {removed} 件のフィンガープリント付きファイルとマニフェストを削除しました")
+        return 0
+
+    manifest = build_manifest()
+    MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = MANIFEST_FILE.with_suffix(".json.tmp")
+    tmp_file.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    tmp_file.replace(MANIFEST_FILE)
+    print(f"[done] {len(manifest)} 件のアセットを {MANIFEST_FILE} に書き出しました")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@
 set -euo pipefail
 
 # Build CSS (Tailwind/daisyUI) and vendor JS bundles into assets/.
+# Set ASSET_FINGERPRINT=0 to skip content-hashed copies and the manifest (dev runs).
 
 ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 BUILDER_DIR="${ROOT_DIR}/builder"
@@ -35,4 +36,14 @@ echo "[js] Copying vendor bundles -> ${JS_DIR}"
 cp "${BUILDER_DIR}/node_modules/htmx.org/dist/htmx.min.js" "${JS_DIR}/htmx.min.js"
 cp "${BUILDER_DIR}/node_modules/alpinejs/dist/cdn.min.js" "${JS_DIR}/alpine.min.js"
 
+if [[ "${ASSET_FINGERPRINT:-1}" != "0" ]]; then
+  if command -v python3 >/dev/null 2>&1; then
+    echo "[hash] Writing content-hashed assets and manifest -> ${ASSETS_DIR}/manifest.json"
+    python3 "${ROOT_DIR}/scripts/build_asset_manifest.py"
+  else
+    # Node-only build stages have no python3; the Dockerfile runs the manifest step later.
+    echo "[skip] python3 not found; run scripts/build_asset_manifest.py to fingerprint assets"
+  fi
+fi
+
 echo "[done] Assets are built."
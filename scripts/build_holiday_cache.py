@@ -78,8 +78,11 @@ def build_holiday_cache() -> None:
     }
     
     try:
-        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        # 稼働中のアプリケーションが書き込み途中のファイルを読まないよう、一時ファイルから置き換える
+        tmp_file = CACHE_FILE.with_name(CACHE_FILE.name + '.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(cache_data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, CACHE_FILE)
         
         print(f"祝日キャッシュを保存しました: {len(all_holidays)}件 -> {CACHE_FILE}")
         
@@ -0,0 +1,48 @@
+"""Add attendance_summary table
+
+Revision ID: 5e2a8c4f7b19
+Revises: 9d4b6e2f1a73
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a8c4f7b19'
+down_revision: Union[str, None] = '9d4b6e2f1a73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'attendance_summary',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('location_id', sa.Integer(), nullable=False),
+        sa.Column('days', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'month', 'location_id')
+    )
+    op.create_index(op.f('ix_attendance_summary_month'), 'attendance_summary', ['month'], unique=False)
+    # 既存の勤怠データから集計を作成
+    op.execute(
+        """
+        INSERT INTO attendance_summary (user_id, month, location_id, days)
+        SELECT user_id, strftime('%Y-%m-01', date), location_id, COUNT(*)
+        FROM attendance
+        GROUP BY user_id, strftime('%Y-%m-01', date), location_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_attendance_summary_month'), table_name='attendance_summary')
+    op.drop_table('attendance_summary')
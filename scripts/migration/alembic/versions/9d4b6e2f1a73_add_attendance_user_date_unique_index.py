@@ -0,0 +1,40 @@
+"""Add unique (user_id, date) index and location_id index to attendance
+
+Revision ID: 9d4b6e2f1a73
+Revises: 3c9e5a7d2b41
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4b6e2f1a73'
+down_revision: Union[str, None] = '3c9e5a7d2b41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 一意制約を付与する前に、同一ユーザー・同一日付の重複レコードを最新 (id 最大) の1件に集約する
+    op.execute(
+        """
+        DELETE FROM attendance
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM attendance GROUP BY user_id, date
+        )
+        """
+    )
+    op.create_index(
+        'ix_attendance_user_id_date', 'attendance', ['user_id', 'date'], unique=True
+    )
+    op.create_index(op.f('ix_attendance_location_id'), 'attendance', ['location_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_attendance_location_id'), table_name='attendance')
+    op.drop_index('ix_attendance_user_id_date', table_name='attendance')
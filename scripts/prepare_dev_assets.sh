@@ -8,7 +8,9 @@ HOLIDAY_CACHE="${ASSETS_JSON}/holidays_cache.json"
 
 mkdir -p "${ASSETS_JSON}"
 
-"${ROOT_DIR}/scripts/build_assets.sh"
+# Dev runs serve files straight from app/static so edits show up without a rebuild.
+ASSET_FINGERPRINT=0 "${ROOT_DIR}/scripts/build_assets.sh"
+(cd "${ROOT_DIR}" && poetry run python scripts/build_asset_manifest.py --clean)
 
 if [[ ! -s "${HOLIDAY_CACHE}" ]]; then
   echo "[build] Building holiday cache -> ${HOLIDAY_CACHE}"
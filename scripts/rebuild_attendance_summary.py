@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+勤怠月次集計再構築スクリプト
+=========================
+
+勤怠明細 (attendance) から月次集計テーブル (attendance_summary) を全件作り直す。
+通常は勤怠の書き込み時に自動で更新されるため、SQL で直接データを投入した後や
+集計の不整合が疑われる場合に実行する。
+"""
+
+import sys
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.crud.attendance_summary import attendance_summary  # noqa: E402
+from app.crud.cache_generation import cache_generation  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+
+
+def main() -> int:
+    """集計テーブルを再構築し、終了コードを返す"""
+    db = SessionLocal()
+    try:
+        print("勤怠月次集計を再構築中...")
+        rows = attendance_summary.rebuild(db)
+        # 集計値を参照するキャッシュを全ワーカーで失効させる
+        cache_generation.mark_all_changed(db)
+        db.commit()
+        print(f"再構築が完了しました: {rows} 行")
+        return 0
+    except Exception as e:
+        db.rollback()
+        print(f"エラー: 再構築に失敗しました: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
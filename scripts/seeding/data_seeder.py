@@ -16,6 +16,7 @@ from datetime import date, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
+from app.crud.attendance_summary import attendance_summary
 from app.db.session import SessionLocal, init_db
 from app.models.user import User
 from app.models.attendance import Attendance
@@ -249,7 +250,8 @@ def seed_attendance(db: Session, days_back: int = 30, days_forward: int = 30) ->
                     db.add(attendance)
                     created_records.append(attendance)
 
-    # まとめてコミット
+    # 直接追加した勤怠記録を月次集計に反映してからまとめてコミット
+    attendance_summary.rebuild(db)
     db.commit()
     logger.info(f"{len(created_records)} 件の勤怠記録をシードしました。")
     return created_records